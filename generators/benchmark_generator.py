@@ -1,18 +1,23 @@
 import random
 
+from utils.projections import CATALOG
+from utils.spans import annotate, traced
+
 class BenchmarkGenerator:
-    def __init__(self, supabase):
+    def __init__(self, supabase, wods=None):
         """
         supabase: Supabase client instance
+        wods: optional preloaded benchmark_wods rows (skips the query)
         """
         self.supabase = supabase
-        self.wods = self._load_benchmark_wods()
+        self.wods = wods if wods is not None else self._load_benchmark_wods()
 
     def _load_benchmark_wods(self):
-        response = self.supabase.table("benchmark_wods").select("*").execute()
-        return response.data if response.data else []
+        return CATALOG["benchmark_wods"].fetch_all(self.supabase)
 
+    @traced("Benchmark")
     def generate(self):
+        annotate(pool=len(self.wods))
         if not self.wods:
             return {
                 "type": "Benchmark",
@@ -1,5 +1,7 @@
 import random
 
+from utils.spans import annotate, traced
+
 COOLDOWN_DURATION = 55
 TRANSITION_TIME = 5
 TOTAL_COOLDOWN_TIME = 10
@@ -30,10 +32,12 @@ class CooldownGenerator:
         category_ex_ids = {m["exercise_id"] for m in self.category_mappings if m["category_id"] == self.cooldown_category_id}
         return [ex for ex in self.exercises if ex["id"] in category_ex_ids]
 
+    @traced("Cooldown")
     def generate(self, muscles):
         muscle_specific_pool = self.get_muscle_specific_cooldowns(muscles)
         general_pool = self.get_general_cooldowns()
         general_pool = [ex for ex in general_pool if ex["id"] not in {e["id"] for e in muscle_specific_pool}]
+        annotate(pool=len(muscle_specific_pool), general_pool=len(general_pool))
 
         random.shuffle(muscle_specific_pool)
         random.shuffle(general_pool)
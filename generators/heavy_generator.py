@@ -1,17 +1,22 @@
 import random
 
+from utils.prescriptions import DEFAULT_PLATE_INCREMENT, expected_weight
+from utils.spans import annotate, traced
+
 EXERCISE_DURATION = 30  # seconds per rep estimate for time calculation
 TRANSITION_TIME = 5     # seconds between exercises
 
 
 class HeavyGenerator:
-    def __init__(self, data, debug=False):
+    def __init__(self, data, debug=False, maxes=None, plate_increment=DEFAULT_PLATE_INCREMENT):
         self.exercises = data["exercises"]
         self.muscle_groups = data["muscle_groups"]
         self.mappings = data["mappings"]
         self.categories = data["categories"]
         self.category_mappings = data["category_mappings"]
         self.debug = debug
+        self.maxes = maxes or {}  # exercise_name -> 1RM, for expected_weight
+        self.plate_increment = plate_increment
 
     def normalize_name(self, value):
         if isinstance(value, list):
@@ -63,11 +68,13 @@ class HeavyGenerator:
         6: {"sets": 3, "reps": 2, "pct": 80},
     }
 
+    @traced("Heavy")
     def generate(self, target, week=1):
         if isinstance(target, list):
             target = target[0]
 
         pool, debug_info = self.get_exercises_by_muscle_and_type(target, "Heavy")
+        annotate(pool=len(pool))
         exercise_name = random.choice(pool) if pool else "No exercise available"
         exercise_id = next((e["id"] for e in self.exercises if e["name"] == exercise_name), None)
 
@@ -119,6 +126,7 @@ class HeavyGenerator:
 
         all_sets = warmup_sets + [top_set] + backoffs
 
+        one_rm = self.maxes.get(exercise_name)
         exercises = []
         for i, s in enumerate(all_sets):
             exercises.append({
@@ -130,7 +138,7 @@ class HeavyGenerator:
                 "rest": s["rest"],
                 "notes": s["notes"],
                 "tempo": "20X0",
-                "expected_weight": "",
+                "expected_weight": expected_weight(one_rm, s["intensity"], self.plate_increment),
                 "equipment": "Barbell",
                 "exercise_order": i + 1
             })
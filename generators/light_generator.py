@@ -1,6 +1,8 @@
 
 import random
 
+from utils.spans import annotate, traced
+
 LIGHT_SETS = 3
 LIGHT_REPS = "15–20 reps each @ <60% 1RM"
 LIGHT_TIME = 15  # minutes
@@ -49,11 +51,13 @@ class LightGenerator:
         valid_ex_ids = muscle_ex_ids & category_ex_ids
         return [ex for ex in self.exercises if ex["id"] in valid_ex_ids]
 
+    @traced("Light")
     def generate(self, target):
         """Generate a light session with 3 supersets of 2 exercises (primary + opposing)."""
         primary_pool = self.get_light_exercises_by_muscle(target)
         opposing_group = self.opposing_map.get(target, target)
         opposing_pool = self.get_light_exercises_by_muscle(opposing_group)
+        annotate(pool=len(primary_pool), opposing_pool=len(opposing_pool))
 
         
         # ✅ Pick two exercises ONCE
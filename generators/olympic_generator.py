@@ -1,6 +1,9 @@
 
 import random
 
+from utils.prescriptions import DEFAULT_PLATE_INCREMENT, expected_weight
+from utils.spans import annotate, traced
+
 class OlympicGenerator:
     # --- 6-week %RM scheme to match heavy progression ---
     TOP_SETS = {
@@ -21,13 +24,15 @@ class OlympicGenerator:
         6: {"sets": 3, "reps": 2, "pct": 80},
     }
 
-    def __init__(self, data, debug=False):
+    def __init__(self, data, debug=False, maxes=None, plate_increment=DEFAULT_PLATE_INCREMENT):
         self.exercises = data["exercises"]
         self.categories = data["categories"]
         self.category_mappings = data["category_mappings"]
         self.mappings = data["mappings"]
         self.muscle_groups = data["muscle_groups"]
         self.debug = debug
+        self.maxes = maxes or {}  # exercise_name -> 1RM, for expected_weight
+        self.plate_increment = plate_increment
 
     def normalize_name(self, value):
         if isinstance(value, list):
@@ -56,8 +61,10 @@ class OlympicGenerator:
                       if m["exercise_id"] == exercise_id}
         return [mg["name"] for mg in self.muscle_groups if mg["id"] in muscle_ids]
 
+    @traced("Olympic")
     def generate(self, week=1):
         pool, debug_info = self.get_olympic_exercises()
+        annotate(pool=len(pool))
         if not pool:
             return {"error": "No Olympic exercises found", "debug": debug_info}
 
@@ -108,6 +115,7 @@ class OlympicGenerator:
 
         all_sets = warmup_sets + [top_set] + backoffs
 
+        one_rm = self.maxes.get(main_lift["name"])
         exercises = []
         for i, s in enumerate(all_sets):
             exercises.append({
@@ -119,7 +127,7 @@ class OlympicGenerator:
                 "rest": s["rest"],
                 "notes": s["notes"],
                 "tempo": "30X0",       # keep your existing tempo for Olympic lifts
-                "expected_weight": "",
+                "expected_weight": expected_weight(one_rm, s["intensity"], self.plate_increment),
                 "equipment": "Barbell",
                 "exercise_order": i + 1
             })
@@ -1,3 +1,6 @@
+from utils.spans import traced
+
+
 class RunGenerator:
     def __init__(self, user_5k_time=24, debug=False):
         """
@@ -7,6 +10,7 @@ class RunGenerator:
         self.user_5k_time = user_5k_time
         self.debug = debug
 
+    @traced("Run")
     def generate(self, duration=60):
         # Calculate pace and Zone 2 target
         five_km_pace_per_km = self.user_5k_time / 5  # min/km
@@ -1,7 +1,12 @@
+from utils.projections import CATALOG
+from utils.spans import traced
+
+
 class SkillSessionGenerator:
     def __init__(self, data, supabase, debug=False):
         """
         data: Dictionary containing exercises and other mappings
+              (optionally preloaded "skills" / "skill_plans", used instead of queries)
         supabase: Supabase client instance
         """
         self.data = data  # ✅ Store exercise dataset
@@ -9,17 +14,22 @@ class SkillSessionGenerator:
         self.debug = debug
 
     def get_skill_id(self, skill_name):
+        if "skills" in self.data:
+            return next((s["skill_id"] for s in self.data["skills"] if s["skill_name"] == skill_name), None)
         response = self.supabase.table("skills").select("skill_id").eq("skill_name", skill_name).execute()
         if response.data:
             return response.data[0]["skill_id"]
         return None
 
     def get_session_plan(self, skill_id, week):
-        response = self.supabase.table("skill_plans").select("*").eq("skill_id", skill_id).eq("week", week).execute()
+        if "skill_plans" in self.data:
+            return next((p for p in self.data["skill_plans"] if p["skill_id"] == skill_id and p["week"] == week), None)
+        response = CATALOG["skill_plans"].query(self.supabase).eq("skill_id", skill_id).eq("week", week).execute()
         if response.data:
             return response.data[0]
         return None
 
+    @traced("Skill")
     def generate(self, skill_name, week):
         skill_id = self.get_skill_id(skill_name)
         if not skill_id:
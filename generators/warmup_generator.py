@@ -1,5 +1,7 @@
 import random
 
+from utils.spans import annotate, traced
+
 EXERCISE_DURATION = 30  # seconds
 TRANSITION_TIME = 5     # seconds
 WARMUP_TIME = 10        # minutes
@@ -44,11 +46,13 @@ class WarmupGenerator:
         # Return exercise names
         return [e["name"] for e in self.exercises if e["id"] in exercise_ids]
 
+    @traced("Warmup")
     def generate(self, muscles):
         general_pool = self.get_general_warmup()
         specific_pool = []
         for muscle in muscles:
             specific_pool.extend(self.get_exercises_by_muscle(muscle))
+        annotate(pool=len(specific_pool), general_pool=len(general_pool))
     
         general_selected = random.sample(general_pool, min(8, len(general_pool)))
         specific_selected = random.sample(specific_pool, min(8, len(specific_pool)))
@@ -1,7 +1,10 @@
 
 import random
+import re
 from typing import Any, Dict, List, Optional, Sequence, Union
 
+from utils.spans import annotate, traced
+
 
 class WODGenerator:
     """
@@ -141,6 +144,7 @@ class WODGenerator:
         # Fallback if filters empty the pool
         if not pool:
             pool = list(self.data.get("exercise_pool") or [])
+        annotate(pool=len(pool))
         return pool
 
     def _pick_exercises(
@@ -239,10 +243,62 @@ class WODGenerator:
             "Alternating EMOM": {"Beginner": "Maintain for 6-8 minutes", "Intermediate": "9-12 minutes", "Advanced": "13-15 minutes", "Elite": "Maintain full duration unbroken"},
         }.get(wod_type, {})
 
+    @staticmethod
+    def _target_value(text: str) -> Optional[float]:
+        """Numeric reading of a target ('5-6 rounds' -> 5.5, '<10 min' -> 10); None if it has no numbers."""
+        nums = [int(n) for n in re.findall(r"\d+", text or "")]
+        return sum(nums) / len(nums) if nums else None
+
+    def wod_spec(
+        self,
+        wod_type: str,
+        duration_min: int,
+        structured: List[Dict[str, Any]],
+        template: Optional[str] = None,
+        rounds: Optional[int] = None,
+        work_min: Optional[int] = None,
+        rest_min: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Machine-readable WOD description, persisted as plan_sessions.wod_spec so the
+        session view reads it instead of parsing `details`:
+          - type, template, rounds
+          - cap_seconds: clock length (Tabata: rounds x (work + rest) x movements)
+          - phases: one interval cycle, [{"phase": "work"|"rest", "seconds": n}]; empty for running clocks
+          - movements: [{"name", "exercise_id", "qty", "unit"}]
+          - targets: {level: number | None} (rounds, minutes or reps, as the type's targets are worded)
+        """
+        movements = [
+            {"name": ex.get("name"), "exercise_id": ex.get("exercise_id"), "qty": ex.get("reps"), "unit": ex.get("unit", "reps")}
+            for ex in structured
+        ]
+        cap_seconds = int(duration_min) * 60
+        phases: List[Dict[str, Any]] = []
+        if wod_type == "Tabata":
+            rounds = rounds or 8
+            phases = [{"phase": "work", "seconds": 20}, {"phase": "rest", "seconds": 10}]
+            cap_seconds = rounds * 30 * max(1, len(movements))
+        elif wod_type in ("EMOM", "Alternating EMOM"):
+            phases = [{"phase": "work", "seconds": 60}]
+        elif wod_type == "Interval":
+            phases = [{"phase": "work", "seconds": (work_min or 2) * 60}, {"phase": "rest", "seconds": (rest_min or 1) * 60}]
+
+        return {
+            "version": 1,
+            "type": wod_type,
+            "template": template,
+            "rounds": rounds,
+            "cap_seconds": cap_seconds,
+            "phases": phases,
+            "movements": movements,
+            "targets": {level: self._target_value(text) for level, text in self.generate_targets(wod_type).items()},
+        }
+
     # ----------------------------
     # --------- Generate ---------
     # ----------------------------
 
+    @traced("WOD")
     def generate(
         self,
         target_muscle: Optional[Union[int, str]] = None,
@@ -289,6 +345,7 @@ class WODGenerator:
             }
 
         lines: List[str] = [f"{wod_type} for {duration} minutes"]
+        rounds = work = rest = None  # recorded in the structured spec when the format defines them
 
         # Build description per format
         if wod_type == "AMRAP":
@@ -361,6 +418,7 @@ class WODGenerator:
             "details": "\n".join(lines),
             "Performance Targets": self.generate_targets(wod_type),
             "exercises": structured,
+            "spec": self.wod_spec(wod_type, duration, structured, rounds=rounds, work_min=work, rest_min=rest),
             "debug": {
                 "muscle": target_muscle,
                 "stimulus": stimulus,
@@ -371,6 +429,7 @@ class WODGenerator:
     # --------------------------------------------
     # --- Optional richer templates (table-driven)
     # --------------------------------------------
+    @traced("WOD")
     def generate_complex_wod(
         self,
         target_muscle: Optional[Union[int, str]] = None,
@@ -427,6 +486,7 @@ class WODGenerator:
         duration = time_cap_for(wod_type)
         lines: List[str] = []
         structured: List[Dict[str, Any]] = []
+        rounds = work = rest = None  # recorded in the structured spec when the format defines them
 
         ladder_schemes = [[21, 15, 9], [21, 15, 9, 6, 3], [10, 8, 6, 4, 2]]
 
@@ -601,6 +661,7 @@ class WODGenerator:
             for i, ex in enumerate(moves, start=1):
                 item = self._structured_item(ex, i, 1, "Death by", duration)
                 item["notes"] = "Protocol: +1 rep each minute until failure"
+                structured.append(item)
         
 
 
@@ -629,6 +690,9 @@ class WODGenerator:
             "details": details,
             "Performance Targets": self.generate_targets(wod_type),
             "exercises": structured,
+            "spec": self.wod_spec(
+                wod_type, duration, structured, template=template, rounds=rounds, work_min=work, rest_min=rest
+            ),
             "debug": {"muscle": target_muscle, "stimulus": stimulus, "template": template} if self.debug else {},
         }
 
@@ -0,0 +1,95 @@
+-- 0001_plan_schema.sql
+-- Plan and results tables (create if missing), plus the columns later features added to
+-- tables that predate them. Column set mirrors storage/sqlite_backend.TABLES.
+
+create table if not exists plan_weeks (
+    id bigserial primary key,
+    number int not null,
+    notes text,
+    start_date date
+);
+alter table plan_weeks add column if not exists athlete_id bigint;  -- utils/plan_scope.py
+
+create table if not exists plan_days (
+    id bigserial primary key,
+    week_id bigint not null references plan_weeks (id) on delete cascade,
+    day_number int not null,
+    is_rest_day boolean not null default false,
+    date date,
+    total_time int
+);
+
+create table if not exists plan_sessions (
+    id bigserial primary key,
+    day_id bigint not null references plan_days (id) on delete cascade,
+    type text not null,
+    target_muscle text,
+    duration int,
+    details text,
+    focus_muscle text,
+    completed boolean not null default false
+);
+alter table plan_sessions add column if not exists performance_targets jsonb;
+alter table plan_sessions add column if not exists wod_spec jsonb;  -- generators/wod_generator.py (structured WOD spec)
+
+create table if not exists plan_session_exercises (
+    id bigserial primary key,
+    session_id bigint not null references plan_sessions (id) on delete cascade,
+    exercise_name text,
+    set_number int,
+    reps text,
+    intensity text,
+    rest int,
+    notes text,
+    exercise_order int,
+    completed boolean not null default false,
+    actual_reps text,
+    actual_weight text
+);
+alter table plan_session_exercises add column if not exists exercise_id bigint;
+alter table plan_session_exercises add column if not exists tempo text;
+alter table plan_session_exercises add column if not exists equipment text;
+alter table plan_session_exercises add column if not exists expected_weight text;  -- utils/prescriptions.py
+
+-- utils/session_blocks.py (PLAN_SET_LAYOUT=blocks)
+create table if not exists plan_session_blocks (
+    id bigserial primary key,
+    session_id bigint not null references plan_sessions (id) on delete cascade,
+    exercise_name text,
+    exercise_id bigint,
+    exercise_order int,
+    tempo text,
+    equipment text,
+    sets jsonb not null default '[]'::jsonb
+);
+
+-- utils/day_progress.py
+create table if not exists plan_day_progress (
+    day_id bigint primary key references plan_days (id) on delete cascade,
+    sessions_total int not null default 0,
+    sessions_completed int not null default 0,
+    sets_total int not null default 0,
+    sets_completed int not null default 0,
+    updated_at timestamptz default now()
+);
+
+create table if not exists exercise_maxes (
+    id bigserial primary key,
+    exercise_name text not null,
+    manual_1rm real,
+    calculated_1rm real,
+    source_set_id bigint,
+    date timestamptz not null default now()
+);
+
+create table if not exists wod_results (
+    id bigserial primary key,
+    session_id bigint,
+    user_id bigint not null default 1,
+    result_details jsonb,
+    rating int,
+    notes text,
+    timestamp timestamptz not null default now()
+);
+alter table wod_results add column if not exists benchmark_id bigint;
+alter table wod_results add column if not exists level text;
@@ -0,0 +1,22 @@
+-- 0002_hot_path_indexes.sql
+-- Composite indexes for the filters the app runs on every render / sync
+-- (each is exercised by a shape in storage/explain.py).
+
+-- plan_exists() and the dashboard: days of a plan by date
+create index if not exists ix_plan_days_date on plan_days (date);
+-- merge sync (_upsert_session), dashboard day cards, plan_scope.child_ids
+create index if not exists ix_plan_sessions_day_type on plan_sessions (day_id, type);
+-- session views, write-behind, day_progress rebuilds, plan_scope deletes
+create index if not exists ix_plan_session_exercises_session_order on plan_session_exercises (session_id, exercise_order);
+-- prescriptions.refresh_prescriptions (by lift name)
+create index if not exists ix_plan_session_exercises_name on plan_session_exercises (exercise_name);
+create index if not exists ix_plan_session_blocks_session_order on plan_session_blocks (session_id, exercise_order);
+create index if not exists ix_plan_session_blocks_name on plan_session_blocks (exercise_name);
+-- latest 1RM per lift (heavy / olympic views)
+create index if not exists ix_exercise_maxes_name_date on exercise_maxes (exercise_name, date desc);
+-- benchmark history per athlete, newest first
+create index if not exists ix_wod_results_benchmark_user_ts on wod_results (benchmark_id, user_id, timestamp desc);
+
+-- Catalog join indexes live in 0007, which creates the catalog tables first. They were
+-- dropped from here because a fresh Postgres has no catalog tables at this point; a
+-- database that already applied this file has them, and 0007 leaves them as they are.
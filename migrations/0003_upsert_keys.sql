@@ -0,0 +1,23 @@
+-- 0003_upsert_keys.sql
+-- Unique keys that single-statement upserts (PostgREST on_conflict=...) resolve against.
+-- These replace the select-then-insert/update round trips of the merge sync and the
+-- result views.
+
+-- One week number per plan; the default plan has athlete_id null, so nulls must compare
+-- equal (Postgres 15+, which Supabase runs).
+create unique index if not exists ux_plan_weeks_athlete_number
+    on plan_weeks (athlete_id, number) nulls not distinct;
+
+-- One row per day of a week (merge sync _get_or_create_day). Duplicates here mean a plan
+-- was written twice without a wipe; the index build fails on them rather than guessing
+-- which copy the sessions belong to.
+create unique index if not exists ux_plan_days_week_day on plan_days (week_id, day_number);
+
+-- One result per athlete and session (on_conflict="session_id,user_id"). Repeated
+-- submissions used to insert new rows; keep the newest.
+delete from wod_results r
+ using wod_results newer
+ where r.session_id = newer.session_id
+   and r.user_id = newer.user_id
+   and r.id < newer.id;
+create unique index if not exists ux_wod_results_session_user on wod_results (session_id, user_id);
@@ -0,0 +1,40 @@
+-- 0004_complete_session_exercises.sql
+-- RPC behind utils/completion.set_completion: tick / untick a session's sets, update the
+-- session flag and its plan_day_progress row in one call.
+
+create or replace function complete_session_exercises(
+    p_session_id bigint, p_done_ids bigint[], p_undone_ids bigint[], p_session_completed boolean
+) returns json language plpgsql as $$
+declare
+    v_day bigint; v_prev boolean; v_done int; v_undone int; v_sessions int := 0;
+    v_sets_completed int; v_sets_total int; v_day_row json;
+begin
+    update plan_session_exercises set completed = true
+     where session_id = p_session_id and id = any(p_done_ids) and not coalesce(completed, false);
+    get diagnostics v_done = row_count;
+    update plan_session_exercises set completed = false
+     where session_id = p_session_id and id = any(p_undone_ids) and coalesce(completed, false);
+    get diagnostics v_undone = row_count;
+
+    select day_id, coalesce(completed, false) into v_day, v_prev from plan_sessions where id = p_session_id for update;
+    if p_session_completed is not null and p_session_completed <> v_prev then
+        update plan_sessions set completed = p_session_completed where id = p_session_id;
+        v_sessions := case when p_session_completed then 1 else -1 end;
+    end if;
+
+    update plan_day_progress
+       set sets_completed = greatest(0, sets_completed + v_done - v_undone),
+           sessions_completed = greatest(0, sessions_completed + v_sessions),
+           updated_at = now()
+     where day_id = v_day
+    returning json_build_object('day_id', day_id, 'sessions_total', sessions_total,
+                                'sessions_completed', sessions_completed, 'sets_total', sets_total,
+                                'sets_completed', sets_completed) into v_day_row;
+
+    select count(*) filter (where completed), count(*) into v_sets_completed, v_sets_total
+      from plan_session_exercises where session_id = p_session_id;
+    return json_build_object(
+        'changed', v_done + v_undone,
+        'sets_completed', v_sets_completed, 'sets_total', v_sets_total,
+        'session_completed', coalesce(p_session_completed, v_prev), 'day', v_day_row);
+end $$;
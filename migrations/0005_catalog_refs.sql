@@ -0,0 +1,7 @@
+-- 0005_catalog_refs.sql
+-- Catalog rows each stored session was generated from (utils/catalog_deps.py), so a
+-- catalog change can find the affected sessions without scanning plans.
+
+alter table plan_sessions add column if not exists catalog_refs jsonb not null default '[]'::jsonb;
+-- catalog_refs @> '["md_exercises:12"]' (PostgREST cs) lookups
+create index if not exists ix_plan_sessions_catalog_refs on plan_sessions using gin (catalog_refs jsonb_path_ops);
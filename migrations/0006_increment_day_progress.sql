@@ -0,0 +1,17 @@
+-- 0006_increment_day_progress.sql
+-- Atomic counter change on plan_day_progress (utils/day_progress.increment_progress), so
+-- two processes flushing the same day cannot lose each other's updates.
+
+create or replace function increment_day_progress(p_day_id bigint, p_deltas jsonb)
+returns json language sql as $$
+    update plan_day_progress
+       set sessions_total = greatest(0, sessions_total + coalesce((p_deltas ->> 'sessions_total')::int, 0)),
+           sessions_completed = greatest(0, sessions_completed + coalesce((p_deltas ->> 'sessions_completed')::int, 0)),
+           sets_total = greatest(0, sets_total + coalesce((p_deltas ->> 'sets_total')::int, 0)),
+           sets_completed = greatest(0, sets_completed + coalesce((p_deltas ->> 'sets_completed')::int, 0)),
+           updated_at = now()
+     where day_id = p_day_id
+    returning json_build_object('day_id', day_id, 'sessions_total', sessions_total,
+                                'sessions_completed', sessions_completed, 'sets_total', sets_total,
+                                'sets_completed', sets_completed);
+$$;
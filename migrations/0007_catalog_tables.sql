@@ -0,0 +1,84 @@
+-- 0007_catalog_tables.sql
+-- Catalog tables (create if missing) and the indexes of their generation-time joins.
+-- Column set mirrors storage/sqlite_backend.TABLES. On Supabase these tables already
+-- exist and are left as they are; a fresh Postgres gets them here, before the indexes
+-- that need them (which 0002 used to create).
+
+create table if not exists md_exercises (
+    id bigserial primary key,
+    name text not null,
+    equipment text,
+    description text
+);
+
+create table if not exists md_muscle_groups (
+    id bigserial primary key,
+    name text not null
+);
+
+create table if not exists md_map_exercise_muscle_groups (
+    id bigserial primary key,
+    exercise_id bigint references md_exercises (id) on delete cascade,
+    musclegroup_id bigint references md_muscle_groups (id) on delete cascade
+);
+
+create table if not exists md_categories (
+    id bigserial primary key,
+    name text not null
+);
+
+create table if not exists md_map_exercise_categories (
+    id bigserial primary key,
+    exercise_id bigint references md_exercises (id) on delete cascade,
+    category_id bigint references md_categories (id) on delete cascade
+);
+
+create table if not exists exercise_pool (
+    id bigserial primary key,
+    musclegroup_id bigint,
+    exercise text not null,
+    unit text,
+    range_min int,
+    range_max int,
+    rx_male_kg real,
+    rx_female_kg real,
+    equipment jsonb,
+    tags jsonb,
+    skill_level int,
+    is_unilateral boolean,
+    notes text
+);
+
+create table if not exists skills (
+    skill_id bigserial primary key,
+    skill_name text not null
+);
+
+create table if not exists skill_plans (
+    id bigserial primary key,
+    skill_id bigint references skills (skill_id) on delete cascade,
+    week int,
+    focus text,
+    session_plan jsonb
+);
+
+create table if not exists benchmark_wods (
+    id bigserial primary key,
+    name text not null,
+    description text,
+    estimated_time text,
+    workout_type text,
+    type text,
+    beginner text,
+    intermediate text,
+    advanced text,
+    elite text,
+    wodwell_url text
+);
+
+-- Catalog joins at generation time
+create index if not exists ix_map_muscle_exercise on md_map_exercise_muscle_groups (exercise_id);
+create index if not exists ix_map_muscle_group on md_map_exercise_muscle_groups (musclegroup_id);
+create index if not exists ix_map_category_exercise on md_map_exercise_categories (exercise_id);
+create index if not exists ix_map_category on md_map_exercise_categories (category_id);
+create index if not exists ix_skill_plans_skill_week on skill_plans (skill_id, week);
@@ -1,59 +1,80 @@
 
+import time
+_script_started = time.perf_counter()
+
 import streamlit as st
-from supabase import create_client
-#from session_views import warmup, heavy, olympic, wod, cooldown, light, skill, run, benchmark
+from storage import get_client
+from session_views import load_view
 from datetime import date
-import importlib
+from utils.startup_profiler import IMPORT_TIMES, enabled as profiling_enabled
+from utils.write_behind import recover_spilled
+from utils.day_progress import fetch_progress, rebuild_day_progress
+from utils.cache_bus import bus_cached
+from utils.pagination import fetch_all
+from utils.plan_scope import current_athlete_id, scope_weeks
+from utils.projections import DAY_SESSIONS, PLAN_DAYS, PLAN_WEEKS, SESSION_SETS
 
 # ✅ Page config
 st.set_page_config(page_title="FullCrossFit Dashboard", page_icon="🏠", layout="wide")
 
 # ✅ Supabase setup
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = get_client()  # Supabase or local SQLite, per STORAGE_BACKEND
 
 
-def safe_import(modname: str):
-    """Import a module by name; warn and return None if it fails."""
+def safe_load_view(session_type: str):
+    """Load the view for a session type on demand; warn and return None if it fails."""
     try:
-        return importlib.import_module(modname)
+        return load_view(session_type)
+    except KeyError:
+        st.error("Unknown session type.")
     except Exception as e:
-               st.warning(f"Optional module `{modname}` not loaded: {e}")
+        st.warning(f"Session view for `{session_type}` not loaded: {e}")
     return None
 
-# Lazy imports of session views (each can fail without killing the app)
-warmup    = safe_import("session_views.warmup")
-heavy     = safe_import("session_views.heavy")
-olympic   = safe_import("session_views.olympic")
-wod       = safe_import("session_views.wod")
-cooldown  = safe_import("session_views.cooldown")
-light     = safe_import("session_views.light")
-run       = safe_import("session_views.run")
-benchmark = safe_import("session_views.benchmark")
-skill     = safe_import("session_views.skill")
 
+# ✅ Replay session-logging writes spilled by a previous process (once per process)
+@st.cache_resource
+def recover_pending_writes():
+    return recover_spilled(supabase)
+
+recover_pending_writes()
 
 # ✅ Session state
 if "selected_session" not in st.session_state:
     st.session_state.selected_session = None
 
 # ✅ Cached data fetch
-@st.cache_data(ttl=60)
+# Entries are evicted by utils.cache_bus events from the session views and sync paths;
+# the long TTL only backstops writes made by other processes.
+CACHE_TTL = 3600
+
+@bus_cached(ttl=CACHE_TTL, tables=["plan_weeks"])
 def fetch_weeks():
-    return supabase.table("plan_weeks").select("*").order("number").execute().data
+    # Only this app's plan (PLAN_ATHLETE_ID); days and sessions follow from its weeks
+    athlete_id = current_athlete_id()
+    return fetch_all(lambda: scope_weeks(PLAN_WEEKS.query(supabase), athlete_id).order("number").order("id"),
+                     source="plan_weeks")
 
-@st.cache_data(ttl=60)
+@bus_cached(ttl=CACHE_TTL, tables=["plan_days"])
 def fetch_days(week_id):
-    return supabase.table("plan_days").select("*").eq("week_id", week_id).execute().data
+    return PLAN_DAYS.query(supabase).eq("week_id", week_id).execute().data
 
-@st.cache_data(ttl=60)
+@bus_cached(ttl=CACHE_TTL, tables=["plan_sessions"], tags=lambda rows, day_ids: [("plan_sessions", s["id"]) for s in rows])
 def fetch_sessions(day_ids):
-    return supabase.table("plan_sessions").select("*").in_("day_id", day_ids).execute().data
-
-@st.cache_data(ttl=60)
+    return DAY_SESSIONS.query(supabase).in_("day_id", day_ids).execute().data
+
+@bus_cached(ttl=CACHE_TTL, tables=["plan_day_progress"], tags=lambda progress, day_ids: [("plan_day_progress", d) for d in day_ids])
+def fetch_day_progress(day_ids):
+    """Completion summary for every day of the plan in one query (backfilling missing rows)."""
+    progress = fetch_progress(supabase, day_ids)
+    missing = [d for d in day_ids if d not in progress]
+    if missing:
+        progress.update({row["day_id"]: row for row in rebuild_day_progress(supabase, missing)})
+    return progress
+
+@bus_cached(ttl=CACHE_TTL, tables=["plan_session_exercises"], tags=lambda rows, session_id: [("plan_session_exercises", r["id"]) for r in rows])
 def fetch_exercises(session_id):
-    return supabase.table("plan_session_exercises").select("*").eq("session_id", session_id).order("set_number").execute().data
+    return SESSION_SETS.query(supabase).eq("session_id", session_id).order("set_number").execute().data
 
 # ✅ Dashboard view
 if st.session_state.selected_session is None:
@@ -87,10 +108,23 @@ if st.session_state.selected_session is None:
     if not current_week_id:
         current_week_id = weeks[0]["id"]
 
+    # Plan-wide completion summary (one query for every day of every week)
+    all_day_ids = tuple(d["id"] for w in weeks for d in week_days_map[w["id"]])
+    progress = fetch_day_progress(all_day_ids)
+
+    def week_progress_label(label):
+        week = next(w for w in weeks if f"Week {w['number']}" == label)
+        rows = [progress.get(d["id"], {}) for d in week_days_map[week["id"]]]
+        done = sum(r.get("sessions_completed", 0) for r in rows)
+        total = sum(r.get("sessions_total", 0) for r in rows)
+        return f"{label} ({done}/{total} sessions)"
+
     # Week selection with default set to current week
     week_labels = [f"Week {w['number']}" for w in weeks]
     default_week_label = f"Week {next(w['number'] for w in weeks if w['id'] == current_week_id)}"
-    selected_week_label = st.selectbox("Select Week", week_labels, index=week_labels.index(default_week_label))
+    selected_week_label = st.selectbox(
+        "Select Week", week_labels, index=week_labels.index(default_week_label), format_func=week_progress_label
+    )
 
     current_week = next(w for w in weeks if f"Week {w['number']}" == selected_week_label)
 
@@ -113,7 +147,7 @@ if st.session_state.selected_session is None:
                     "completed": s.get("completed", False),
                     "session_id": s["id"]
                 } for s in day_sessions}
-                full_plan[selected_week_label][label] = {"plan": plan}
+                full_plan[selected_week_label][label] = {"plan": plan, "day_id": day["id"]}
         else:
             # Inject missing day as rest
             full_plan[selected_week_label][label] = {"Rest": True}
@@ -126,9 +160,9 @@ if st.session_state.selected_session is None:
             status_icon = "💤"
             label_text = f"{status_icon} {day_label}"
         else:
-            sessions_for_day = day_info["plan"].values()
-            completed_count = sum(1 for s in sessions_for_day if s.get("completed") is True)
-            total_count = len(sessions_for_day)
+            day_progress = progress.get(day_info["day_id"], {})
+            completed_count = day_progress.get("sessions_completed", 0)
+            total_count = day_progress.get("sessions_total", 0)
             if completed_count == 0:
                 status_icon = "⚫"
             elif completed_count == total_count:
@@ -186,33 +220,23 @@ if st.session_state.selected_session is None:
                 if st.button(button_text, key=session_content["session_id"], use_container_width=True):
                     st.session_state.selected_session = {
                         "session_id": session_content["session_id"],
+                        "day_id": day_record["id"] if day_record else None,
+                        "completed": bool(session_content.get("completed")),
                         "type": session_type,
                         "day": selected_day,
                         "week": selected_week_label
                     }
                     st.rerun()
 
-# ✅ Routing to session detail
+# ✅ Routing to session detail (only the routed view module is imported)
 if st.session_state.selected_session:
     session = st.session_state.selected_session
-    session_type = session["type"]
-    if session_type == "Warmup":
-        warmup.render(session)
-    elif session_type == "Heavy":
-        heavy.render(session)
-    elif session_type == "Olympic":
-        olympic.render(session)
-    elif session_type == "WOD":
-        wod.render(session)
-    elif session_type == "Skill":
-        skill.render(session)
-    elif session_type == "Light":
-        light.render(session)
-    elif session_type == "Run":
-        run.render(session)
-    elif session_type == "Benchmark":
-        benchmark.render(session)
-    elif session_type == "Cooldown":
-        cooldown.render(session)
-    else:
-        st.error("Unknown session type.")
+    view = safe_load_view(session["type"])
+    if view is not None:
+        view.render(session)
+
+# ✅ Startup profile (STARTUP_PROFILE=1)
+if profiling_enabled():
+    with st.sidebar.expander("⏱ Startup profile"):
+        st.write(f"Script run: {(time.perf_counter() - _script_started) * 1000:.0f} ms")
+        st.table([{"module": m, "import ms": ms} for m, ms in IMPORT_TIMES.items()])
@@ -1,18 +1,22 @@
 
 # 2_⚙️_Plan_Generator.py
 import streamlit as st
-from supabase import create_client
-import pandas as pd
+from storage import get_client
 from datetime import datetime, timedelta, date
 
 # Plan generators
 from plan_generators.crossfit_generator import CrossFitPlanGenerator, UpdateScope, _normalize_iso_date
-from plan_generators.supabase_sync_function import merge_plan_patch_to_supabase
+from plan_generators.sync_jobs import SyncJobConflict, active_job, get_job, submit, submit_sync
+from plan_generators.sync_journal import has_pending_sync, resume_sync
+from plan_generators.plan_export import EXPORT_FORMATS, iter_plan_rows, export_to_bytes
+from utils.plan_preview import summarize_plan, render_plan_preview
+from utils.plan_scope import current_athlete_id, plan_key
+from utils.prescriptions import DEFAULT_PLATE_INCREMENT
+from utils.spans import profile_call, record_spans
 
 # Connect to Supabase
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = get_client()  # Supabase or local SQLite, per STORAGE_BACKEND
+athlete_id = current_athlete_id()  # plan namespace (PLAN_ATHLETE_ID); syncs only touch this plan's rows
 
 # Sidebar
 st.sidebar.title("Plan Options")
@@ -24,7 +28,9 @@ start_date_dt = st.date_input("Select Start Date", datetime.today()).strftime("%
 
 # Initialize generator
 if plan_type == "CrossFit":
-    plan_gen = CrossFitPlanGenerator(supabase)
+    plate_increment = st.sidebar.number_input("Plate increment (kg)", min_value=0.5, max_value=10.0,
+                                              value=DEFAULT_PLATE_INCREMENT, step=0.25)
+    plan_gen = CrossFitPlanGenerator(supabase, plate_increment=plate_increment, athlete_id=athlete_id)
     skills = [s["skill_name"] for s in plan_gen.fetch_skills()]
     selected_skill = st.selectbox("Select Skill for Skill Sessions", skills)
 else:
@@ -32,13 +38,116 @@ else:
     st.stop()
 
 debug_mode = st.checkbox("Enable Debug Mode")
+profile_generation = debug_mode and st.checkbox("Profile generation (cProfile)")
 sync_full_wipe = st.checkbox("Sync Full Plan to Supabase (full wipe)")
+# Sync backend label -> plan_generators.sync_jobs kind
+SYNC_BACKENDS = {
+    "Supabase (REST, row by row)": "rest",
+    "Supabase (REST, concurrent)": "concurrent",
+    "Supabase (REST, resumable chunks)": "resumable",
+    "Postgres (single COPY transaction)": "postgres",
+}
+sync_backend = st.selectbox("Sync backend", list(SYNC_BACKENDS), disabled=not sync_full_wipe)
+sync_concurrency = st.sidebar.number_input("Concurrent sync requests", min_value=1, max_value=32, value=8)
 
 # Session state
 if "full_plan" not in st.session_state:
     st.session_state.full_plan = None
 if "patch_plan" not in st.session_state:
     st.session_state.patch_plan = None
+if "plan_summaries" not in st.session_state:
+    st.session_state.plan_summaries = None
+if "patch_summaries" not in st.session_state:
+    st.session_state.patch_summaries = None
+if "generation_timings" not in st.session_state:
+    st.session_state.generation_timings = None
+if "sync_job_id" not in st.session_state:
+    st.session_state.sync_job_id = None
+
+
+def run_generation(generate, *args, **kwargs):
+    """Run a generate_* call with timing spans (and cProfile when enabled); kept for the debug panel."""
+    report = None
+    with record_spans() as spans:
+        if profile_generation:
+            plan, report = profile_call(generate, *args, **kwargs)
+        else:
+            plan = generate(*args, **kwargs)
+    st.session_state.generation_timings = {"spans": spans.rows(), "profile": report}
+    return plan
+
+
+def render_generation_timings():
+    timings = st.session_state.generation_timings
+    if not (debug_mode and timings):
+        return
+    with st.expander("⏱ Generation timings (last run)"):
+        st.dataframe(timings["spans"], use_container_width=True)
+        if timings["profile"]:
+            st.code(timings["profile"], language="text")
+
+
+def start_sync_job(submit_job):
+    """Start a background sync (plan_generators.sync_jobs); only one runs per plan at a time."""
+    try:
+        job = submit_job()
+    except SyncJobConflict as e:
+        st.session_state.sync_job_id = e.job.job_id
+        st.warning(f"A {e.job.kind} sync is already running for this plan; wait for it or cancel it first.")
+        return False
+    st.session_state.sync_job_id = job.job_id
+    return True
+
+
+def _format_seconds(seconds):
+    return "–" if seconds is None else f"{int(seconds) // 60:d}:{int(seconds) % 60:02d}"
+
+
+def _sync_job_panel(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return
+    snap = job.snapshot()
+
+    st.markdown(f"**Sync job `{snap['job_id']}`** ({snap['kind']}): {snap['state']}")
+    if snap["fraction"] is not None:
+        st.progress(snap["fraction"])
+    st.caption(
+        f"{snap['written']} / {snap['total'] or '?'} rows · elapsed {_format_seconds(snap['elapsed_s'])}"
+        f" · ETA {_format_seconds(snap['eta_s'])}"
+        + (f" · {snap['rows_per_s']} rows/s" if snap["rows_per_s"] else "")
+    )
+    st.dataframe(
+        [{"level": lv["level"], "written": lv["written"], "expected": lv["total"]} for lv in snap["levels"]],
+        use_container_width=True,
+    )
+    if job.active:
+        if st.button("Cancel sync", key=f"cancel_{job.job_id}", disabled=snap["state"] == "cancelling"):
+            job.cancel()
+    elif snap["state"] == "done":
+        st.success(f"Sync finished: {snap['result']}")
+    elif snap["state"] == "failed":
+        st.error(f"Sync failed: {snap['error']}")
+    else:
+        st.warning("Sync cancelled." + (" It can be resumed below." if job.kind in ("resumable", "resume") else ""))
+
+
+def render_sync_job():
+    """Progress of the current sync job, polled every second while it runs."""
+    job = get_job(st.session_state.sync_job_id) or active_job(plan_key(athlete_id))
+    if job is None:
+        return
+    st.session_state.sync_job_id = job.job_id
+    poll = 1.0 if job.active else None
+    if hasattr(st, "fragment"):
+        # Streamlit >= 1.37: only the panel reruns while polling
+        st.fragment(run_every=poll)(_sync_job_panel)(job.job_id)
+        return
+    _sync_job_panel(job.job_id)
+    if poll:
+        from streamlit_autorefresh import st_autorefresh
+        st_autorefresh(interval=int(poll * 1000), key="sync_job_poll")
+
 
 # Info panel: Existing plan?
 exists = plan_gen.plan_exists(start_date_dt, weeks=6)
@@ -49,72 +158,42 @@ st.info(f"Plan exists in Supabase for the 6-week window starting {start_date_dt}
 st.subheader("Generate Full Plan")
 if st.button(f"Generate 6-Week {plan_type} Plan"):
     st.session_state.full_plan = None
-    full_plan = plan_gen.generate_full_plan(start_date=start_date_dt, skill=selected_skill)
+    full_plan = run_generation(plan_gen.generate_full_plan, start_date=start_date_dt, skill=selected_skill)
     st.session_state.full_plan = full_plan
+    st.session_state.plan_summaries = summarize_plan(full_plan)
     if sync_full_wipe:
-        plan_gen.sync_plan_to_supabase(full_plan)  # full-wipe first-time creation path [1](https://danone-my.sharepoint.com/personal/john_matthews_danone_com/Documents/Microsoft%20Copilot%20Chat%20Files/2_%E2%9A%99%EF%B8%8F_Plan_Generator.py)
-        st.success("Full plan synced to Supabase (full wipe).")
+        # Written in the background; progress is shown below and the page stays usable
+        start_sync_job(lambda: submit_sync(plan_gen, SYNC_BACKENDS[sync_backend], full_plan,
+                                           concurrency=sync_concurrency))
 
-# Display full plan
+render_generation_timings()
+render_sync_job()
+
+# Interrupted resumable sync (the checkpoint stores its plan)
+if has_pending_sync(athlete_id=athlete_id) and active_job(plan_key(athlete_id)) is None:
+    st.warning("A previous chunked sync was interrupted before it finished.")
+    if st.button("Resume interrupted sync"):
+        data = plan_gen.data
+        if start_sync_job(lambda: submit("resume", lambda job: resume_sync(job.client(supabase), data, athlete_id=athlete_id),
+                                         plan_key=plan_key(athlete_id))):
+            st.rerun()
+
+# Display full plan (one week at a time, sections on demand)
 if st.session_state.full_plan:
     full_plan = st.session_state.full_plan
-    week_tabs = st.tabs([f"Week {i}" for i in range(1, 7)])
-    for idx, (week_label, week_data) in enumerate(full_plan.items()):
-        with week_tabs[idx]:
-            st.header(week_label)
-            for day_label, day_data in week_data.items():
-                st.subheader(f"{day_label} ({day_data.get('date', '')})")
-                if day_data.get("Rest"):
-                    st.markdown("**Rest Day 💤**")
-                else:
-                    st.markdown(f"**Target Muscles:** {', '.join(day_data.get('muscles', []))}")
-                    st.markdown(f"**Stimulus:** `{day_data.get('stimulus', 'N/A')}`")
-                    st.markdown(f"**Estimated Time:** `{day_data.get('estimated_time', 'N/A')} min`")
-                    if "plan" in day_data:
-                        for section, content in day_data["plan"].items():
-                            if section != "Debug":
-                                # Keep your previous UI exclusions (Tue Light; Thu Warmup/Cooldown/Light)
-                                if (day_label == "Tue" and section == "Light") or \
-                                   (day_label == "Thu" and section in ["Warmup", "Cooldown", "Light"]):
-                                    continue
-                                st.markdown(f"### {section}")
-                                if isinstance(content, dict):
-                                    if "details" in content:
-                                        st.markdown(f"**Details:** {content['details']}")
-                                    st.json(content)
-                                else:
-                                    st.json(content)
-                    if debug_mode and "Debug" in day_data.get("plan", {}):
-                        st.markdown("**Debug Info**")
-                        st.json(day_data["plan"]["Debug"])
-
-    # Export CSV
-    if st.button("Export Plan to CSV"):
-        rows = []
-        for week_label, week_data in full_plan.items():
-            for day_label, day_data in week_data.items():
-                if day_data.get("Rest"):
-                    rows.append([week_label, day_label, day_data.get("date", ""), "Rest", "", "", "", ""])
-                else:
-                    if "plan" in day_data:
-                        for section, content in day_data["plan"].items():
-                            if section != "Debug" and isinstance(content, dict):
-                                if (day_label == "Tue" and section == "Light") or \
-                                   (day_label == "Thu" and section in ["Warmup", "Cooldown", "Light"]):
-                                    continue
-                                rows.append([
-                                    week_label,
-                                    day_label,
-                                    day_data.get("date", ""),
-                                    section,
-                                    ", ".join(day_data.get("muscles", [])),
-                                    day_data.get("stimulus", ""),
-                                    content.get("details", ""),
-                                    content.get("time", "")
-                                ])
-        df = pd.DataFrame(rows, columns=["Week", "Day", "Date", "Type", "Target Muscles", "Stimulus", "Details", "Duration"])
-        csv = df.to_csv(index=False)
-        st.download_button("Download CSV", csv, "6_week_plan.csv", "text/csv")
+    render_plan_preview(full_plan, st.session_state.plan_summaries, debug_mode=debug_mode, key_prefix="full")
+
+    # Export (set-level rows, written in chunks)
+    export_fmt = st.selectbox("Export format", list(EXPORT_FORMATS), key="export_fmt")
+    if st.button("Export Plan"):
+        try:
+            payload = export_to_bytes(iter_plan_rows(full_plan), export_fmt)
+        except ImportError as e:
+            st.error(str(e))
+        else:
+            st.download_button(
+                f"Download {export_fmt.upper()}", payload, f"6_week_plan.{export_fmt}", EXPORT_FORMATS[export_fmt]
+            )
 
 # --- Partial update controls ---
 st.subheader("Partial Update (Merge Only)")
@@ -138,6 +217,7 @@ replace_section = st.radio(
     index=0
 )
 replace_flag = (replace_section == "Replace exercises in selected sections")
+concurrent_merge = st.checkbox("Issue merge requests concurrently")
 
 col_a, col_b = st.columns(2)
 with col_a:
@@ -148,7 +228,10 @@ with col_a:
             dates=set([_normalize_iso_date(d) for d in dates_selected]) if dates_selected else None,
             sections=set(sections_selected) if sections_selected else None
         )
-        st.session_state.patch_plan = plan_gen.generate_partial_plan(start_date_dt, scope, skill=selected_skill)
+        st.session_state.patch_plan = run_generation(
+            plan_gen.generate_partial_plan, start_date_dt, scope, skill=selected_skill
+        )
+        st.session_state.patch_summaries = summarize_plan(st.session_state.patch_plan)
         if st.session_state.patch_plan:
             st.success("Patch generated.")
         else:
@@ -159,14 +242,15 @@ with col_b:
         if not st.session_state.patch_plan:
             st.warning("Generate a patch first.")
         else:
-            summary = plan_gen.sync_partial_plan_to_supabase(
-                st.session_state.patch_plan,
-                start_date=start_date_dt,
-                replace_section=replace_flag
-            )  # non-destructive merge aligned to your schema [1](https://danone-my.sharepoint.com/personal/john_matthews_danone_com/Documents/Microsoft%20Copilot%20Chat%20Files/2_%E2%9A%99%EF%B8%8F_Plan_Generator.py)
-            st.success(f"Merged: {summary}")
+            # non-destructive merge aligned to your schema, run as a background job (progress above)
+            patch_plan = st.session_state.patch_plan
+            if start_sync_job(lambda: submit_sync(
+                plan_gen, "merge-concurrent" if concurrent_merge else "merge", patch_plan,
+                start_date=start_date_dt, replace_section=replace_flag, concurrency=sync_concurrency,
+            )):
+                st.rerun()
 
 # Show patch if present
 if st.session_state.patch_plan:
     st.subheader("Patch preview")
-   
+    render_plan_preview(st.session_state.patch_plan, st.session_state.patch_summaries, debug_mode=debug_mode, key_prefix="patch")
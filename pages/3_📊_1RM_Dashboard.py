@@ -1,20 +1,22 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from supabase import create_client
+from storage import get_client
+from utils.pagination import fetch_all
+from utils.plan_scope import current_athlete_id
+from utils.prescriptions import refresh_prescriptions
+from utils.projections import MAX_HISTORY
 
 
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = get_client()  # Supabase or local SQLite, per STORAGE_BACKEND
 
 st.title("📊 Global 1RM Dashboard")
 
 # Fetch all exercises with history
-history = supabase.table("exercise_maxes") \
-    .select("*") \
-    .order("date", desc=True) \
-    .execute().data
+history = fetch_all(
+    lambda: MAX_HISTORY.query(supabase).order("date", desc=True).order("id", desc=True),
+    source="exercise_maxes",
+)
 
 if not history:
     st.warning("No 1RM data available yet.")
@@ -41,5 +43,7 @@ else:
                 "manual_1rm": manual_input,
                 "date": datetime.now().isoformat()
             }).execute()
-            st.success(f"Manual 1RM for {ex} saved!")
+            updated = refresh_prescriptions(supabase, {ex: manual_input}, exercise_names=[ex],
+                                            athlete_id=current_athlete_id())
+            st.success(f"Manual 1RM for {ex} saved! ({updated} planned sets re-prescribed)")
             st.rerun()
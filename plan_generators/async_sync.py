@@ -0,0 +1,217 @@
+# async_sync.py
+"""
+asyncio variants of the plan sync functions and the generator catalog load.
+
+The Supabase client is blocking, so every request runs in a worker thread
+(asyncio.to_thread) and a semaphore caps how many are in flight at once.
+Rows are written one hierarchy level at a time: all weeks, then all days, then
+all sessions, then all exercises. Rows within a level don't depend on each
+other, so sync time grows with tree depth rather than with row count.
+
+Concurrency defaults to SYNC_CONCURRENCY (environment) or 8.
+
+    summary = asyncio.run(async_sync_plan_to_supabase(supabase, full_plan, data, concurrency=16))
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from plan_generators.crossfit_generator import CATALOG_TABLES
+from plan_generators.supabase_sync_function import (
+    _day_row,
+    _exercise_row,
+    _get_or_create_day,
+    _get_or_create_week,
+    _parse_minutes,
+    _session_row,
+    _upsert_session,
+    _week_number,
+)
+from utils.cache_bus import publish_plan_rewrite
+from utils.day_progress import TABLE as DAY_PROGRESS_TABLE, day_progress_row, rebuild_day_progress
+from utils.plan_scope import delete_plan, week_row
+from utils.projections import catalog_table
+from utils.session_blocks import TABLE as BLOCK_TABLE, compact_rows, compacts
+
+DEFAULT_CONCURRENCY = int(os.getenv("SYNC_CONCURRENCY", "8"))
+
+Runner = Callable[..., Awaitable[Any]]
+
+
+# ---------- CONCURRENCY ----------
+def _limiter(concurrency: Optional[int]) -> Runner:
+    """Return run(fn, *args) which executes fn in a thread, at most `concurrency` at a time."""
+    sem = asyncio.Semaphore(max(1, int(concurrency or DEFAULT_CONCURRENCY)))
+
+    async def run(fn, *args, **kwargs):
+        async with sem:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+    return run
+
+
+def _select_all(supabase, table: str) -> List[dict]:
+    return catalog_table(supabase, table)
+
+
+def _insert_id(supabase, table: str, row: Dict[str, Any]) -> int:
+    return supabase.table(table).insert(row).execute().data[0]["id"]
+
+
+def _is_session(session_type: str, session_data: Any) -> bool:
+    return session_type not in ("Debug", "Total Time") and isinstance(session_data, dict)
+
+
+def _split_rows(sessions) -> Tuple[List[dict], List[dict]]:
+    """(session_type, exercise rows) pairs -> (plan_session_exercises rows, plan_session_blocks rows)."""
+    exercises, blocks = [], []
+    for session_type, rows in sessions:
+        if compacts(session_type):
+            blocks.extend(compact_rows(rows))
+        else:
+            exercises.extend(rows)
+    return exercises, blocks
+
+
+# ---------- CATALOG LOAD ----------
+async def load_data_async(supabase, concurrency: Optional[int] = None) -> Dict[str, List[dict]]:
+    """Fetch every CrossFitPlanGenerator catalog table concurrently (same shape as _load_data)."""
+    run = _limiter(concurrency)
+    keys = list(CATALOG_TABLES)
+    results = await asyncio.gather(*(run(_select_all, supabase, CATALOG_TABLES[k]) for k in keys))
+    return dict(zip(keys, results))
+
+
+# ---------- FULL-WIPE SYNC ----------
+async def async_sync_plan_to_supabase(supabase, full_plan: dict, data: dict, *,
+                                      concurrency: Optional[int] = None,
+                                      athlete_id: Optional[int] = None) -> Dict[str, int]:
+    """
+    Concurrent equivalent of sync_plan_to_supabase.
+      - Deletes the previous rows of this plan only (utils.plan_scope, children first).
+      - Inserts each level with up to `concurrency` requests in flight.
+      - Returns the same summary counts.
+    """
+    run = _limiter(concurrency)
+
+    await run(delete_plan, supabase, athlete_id)
+
+    weeks = list(full_plan.items())
+    week_ids = await asyncio.gather(*(
+        run(_insert_id, supabase, "plan_weeks", week_row({"number": number, "notes": label}, athlete_id))
+        for number, (label, _) in enumerate(weeks, start=1)
+    ))
+
+    days = []  # (day_data, row)
+    for week_id, (_, week_data) in zip(week_ids, weeks):
+        for day_number, day_data in enumerate(week_data.values(), start=1):
+            days.append((day_data, _day_row(week_id, day_number, day_data)))
+    day_ids = await asyncio.gather(*(run(_insert_id, supabase, "plan_days", row) for _, row in days))
+
+    sessions = []  # (session_data, row)
+    for day_id, (day_data, _) in zip(day_ids, days):
+        if day_data.get("Rest") or "plan" not in day_data:
+            continue
+        for session_type, session_data in day_data["plan"].items():
+            if _is_session(session_type, session_data):
+                sessions.append((session_data, _session_row(day_id, session_type, session_data, day_data)))
+    session_ids = await asyncio.gather(*(run(_insert_id, supabase, "plan_sessions", row) for _, row in sessions))
+
+    exercises, blocks = _split_rows(
+        (row["type"], [_exercise_row(session_id, ex, i, data) for i, ex in enumerate(session_data["exercises"], start=1)])
+        for session_id, (session_data, row) in zip(session_ids, sessions)
+        if isinstance(session_data.get("exercises"), list)
+    )
+    await asyncio.gather(
+        *(run(_insert_id, supabase, "plan_session_exercises", row) for row in exercises),
+        *(run(_insert_id, supabase, BLOCK_TABLE, row) for row in blocks),
+    )
+
+    progress_rows = [day_progress_row(day_id, day_data) for day_id, (day_data, _) in zip(day_ids, days)]
+    if progress_rows:
+        await run(lambda: supabase.table(DAY_PROGRESS_TABLE).insert(progress_rows).execute())
+    publish_plan_rewrite()
+
+    return {"weeks": len(week_ids), "days": len(day_ids), "sessions": len(session_ids),
+            "exercises": len(exercises) + sum(len(b["sets"]) for b in blocks)}
+
+
+# ---------- MERGE (NON-DESTRUCTIVE) SYNC ----------
+async def async_merge_plan_patch_to_supabase(
+    supabase,
+    patch_plan: dict,
+    data: dict,
+    *,
+    start_date: Optional[str] = None,
+    replace_section: bool = True,
+    concurrency: Optional[int] = None,
+    athlete_id: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Concurrent equivalent of merge_plan_patch_to_supabase (same arguments and summary).
+    Each week/day/session upsert is a short select-then-write sequence; independent
+    upserts within a level run concurrently.
+    """
+    run = _limiter(concurrency)
+    start_d = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+
+    weeks = []  # (week_number, wk_start, week_blob)
+    for week_label, week_blob in patch_plan.items():
+        week_number = _week_number(week_label)
+        wk_start = start_d + timedelta(days=(week_number - 1) * 7) if start_d and week_number else None
+        weeks.append((week_number or 0, wk_start, week_blob))
+    week_ids = await asyncio.gather(*(
+        run(_get_or_create_week, supabase, number, wk_start, athlete_id) for number, wk_start, _ in weeks
+    ))
+
+    days = [
+        (week_id, day_name, day_data)
+        for week_id, (_, _, week_blob) in zip(week_ids, weeks)
+        for day_name, day_data in week_blob.items()
+    ]
+    day_ids = await asyncio.gather(*(
+        run(
+            _get_or_create_day,
+            supabase,
+            week_id=week_id,
+            day_name=day_name,
+            day_date_iso=day_data.get("date"),
+            total_minutes=_parse_minutes(day_data.get("estimated_time")),
+            is_rest=bool(day_data.get("Rest", False)),
+        )
+        for week_id, day_name, day_data in days
+    ))
+
+    sessions = []  # (exercises, payload)
+    for day_id, (_, _, day_data) in zip(day_ids, days):
+        if day_data.get("Rest") or "plan" not in day_data:
+            continue
+        for session_type, session_payload in day_data["plan"].items():
+            if _is_session(session_type, session_payload):
+                sessions.append((
+                    session_payload.get("exercises", []),
+                    _session_row(day_id, session_type, session_payload, day_data),
+                ))
+    upserted = await asyncio.gather(*(
+        run(_upsert_session, supabase, payload, replace_section=replace_section) for _, payload in sessions
+    ))
+
+    exercises, blocks = _split_rows(
+        (payload["type"], [_exercise_row(sess_id, ex, order, data) for order, ex in enumerate(exs, start=start_order)])
+        for (sess_id, start_order), (exs, payload) in zip(upserted, sessions)
+        if isinstance(exs, list)
+    )
+    await asyncio.gather(
+        *(run(_insert_id, supabase, "plan_session_exercises", row) for row in exercises),
+        *(run(_insert_id, supabase, BLOCK_TABLE, row) for row in blocks),
+    )
+    await run(rebuild_day_progress, supabase, day_ids)
+    publish_plan_rewrite()
+
+    return {
+        "weeks": len(week_ids),
+        "days": len(day_ids),
+        "sessions": len(sessions),
+        "exercises": sum(len(exs or []) for exs, _ in sessions),
+    }
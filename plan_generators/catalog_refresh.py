@@ -0,0 +1,161 @@
+# catalog_refresh.py
+"""
+Catalog change job: when md_exercises / exercise_pool rows (or their mappings) are renamed,
+retired or remapped, regenerate only the stored sessions built from those rows.
+
+    python -m plan_generators.catalog_refresh --storage sqlite --dry-run
+    summary = refresh_catalog(client)
+
+  1. Load the catalog and fingerprint it (utils.catalog_deps.fingerprints).
+  2. Diff against the version recorded by the previous run (CATALOG_SNAPSHOT, default
+     .catalog_snapshot.json). The first run only records the baseline.
+  3. Find the sessions whose catalog_refs include a changed or retired row (one indexed
+     lookup per row), then read only their days and weeks.
+  4. Per plan (athlete) and section: generate_partial_plan() for the affected dates and
+     merge it with replace_section=True, the same path as a partial update from the
+     Plan Generator page.
+  5. Record the new version once every plan was merged; a run that fails part-way is
+     repeated in full next time (merges replace sections, so repeating is safe).
+
+  - Completed sessions are left alone (their logged sets live on those rows) and are
+    reported as skipped.
+  - Run, Benchmark and Skill sessions are not tracked (utils.catalog_deps.CATALOG_SECTIONS),
+    so this job never regenerates them.
+"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from datetime import date as _date, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from plan_generators.crossfit_generator import CATALOG_TABLES, CrossFitPlanGenerator, UpdateScope
+from utils.catalog_deps import diff_fingerprints, fingerprints, load_fingerprints, save_fingerprints, sessions_using
+from utils.plan_scope import ID_CHUNK
+from utils.projections import catalog_table
+
+SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT", ".catalog_snapshot.json")
+
+
+@dataclass
+class RegenTarget:
+    """One plan's share of a refresh: section -> iso dates of the sessions to regenerate."""
+    athlete_id: Optional[int]
+    start_date: str  # first day of the plan (Week 1, day 1)
+    sections: Dict[str, Set[str]] = field(default_factory=dict)
+
+    @property
+    def sessions(self) -> int:
+        return sum(len(dates) for dates in self.sections.values())
+
+
+def load_catalog(client) -> Dict[str, Any]:
+    """The generator's catalog tables (same keys as CrossFitPlanGenerator.data)."""
+    return {key: catalog_table(client, table) for key, table in CATALOG_TABLES.items()}
+
+
+def _rows_by_id(client, table: str, columns: str, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    rows = {}
+    for start in range(0, len(ids), ID_CHUNK):
+        chunk = ids[start:start + ID_CHUNK]
+        rows.update({r["id"]: r for r in client.table(table).select(columns).in_("id", chunk).execute().data or []})
+    return rows
+
+
+def plan_targets(client, sessions: List[Dict[str, Any]]) -> Tuple[List[RegenTarget], List[int]]:
+    """Group affected sessions per plan and section; returns (targets, skipped completed session ids)."""
+    skipped = [s["id"] for s in sessions if s.get("completed")]
+    open_sessions = [s for s in sessions if not s.get("completed")]
+    days = _rows_by_id(client, "plan_days", "id, week_id, day_number, date",
+                       sorted({s["day_id"] for s in open_sessions}))
+    weeks = _rows_by_id(client, "plan_weeks", "id, number, athlete_id",
+                        sorted({d["week_id"] for d in days.values()}))
+
+    targets: Dict[Optional[int], RegenTarget] = {}
+    for session in open_sessions:
+        day = days.get(session["day_id"])
+        week = weeks.get(day["week_id"]) if day else None
+        if not day or not week or not day.get("date"):
+            continue
+        day_date = _date.fromisoformat(str(day["date"])[:10])
+        # Plan days are consecutive from the start date: week n, day d is offset (n-1)*7 + d-1
+        start = day_date - timedelta(days=(week["number"] - 1) * 7 + day["day_number"] - 1)
+        target = targets.setdefault(week.get("athlete_id"), RegenTarget(week.get("athlete_id"), start.isoformat()))
+        target.sections.setdefault(session["type"], set()).add(day_date.isoformat())
+    return list(targets.values()), skipped
+
+
+def regenerate(client, targets: List[RegenTarget], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Regenerate and merge each plan's affected sections; returns one merge summary per (plan, section)."""
+    merged = []
+    for target in targets:
+        gen = CrossFitPlanGenerator(client, data=data, athlete_id=target.athlete_id)
+        for section, dates in sorted(target.sections.items()):
+            patch = gen.generate_partial_plan(target.start_date, UpdateScope(dates=set(dates), sections={section}))
+            summary = gen.sync_partial_plan_to_supabase(patch, target.start_date, replace_section=True)
+            merged.append({"athlete_id": target.athlete_id, "section": section, "dates": sorted(dates), **summary})
+    return merged
+
+
+def refresh_catalog(client, *, snapshot_path=SNAPSHOT_PATH, dry_run: bool = False) -> Dict[str, Any]:
+    """Detect catalog changes since the last run and regenerate the sessions they affect."""
+    data = load_catalog(client)
+    current = fingerprints(data)
+    previous = load_fingerprints(snapshot_path)
+    if previous is None:
+        if not dry_run:
+            save_fingerprints(snapshot_path, current)
+        return {"baseline": True, "catalog_rows": len(current), "changes": {}, "sessions": 0}
+
+    changes = diff_fingerprints(previous, current)
+    sessions = sessions_using(client, changes) if changes else []
+    targets, skipped = plan_targets(client, sessions)
+    summary = {
+        "baseline": False,
+        "catalog_rows": len(current),
+        "changes": changes,
+        "sessions": len(sessions),
+        "skipped_completed": skipped,
+        "plans": [
+            {"athlete_id": t.athlete_id, "start_date": t.start_date,
+             "sections": {s: sorted(d) for s, d in sorted(t.sections.items())}}
+            for t in targets
+        ],
+    }
+    if dry_run:
+        return summary
+    summary["merged"] = regenerate(client, targets, data)
+    save_fingerprints(snapshot_path, current)
+    return summary
+
+
+def main(argv=None) -> int:
+    from plan_generators.cli import _connect
+
+    parser = argparse.ArgumentParser(description="Regenerate the stored sessions affected by catalog changes.")
+    parser.add_argument("--storage", choices=["supabase", "sqlite"], help="storage backend (default: STORAGE_BACKEND)")
+    parser.add_argument("--sqlite-path", help="SQLite file (default: SQLITE_PATH)")
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH, help="catalog version file (default: CATALOG_SNAPSHOT)")
+    parser.add_argument("--dry-run", action="store_true", help="report affected sessions without regenerating")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    summary = refresh_catalog(_connect(args), snapshot_path=args.snapshot, dry_run=args.dry_run)
+    if args.json:
+        print(json.dumps(summary, indent=2, default=str))
+    elif summary["baseline"]:
+        print(f"recorded catalog baseline ({summary['catalog_rows']} rows)")
+    else:
+        print(f"{len(summary['changes'])} changed catalog row(s), {summary['sessions']} affected session(s), "
+              f"{len(summary['skipped_completed'])} completed and skipped")
+        for plan in summary["plans"]:
+            sections = ", ".join(f"{s} x{len(d)}" for s, d in plan["sections"].items())
+            print(f"  plan {plan['athlete_id'] if plan['athlete_id'] is not None else 'default'}: {sections}")
+        if args.dry_run:
+            print("dry run: nothing regenerated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
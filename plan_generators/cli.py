@@ -0,0 +1,261 @@
+# cli.py
+"""
+Headless plan generation and sync (no Streamlit in the loop).
+
+    python -m plan_generators.cli --start-date 2026-01-05 --skill "Handstand Push-Up" --sync rest
+    python -m plan_generators.cli --start-date 2026-01-05 --weeks 3 --sections WOD Light --sync merge
+    python -m plan_generators.cli --start-date 2026-01-05 --seed 7 --export plan.csv
+    python -m plan_generators.cli --roster athletes.json --workers 4 --sync postgres
+    python -m plan_generators.cli --roster athletes.json --sync rest --export roster.parquet
+    python -m plan_generators.cli --start-date 2026-01-05 --athlete-id 42 --sync rest
+
+  - Any of --weeks / --days / --dates / --sections switches to a partial plan (patch),
+    which can only be merged (--sync merge / merge-concurrent).
+  - --storage / --sqlite-path override STORAGE_BACKEND / SQLITE_PATH for this run.
+  - --athlete-id (default PLAN_ATHLETE_ID) picks the plan namespace; syncs replace or merge
+    only that plan's rows (utils.plan_scope).
+  - --roster with --export writes the roster's synced plans from storage, one plan and one
+    week at a time (plan_export.iter_roster_plan_rows), with an athlete_id column.
+  - Prints wall time per phase (connect, catalog, generate, sync, export), plus per-generator
+    spans with --spans (utils.spans); --json prints the run summary as JSON instead. Exits 1 on any failure, 2 on bad arguments.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from plan_generators.sync_jobs import FULL_SYNCS, MERGE_SYNCS, run_sync
+
+SECTIONS = ["Warmup", "Heavy", "Olympic", "Run", "WOD", "Benchmark", "Light", "Skill", "Cooldown"]
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+class PhaseTimer:
+    """Records wall time (ms) per named phase, in the order phases ran."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def report(self) -> str:
+        width = max((len(n) for n in self.phases), default=0)
+        lines = [f"  {name:<{width}}  {ms:>10.1f} ms" for name, ms in self.phases.items()]
+        lines.append(f"  {'total':<{width}}  {sum(self.phases.values()):>10.1f} ms")
+        return "\n".join(lines)
+
+
+def _iso_date(value: str) -> str:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate (and optionally sync/export) a 6-week CrossFit plan.")
+    parser.add_argument("--start-date", type=_iso_date, help="first day of the plan (YYYY-MM-DD)")
+    parser.add_argument("--skill", default="Handstand Push-Up", help="skill for the skill sessions")
+    parser.add_argument("--seed", type=int, help="seed the random module for a reproducible plan")
+    parser.add_argument("--debug", action="store_true", help="keep generator debug payloads in the plan")
+    parser.add_argument("--spans", action="store_true", help="report per-generator timing spans for the generate phase")
+    parser.add_argument("--plate-increment", type=float, help="round prescribed weights to this increment (default: PLATE_INCREMENT_KG or 2.5)")
+    parser.add_argument("--athlete-id", type=int, help="plan to generate / sync (default: PLAN_ATHLETE_ID, else the default plan)")
+
+    scope = parser.add_argument_group("scope (partial plan)")
+    scope.add_argument("--weeks", type=int, nargs="+", choices=range(1, 7), metavar="N")
+    scope.add_argument("--days", nargs="+", choices=DAYS)
+    scope.add_argument("--dates", type=_iso_date, nargs="+", metavar="YYYY-MM-DD")
+    scope.add_argument("--sections", nargs="+", choices=SECTIONS)
+
+    backend = parser.add_argument_group("storage and sync")
+    backend.add_argument("--storage", choices=["supabase", "sqlite"], help="storage backend (default: STORAGE_BACKEND)")
+    backend.add_argument("--sqlite-path", help="SQLite file (default: SQLITE_PATH)")
+    backend.add_argument("--sync", choices=("none",) + FULL_SYNCS + MERGE_SYNCS, default="none",
+                         help="full-wipe sync for a full plan, merge for a partial plan")
+    backend.add_argument("--append", action="store_true", help="merge: append exercises instead of replacing sections")
+    backend.add_argument("--concurrency", type=int, help="in-flight requests for the concurrent syncs")
+    backend.add_argument("--chunk-size", type=int, help="rows per chunk for the resumable sync")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--export", metavar="PATH", help="write set-level rows (.csv / .jsonl / .parquet)")
+    output.add_argument("--json", action="store_true", help="print the run summary as JSON")
+
+    roster = parser.add_argument_group("roster")
+    roster.add_argument("--roster", metavar="PATH", help="athlete profiles (JSON or CSV); one plan per athlete")
+    roster.add_argument("--workers", type=int, help="generation processes (default: CPU count)")
+    roster.add_argument("--sync-workers", type=int, default=2, help="concurrent per-athlete syncs")
+    return parser
+
+
+def _scope(args):
+    from plan_generators.crossfit_generator import UpdateScope, _normalize_iso_date
+
+    if not any((args.weeks, args.days, args.dates, args.sections)):
+        return None
+    return UpdateScope(
+        weeks=set(args.weeks) if args.weeks else None,
+        days=set(args.days) if args.days else None,
+        dates={_normalize_iso_date(d) for d in args.dates} if args.dates else None,
+        sections=set(args.sections) if args.sections else None,
+    )
+
+
+def _validate(parser: argparse.ArgumentParser, args) -> None:
+    partial = any((args.weeks, args.days, args.dates, args.sections))
+    if args.roster:
+        if partial:
+            parser.error("--roster cannot be combined with scope flags")
+        if args.export and args.sync == "none":
+            parser.error("--roster --export exports the synced plans; add --sync postgres or rest")
+        if args.sync not in ("none", "postgres", "rest"):
+            parser.error("--roster only supports --sync postgres (per-athlete COPY), rest or none")
+        if args.athlete_id is not None:
+            parser.error("--roster takes athlete ids from the roster file, not --athlete-id")
+        return
+    if not args.start_date:
+        parser.error("--start-date is required")
+    if partial and args.sync in FULL_SYNCS:
+        parser.error(f"--sync {args.sync} is a full-wipe sync; partial plans use --sync merge or merge-concurrent")
+    if not partial and args.sync in MERGE_SYNCS:
+        parser.error(f"--sync {args.sync} needs a scope (--weeks / --days / --dates / --sections)")
+
+
+def _connect(args):
+    from storage import create_storage_client
+
+    options = {"path": args.sqlite_path} if args.sqlite_path else {}
+    return create_storage_client(args.storage or ("sqlite" if args.sqlite_path else None), **options)
+
+
+def _sync(gen, args, plan: dict) -> Dict[str, Any]:
+    return run_sync(gen, args.sync, plan, start_date=args.start_date, replace_section=not args.append,
+                    concurrency=args.concurrency, chunk_size=args.chunk_size)
+
+
+def _plan_counts(plan: dict) -> Dict[str, int]:
+    days = [d for week in plan.values() for d in week.values()]
+    sessions = [
+        s for d in days for name, s in (d.get("plan") or {}).items()
+        if name not in ("Debug", "Total Time") and isinstance(s, dict)
+    ]
+    return {
+        "weeks": len(plan),
+        "days": len(days),
+        "sessions": len(sessions),
+        "exercises": sum(len(s["exercises"]) for s in sessions if isinstance(s.get("exercises"), list)),
+    }
+
+
+def run_single(args, timer: PhaseTimer) -> Dict[str, Any]:
+    from plan_generators.crossfit_generator import CrossFitPlanGenerator
+    from utils.plan_scope import current_athlete_id
+    from utils.spans import record_spans
+
+    summary: Dict[str, Any] = {"start_date": args.start_date, "skill": args.skill, "seed": args.seed}
+    with timer.phase("connect"):
+        client = _connect(args)
+    athlete_id = args.athlete_id if args.athlete_id is not None else current_athlete_id()
+    summary["athlete_id"] = athlete_id
+    with timer.phase("catalog"):
+        options = {"plate_increment": args.plate_increment} if args.plate_increment else {}
+        gen = CrossFitPlanGenerator(client, debug=args.debug, athlete_id=athlete_id, **options)
+
+    scope = _scope(args)
+    if args.seed is not None:
+        random.seed(args.seed)
+    with timer.phase("generate"), record_spans() as spans:
+        if scope is None:
+            plan = gen.generate_full_plan(args.start_date, skill=args.skill)
+        else:
+            plan = gen.generate_partial_plan(args.start_date, scope, skill=args.skill)
+    if args.spans:
+        summary["spans"] = spans.rows()
+    summary["plan"] = _plan_counts(plan)
+    if scope is not None and not plan:
+        raise RuntimeError("scope produced an empty patch")
+
+    if args.sync != "none":
+        with timer.phase(f"sync ({args.sync})"):
+            summary["sync"] = _sync(gen, args, plan)
+
+    if args.export:
+        from plan_generators.plan_export import export_rows, iter_plan_rows
+        with timer.phase("export"):
+            summary["exported_rows"] = export_rows(iter_plan_rows(plan), args.export)
+    return summary
+
+
+def run_roster_cli(args, timer: PhaseTimer) -> Dict[str, Any]:
+    from plan_generators.roster import (
+        load_profiles, load_shared_catalog, postgres_roster_sync, rest_roster_sync, run_roster, summarize,
+    )
+
+    with timer.phase("profiles"):
+        profiles = load_profiles(args.roster)
+    with timer.phase("connect"):
+        client = _connect(args)
+    with timer.phase("catalog"):
+        data = load_shared_catalog(client)
+    sync = None
+    if args.sync == "postgres":
+        sync = postgres_roster_sync(data)
+    elif args.sync == "rest":
+        sync = rest_roster_sync(client, data)
+    with timer.phase("generate + sync"):
+        results = run_roster(profiles, data, workers=args.workers, sync=sync,
+                             sync_workers=args.sync_workers, debug=args.debug)
+    summary = summarize(results)
+    if summary["failed"]:
+        raise RuntimeError(f"{summary['failed']} of {summary['athletes']} athletes failed: {summary['errors']}")
+
+    if args.export:
+        from plan_generators.plan_export import ROSTER_COLUMNS, export_rows, iter_roster_plan_rows
+        with timer.phase("export"):
+            rows = iter_roster_plan_rows(client, [p.athlete_id for p in profiles])
+            summary["exported_rows"] = export_rows(rows, args.export, columns=ROSTER_COLUMNS)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    _validate(parser, args)
+
+    timer = PhaseTimer()
+    try:
+        summary = run_roster_cli(args, timer) if args.roster else run_single(args, timer)
+    except Exception as e:
+        print(f"error: {type(e).__name__}: {e}", file=sys.stderr)
+        print(timer.report(), file=sys.stderr)
+        return 1
+
+    summary["timings_ms"] = timer.phases
+    if args.json:
+        print(json.dumps(summary, default=str, indent=2))
+    else:
+        for key, value in summary.items():
+            if key == "spans":
+                print("spans:")
+                for row in value:
+                    notes = {k: v for k, v in row.items() if k not in ("span", "calls", "total_ms", "avg_ms", "max_ms", "queries")}
+                    print(f"  {row['total_ms']:>9.2f} ms  x{row['calls']:<4} q={row['queries']:<3} {row['span']}  {notes or ''}")
+            elif key != "timings_ms":
+                print(f"{key}: {value}")
+        print("timings:")
+        print(timer.report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@
 # crossfit_generator.py
 import random
 from dataclasses import dataclass
-from typing import Optional, Set, Dict, Any
+from typing import Optional, Set, Dict, Any, Sequence
 from datetime import datetime, timedelta, date as _date
 
 from generators.warmup_generator import WarmupGenerator
@@ -14,6 +14,11 @@ from generators.benchmark_generator import BenchmarkGenerator
 from generators.light_generator import LightGenerator
 from generators.cooldown_generator import CooldownGenerator
 from generators.skillsession_generator import SkillSessionGenerator
+from utils.catalog_deps import tag_plan
+from utils.plan_scope import scope_weeks
+from utils.projections import catalog_table
+from utils.prescriptions import DEFAULT_PLATE_INCREMENT, load_maxes_snapshot
+from utils.spans import count_queries, traced
 
 # Full-wipe sync (existing) and new partial-merge sync
 from plan_generators.supabase_sync_function import (
@@ -49,33 +54,78 @@ def _iso(some_date: _date) -> str:
     return some_date.isoformat()
 
 
+# Catalog key -> source table, loaded once per generator
+CATALOG_TABLES = {
+    "exercises": "md_exercises",
+    "muscle_groups": "md_muscle_groups",
+    "mappings": "md_map_exercise_muscle_groups",
+    "categories": "md_categories",
+    "category_mappings": "md_map_exercise_categories",
+    "exercise_pool": "exercise_pool",
+}
+
+
+# Extra tables a shared catalog can carry so generation needs no queries at all
+# (see plan_generators.roster)
+SHARED_CATALOG_TABLES = {
+    **CATALOG_TABLES,
+    "skills": "skills",
+    "skill_plans": "skill_plans",
+    "benchmark_wods": "benchmark_wods",
+}
+
+
 class CrossFitPlanGenerator:
-    def __init__(self, supabase, debug: bool = False):
-        self.supabase = supabase
-        self.data = self._load_data()
+    def __init__(self, supabase, debug: bool = False, data: Optional[Dict[str, Any]] = None,
+                 user_5k_time: float = 24, equipment: Optional[Sequence[str]] = None,
+                 maxes: Optional[Dict[str, float]] = None, plate_increment: float = DEFAULT_PLATE_INCREMENT,
+                 athlete_id: Optional[int] = None):
+        """
+        data: optional preloaded catalog (same keys as CATALOG_TABLES, optionally SHARED_CATALOG_TABLES);
+              loaded from supabase when omitted.
+        user_5k_time: athlete's 5K time in minutes (run pacing).
+        equipment: equipment available to the athlete (filters WOD movements); None = no filter.
+        maxes: exercise_name -> current 1RM used to prescribe %RM sets (expected_weight);
+               snapshot of exercise_maxes when omitted (empty without a client).
+        plate_increment: prescribed weights are rounded to this increment (kg).
+        athlete_id: the plan namespace every sync / existence check works on (utils.plan_scope);
+                    None = the default plan.
+        """
+        self.supabase = count_queries(supabase)  # executed queries are counted into timing spans (utils.spans)
+        self.data = data if data is not None else self._load_data()
+        if maxes is None:
+            maxes = load_maxes_snapshot(self.supabase) if self.supabase is not None else {}
+        self.maxes = maxes
         self.debug = debug
+        self.equipment = list(equipment) if equipment else None
+        self.athlete_id = athlete_id
 
         # Generators
         self.warmup_gen = WarmupGenerator(self.data)
-        self.heavy_gen = HeavyGenerator(self.data, debug=debug)
-        self.olympic_gen = OlympicGenerator(self.data, debug=debug)
-        self.run_gen = RunGenerator(user_5k_time=24, debug=debug)
+        self.heavy_gen = HeavyGenerator(self.data, debug=debug, maxes=self.maxes, plate_increment=plate_increment)
+        self.olympic_gen = OlympicGenerator(self.data, debug=debug, maxes=self.maxes, plate_increment=plate_increment)
+        self.run_gen = RunGenerator(user_5k_time=user_5k_time, debug=debug)
         self.wod_gen = WODGenerator(self.data, debug=debug)
-        self.benchmark_gen = BenchmarkGenerator(supabase)
+        self.benchmark_gen = BenchmarkGenerator(self.supabase, wods=self.data.get("benchmark_wods"))
         self.light_gen = LightGenerator(self.data)
         self.cooldown_gen = CooldownGenerator(self.data)
         self.skill_gen = SkillSessionGenerator(self.data, self.supabase, debug=self.debug)
 
+    @traced("catalog load")
     def _load_data(self):
         return {
-            "exercises": self.supabase.table("md_exercises").select("*").execute().data,
-            "muscle_groups": self.supabase.table("md_muscle_groups").select("*").execute().data,
-            "mappings": self.supabase.table("md_map_exercise_muscle_groups").select("*").execute().data,
-            "categories": self.supabase.table("md_categories").select("*").execute().data,
-            "category_mappings": self.supabase.table("md_map_exercise_categories").select("*").execute().data,
-            "exercise_pool": self.supabase.table("exercise_pool").select("*").execute().data,
+            key: catalog_table(self.supabase, table)  # declared columns, paged past the PostgREST row cap
+            for key, table in CATALOG_TABLES.items()
         }
 
+    @classmethod
+    async def create_async(cls, supabase, debug: bool = False, concurrency: Optional[int] = None,
+                           athlete_id: Optional[int] = None):
+        """Build a generator whose catalog tables are fetched concurrently."""
+        from plan_generators.async_sync import load_data_async
+        data = await load_data_async(supabase, concurrency=concurrency)
+        return cls(supabase, debug=debug, data=data, athlete_id=athlete_id)
+
     def _estimate_total_time(self, plan: dict) -> int:
         """
         Sum known section times. Prefer structured 'time_cap_sec' in exercises,
@@ -151,6 +201,7 @@ class CrossFitPlanGenerator:
     def fetch_skills(self):
         return self.supabase.table("skills").select("skill_name").execute().data
 
+    @traced("framework")
     def build_framework(self):
         framework = {}
         MUSCLE_POOL = ["Back", "Chest", "Shoulders", "Quads", "Glutes/Hamstrings", "Core"]
@@ -287,6 +338,7 @@ class CrossFitPlanGenerator:
             ]
         return framework  # based on your original structure [1](https://danone-my.sharepoint.com/personal/john_matthews_danone_com/Documents/Microsoft%20Copilot%20Chat%20Files/2_%E2%9A%99%EF%B8%8F_Plan_Generator.py)
 
+    @traced("day")
     def generate_daily_plan(self, config, week_number, skill_name=None):
         if config is None:
             return {"Rest Day": "No workout scheduled"}
@@ -304,7 +356,7 @@ class CrossFitPlanGenerator:
             plan["Run"] = self.run_gen.generate()
         if config["wod"] and config["stimulus"]:
             plan["WOD"] = self.wod_gen.generate_complex_wod(
-                target_muscle=config["wod"][0], stimulus=config["stimulus"]
+                target_muscle=config["wod"][0], stimulus=config["stimulus"], equipment_available=self.equipment
             )
         if config["stimulus"] == "Girl/Hero":
             plan["Benchmark"] = self.benchmark_gen.generate()
@@ -317,8 +369,9 @@ class CrossFitPlanGenerator:
             plan["Cooldown"] = self.cooldown_gen.generate(muscles)
 
         plan["Total Time"] = f"{self._estimate_total_time(plan)} min"
-        return plan
+        return tag_plan(plan, self.data)  # catalog_refs per session, for catalog change tracking
 
+    @traced("generate_full_plan")
     def generate_full_plan(self, start_date, skill="Handstand Push-Up"):
         if isinstance(start_date, str):
             start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
@@ -377,13 +430,17 @@ class CrossFitPlanGenerator:
     # ---------- EXISTING PLAN DETECTION ----------
     def plan_exists(self, start_date, weeks: int = 6) -> bool:
         """
-        True if at least one plan day exists between start_date and start_date + 7*weeks-1.
+        True if this plan has at least one day between start_date and start_date + 7*weeks-1.
         """
         start = _normalize_iso_date(start_date)
         end = start + timedelta(days=7*weeks - 1)
         try:
+            week_ids = [w["id"] for w in scope_weeks(self.supabase.table("plan_weeks").select("id"), self.athlete_id).execute().data or []]
+            if not week_ids:
+                return False
             resp = self.supabase.table("plan_days") \
                 .select("date") \
+                .in_("week_id", week_ids) \
                 .gte("date", _iso(start)) \
                 .lte("date", _iso(end)) \
                 .limit(1) \
@@ -393,6 +450,7 @@ class CrossFitPlanGenerator:
             return False  # fail-safe if table missing in dev
 
     # ---------- PARTIAL PLAN GENERATION ----------
+    @traced("generate_partial_plan")
     def generate_partial_plan(self, start_date, scope: UpdateScope, skill="Handstand Push-Up") -> dict:
         """
         Build only the subset requested by scope.
@@ -489,7 +547,40 @@ class CrossFitPlanGenerator:
     # ---------- SYNC METHODS ----------
     def sync_plan_to_supabase(self, full_plan):
         """Existing full-wipe sync (use for first-time creation)."""
-        return full_sync_to_supabase(self.supabase, full_plan, self.data)  # based on your current function [1](https://danone-my.sharepoint.com/personal/john_matthews_danone_com/Documents/Microsoft%20Copilot%20Chat%20Files/2_%E2%9A%99%EF%B8%8F_Plan_Generator.py)
+        return full_sync_to_supabase(self.supabase, full_plan, self.data, athlete_id=self.athlete_id)  # based on your current function [1](https://danone-my.sharepoint.com/personal/john_matthews_danone_com/Documents/Microsoft%20Copilot%20Chat%20Files/2_%E2%9A%99%EF%B8%8F_Plan_Generator.py)
+
+    def sync_plan_bulk(self, full_plan, pool=None, progress=None):
+        """Full-wipe sync in a single Postgres transaction (COPY); needs DB_* settings."""
+        from plan_generators.postgres_sync import sync_plan_to_postgres
+        return sync_plan_to_postgres(full_plan, self.data, pool=pool, progress=progress, athlete_id=self.athlete_id)
+
+    def sync_plan_resumable(self, full_plan, journal_path=None, chunk_size: Optional[int] = None):
+        """Full-wipe sync in checkpointed chunks; re-running after a failure resumes where it stopped."""
+        from plan_generators.sync_journal import DEFAULT_CHUNK_SIZE, resumable_sync_plan_to_supabase
+        return resumable_sync_plan_to_supabase(
+            self.supabase, full_plan, self.data,
+            journal_path=journal_path, chunk_size=chunk_size or DEFAULT_CHUNK_SIZE, athlete_id=self.athlete_id,
+        )
+
+    async def async_sync_plan_to_supabase(self, full_plan, concurrency: Optional[int] = None):
+        """Full-wipe sync issuing each hierarchy level's inserts concurrently."""
+        from plan_generators.async_sync import async_sync_plan_to_supabase
+        return await async_sync_plan_to_supabase(self.supabase, full_plan, self.data, concurrency=concurrency,
+                                                 athlete_id=self.athlete_id)
+
+    async def async_sync_partial_plan_to_supabase(self, patch_plan: dict, start_date: str,
+                                                  replace_section: bool = True, concurrency: Optional[int] = None):
+        """Merge-only sync issuing each hierarchy level's upserts concurrently."""
+        from plan_generators.async_sync import async_merge_plan_patch_to_supabase
+        return await async_merge_plan_patch_to_supabase(
+            self.supabase,
+            patch_plan,
+            self.data,
+            start_date=start_date,
+            replace_section=replace_section,
+            concurrency=concurrency,
+            athlete_id=self.athlete_id,
+        )
 
     def sync_partial_plan_to_supabase(self, patch_plan: dict, start_date: str, replace_section: bool = True):
         """
@@ -502,4 +593,5 @@ class CrossFitPlanGenerator:
             self.data,
             start_date=start_date,
             replace_section=replace_section,
+            athlete_id=self.athlete_id,
         )  # new non-destructive path aligned to your schema [1](https://danone-my.sharepoint.com/personal/john_matthews_danone_com/Documents/Microsoft%20Copilot%20Chat%20Files/2_%E2%9A%99%EF%B8%8F_Plan_Generator.py)
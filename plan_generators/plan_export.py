@@ -0,0 +1,255 @@
+# plan_export.py
+import csv
+import io
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from utils.pagination import fetch_all, fetch_in
+from utils.plan_preview import is_hidden_section
+from utils.plan_scope import scope_weeks
+from utils.session_blocks import fetch_block_sets
+
+EXPORT_COLUMNS = [
+    "week", "day", "date", "section", "target_muscles", "stimulus", "details", "duration",
+    "exercise_order", "exercise_name", "exercise_id", "set_number", "reps", "intensity",
+    "rest", "tempo", "expected_weight", "equipment", "notes",
+]
+# Roster exports (iter_roster_plan_rows) lead with the plan's athlete
+ROSTER_COLUMNS = ["athlete_id"] + EXPORT_COLUMNS
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _empty_row(**values) -> Dict[str, Any]:
+    row = {col: "" for col in EXPORT_COLUMNS}
+    row.update(values)
+    return row
+
+
+# ---------- ROW SOURCES ----------
+def iter_plan_rows(full_plan: dict) -> Iterator[Dict[str, Any]]:
+    """
+    Walk an in-memory plan (generate_full_plan / generate_partial_plan shape) and yield
+    one row per prescribed set. Sections without exercises yield a single section row,
+    rest days yield a single 'Rest' row. Sections the preview hides (utils.plan_preview)
+    are skipped, as the CSV export always did.
+    """
+    for week_label, week_data in full_plan.items():
+        for day_label, day_data in week_data.items():
+            date = day_data.get("date", "")
+            if day_data.get("Rest") or "plan" not in day_data:
+                yield _empty_row(week=week_label, day=day_label, date=date, section="Rest")
+                continue
+
+            for section, content in day_data["plan"].items():
+                if section in ("Debug", "Total Time") or not isinstance(content, dict):
+                    continue
+                if is_hidden_section(day_label, section):
+                    continue
+                base = {
+                    "week": week_label,
+                    "day": day_label,
+                    "date": date,
+                    "section": section,
+                    "target_muscles": ", ".join(day_data.get("muscles", [])),
+                    "stimulus": day_data.get("stimulus") or "",
+                    "details": content.get("details", ""),
+                    "duration": content.get("time", content.get("Estimated Time", "")),
+                }
+                exercises = content.get("exercises") or []
+                if not isinstance(exercises, list) or not exercises:
+                    yield _empty_row(**base)
+                    continue
+                for order, ex in enumerate(exercises, start=1):
+                    yield _empty_row(
+                        **base,
+                        exercise_order=order,
+                        exercise_name=ex.get("name") or ex.get("exercise_name") or ex.get("exercise") or "Unknown",
+                        exercise_id=ex.get("exercise_id") or "",
+                        set_number=ex.get("set", ex.get("set_number", 1)),
+                        reps=ex.get("reps", ""),
+                        intensity=ex.get("intensity", ""),
+                        rest=ex.get("rest", ""),
+                        tempo=ex.get("tempo", ""),
+                        expected_weight=ex.get("expected_weight", ""),
+                        equipment=ex.get("equipment", ""),
+                        notes=ex.get("notes", ""),
+                    )
+
+
+DAY_LABELS = {1: "Mon", 2: "Tue", 3: "Wed", 4: "Thu", 5: "Fri", 6: "Sat", 7: "Sun"}
+
+
+def iter_stored_plan_rows(supabase, athlete_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Walk one stored plan (athlete_id None = the default plan) a week at a time and yield set-level rows.
+    Only a single week's days/sessions/exercises are held in memory at once.
+    """
+    weeks = scope_weeks(supabase.table("plan_weeks").select("id, number, notes"), athlete_id).order("number").execute().data or []
+    for week in weeks:
+        week_label = week.get("notes") or f"Week {week['number']}"
+        days = (
+            supabase.table("plan_days")
+            .select("id, day_number, date, is_rest_day")
+            .eq("week_id", week["id"])
+            .order("day_number")
+            .execute()
+            .data
+            or []
+        )
+        day_ids = [d["id"] for d in days if not d.get("is_rest_day")]
+        sessions = fetch_in(supabase, "plan_sessions", "id, day_id, type, target_muscle, details, duration",
+                            "day_id", day_ids)
+        exercises_by_session: Dict[int, List[dict]] = {}
+        session_ids = [s["id"] for s in sessions]
+        if session_ids:
+            # Paginated: a heavy week can pass the server row cap
+            rows = fetch_in(
+                supabase, "plan_session_exercises",
+                "session_id, exercise_order, exercise_name, exercise_id, set_number, reps, "
+                "intensity, rest, tempo, expected_weight, equipment, notes",
+                "session_id", session_ids, order=("exercise_order", "id"),
+            )
+            for row in rows + fetch_block_sets(supabase, session_ids):
+                exercises_by_session.setdefault(row["session_id"], []).append(row)
+            for ex_rows in exercises_by_session.values():
+                ex_rows.sort(key=lambda r: r.get("exercise_order") or 0)
+
+        for day in days:
+            day_label = DAY_LABELS.get(day.get("day_number"), str(day.get("day_number")))
+            if day.get("is_rest_day"):
+                yield _empty_row(week=week_label, day=day_label, date=day.get("date") or "", section="Rest")
+                continue
+            for sess in (s for s in sessions if s["day_id"] == day["id"]):
+                base = {
+                    "week": week_label,
+                    "day": day_label,
+                    "date": day.get("date") or "",
+                    "section": sess.get("type", ""),
+                    "target_muscles": sess.get("target_muscle", ""),
+                    "details": sess.get("details", ""),
+                    "duration": sess.get("duration", ""),
+                }
+                ex_rows = exercises_by_session.get(sess["id"], [])
+                if not ex_rows:
+                    yield _empty_row(**base)
+                    continue
+                for ex in ex_rows:
+                    yield _empty_row(**base, **{k: ("" if v is None else v) for k, v in ex.items() if k in EXPORT_COLUMNS})
+
+
+def roster_athlete_ids(supabase) -> List[int]:
+    """Athletes with a stored plan (plan_weeks.athlete_id), in id order; the default plan is not one."""
+    weeks = fetch_all(lambda: supabase.table("plan_weeks").select("id, athlete_id").order("id"), source="plan_weeks")
+    return sorted({w["athlete_id"] for w in weeks if w.get("athlete_id") is not None})
+
+
+def iter_roster_plan_rows(supabase, athlete_ids: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Set-level rows of many stored plans (default: every athlete's), one plan and one week at
+    a time, each tagged with its athlete_id. Write them with columns=ROSTER_COLUMNS.
+    """
+    for athlete_id in (roster_athlete_ids(supabase) if athlete_ids is None else athlete_ids):
+        for row in iter_stored_plan_rows(supabase, athlete_id):
+            row["athlete_id"] = athlete_id
+            yield row
+
+
+# ---------- WRITERS ----------
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_csv(rows: Iterable[Dict[str, Any]], fp, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              columns: Sequence[str] = EXPORT_COLUMNS) -> int:
+    """Write rows to a text file object as CSV, chunk by chunk. Returns the row count."""
+    writer = csv.DictWriter(fp, fieldnames=list(columns), extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for chunk in _chunks(rows, chunk_size):
+        writer.writerows(chunk)
+        count += len(chunk)
+    return count
+
+
+def write_jsonl(rows: Iterable[Dict[str, Any]], fp, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                columns: Sequence[str] = EXPORT_COLUMNS) -> int:
+    """Write rows to a text file object as JSON lines, chunk by chunk. Returns the row count."""
+    count = 0
+    for chunk in _chunks(rows, chunk_size):
+        fp.write("".join(json.dumps({col: row.get(col, "") for col in columns}, default=str) + "\n"
+                         for row in chunk))
+        count += len(chunk)
+    return count
+
+
+def write_parquet(rows: Iterable[Dict[str, Any]], path_or_fp, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  columns: Sequence[str] = EXPORT_COLUMNS) -> int:
+    """
+    Write rows to Parquet, one row group per chunk. Requires pyarrow.
+    All columns are written as strings so chunks always share one schema.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow).") from e
+
+    schema = pa.schema([(col, pa.string()) for col in columns])
+    count = 0
+    with pq.ParquetWriter(path_or_fp, schema) as writer:
+        for chunk in _chunks(rows, chunk_size):
+            columns = {
+                col: [None if row.get(col) in (None, "") else str(row.get(col)) for row in chunk]
+                for col in columns
+            }
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def export_rows(rows: Iterable[Dict[str, Any]], path, fmt: Optional[str] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, columns: Sequence[str] = EXPORT_COLUMNS) -> int:
+    """
+    Headless export entry point: write rows to path in csv / jsonl / parquet.
+    The format defaults to the file suffix. Returns the number of rows written.
+    """
+    path = Path(path)
+    fmt = (fmt or path.suffix.lstrip(".")).lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Choose from: {', '.join(EXPORT_FORMATS)}.")
+    if fmt == "parquet":
+        return write_parquet(rows, str(path), chunk_size, columns)
+    with open(path, "w", newline="", encoding="utf-8") as fp:
+        if fmt == "csv":
+            return write_csv(rows, fp, chunk_size, columns)
+        return write_jsonl(rows, fp, chunk_size, columns)
+
+
+def export_to_bytes(rows: Iterable[Dict[str, Any]], fmt: str,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, columns: Sequence[str] = EXPORT_COLUMNS) -> bytes:
+    """Export into an in-memory buffer (for st.download_button)."""
+    fmt = fmt.lower()
+    if fmt == "parquet":
+        buf = io.BytesIO()
+        write_parquet(rows, buf, chunk_size, columns)
+        return buf.getvalue()
+    text = io.StringIO(newline="")
+    if fmt == "csv":
+        write_csv(rows, text, chunk_size, columns)
+    else:
+        write_jsonl(rows, text, chunk_size, columns)
+    return text.getvalue().encode("utf-8")
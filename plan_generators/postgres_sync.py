@@ -0,0 +1,279 @@
+# postgres_sync.py
+"""
+Direct Postgres bulk loader for plan sync.
+
+Writes plan_weeks, plan_days, plan_sessions and plan_session_exercises (plus
+plan_session_blocks with PLAN_SET_LAYOUT=blocks) in a single transaction using COPY FROM STDIN. Ids are preallocated from each table's serial
+sequence, so child rows can reference their parents before anything is written.
+
+Connection settings come from DB_HOST / DB_NAME / DB_USER / DB_PASSWORD / DB_PORT
+(see .env.example), which also makes it easy to point at a local Postgres for testing:
+
+    DB_HOST=localhost DB_USER=postgres DB_PASSWORD=postgres DB_NAME=postgres
+"""
+import csv
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from plan_generators.supabase_sync_function import _day_row, _session_row, _exercise_row
+from utils.cache_bus import publish_plan_rewrite
+from utils.session_blocks import TABLE as BLOCK_TABLE, compact_rows, compacts
+
+PLAN_WEEK_COLUMNS = ["id", "number", "notes", "athlete_id"]
+PLAN_DAY_COLUMNS = ["id", "week_id", "day_number", "is_rest_day", "date", "total_time"]
+PLAN_SESSION_COLUMNS = [
+    "id", "day_id", "type", "target_muscle", "duration", "details", "focus_muscle", "performance_targets", "wod_spec",
+    "catalog_refs",
+]
+PLAN_SESSION_EXERCISE_COLUMNS = [
+    "id", "session_id", "exercise_name", "exercise_id", "set_number", "reps", "intensity", "rest", "notes",
+    "exercise_order", "completed", "actual_reps", "actual_weight", "tempo", "expected_weight", "equipment",
+]
+PLAN_SESSION_BLOCK_COLUMNS = [
+    "id", "session_id", "exercise_name", "exercise_id", "exercise_order", "tempo", "equipment", "sets",
+]
+PLAN_DAY_PROGRESS_COLUMNS = ["day_id", "sessions_total", "sessions_completed", "sets_total", "sets_completed"]
+
+_COPY_NULL = r"\N"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# ---------- CONNECTIONS ----------
+def _dsn_from_env() -> Dict[str, Any]:
+    return {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "dbname": os.getenv("DB_NAME", "postgres"),
+        "user": os.getenv("DB_USER", "postgres"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "port": int(os.getenv("DB_PORT", "5432")),
+    }
+
+
+def get_pool(minconn: int = 1, maxconn: int = 4, **dsn):
+    """
+    Return the process-wide psycopg2 connection pool, creating it on first use.
+    Keyword arguments override the DB_* environment settings.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from psycopg2.pool import ThreadedConnectionPool
+            _pool = ThreadedConnectionPool(minconn, maxconn, **{**_dsn_from_env(), **dsn})
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+@contextmanager
+def pooled_connection(pool=None):
+    """Borrow a connection from the pool for the duration of the block."""
+    pool = pool or get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+# ---------- COPY HELPERS ----------
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return _COPY_NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _copy_rows(cur, table: str, columns: Sequence[str], rows: Iterable[Dict[str, Any]]) -> int:
+    """COPY rows (dicts) into table using CSV format with an explicit NULL marker."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    count = 0
+    for row in rows:
+        writer.writerow([_copy_value(row.get(col)) for col in columns])
+        count += 1
+    if not count:
+        return 0
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{_COPY_NULL}')",
+        buf,
+    )
+    return count
+
+
+def _preallocate_ids(cur, table: str, count: int) -> List[int]:
+    """Reserve count ids from the table's serial/identity sequence."""
+    if count <= 0:
+        return []
+    cur.execute(
+        "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+        (table, count),
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+# ---------- PLAN FLATTENING ----------
+def _flatten_plan(full_plan: dict, data: dict, athlete_id: Optional[int] = None, layout: Optional[str] = None):
+    """
+    Build week/day/session/exercise/block rows with placeholder parent references
+    (list indexes) that are swapped for real ids once they are allocated.
+    Sessions compacted by utils.session_blocks (under layout, default PLAN_SET_LAYOUT)
+    contribute blocks instead of exercise rows.
+    """
+    weeks, days, sessions, exercises, blocks = [], [], [], [], []
+    for week_number, (week_label, week_data) in enumerate(full_plan.items(), start=1):
+        weeks.append({"number": week_number, "notes": week_label})
+        if athlete_id is not None:
+            weeks[-1]["athlete_id"] = athlete_id
+        week_idx = len(weeks) - 1
+
+        for day_number, (day_label, day_data) in enumerate(week_data.items(), start=1):
+            days.append(_day_row(week_idx, day_number, day_data))
+            day_idx = len(days) - 1
+
+            if day_data.get("Rest") or "plan" not in day_data:
+                continue
+
+            for session_type, session_data in day_data["plan"].items():
+                if session_type in ["Debug", "Total Time"] or not isinstance(session_data, dict):
+                    continue
+                sessions.append(_session_row(day_idx, session_type, session_data, day_data))
+                session_idx = len(sessions) - 1
+
+                if isinstance(session_data.get("exercises"), list):
+                    rows = [_exercise_row(session_idx, ex, i, data) for i, ex in enumerate(session_data["exercises"], start=1)]
+                    if compacts(session_type, layout):
+                        blocks.extend(compact_rows(rows))
+                    else:
+                        exercises.extend(rows)
+    return weeks, days, sessions, exercises, blocks
+
+
+def _progress_rows(days: list, sessions: list, exercises: list, blocks: Sequence[dict] = ()) -> List[Dict[str, Any]]:
+    """
+    plan_day_progress seed rows, built from flattened rows whose parent references are
+    still list indexes (day_id holds the day's index until ids are assigned).
+    """
+    rows = [
+        {"day_id": i, "sessions_total": 0, "sessions_completed": 0, "sets_total": 0, "sets_completed": 0}
+        for i in range(len(days))
+    ]
+    for s in sessions:
+        rows[s["day_id"]]["sessions_total"] += 1
+    for ex in exercises:
+        rows[sessions[ex["session_id"]]["day_id"]]["sets_total"] += 1
+    for block in blocks:
+        rows[sessions[block["session_id"]]["day_id"]]["sets_total"] += len(block["sets"])
+    return rows
+
+
+# ---------- WIPES ----------
+# One plan's rows through the parent keys ({plan} is the plan_weeks predicate, see utils.plan_scope)
+_PLAN_WEEKS = "SELECT id FROM plan_weeks WHERE {plan}"
+_PLAN_DAYS = f"SELECT id FROM plan_days WHERE week_id IN ({_PLAN_WEEKS})"
+_PLAN_SESSIONS = f"SELECT id FROM plan_sessions WHERE day_id IN ({_PLAN_DAYS})"
+
+PLAN_WIPE_STATEMENTS = [
+    f"DELETE FROM plan_day_progress WHERE day_id IN ({_PLAN_DAYS})",
+    f"DELETE FROM plan_session_exercises WHERE session_id IN ({_PLAN_SESSIONS})",
+    f"DELETE FROM {BLOCK_TABLE} WHERE session_id IN ({_PLAN_SESSIONS})",  # whatever the current layout
+    f"DELETE FROM plan_sessions WHERE day_id IN ({_PLAN_DAYS})",
+    f"DELETE FROM plan_days WHERE week_id IN ({_PLAN_WEEKS})",
+    "DELETE FROM plan_weeks WHERE {plan}",
+]
+
+
+def _wipe(cur, athlete_id: Optional[int]) -> None:
+    """Delete one plan's rows (athlete_id None = the default plan, athlete_id IS NULL)."""
+    plan = "athlete_id IS NULL" if athlete_id is None else "athlete_id = %(athlete_id)s"
+    for template in PLAN_WIPE_STATEMENTS:
+        statement = template.format(plan=plan)
+        cur.execute(statement, {"athlete_id": athlete_id})
+
+
+# ---------- BULK SYNC ----------
+def sync_plan_to_postgres(full_plan: dict, data: dict, *, pool=None, conn=None, wipe: bool = True,
+                          athlete_id: Optional[int] = None,
+                          progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, Any]:
+    """
+    Full-plan sync in one transaction.
+      - wipe=True deletes this plan's previous rows first (same semantics as sync_plan_to_supabase).
+      - athlete_id tags the plan's weeks and scopes the wipe to that plan (None = the default
+        plan), so syncs for different athletes don't touch each other's rows.
+      - Ids are preallocated from the serial sequences; every table is loaded with one COPY.
+      - Pass conn to use an existing connection, otherwise one is borrowed from the pool.
+      - progress(table, rows) is called after each COPY; raising from it rolls the sync back.
+    Returns row counts plus elapsed_ms. Any failure rolls the whole sync back.
+    """
+    started = time.perf_counter()
+    weeks, days, sessions, exercises, blocks = _flatten_plan(full_plan, data, athlete_id)
+    progress_rows = _progress_rows(days, sessions, exercises, blocks)
+
+    def _run(connection):
+        with connection:  # commit on success, rollback on exception
+            with connection.cursor() as cur:
+                if wipe:
+                    _wipe(cur, athlete_id)
+
+                week_ids = _preallocate_ids(cur, "plan_weeks", len(weeks))
+                day_ids = _preallocate_ids(cur, "plan_days", len(days))
+                session_ids = _preallocate_ids(cur, "plan_sessions", len(sessions))
+                exercise_ids = _preallocate_ids(cur, "plan_session_exercises", len(exercises))
+                block_ids = _preallocate_ids(cur, BLOCK_TABLE, len(blocks))
+
+                for row, row_id in zip(weeks, week_ids):
+                    row["id"] = row_id
+                for row, row_id in zip(days, day_ids):
+                    row["id"], row["week_id"] = row_id, week_ids[row["week_id"]]
+                for row, row_id in zip(sessions, session_ids):
+                    row["id"], row["day_id"] = row_id, day_ids[row["day_id"]]
+                for row, row_id in zip(exercises, exercise_ids):
+                    row["id"], row["session_id"] = row_id, session_ids[row["session_id"]]
+                for row, row_id in zip(blocks, block_ids):
+                    row["id"], row["session_id"] = row_id, session_ids[row["session_id"]]
+                for row in progress_rows:
+                    row["day_id"] = day_ids[row["day_id"]]
+
+                for table, columns, rows in (
+                    ("plan_weeks", PLAN_WEEK_COLUMNS, weeks),
+                    ("plan_days", PLAN_DAY_COLUMNS, days),
+                    ("plan_sessions", PLAN_SESSION_COLUMNS, sessions),
+                    ("plan_session_exercises", PLAN_SESSION_EXERCISE_COLUMNS, exercises),
+                    (BLOCK_TABLE, PLAN_SESSION_BLOCK_COLUMNS, blocks),
+                    ("plan_day_progress", PLAN_DAY_PROGRESS_COLUMNS, progress_rows),
+                ):
+                    written = _copy_rows(cur, table, columns, rows)
+                    if progress is not None:
+                        progress(table, written)
+
+    if conn is not None:
+        _run(conn)
+    else:
+        with pooled_connection(pool) as pooled:
+            _run(pooled)
+    publish_plan_rewrite()
+
+    return {
+        "weeks": len(weeks),
+        "days": len(days),
+        "sessions": len(sessions),
+        "exercises": len(exercises),
+        "blocks": len(blocks),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,211 @@
+# roster.py
+"""
+Roster mode: generate and sync plans for many athletes in one run.
+
+  - The catalog (SHARED_CATALOG_TABLES) is loaded once and handed to each worker
+    process when it starts, so workers generate without touching the database.
+  - Plans are generated in a ProcessPoolExecutor, one task per athlete.
+  - As each plan finishes it is handed to a per-athlete sync (the Postgres COPY loader,
+    or the REST sync) on a small thread pool, overlapping with the remaining generation.
+    Both replace only that athlete's plan (utils.plan_scope). Plans are dropped after
+    syncing unless keep_plans=True.
+
+Postgres schema needs plan_weeks.athlete_id (and a unique key on (athlete_id, number)
+instead of number alone):
+
+    alter table plan_weeks add column athlete_id bigint;
+    create unique index ux_plan_weeks_athlete_number on plan_weeks (athlete_id, number);
+
+Usage:
+    data = load_shared_catalog(supabase)
+    results = run_roster(load_profiles("roster.json"), data, sync=postgres_roster_sync(data))
+"""
+import csv
+import json
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from plan_generators.crossfit_generator import SHARED_CATALOG_TABLES, CrossFitPlanGenerator
+from utils.projections import catalog_table
+
+SyncFn = Callable[["AthleteProfile", dict], Dict[str, Any]]
+
+
+@dataclass
+class AthleteProfile:
+    athlete_id: int
+    start_date: str
+    skill: str = "Handstand Push-Up"
+    run_5k_minutes: float = 24
+    equipment: Optional[List[str]] = None
+    name: str = ""
+    seed: Optional[int] = None
+    maxes: Optional[Dict[str, float]] = None  # exercise_name -> 1RM (JSON profiles); prescribes %RM sets
+
+
+@dataclass
+class RosterResult:
+    athlete_id: int
+    ok: bool
+    generate_ms: float = 0.0
+    sync: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    plan: Optional[dict] = field(default=None, repr=False)
+
+
+# ---------- PROFILES & CATALOG ----------
+def load_profiles(path) -> List[AthleteProfile]:
+    """
+    Read athlete profiles from JSON (a list of objects) or CSV (one row per athlete;
+    equipment as a ';'-separated list).
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as fp:
+            records = list(csv.DictReader(fp))
+        for rec in records:
+            rec["athlete_id"] = int(rec["athlete_id"])
+            rec["equipment"] = [e.strip() for e in (rec.get("equipment") or "").split(";") if e.strip()] or None
+            rec["seed"] = int(rec["seed"]) if rec.get("seed") else None
+            if rec.get("run_5k_minutes"):
+                rec["run_5k_minutes"] = float(rec["run_5k_minutes"])
+            for key in [k for k in ("skill", "run_5k_minutes", "name") if not rec.get(k)]:
+                rec.pop(key, None)
+    else:
+        with open(path, encoding="utf-8") as fp:
+            records = json.load(fp)
+    return [AthleteProfile(**rec) for rec in records]
+
+
+def load_shared_catalog(supabase) -> Dict[str, List[dict]]:
+    """Everything plan generation reads, fetched once for the whole roster."""
+    return {key: catalog_table(supabase, table) for key, table in SHARED_CATALOG_TABLES.items()}
+
+
+# ---------- WORKERS ----------
+_worker_data: Optional[Dict[str, Any]] = None
+_worker_debug = False
+
+
+def _init_worker(data: Dict[str, Any], debug: bool) -> None:
+    global _worker_data, _worker_debug
+    _worker_data, _worker_debug = data, debug
+
+
+def _generate_for(profile: AthleteProfile) -> Tuple[int, dict, float]:
+    started = time.perf_counter()
+    if profile.seed is not None:
+        random.seed(profile.seed)
+    gen = CrossFitPlanGenerator(
+        None,
+        debug=_worker_debug,
+        data=_worker_data,
+        user_5k_time=profile.run_5k_minutes,
+        equipment=profile.equipment,
+        maxes=profile.maxes or {},
+        athlete_id=profile.athlete_id,
+    )
+    plan = gen.generate_full_plan(profile.start_date, skill=profile.skill)
+    return profile.athlete_id, plan, round((time.perf_counter() - started) * 1000, 1)
+
+
+def generate_roster(profiles: Sequence[AthleteProfile], data: Dict[str, Any], *, workers: Optional[int] = None,
+                    debug: bool = False) -> Iterator[Tuple[AthleteProfile, Optional[dict], float, Optional[str]]]:
+    """
+    Generate every profile's plan in a process pool. Yields
+    (profile, plan, generate_ms, error) as plans complete (not in input order).
+    """
+    by_id = {p.athlete_id: p for p in profiles}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(data, debug)) as pool:
+        futures = {pool.submit(_generate_for, p): p for p in profiles}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                profile = futures[fut]
+                try:
+                    athlete_id, plan, ms = fut.result()
+                except Exception as e:
+                    yield profile, None, 0.0, f"{type(e).__name__}: {e}"
+                    continue
+                yield by_id[athlete_id], plan, ms, None
+
+
+# ---------- SYNC ----------
+def postgres_roster_sync(data: Dict[str, Any], pool=None) -> SyncFn:
+    """Per-athlete COPY sync: replaces only that athlete's plan rows."""
+    from plan_generators.postgres_sync import get_pool, sync_plan_to_postgres
+
+    def sync(profile: AthleteProfile, plan: dict) -> Dict[str, Any]:
+        return sync_plan_to_postgres(plan, data, pool=pool or get_pool(), athlete_id=profile.athlete_id)
+
+    return sync
+
+
+def rest_roster_sync(supabase, data: Dict[str, Any]) -> SyncFn:
+    """Per-athlete REST sync: replaces only that athlete's plan rows."""
+    from plan_generators.supabase_sync_function import sync_plan_to_supabase
+
+    def sync(profile: AthleteProfile, plan: dict) -> Dict[str, Any]:
+        return sync_plan_to_supabase(supabase, plan, data, athlete_id=profile.athlete_id)
+
+    return sync
+
+
+def run_roster(profiles: Sequence[AthleteProfile], data: Dict[str, Any], *, workers: Optional[int] = None,
+               sync: Optional[SyncFn] = None, sync_workers: int = 2, keep_plans: bool = False,
+               debug: bool = False, on_result: Optional[Callable[[RosterResult], None]] = None) -> List[RosterResult]:
+    """
+    Generate plans for every profile and stream each finished plan into sync(profile, plan).
+      - sync_workers: concurrent syncs (keep at or below the DB pool size)
+      - keep_plans: keep generated plans on the results (memory grows with the roster)
+      - on_result: called as each athlete finishes (e.g. progress output)
+    Returns one RosterResult per athlete, in input order.
+    """
+    results: Dict[int, RosterResult] = {}
+
+    def finish(result: RosterResult) -> None:
+        results[result.athlete_id] = result
+        if on_result:
+            on_result(result)
+
+    def sync_one(profile: AthleteProfile, plan: dict, ms: float) -> RosterResult:
+        try:
+            summary = sync(profile, plan)
+        except Exception as e:
+            return RosterResult(profile.athlete_id, False, ms, error=f"sync failed: {type(e).__name__}: {e}",
+                                plan=plan if keep_plans else None)
+        return RosterResult(profile.athlete_id, True, ms, sync=summary, plan=plan if keep_plans else None)
+
+    with ThreadPoolExecutor(max_workers=max(1, sync_workers)) as sync_pool:
+        sync_futures = []
+        for profile, plan, ms, error in generate_roster(profiles, data, workers=workers, debug=debug):
+            if error:
+                finish(RosterResult(profile.athlete_id, False, ms, error=error))
+            elif sync is None:
+                finish(RosterResult(profile.athlete_id, True, ms, plan=plan if keep_plans else None))
+            else:
+                fut = sync_pool.submit(sync_one, profile, plan, ms)
+                fut.add_done_callback(lambda f: finish(f.result()))
+                sync_futures.append(fut)
+        wait(sync_futures)
+
+    return [results[p.athlete_id] for p in profiles]
+
+
+def summarize(results: Sequence[RosterResult]) -> Dict[str, Any]:
+    ok = [r for r in results if r.ok]
+    return {
+        "athletes": len(results),
+        "ok": len(ok),
+        "failed": len(results) - len(ok),
+        "generate_ms_total": round(sum(r.generate_ms for r in results), 1),
+        "errors": {r.athlete_id: r.error for r in results if r.error},
+    }
+
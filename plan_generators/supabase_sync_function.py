@@ -1,9 +1,14 @@
 
 # supabase_sync_function.py
 import re
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, Tuple
 from datetime import datetime, timedelta, date as _date
 
+from utils.cache_bus import publish_plan_rewrite
+from utils.day_progress import TABLE as DAY_PROGRESS_TABLE, day_progress_row, rebuild_day_progress
+from utils.plan_scope import delete_plan, scope_weeks, week_row
+from utils.session_blocks import TABLE as BLOCK_TABLE, compact_rows, compacts
+
 # ---------- EXISTING HELPERS ----------
 def _parse_minutes(value: Optional[Union[str, int, float]]) -> int:
     """
@@ -60,11 +65,75 @@ def _resolve_exercise_id(ex_item: Dict[str, Any], data: Dict[str, Any]) -> Optio
             return e.get("id")
     return None
 
-# ---------- FULL-WIPE SYNC (unchanged; for first-time creation) ----------
-def sync_plan_to_supabase(supabase, full_plan, data):
+def _exercise_name(ex: Dict[str, Any]) -> str:
+    return (
+        ex.get("name")
+        or ex.get("exercise_name")
+        or ex.get("exercise")
+        or "Unknown"
+    )
+
+def _session_minutes(session_data: Dict[str, Any]) -> int:
+    return _parse_minutes(
+        session_data.get("time", None) if session_data.get("time") is not None
+        else session_data.get("Estimated Time", None)
+    )
+
+def _day_row(week_id: Optional[int], day_number: int, day_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for one plan_days row (shared by every sync backend)."""
+    return {
+        "week_id": week_id,
+        "day_number": day_number,
+        "is_rest_day": bool(day_data.get("Rest", False)),
+        "date": day_data.get("date") or None,
+        "total_time": _parse_minutes(day_data.get("estimated_time"))
+    }
+
+def _session_row(day_id: Optional[int], session_type: str, session_data: Dict[str, Any], day_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for one plan_sessions row (shared by every sync backend)."""
+    row = {
+        "day_id": day_id,
+        "type": session_type,
+        "target_muscle": ", ".join(day_data.get("muscles", [])),
+        "duration": _session_minutes(session_data),
+        "details": session_data.get("details", ""),
+        "focus_muscle": session_data.get("focus_muscle", ""),
+        # catalog rows the session was generated from (utils.catalog_deps)
+        "catalog_refs": session_data.get("catalog_refs") or [],
+    }
+    if session_type == "WOD":
+        row["performance_targets"] = session_data.get("Performance Targets", {})
+        # structured spec read by session_views/wod.py (plan_sessions.wod_spec jsonb)
+        row["wod_spec"] = session_data.get("spec")
+    return row
+
+def _exercise_row(session_id: Optional[int], ex: Dict[str, Any], order: int, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for one plan_session_exercises row (shared by every sync backend)."""
+    exercise_name = _exercise_name(ex)
+    return {
+        "session_id": session_id,
+        "exercise_name": exercise_name,
+        "exercise_id": _resolve_exercise_id({"name": exercise_name, "exercise_id": ex.get("exercise_id")}, data),
+        "set_number": ex.get("set", 1),
+        "reps": ex.get("reps", ""),
+        "intensity": ex.get("intensity", ""),
+        "rest": ex.get("rest", 0),
+        "notes": ex.get("notes", ""),
+        "exercise_order": order,
+        "completed": False,
+        "actual_reps": "",
+        "actual_weight": "",
+        "tempo": ex.get("tempo", ""),
+        "expected_weight": ex.get("expected_weight", ""),
+        "equipment": ex.get("equipment", "")
+    }
+
+# ---------- FULL-WIPE SYNC (for first-time creation) ----------
+def sync_plan_to_supabase(supabase, full_plan, data, athlete_id: Optional[int] = None):
     """
     Syncs a generated plan to Supabase tables.
-      - Clears previous plan data.
+      - Replaces one plan (utils.plan_scope): only that athlete's previous rows are deleted
+        (athlete_id None = the default plan).
       - Inserts weeks, days, sessions, and exercises.
       - Stores performance_targets for WOD sessions.
       - Ensures numeric values for total_time and duration.
@@ -72,32 +141,24 @@ def sync_plan_to_supabase(supabase, full_plan, data):
     """
     summary = {"weeks": 0, "days": 0, "sessions": 0, "exercises": 0}
 
-    # Full wipe (dev/seed). Reuses your original behavior. [1](https://danone-my.sharepoint.com/personal/john_matthews_danone_com/Documents/Microsoft%20Copilot%20Chat%20Files/2_%E2%9A%99%EF%B8%8F_Plan_Generator.py)
-    supabase.table("plan_session_exercises").delete().gt("id", 0).execute()
-    supabase.table("plan_sessions").delete().gt("id", 0).execute()
-    supabase.table("plan_days").delete().gt("id", 0).execute()
-    supabase.table("plan_weeks").delete().gt("id", 0).execute()
+    # Replace this plan only, through indexed parent-key deletes
+    delete_plan(supabase, athlete_id)
 
+    progress_rows = []
     for week_number, (week_label, week_data) in enumerate(full_plan.items(), start=1):
         # Insert week
-        week_resp = supabase.table("plan_weeks").insert({
+        week_resp = supabase.table("plan_weeks").insert(week_row({
             "number": week_number,
             "notes": week_label
-        }).execute()
+        }, athlete_id)).execute()
         week_id = week_resp.data[0]["id"]
         summary["weeks"] += 1
 
         for day_number, (day_label, day_data) in enumerate(week_data.items(), start=1):
-            total_minutes = _parse_minutes(day_data.get("estimated_time"))
-            day_resp = supabase.table("plan_days").insert({
-                "week_id": week_id,
-                "day_number": day_number,
-                "is_rest_day": bool(day_data.get("Rest", False)),
-                "date": day_data.get("date") or None,
-                "total_time": total_minutes
-            }).execute()
+            day_resp = supabase.table("plan_days").insert(_day_row(week_id, day_number, day_data)).execute()
             day_id = day_resp.data[0]["id"]
             summary["days"] += 1
+            progress_rows.append(day_progress_row(day_id, day_data))
 
             if day_data.get("Rest") or "plan" not in day_data:
                 continue
@@ -106,67 +167,37 @@ def sync_plan_to_supabase(supabase, full_plan, data):
                 if session_type in ["Debug", "Total Time"] or not isinstance(session_data, dict):
                     continue
 
-                session_minutes = _parse_minutes(
-                    session_data.get("time", None) if session_data.get("time") is not None
-                    else session_data.get("Estimated Time", None)
-                )
-                payload = {
-                    "day_id": day_id,
-                    "type": session_type,
-                    "target_muscle": ", ".join(day_data.get("muscles", [])),
-                    "duration": session_minutes,
-                    "details": session_data.get("details", ""),
-                    "focus_muscle": session_data.get("focus_muscle", "")
-                }
-                if session_type == "WOD":
-                    payload["performance_targets"] = session_data.get("Performance Targets", {})
-
+                payload = _session_row(day_id, session_type, session_data, day_data)
                 session_resp = supabase.table("plan_sessions").insert(payload).execute()
                 session_id = session_resp.data[0]["id"]
                 summary["sessions"] += 1
 
                 if "exercises" in session_data and isinstance(session_data["exercises"], list):
-                    for i, ex in enumerate(session_data["exercises"], start=1):
-                        exercise_name = (
-                            ex.get("name")
-                            or ex.get("exercise_name")
-                            or ex.get("exercise")
-                            or "Unknown"
-                        )
-                        exercise_id = _resolve_exercise_id(
-                            {"name": exercise_name, "exercise_id": ex.get("exercise_id")},
-                            data
-                        )
-                        supabase.table("plan_session_exercises").insert({
-                            "session_id": session_id,
-                            "exercise_name": exercise_name,
-                            "exercise_id": exercise_id,
-                            "set_number": ex.get("set", 1),
-                            "reps": ex.get("reps", ""),
-                            "intensity": ex.get("intensity", ""),
-                            "rest": ex.get("rest", 0),
-                            "notes": ex.get("notes", ""),
-                            "exercise_order": i,
-                            "completed": False,
-                            "actual_reps": "",
-                            "actual_weight": "",
-                            "tempo": ex.get("tempo", ""),
-                            "expected_weight": ex.get("expected_weight", ""),
-                            "equipment": ex.get("equipment", "")
-                        }).execute()
-                        summary["exercises"] += 1
+                    rows = [_exercise_row(session_id, ex, i, data) for i, ex in enumerate(session_data["exercises"], start=1)]
+                    if compacts(session_type):
+                        # One plan_session_blocks row per exercise (utils.session_blocks)
+                        supabase.table(BLOCK_TABLE).insert(compact_rows(rows)).execute()
+                    else:
+                        for row in rows:
+                            supabase.table("plan_session_exercises").insert(row).execute()
+                    summary["exercises"] += len(rows)
+
+    # Seed the per-day completion summary in one request
+    if progress_rows:
+        supabase.table(DAY_PROGRESS_TABLE).insert(progress_rows).execute()
 
+    publish_plan_rewrite()
     return summary
 
 # ---------- MERGE (NON-DESTRUCTIVE) SYNC ----------
 DAY_INDEX = {"Mon": 1, "Tue": 2, "Wed": 3, "Thu": 4, "Fri": 5, "Sat": 6, "Sun": 7}
 
-def _get_or_create_week(supabase, week_number: int, start_date: Optional[_date]) -> int:
-    # weeks.number has a unique constraint (per your schema). [1](https://danone-my.sharepoint.com/personal/john_matthews_danone_com/Documents/Microsoft%20Copilot%20Chat%20Files/2_%E2%9A%99%EF%B8%8F_Plan_Generator.py)
-    resp = supabase.table("plan_weeks").select("id").eq("number", week_number).execute()
+def _get_or_create_week(supabase, week_number: int, start_date: Optional[_date], athlete_id: Optional[int] = None) -> int:
+    # (athlete_id, number) is unique: one row per week of each plan
+    resp = scope_weeks(supabase.table("plan_weeks").select("id").eq("number", week_number), athlete_id).execute()
     if resp.data:
         return resp.data[0]["id"]
-    payload = {"number": week_number, "notes": f"Week {week_number}"}
+    payload = week_row({"number": week_number, "notes": f"Week {week_number}"}, athlete_id)
     if start_date:
         payload["start_date"] = start_date
     ins = supabase.table("plan_weeks").insert(payload).execute()
@@ -190,50 +221,51 @@ def _get_or_create_day(supabase, week_id: int, day_name: str, day_date_iso: Opti
     ins = supabase.table("plan_days").insert(payload).execute()
     return ins.data[0]["id"]
 
-def _insert_exercises(supabase, session_id: int, exercises: Optional[list], data: Dict[str, Any], append: bool = False):
+def _next_exercise_order(supabase, session_id: int, session_type: Optional[str] = None) -> int:
+    # Blocks first whatever the current layout: a session synced as blocks keeps them
+    blocks = supabase.table(BLOCK_TABLE).select("sets").eq("session_id", session_id).execute().data or []
+    orders = [int(s.get("exercise_order") or 0) for b in blocks for s in (b.get("sets") or [])]
+    if orders:
+        return max(orders) + 1
+    cur = supabase.table("plan_session_exercises").select("exercise_order").eq("session_id", session_id).order("exercise_order", desc=True).limit(1).execute()
+    if cur.data:
+        return int(cur.data[0]["exercise_order"]) + 1
+    return 1
+
+def _insert_exercises(supabase, session_id: int, exercises: Optional[list], data: Dict[str, Any], start_order: int = 1,
+                      session_type: Optional[str] = None):
     if not exercises or not isinstance(exercises, list):
         return
-    start_order = 1
-    if append:
-        cur = supabase.table("plan_session_exercises").select("exercise_order").eq("session_id", session_id).order("exercise_order", desc=True).limit(1).execute()
-        if cur.data:
-            start_order = int(cur.data[0]["exercise_order"]) + 1
-
+    if compacts(session_type):
+        rows = [_exercise_row(session_id, ex, idx, data) for idx, ex in enumerate(exercises, start=start_order)]
+        supabase.table(BLOCK_TABLE).insert(compact_rows(rows)).execute()
+        return
     for idx, ex in enumerate(exercises, start=start_order):
-        exercise_name = (
-            ex.get("name")
-            or ex.get("exercise_name")
-            or ex.get("exercise")
-            or "Unknown"
-        )
-        exercise_id = _resolve_exercise_id({"name": exercise_name, "exercise_id": ex.get("exercise_id")}, data)
-        supabase.table("plan_session_exercises").insert({
-            "session_id": session_id,
-            "exercise_name": exercise_name,
-            "exercise_id": exercise_id,
-            "set_number": ex.get("set", 1),
-            "reps": ex.get("reps", ""),
-            "intensity": ex.get("intensity", ""),
-            "rest": ex.get("rest", 0),
-            "notes": ex.get("notes", ""),
-            "exercise_order": idx,
-            "completed": False,
-            "actual_reps": "",
-            "actual_weight": "",
-            "tempo": ex.get("tempo", ""),
-            "expected_weight": ex.get("expected_weight", ""),
-            "equipment": ex.get("equipment", "")
-        }).execute()
+        supabase.table("plan_session_exercises").insert(_exercise_row(session_id, ex, idx, data)).execute()
+
+def _upsert_session(supabase, payload: Dict[str, Any], *, replace_section: bool = True) -> Tuple[int, int]:
+    """
+    Upserts one plan_sessions row (match on day_id + type) and prepares its exercise list.
+    - Existing session: update fields; clear its exercises (replace_section=True) or find the next free order
+    - New session: insert
+    Returns (session_id, exercise_order to start inserting from).
+    """
+    sel = supabase.table("plan_sessions").select("id").eq("day_id", payload["day_id"]).eq("type", payload["type"]).execute()
+    if sel.data:
+        sess_id = sel.data[0]["id"]
+        supabase.table("plan_sessions").update(payload).eq("id", sess_id).execute()
+        if replace_section:
+            supabase.table("plan_session_exercises").delete().eq("session_id", sess_id).execute()
+            # Cleared whatever the current layout, so no stale blocks survive a layout switch
+            supabase.table(BLOCK_TABLE).delete().eq("session_id", sess_id).execute()
+            return sess_id, 1
+        return sess_id, _next_exercise_order(supabase, sess_id, payload["type"])
+    ins = supabase.table("plan_sessions").insert(payload).execute()
+    return ins.data[0]["id"], 1
 
 def _upsert_session_and_exercises(
     supabase,
-    day_id: int,
-    session_type: str,
-    session_minutes: int,
-    target_muscle: str,
-    details: str,
-    focus_muscle: str,
-    performance_targets: Optional[Dict[str, Any]],
+    payload: Dict[str, Any],
     exercises: Optional[list],
     data: Dict[str, Any],
     *,
@@ -241,35 +273,19 @@ def _upsert_session_and_exercises(
 ) -> int:
     """
     Upserts a session (match on day_id + type) and optionally replaces its exercises.
+    payload: the session's columns, built by _session_row() like every other sync backend.
     - If session exists: update fields; optionally delete exercises then reinsert (replace_section=True)
     - If not exists: insert.
     """
-    sel = supabase.table("plan_sessions").select("id").eq("day_id", day_id).eq("type", session_type).execute()
-    payload = {
-        "day_id": day_id,
-        "type": session_type,
-        "target_muscle": target_muscle or "",
-        "duration": int(session_minutes or 0),
-        "details": details or "",
-        "focus_muscle": focus_muscle or "",
-    }
-    if session_type == "WOD" and performance_targets is not None:
-        payload["performance_targets"] = performance_targets
+    sess_id, start_order = _upsert_session(supabase, payload, replace_section=replace_section)
+    _insert_exercises(supabase, sess_id, exercises, data, start_order=start_order, session_type=payload["type"])
+    return sess_id
 
-    if sel.data:
-        sess_id = sel.data[0]["id"]
-        supabase.table("plan_sessions").update(payload).eq("id", sess_id).execute()
-        if replace_section:
-            supabase.table("plan_session_exercises").delete().eq("session_id", sess_id).execute()
-            _insert_exercises(supabase, sess_id, exercises, data)
-        else:
-            _insert_exercises(supabase, sess_id, exercises, data, append=True)
-        return sess_id
-    else:
-        ins = supabase.table("plan_sessions").insert(payload).execute()
-        sess_id = ins.data[0]["id"]
-        _insert_exercises(supabase, sess_id, exercises, data)
-        return sess_id
+def _week_number(week_label) -> Optional[int]:
+    try:
+        return int(str(week_label).split()[-1])
+    except Exception:
+        return None
 
 def merge_plan_patch_to_supabase(
     supabase,
@@ -277,7 +293,8 @@ def merge_plan_patch_to_supabase(
     data: dict,
     *,
     start_date: Optional[str] = None,
-    replace_section: bool = True
+    replace_section: bool = True,
+    athlete_id: Optional[int] = None
 ) -> Dict[str, int]:
     """
     Merge-only sync: upserts weeks, days, and only the sessions present in patch_plan.
@@ -290,23 +307,22 @@ def merge_plan_patch_to_supabase(
       - replace_section:
           True  => for any session included in the patch, delete its existing exercises first, then reinsert
           False => append exercises to any existing ones (merge)
+      - athlete_id: the plan to merge into (None = the default plan)
 
     Returns: summary counts
     """
     summary = {"weeks": 0, "days": 0, "sessions": 0, "exercises": 0}
     start_d = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+    touched_days = []
 
     for week_label, week_blob in patch_plan.items():
-        try:
-            week_number = int(str(week_label).split()[-1])
-        except Exception:
-            week_number = None
+        week_number = _week_number(week_label)
 
         wk_start = None
         if start_d and week_number:
             wk_start = start_d + timedelta(days=(week_number - 1) * 7)
 
-        week_id = _get_or_create_week(supabase, week_number or 0, wk_start)
+        week_id = _get_or_create_week(supabase, week_number or 0, wk_start, athlete_id)
         summary["weeks"] += 1
 
         for day_name, day_data in week_blob.items():
@@ -320,6 +336,7 @@ def merge_plan_patch_to_supabase(
                 is_rest=bool(day_data.get("Rest", False)),
             )
             summary["days"] += 1
+            touched_days.append(day_id)
 
             if day_data.get("Rest") or "plan" not in day_data:
                 continue
@@ -329,31 +346,18 @@ def merge_plan_patch_to_supabase(
                     continue
                 if not isinstance(session_payload, dict):
                     continue
-                session_minutes = _parse_minutes(
-                    session_payload.get("time", None)
-                    if session_payload.get("time") is not None
-                    else session_payload.get("Estimated Time", None)
-                )
-                target_muscle = ", ".join(day_data.get("muscles", []))
-                details = session_payload.get("details", "")
-                focus_muscle = session_payload.get("focus_muscle", "")
-                perf_targets = session_payload.get("Performance Targets", {}) if session_type == "WOD" else None
                 exs = session_payload.get("exercises", [])
-
-                sess_id = _upsert_session_and_exercises(
+                _upsert_session_and_exercises(
                     supabase,
-                    day_id=day_id,
-                    session_type=session_type,
-                    session_minutes=session_minutes,
-                    target_muscle=target_muscle,
-                    details=details,
-                    focus_muscle=focus_muscle,
-                    performance_targets=perf_targets,
-                    exercises=exs,
-                    data=data,
-                    replace_section=replace_section
+                    _session_row(day_id, session_type, session_payload, day_data),
+                    exs,
+                    data,
+                    replace_section=replace_section,
                 )
                 summary["sessions"] += 1
                 summary["exercises"] += (len(exs) or 0)
 
-   
+    # Recount the completion summary for every day the patch touched
+    rebuild_day_progress(supabase, touched_days)
+    publish_plan_rewrite()
+    return summary
@@ -0,0 +1,9 @@
+# sync_errors.py
+"""
+Exceptions shared by the sync paths, kept apart from the job runner (sync_jobs) so the
+sync implementations can raise or pass them through without importing it.
+"""
+
+
+class SyncCancelled(Exception):
+    """Raised inside a sync job's worker thread once cancel() has been requested."""
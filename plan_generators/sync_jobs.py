@@ -0,0 +1,310 @@
+# sync_jobs.py
+"""
+Plan syncs as background jobs, so the Streamlit script (or any caller) is not blocked
+while every row is written.
+
+    job = submit_sync(plan_gen, "concurrent", full_plan, concurrency=8)
+    get_job(job.job_id).snapshot()   # state, rows written / expected per level, ETA
+    job.cancel()
+
+  - Each job runs in a daemon worker thread of this process and is identified by a job id;
+    the registry outlives Streamlit reruns and page switches, so the page only polls
+    snapshot() (a dict copy taken under a lock, no queries).
+  - Progress is counted per level (plan table) as rows are written: the REST syncs go
+    through a client proxy that counts insert/upsert rows, the Postgres COPY sync reports
+    each COPY. Expected totals come from flattening the plan (exact for full syncs, an
+    upper bound for merges, where existing weeks/days are reused).
+  - cancel() stops the job before its next request (or COPY). The COPY sync rolls back;
+    the resumable sync keeps its checkpoint so it can be resumed; the other REST syncs
+    leave whatever was written, like any interrupted sync.
+  - Only one queued/running job per plan key (utils.plan_scope.plan_key, i.e. per athlete
+    plan): submitting another raises SyncJobConflict.
+  - run_sync() is the blocking dispatch shared with the CLI (plan_generators.cli).
+"""
+import copy
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from plan_generators.sync_errors import SyncCancelled
+
+FULL_SYNCS = ("rest", "concurrent", "resumable", "postgres")
+MERGE_SYNCS = ("merge", "merge-concurrent")
+
+DEFAULT_PLAN_KEY = "default"  # utils.plan_scope.plan_key(None): the default plan
+KEEP_FINISHED = 20  # finished jobs kept for their snapshots
+
+ACTIVE_STATES = ("queued", "running", "cancelling")
+
+# Level order for progress reports (plan table -> label)
+LEVELS = [
+    ("plan_weeks", "weeks"),
+    ("plan_days", "days"),
+    ("plan_sessions", "sessions"),
+    ("plan_session_exercises", "exercises"),
+    ("plan_session_blocks", "blocks"),
+    ("plan_day_progress", "day progress"),
+]
+
+
+class SyncJobConflict(RuntimeError):
+    """Another job is still active for the same plan."""
+
+    def __init__(self, job: "SyncJob"):
+        super().__init__(f"sync job {job.job_id} ({job.kind}) is still {job.state} for plan {job.plan_key!r}")
+        self.job = job
+
+
+# ---------- PROGRESS ----------
+class _TrackedQuery:
+    """Wraps a query builder: execute() checks for cancellation and counts inserted rows."""
+    __slots__ = ("_query", "_job", "_table", "_rows")
+
+    def __init__(self, query, job: "SyncJob", table: str, rows: int = 0):
+        self._query = query
+        self._job = job
+        self._table = table
+        self._rows = rows
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name == "execute":
+            def execute(*args, **kwargs):
+                self._job.check()
+                result = attr(*args, **kwargs)
+                if self._rows:
+                    self._job.advance(self._table, self._rows)
+                return result
+            return execute
+        if callable(attr):
+            def chain(*args, **kwargs):
+                result = attr(*args, **kwargs)
+                if not hasattr(result, "execute"):
+                    return result
+                rows = self._rows
+                if name in ("insert", "upsert") and args:
+                    rows = len(args[0]) if isinstance(args[0], list) else 1
+                return _TrackedQuery(result, self._job, self._table, rows)
+            return chain
+        return attr
+
+
+class ProgressClient:
+    """Client proxy feeding a job's progress (and cancellation) from the queries it executes."""
+
+    def __init__(self, client, job: "SyncJob"):
+        self._client = client
+        self._job = job
+
+    def table(self, name: str):
+        return _TrackedQuery(self._client.table(name), self._job, name)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def plan_totals(plan: dict, data: dict) -> Dict[str, int]:
+    """Rows a sync of this plan writes per plan table (flattened the same way as the bulk syncs)."""
+    from plan_generators.postgres_sync import _flatten_plan, _progress_rows
+
+    weeks, days, sessions, exercises, blocks = _flatten_plan(plan, data)
+    return {
+        "plan_weeks": len(weeks),
+        "plan_days": len(days),
+        "plan_sessions": len(sessions),
+        "plan_session_exercises": len(exercises),
+        "plan_session_blocks": len(blocks),
+        "plan_day_progress": len(_progress_rows(days, sessions, exercises, blocks)),
+    }
+
+
+# ---------- JOBS ----------
+class SyncJob:
+    """One background sync. State: queued -> running -> done | failed | cancelled (via cancelling)."""
+
+    def __init__(self, kind: str, plan_key: str, totals: Optional[Dict[str, int]] = None):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.plan_key = plan_key
+        self.state = "queued"
+        self.totals = dict(totals or {})
+        self.written: Dict[str, int] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- called from the worker thread ---
+    def check(self) -> None:
+        if self._cancel.is_set():
+            raise SyncCancelled(f"sync job {self.job_id} cancelled")
+
+    def advance(self, table: str, rows: int) -> None:
+        """Record rows written to table (also the progress callback of the COPY sync)."""
+        with self._lock:
+            self.written[table] = self.written.get(table, 0) + rows
+        self.check()
+
+    def client(self, client) -> ProgressClient:
+        return ProgressClient(client, self)
+
+    def _run(self, run: Callable[["SyncJob"], Any]) -> None:
+        with self._lock:
+            if self.state == "queued":
+                self.state = "running"
+            self.started_at = time.time()
+        try:
+            self.check()  # cancelled before the worker started
+            result = run(self)
+        except SyncCancelled:
+            state, result, error = "cancelled", None, None
+        except Exception as e:
+            state, result, error = "failed", None, f"{type(e).__name__}: {e}"
+        else:
+            state, error = "done", None
+        with self._lock:
+            self.state, self.result, self.error = state, result, error
+            self.finished_at = time.time()
+        _release(self)
+
+    # --- called from anywhere ---
+    def cancel(self) -> None:
+        with self._lock:
+            if self.state in ACTIVE_STATES:
+                self._cancel.set()
+                self.state = "cancelling"
+
+    @property
+    def active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the worker finishes; True if it did within timeout."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.active
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict view for polling: levels, overall fraction, rows/s and ETA (seconds)."""
+        with self._lock:
+            written, totals = dict(self.written), dict(self.totals)
+            state, result, error = self.state, self.result, self.error
+            started, finished = self.started_at, self.finished_at
+
+        names = dict(LEVELS)
+        tables = [t for t, _ in LEVELS if totals.get(t) or written.get(t)]
+        tables += [t for t in list(totals) + list(written) if t not in names and t not in tables]
+        levels = [
+            {"level": names.get(t, t), "table": t, "written": written.get(t, 0), "total": totals.get(t)}
+            for t in tables
+        ]
+        done_rows = sum(written.values())
+        total_rows = sum(totals.values())
+        elapsed = ((finished or time.time()) - started) if started else 0.0
+        rate = done_rows / elapsed if elapsed > 0 and done_rows else None
+        remaining = max(0, total_rows - done_rows)
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "plan_key": self.plan_key,
+            "state": state,
+            "levels": levels,
+            "written": done_rows,
+            "total": total_rows or None,
+            "fraction": 1.0 if state == "done" else (min(1.0, done_rows / total_rows) if total_rows else None),
+            "elapsed_s": round(elapsed, 1),
+            "rows_per_s": round(rate, 1) if rate else None,
+            "eta_s": round(remaining / rate, 1) if rate and state == "running" else None,
+            "result": result,
+            "error": error,
+        }
+
+
+_jobs: Dict[str, SyncJob] = {}
+_active: Dict[str, str] = {}  # plan key -> job id
+_registry_lock = threading.Lock()
+
+
+def _release(job: SyncJob) -> None:
+    with _registry_lock:
+        if _active.get(job.plan_key) == job.job_id:
+            del _active[job.plan_key]
+        finished = [j for j in _jobs.values() if not j.active]
+        for old in sorted(finished, key=lambda j: j.created_at)[:-KEEP_FINISHED]:
+            _jobs.pop(old.job_id, None)
+
+
+def submit(kind: str, run: Callable[[SyncJob], Any], *, plan_key: str = DEFAULT_PLAN_KEY,
+           totals: Optional[Dict[str, int]] = None) -> SyncJob:
+    """Start run(job) on a worker thread; raises SyncJobConflict if the plan already has an active job."""
+    with _registry_lock:
+        current = _jobs.get(_active.get(plan_key, ""))
+        if current is not None and current.active:
+            raise SyncJobConflict(current)
+        job = SyncJob(kind, plan_key, totals)
+        _jobs[job.job_id] = job
+        _active[plan_key] = job.job_id
+    job._thread = threading.Thread(target=job._run, args=(run,), name=f"sync-job:{job.job_id}", daemon=True)
+    job._thread.start()
+    return job
+
+
+def get_job(job_id: Optional[str]) -> Optional[SyncJob]:
+    return _jobs.get(job_id) if job_id else None
+
+
+def active_job(plan_key: str = DEFAULT_PLAN_KEY) -> Optional[SyncJob]:
+    job = get_job(_active.get(plan_key))
+    return job if job is not None and job.active else None
+
+
+def list_jobs() -> List[SyncJob]:
+    with _registry_lock:
+        return sorted(_jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+
+# ---------- PLAN SYNCS ----------
+def run_sync(gen, kind: str, plan: dict, *, start_date: Optional[str] = None, replace_section: bool = True,
+             concurrency: Optional[int] = None, chunk_size: Optional[int] = None,
+             progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, Any]:
+    """Blocking sync of plan with the CrossFitPlanGenerator gen (kind: FULL_SYNCS / MERGE_SYNCS)."""
+    import asyncio
+
+    if kind == "rest":
+        return gen.sync_plan_to_supabase(plan)
+    if kind == "concurrent":
+        return asyncio.run(gen.async_sync_plan_to_supabase(plan, concurrency=concurrency))
+    if kind == "resumable":
+        return gen.sync_plan_resumable(plan, chunk_size=chunk_size)
+    if kind == "postgres":
+        return gen.sync_plan_bulk(plan, progress=progress)
+    if kind == "merge":
+        return gen.sync_partial_plan_to_supabase(plan, start_date, replace_section=replace_section)
+    if kind == "merge-concurrent":
+        return asyncio.run(gen.async_sync_partial_plan_to_supabase(
+            plan, start_date, replace_section=replace_section, concurrency=concurrency,
+        ))
+    raise ValueError(f"unknown sync kind {kind!r}; expected one of {FULL_SYNCS + MERGE_SYNCS}")
+
+
+def submit_sync(gen, kind: str, plan: dict, *, plan_key: Optional[str] = None, **options) -> SyncJob:
+    """
+    run_sync() as a background job, writing through a progress-counting copy of gen's client.
+    The job is keyed by gen's plan (athlete_id) unless plan_key is given.
+    """
+    from utils.plan_scope import plan_key as key_for
+
+    totals = plan_totals(plan, gen.data)
+    plan_key = plan_key or key_for(getattr(gen, "athlete_id", None))
+
+    def run(job: SyncJob):
+        job_gen = copy.copy(gen)  # same catalog, client swapped for the job's proxy
+        job_gen.supabase = job.client(gen.supabase)
+        return run_sync(job_gen, kind, plan, progress=job.advance, **options)
+
+    return submit(kind, run, plan_key=plan_key, totals=totals)
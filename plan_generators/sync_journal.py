@@ -0,0 +1,252 @@
+# sync_journal.py
+"""
+Resumable full-wipe sync.
+
+The plan is flattened into week / day / session / exercise rows and written level by
+level in chunks (one list insert per chunk). After every committed chunk a JSON
+checkpoint is written with:
+  - the plan itself and its fingerprint
+  - the set layout it is flattened with (PLAN_SET_LAYOUT, utils.session_blocks)
+  - whether the wipe has happened
+  - the current level and next chunk index
+  - the ids assigned so far at each level (used to resolve child -> parent references)
+
+If a sync is interrupted, calling resumable_sync_plan_to_supabase again with the same
+plan (or resume_sync without one) continues from the next chunk. Rows left by a chunk
+whose response was lost are removed before that chunk is resent, both on resume and before
+an in-call retry. A checkpoint written under the other set layout is not resumed: its
+committed ids belong to a different flattening, so the sync starts over (the wipe removes
+rows of both layouts).
+
+Each plan (utils.plan_scope) has its own checkpoint in SYNC_JOURNAL_DIR (default
+.sync_journal/): plan_sync.json for the default plan, plan_sync_athlete_<id>.json otherwise.
+"""
+import hashlib
+import json
+import os
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from plan_generators.postgres_sync import _flatten_plan, _progress_rows
+from plan_generators.sync_errors import SyncCancelled
+from utils import session_blocks
+from utils.cache_bus import publish_plan_rewrite
+from utils.day_progress import TABLE as DAY_PROGRESS_TABLE
+from utils.plan_scope import child_ids, delete_in, delete_plan, scope_weeks
+from utils.session_blocks import TABLE as BLOCK_TABLE, compact_enabled
+
+JOURNAL_DIR = os.getenv("SYNC_JOURNAL_DIR", ".sync_journal")
+DEFAULT_CHUNK_SIZE = 200
+DEFAULT_RETRIES = 3
+
+# (level, table, parent level, parent reference column) in insert order
+LEVELS = [
+    ("weeks", "plan_weeks", None, None),
+    ("days", "plan_days", "weeks", "week_id"),
+    ("sessions", "plan_sessions", "days", "day_id"),
+    ("exercises", "plan_session_exercises", "sessions", "session_id"),
+]
+# Extra level written with PLAN_SET_LAYOUT=blocks (utils.session_blocks)
+BLOCK_LEVEL = ("blocks", BLOCK_TABLE, "sessions", "session_id")
+FLATTENED_LEVELS = ["weeks", "days", "sessions", "exercises", "blocks"]  # _flatten_plan output order
+
+
+def _levels(layout: str) -> List[tuple]:
+    return LEVELS + [BLOCK_LEVEL] if compact_enabled(layout) else LEVELS
+
+
+def plan_fingerprint(full_plan: dict) -> str:
+    return hashlib.sha256(json.dumps(full_plan, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def default_journal_path(athlete_id: Optional[int] = None) -> Path:
+    name = "plan_sync.json" if athlete_id is None else f"plan_sync_athlete_{athlete_id}.json"
+    return Path(JOURNAL_DIR) / name
+
+
+class SyncJournal:
+    """JSON checkpoint for one resumable sync, written atomically after every chunk."""
+
+    def __init__(self, path=None, athlete_id: Optional[int] = None):
+        self.path = Path(path) if path else default_journal_path(athlete_id)
+        self.athlete_id = athlete_id
+        self.state: Optional[Dict[str, Any]] = None
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not self.path.exists():
+            self.state = None
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as fp:
+                self.state = json.load(fp)
+        except ValueError:
+            self.state = None  # unreadable checkpoint -> start over
+        return self.state
+
+    def start(self, full_plan: dict) -> Dict[str, Any]:
+        layout = session_blocks.LAYOUT
+        self.state = {
+            "fingerprint": plan_fingerprint(full_plan),
+            "plan": full_plan,
+            "athlete_id": self.athlete_id,
+            "layout": layout,
+            "wiped": False,
+            "level": LEVELS[0][0],
+            "chunk": 0,
+            "ids": {level: [] for level, *_ in _levels(layout)},
+            "started_at": time.time(),
+        }
+        self.save()
+        return self.state
+
+    def resumable(self) -> bool:
+        """True if the loaded checkpoint was written under the current set layout."""
+        return bool(self.state) and self.state.get("layout") == session_blocks.LAYOUT
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump(self.state, fp, default=str)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.state = None
+
+
+def has_pending_sync(journal_path=None, athlete_id: Optional[int] = None) -> bool:
+    """True if an interrupted sync of this plan left a checkpoint behind."""
+    return SyncJournal(journal_path, athlete_id).load() is not None
+
+
+def _insert_chunk(supabase, table: str, rows: List[Dict[str, Any]], retries: int,
+                  trim: Optional[Callable[[], None]] = None) -> List[int]:
+    """
+    List insert with a short retry/backoff; returns the new ids in row order.
+    A failed attempt may still have committed (response lost), so trim() removes its rows
+    before every retry; otherwise the retry would duplicate the whole chunk.
+    """
+    for attempt in range(retries + 1):
+        try:
+            resp = supabase.table(table).insert(rows).execute()
+            return [r["id"] for r in resp.data]
+        except SyncCancelled:
+            raise  # not retried; the checkpoint keeps the sync resumable
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+            if trim is not None:
+                trim()
+
+
+def _trim_uncommitted(supabase, table: str, committed_ids: List[int], parent_col: Optional[str],
+                      parent_ids: List[int], athlete_id: Optional[int]) -> None:
+    """
+    Delete this plan's rows past the last committed id (left by a chunk whose response was
+    lost): weeks of the plan, or rows under the plan's committed parents.
+    """
+    last = max(committed_ids, default=0)
+    if parent_col is None:
+        scope_weeks(supabase.table(table).delete().gt("id", last), athlete_id).execute()
+        return
+    lost = [i for i in child_ids(supabase, table, parent_col, parent_ids) if i > last]
+    delete_in(supabase, table, "id", lost)
+
+
+def _run(supabase, journal: SyncJournal, data: dict, chunk_size: int, retries: int, resumed: bool) -> Dict[str, Any]:
+    state = journal.state
+    athlete_id = state.get("athlete_id")
+    levels = _levels(state["layout"])
+    if not state["wiped"]:
+        delete_plan(supabase, athlete_id)  # this plan's rows only (utils.plan_scope)
+        state["wiped"] = True
+        journal.save()
+
+    level_names = [level for level, *_ in levels]
+    rows_by_level = dict(zip(FLATTENED_LEVELS, _flatten_plan(state["plan"], data, athlete_id, state["layout"])))
+    chunks_sent = 0
+
+    for level, table, parent, parent_col in levels[level_names.index(state["level"]):]:
+        rows = rows_by_level[level]
+        ids = state["ids"].setdefault(level, [])
+        trim = partial(_trim_uncommitted, supabase, table, ids, parent_col,
+                       state["ids"][parent] if parent else [], athlete_id)
+        if resumed:
+            trim()
+            resumed = False
+
+        # len(ids) is the committed row count, so resuming never depends on the previous chunk size
+        for start in range(len(ids), len(rows), chunk_size):
+            chunk = [dict(r) for r in rows[start:start + chunk_size]]
+            if parent:
+                parent_ids = state["ids"][parent]
+                for row in chunk:
+                    row[parent_col] = parent_ids[row[parent_col]]
+            ids.extend(_insert_chunk(supabase, table, chunk, retries, trim))
+            state["chunk"] += 1
+            chunks_sent += 1
+            journal.save()
+
+        next_index = level_names.index(level) + 1
+        if next_index < len(level_names):
+            state["level"], state["chunk"] = level_names[next_index], 0
+            journal.save()
+
+    # Seed the per-day completion summary (upsert, so a resumed run can repeat it)
+    progress = _progress_rows(rows_by_level["days"], rows_by_level["sessions"], rows_by_level["exercises"],
+                              rows_by_level["blocks"])
+    for row in progress:
+        row["day_id"] = state["ids"]["days"][row["day_id"]]
+    if progress:
+        supabase.table(DAY_PROGRESS_TABLE).upsert(progress, on_conflict="day_id").execute()
+
+    journal.clear()
+    publish_plan_rewrite()
+    summary = {level: len(rows_by_level[level]) for level in level_names}
+    summary["chunks"] = chunks_sent
+    return summary
+
+
+# ---------- ENTRY POINTS ----------
+def resumable_sync_plan_to_supabase(supabase, full_plan: dict, data: dict, *, journal_path=None,
+                                    chunk_size: int = DEFAULT_CHUNK_SIZE, retries: int = DEFAULT_RETRIES,
+                                    athlete_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Full-wipe sync of one plan (athlete_id None = the default plan) written as checkpointed chunks.
+      - A checkpoint for the same plan resumes from its next chunk.
+      - A checkpoint for a different plan, or written under the other set layout, is
+        discarded and the sync starts over.
+    Returns row counts per level, chunks sent in this call, and whether it resumed.
+    """
+    journal = SyncJournal(journal_path, athlete_id)
+    state = journal.load()
+    resumed = bool(state and state.get("fingerprint") == plan_fingerprint(full_plan) and journal.resumable())
+    if not resumed:
+        journal.start(full_plan)
+    summary = _run(supabase, journal, data, chunk_size, retries, resumed)
+    summary["resumed"] = resumed
+    return summary
+
+
+def resume_sync(supabase, data: dict, *, journal_path=None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                retries: int = DEFAULT_RETRIES, athlete_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Resume an interrupted sync from its checkpoint (the plan is stored there). None if nothing
+    is pending. A checkpoint from the other set layout restarts the stored plan from scratch.
+    """
+    journal = SyncJournal(journal_path, athlete_id)
+    state = journal.load()
+    if state is None:
+        return None
+    resumed = journal.resumable()
+    if not resumed:
+        journal.athlete_id = state.get("athlete_id", athlete_id)
+        journal.start(state["plan"])
+    summary = _run(supabase, journal, data, chunk_size, retries, resumed)
+    summary["resumed"] = resumed
+    return summary
+
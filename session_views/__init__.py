@@ -1,6 +1,28 @@
-
-
 # session_views/__init__.py
 # Declare it's a package; don't import submodules here.
-__all__ = []
+# Views are loaded on demand through load_view(), so a dashboard run only pays
+# for the one view it routes to.
+from utils.startup_profiler import timed_import
+
+__all__ = ["VIEW_MODULES", "load_view"]
+
+# Session type (plan_sessions.type) -> view module exposing render(session)
+VIEW_MODULES = {
+    "Warmup": "session_views.warmup",
+    "Heavy": "session_views.heavy",
+    "Olympic": "session_views.olympic",
+    "Run": "session_views.run",
+    "WOD": "session_views.wod",
+    "Benchmark": "session_views.benchmark",
+    "Light": "session_views.light",
+    "Skill": "session_views.skill",
+    "Cooldown": "session_views.cooldown",
+}
+
 
+def load_view(session_type: str):
+    """
+    Import and return the view module for a session type.
+    Raises KeyError for unknown types; import errors propagate to the caller.
+    """
+    return timed_import(VIEW_MODULES[session_type])
@@ -2,13 +2,14 @@
 import streamlit as st
 import time
 import re
-from supabase import create_client
+from storage import lazy_client
+from utils.projections import CATALOG, SESSION_DETAILS
+from utils.leaderboard import TIME, leaderboard
+from utils.results import result_history, submit_result
 from datetime import datetime
 
 # Supabase setup
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = lazy_client()  # Supabase or local SQLite, per STORAGE_BACKEND; connects on first query
 
 def render(session):
     st.title("🏆 Benchmark WOD")
@@ -17,7 +18,7 @@ def render(session):
 
 
     # Fetch session details first
-    session_data = supabase.table("plan_sessions").select("*").eq("id", session["session_id"]).single().execute().data
+    session_data = SESSION_DETAILS.query(supabase).eq("id", session["session_id"]).single().execute().data
     details_text = session_data.get("details", "")
     
     # Extract benchmark WOD ID from details (assuming it's numeric)
@@ -30,7 +31,7 @@ def render(session):
     benchmark_id = int(match_id.group(0))
     
     # Fetch benchmark WOD details
-    wod_data = supabase.table("benchmark_wods").select("*").eq("id", benchmark_id).single().execute().data
+    wod_data = CATALOG["benchmark_wods"].query(supabase).eq("id", benchmark_id).single().execute().data
 
 
 
@@ -92,45 +93,70 @@ def render(session):
 
     if st.button("Submit Result", key="submit_result_btn"):
         rating = calculate_rating(workout_type, user_result, intermediate)
+        percentile = leaderboard(supabase, wod_data["id"], workout_type).percentile(user_result)
 
-        supabase.table("wod_results").insert({
-            "session_id": session["session_id"],
-            "benchmark_id": wod_data["id"],  # new column
-            "user_id": st.session_state.get("user_id", 1),
-            "result_details": user_result,   # JSONB field
-            "rating": rating
-            # timestamp omitted because DEFAULT CURRENT_TIMESTAMP handles it
-        }).execute()
-
-        supabase.table("plan_sessions").update({"completed": True}).eq("id", session["session_id"]).execute()
-        st.success(f"Result saved! Your rating: {rating}/100")
+        # One upsert on (session_id, user_id): resubmitting replaces the session's result
+        submit_result(supabase, session, st.session_state.get("user_id", 1), user_result,
+                      rating=rating, benchmark_id=wod_data["id"])
+        st.success(f"Result saved! Your rating: {rating}/100"
+                   + (f" — better than {percentile:.0f}% of logged results" if percentile is not None else ""))
         st.session_state.selected_session = None
         st.rerun()
 
-    # Display previous benchmark results
-   
-    results = supabase.table("wod_results").select("result_details, rating, timestamp") \
-        .eq("benchmark_id", wod_data["id"]) \
-        .eq("user_id", st.session_state.get("user_id", 1)) \
-        .order("timestamp", desc=True).execute().data
+    # Display previous benchmark results, one cached page at a time
+    pages_key = f"benchmark_history_pages_{wod_data['id']}"
+    pages = st.session_state.get(pages_key, 1)
+    history = [result_history(supabase, wod_data["id"], st.session_state.get("user_id", 1), page=p) for p in range(pages)]
+    results = [r for page in history for r in page["rows"]]
 
     if results:
 
         st.subheader("Previous Results")
         for r in results:
             # Format timestamp nicely
-            ts = datetime.fromisoformat(r["timestamp"]).strftime("%d %b %Y, %H:%M")
+            ts = datetime.fromisoformat(str(r["timestamp"])).strftime("%d %b %Y, %H:%M")
             
             # Extract details from JSON
-            details = ", ".join([f"{k.capitalize()}: {v}" for k, v in r["result_details"].items()])
+            details = ", ".join([f"{k.capitalize()}: {v}" for k, v in (r["result_details"] or {}).items()])
             
             st.write(f"**{ts}** — {details}  |  **Rating:** {r['rating']}/100")
-        
+        if history[-1]["has_more"] and st.button("Show older results", key="benchmark_history_more"):
+            st.session_state[pages_key] = pages + 1
+            st.rerun()
+
+    render_leaderboard(wod_data["id"], workout_type, st.session_state.get("user_id", 1))
 
     if st.button("⬅ Back to Dashboard", key='back_to_dashboard_btn'):
         st.session_state.selected_session = None
         st.rerun()
 
+# --- Leaderboard ---
+def format_score(direction, score):
+    if direction == TIME:
+        mins, secs = divmod(int(round(score * 60)), 60)
+        return f"{mins}:{secs:02d}"
+    return f"{score:g}"
+
+def render_leaderboard(benchmark_id, workout_type, user_id, limit=10):
+    board = leaderboard(supabase, benchmark_id, workout_type)
+    if not len(board):
+        return
+    st.subheader("Leaderboard")
+    st.table([
+        {
+            "Rank": row["rank"],
+            "Athlete": "You" if row["user_id"] == user_id else f"Athlete {row['user_id']}",
+            "Result": format_score(board.direction, row["score"]),
+        }
+        for row in board.top(limit)
+    ])
+    best = board.athlete_best(user_id)
+    if best:
+        st.caption(
+            f"Your best: {format_score(board.direction, best['score'])} — rank {best['rank']} of {best['of']} "
+            f"athletes ({best['percentile']:.0f}th percentile)"
+        )
+
 # --- Rating Calculation ---
 def parse_time(text):
     nums = [int(n) for n in re.findall(r"\d+", text)]
@@ -1,11 +1,12 @@
 
 import streamlit as st
-from supabase import create_client
+from storage import lazy_client
 from utils.timer import run_rest_timer
+from utils.completion import complete_exercises, tick_exercise
+from utils.projections import TIMED_EXERCISES
+from utils.write_behind import get_session_queue
 
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = lazy_client()  # Supabase or local SQLite, per STORAGE_BACKEND; connects on first query
 
 def render(session):
     st.title("❄️ Cooldown")
@@ -15,7 +16,12 @@ def render(session):
     timer_container = st.container()  # <-- this is the anchor
 
     # Fetch exercises from Supabase
-    exercises = supabase.table("plan_session_exercises")        .select("*")        .eq("session_id", session["session_id"])        .order("exercise_order")        .execute().data
+    exercises = TIMED_EXERCISES.query(supabase)        .eq("session_id", session["session_id"])        .order("exercise_order")        .execute().data
+
+    # Each finished exercise is queued (and spilled to disk) as it happens; the overlay shows
+    # ticks not yet flushed, including those replayed after a restart
+    queue = get_session_queue(session["session_id"], supabase)
+    queue.overlay("plan_session_exercises", exercises or [])
 
     if not exercises:
         st.warning("No exercises found for this warmup.")
@@ -27,7 +33,7 @@ def render(session):
     if "warmup_paused" not in st.session_state:
         st.session_state.warmup_paused = False
 
-    # Calculate initial completed count from Supabase data
+    # Calculate initial completed count (stored and queued ticks)
     completed_count = sum(1 for ex in exercises if ex.get("completed", False))
 
     # Placeholders for dynamic content
@@ -48,6 +54,7 @@ def render(session):
         st.session_state.warmup_paused = True
     if col3.button("⬅ Back to Dashboard", key=f"back_session_{session['session_id']}"):
         st.session_state.warmup_running = False
+        queue.flush()
         st.session_state.selected_session = None
         st.rerun()
 
@@ -74,7 +81,7 @@ def render(session):
 
             # Exercise phase
             run_rest_timer(int(ex.get("duration", 30)), label=ex['exercise_name'], next_item=next_ex_name, skip_key=f"skip_ex_{ex['id']}", parent=timer_container,)
-            supabase.table("plan_session_exercises").update({"completed": True}).eq("id", ex["id"]).execute()
+            tick_exercise(queue, session, ex)
             completed_count += 1
 
             # Update progress after exercise
@@ -85,8 +92,9 @@ def render(session):
             if next_ex_name:
                 run_rest_timer(int(ex.get("rest", 30)), label="Rest", next_item=next_ex_name, skip_key=f"skip_rest_{ex['id']}", parent=timer_container,)
 
-        # Mark session complete
-        supabase.table("plan_sessions").update({"completed": True}).eq("id", session["session_id"]).execute()
+        # Ticks are written first; the batch call then only flips the session flag
+        queue.flush()
+        complete_exercises(supabase, session, exercises, complete_session=True)
         st.success("Cooldown completed!")
         st.session_state.selected_session = None
         st.rerun()
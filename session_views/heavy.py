@@ -1,15 +1,17 @@
 import streamlit as st
-import pandas as pd
 import time
-from supabase import create_client
-from collections import defaultdict
+from storage import lazy_client
 from datetime import datetime
 from utils.timer import run_rest_timer
+from utils.write_behind import get_session_queue
+from utils.day_progress import mark_sets, mark_session
+from utils.plan_scope import current_athlete_id
+from utils.prescriptions import refresh_prescriptions
+from utils.projections import LATEST_MAX
+from utils.session_blocks import load_session_sets
 
 # Supabase setup
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = lazy_client()  # Supabase or local SQLite, per STORAGE_BACKEND; connects on first query
 
 
 def calculate_1rm(weight: float, reps: int) -> float:
@@ -30,8 +32,7 @@ def update_1rm_on_completion(exercise_name, completed_sets):
             calc_1rm = calculate_1rm(weight, reps)
 
             # Fetch latest max for comparison
-            latest = supabase.table("exercise_maxes") \
-                .select("*") \
+            latest = LATEST_MAX.query(supabase) \
                 .eq("exercise_name", exercise_name) \
                 .order("date", desc=True) \
                 .limit(1) \
@@ -46,16 +47,19 @@ def update_1rm_on_completion(exercise_name, completed_sets):
                 supabase.table("exercise_maxes").insert({
                     "exercise_name": exercise_name,
                     "calculated_1rm": calc_1rm,
-                    "source_set_id": s["id"],
+                    "source_set_id": s["id"] if isinstance(s["id"], int) else None,  # compact sets have no row id
                     "date": datetime.now().isoformat()
                 }).execute()
+                # Re-prescribe the open sets of this lift from the new max
+                refresh_prescriptions(supabase, {exercise_name: calc_1rm}, exercise_names=[exercise_name],
+                                      athlete_id=current_athlete_id())
 
 
 
 # ---------------------------
 # Single-click save helper
 # ---------------------------
-def persist_block_changes(edited_df, original_df, row_ids, ex_name):
+def persist_block_changes(edited_df, original_df, row_ids, ex_name, session_sets, day_id=None):
     """
     Persist per-row changes for a block (Warmup or Working) and rerun once
     so UI aligns with DB immediately (prevents needing to click twice).
@@ -64,6 +68,7 @@ def persist_block_changes(edited_df, original_df, row_ids, ex_name):
         return
 
     any_updated = False
+    sets_delta = 0  # net change in completed sets, for the day summary
 
     for i, row_id in enumerate(row_ids):
         # Current (edited) values
@@ -77,14 +82,17 @@ def persist_block_changes(edited_df, original_df, row_ids, ex_name):
         reps_prev = str(original_df.loc[i, "Reps"])
 
         if (is_done_now != was_done) or (weight_now != weight_prev) or (reps_now != reps_prev):
-            supabase.table("plan_session_exercises").update(
+            session_sets.update(
+                row_id,
                 {
                     "completed": is_done_now,
                     "actual_weight": weight_now,
                     "actual_reps": reps_now,
-                }
-            ).eq("id", row_id).execute()
+                },
+            )
             any_updated = True
+            if is_done_now != was_done:
+                sets_delta += 1 if is_done_now else -1
 
             # If newly completed, record potential new 1RM
             if is_done_now and not was_done:
@@ -102,8 +110,10 @@ def persist_block_changes(edited_df, original_df, row_ids, ex_name):
                     ],
                 )
 
+    mark_sets(session_sets.queue, day_id, sets_delta)
+
     if any_updated:
-        # Single rerun after all updates so table reflects DB instantly
+        # Single rerun after all updates; the queue overlay keeps the table in sync until flushed
         st.rerun()
 
 
@@ -111,26 +121,21 @@ def persist_block_changes(edited_df, original_df, row_ids, ex_name):
                 
 def render(session):
     st.title("🏋 Heavy Session")
+    import pandas as pd  # deferred: only paid once this view is actually rendered
     st.markdown(f"**Week:** {session['week']}  \n **Day:** {session['day']}")
 
-    # Fetch sets from DB
-    sets_data = supabase.table("plan_session_exercises") \
-        .select("*") \
-        .eq("session_id", session["session_id"]) \
-        .order("exercise_order") \
-        .execute().data
+    # Set edits are buffered locally and flushed in the background
+    queue = get_session_queue(session["session_id"], supabase)
+    # Row-per-set or compact block storage, whichever layout the session was synced with
+    session_sets = load_session_sets(supabase, session, queue)
+    sets_data = session_sets.rows
 
     if not sets_data:
         st.warning("No sets found for this heavy session.")
         return
 
-    # Group by exercise_name
-    grouped_exercises = defaultdict(list)
-    for row in sets_data:
-        grouped_exercises[row["exercise_name"]].append(row)
-
-    for ex_name in grouped_exercises:
-        grouped_exercises[ex_name].sort(key=lambda r: r.get("set_number", 1))
+    # Group by exercise_name (sets in set_number order)
+    grouped_exercises = session_sets.grouped()
 
     # Overall progress
     total_sets = len(sets_data)
@@ -148,19 +153,6 @@ def render(session):
         st.markdown(f"**{block_name} Sets**")
 
 
-        # Fetch latest 1RM for this exercise
-        latest_max = supabase.table("exercise_maxes") \
-            .select("*") \
-            .eq("exercise_name", ex_name) \
-            .order("date", desc=True) \
-            .limit(1) \
-            .execute().data
-        
-        latest_1rm = None
-        if latest_max:
-            latest_1rm = latest_max[0].get("manual_1rm") or latest_max[0].get("calculated_1rm")
-        
-                
         # Prepare DataFrame
         data = []
         for row in block_sets:
@@ -170,15 +162,13 @@ def render(session):
             reps_value = actual_reps if completed and actual_reps else planned_reps
 
             
-            # Calculate suggested weight if %RM and 1RM exist
+            # Prescribed weight resolved at generation time (utils.prescriptions)
             suggested_weight = ""
-            if latest_1rm and row.get("intensity"):
-                try:
-                    percent_rm = float(row.get("intensity").replace("%", ""))
-                    suggested_weight = round(latest_1rm * (percent_rm / 100), 2)
-                except ValueError:
-                    suggested_weight = ""
-        
+            try:
+                suggested_weight = float(row.get("expected_weight") or "")
+            except ValueError:
+                pass
+
             # Use actual weight if present, else suggested weight
             weight_value = row.get("actual_weight") or suggested_weight
 
@@ -224,7 +214,7 @@ def render(session):
         if warmup_df is not None:
 
             # one-click persistence + rerun
-            persist_block_changes(warmup_df, warmup_df_original, warmup_ids, ex_name)
+            persist_block_changes(warmup_df, warmup_df_original, warmup_ids, ex_name, session_sets, session.get("day_id"))
 
             # Warmup timers (group)
             warmup_rest = max([int(s.get("rest", 60)) for s in warmup_sets], default=60)
@@ -241,7 +231,7 @@ def render(session):
         working_df, working_df_original, working_ids = render_block("💪 Working", working_sets, ex_name, session)
         if working_df is not None:
             # one-click persistence + rerun
-            persist_block_changes(working_df, working_df_original, working_ids, ex_name)
+            persist_block_changes(working_df, working_df_original, working_ids, ex_name, session_sets, session.get("day_id"))
 
             # Working timers (group)
             working_rest = max([int(s.get("rest", 90)) for s in working_sets], default=90)
@@ -270,11 +260,11 @@ def render(session):
             completed_sets_list = []
             for i, row_id in enumerate(ids):
                 is_done = bool(edited_df.loc[i, "Done"])
-                supabase.table("plan_session_exercises").update({
+                session_sets.update(row_id, {
                     "completed": is_done,
                     "actual_weight": str(edited_df.loc[i, "Weight"]),
                     "actual_reps": str(edited_df.loc[i, "Reps"])
-                }).eq("id", row_id).execute()
+                })
     
                 completed_sets_list.append({
                     "id": row_id,
@@ -291,8 +281,8 @@ def render(session):
     
         # ✅ Mark session complete if all sets are done
         if all_completed:
-            supabase.table("plan_sessions").update({"completed": True}) \
-                .eq("id", session["session_id"]).execute()
+            mark_session(queue, session)
+        queue.flush()
     
         st.success("Progress saved. Returning to dashboard...")
         st.session_state.selected_session = None
@@ -1,17 +1,17 @@
 
 import streamlit as st
-import pandas as pd
 import re
-from supabase import create_client
+from storage import lazy_client
 from collections import defaultdict
 from utils.timer import run_rest_timer
+from utils.write_behind import get_session_queue
+from utils.day_progress import mark_sets, mark_session
+from utils.projections import BEST_SET, SESSION_SETS
 
 # ---------------------------
 # Supabase setup
 # ---------------------------
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = lazy_client()  # Supabase or local SQLite, per STORAGE_BACKEND; connects on first query
 
 # ---------------------------
 # Helpers (parse "Set <n>" from notes only)
@@ -39,8 +39,7 @@ def fetch_prev_best_for_exercise(exercise_name: str):
     """
     try:
         rows = (
-            supabase.table("plan_session_exercises")
-            .select("*")
+            BEST_SET.query(supabase)
             .eq("exercise_name", exercise_name)
             .eq("completed", True)
             .order("actual_weight", desc=True)
@@ -59,7 +58,7 @@ def fetch_prev_best_for_exercise(exercise_name: str):
         }
     return None
 
-def persist_block_changes(edited_df, original_df, row_ids):
+def persist_block_changes(edited_df, original_df, row_ids, queue, day_id=None):
     """
     Persist per-row changes for a block and rerun once
     so UI aligns with DB immediately (prevents needing to click twice).
@@ -67,6 +66,7 @@ def persist_block_changes(edited_df, original_df, row_ids):
     if edited_df is None or original_df is None or not row_ids:
         return
     any_updated = False
+    sets_delta = 0  # net change in completed sets, for the day summary
 
     for i, row_id in enumerate(row_ids):
         is_done_now = bool(edited_df.loc[i, "Done"])
@@ -78,10 +78,16 @@ def persist_block_changes(edited_df, original_df, row_ids):
         reps_prev   = str(original_df.loc[i, "Reps"])
 
         if (is_done_now != was_done) or (weight_now != weight_prev) or (reps_now != reps_prev):
-            supabase.table("plan_session_exercises").update(
-                {"completed": is_done_now, "actual_weight": weight_now, "actual_reps": reps_now}
-            ).eq("id", row_id).execute()
+            queue.update(
+                "plan_session_exercises",
+                row_id,
+                {"completed": is_done_now, "actual_weight": weight_now, "actual_reps": reps_now},
+            )
             any_updated = True
+            if is_done_now != was_done:
+                sets_delta += 1 if is_done_now else -1
+
+    mark_sets(queue, day_id, sets_delta)
 
     if any_updated:
         st.rerun()
@@ -110,6 +116,7 @@ def render_set_block(block_title: str, rows: list, session, show_prev_bests: boo
     Render one 'Set (n)' block.
     If show_prev_bests=True, show the Previous Bests expander above the editor for all session exercises.
     """
+    import pandas as pd  # deferred: only paid once this view is actually rendered
     st.markdown(f"### {block_title}")
 
     # --- 📈 Previous Bests (show once, above first block) ---
@@ -163,7 +170,7 @@ def render_set_block(block_title: str, rows: list, session, show_prev_bests: boo
 
     # Save instantly + rerun (prevents double-click)
     ids = df_original["ID"].tolist()
-    persist_block_changes(edited_df, df_original, ids)
+    persist_block_changes(edited_df, df_original, ids, get_session_queue(session["session_id"], supabase), session.get("day_id"))
 
     # Group rest timer controls
     rest_default = int(df_original["Rest"].iloc[0]) if len(df_original) else 60
@@ -194,14 +201,17 @@ def render(session):
 
     # Pull sets for this session
     sets_data = (
-        supabase.table("plan_session_exercises")
-        .select("*")
+        SESSION_SETS.query(supabase)
         .eq("session_id", session["session_id"])
         .order("exercise_order")
         .execute()
         .data
     )
 
+    # Set edits are buffered locally and flushed in the background
+    queue = get_session_queue(session["session_id"], supabase)
+    queue.overlay("plan_session_exercises", sets_data or [])
+
     if not sets_data:
         st.warning("No sets found for this light session.")
         return
@@ -258,19 +268,22 @@ def render(session):
                 continue
             for i, row_id in enumerate(ids):
                 is_done = bool(edited_df.loc[i, "Done"])
-                supabase.table("plan_session_exercises").update(
+                queue.update(
+                    "plan_session_exercises",
+                    row_id,
                     {
                         "completed": is_done,
                         "actual_weight": str(edited_df.loc[i, "Weight"]),
                         "actual_reps": str(edited_df.loc[i, "Reps"]),
-                    }
-                ).eq("id", row_id).execute()
+                    },
+                )
 
                 if not is_done:
                     all_completed = False
 
         if all_completed:
-            supabase.table("plan_sessions").update({"completed": True}).eq("id", session["session_id"]).execute()
+            mark_session(queue, session)
+        queue.flush()
 
         st.success("Progress saved. Returning to dashboard...")
         st.session_state.selected_session = None
@@ -1,18 +1,19 @@
 
 import streamlit as st
-from supabase import create_client
+from storage import lazy_client
+from utils.write_behind import get_session_queue
+from utils.day_progress import mark_session
+from utils.projections import SESSION_DETAILS
 
 # Supabase setup
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = lazy_client()  # Supabase or local SQLite, per STORAGE_BACKEND; connects on first query
 
 def render(session):
     st.title("🏃 Run Session")
     st.markdown(f"**Week:** {session['week']}  \n **Day:** {session['day']}")
 
     # Fetch session details
-    session_details = supabase.table("plan_sessions")         .select("*")         .eq("id", session["session_id"])         .execute().data
+    session_details = SESSION_DETAILS.query(supabase)         .eq("id", session["session_id"])         .execute().data
 
     if not session_details:
         st.warning("No details found for this run session.")
@@ -33,7 +34,10 @@ def render(session):
 
     # Back to Dashboard button
     if st.button("⬅ Back to Dashboard"):
-        supabase.table("plan_sessions").update({"completed": st.session_state.run_completed}).eq("id", session["session_id"]).execute()
+        session.setdefault("completed", bool(details.get("completed", False)))
+        queue = get_session_queue(session["session_id"], supabase)
+        mark_session(queue, session, bool(st.session_state.run_completed))
+        queue.flush()
         st.success("Run session status saved. Returning to dashboard...")
         st.session_state.selected_session = None
         st.rerun()
@@ -1,18 +1,18 @@
 
 import streamlit as st
-from supabase import create_client
+from storage import lazy_client
+from utils.completion import set_completion
+from utils.projections import SKILL_EXERCISES
 
 # Supabase setup
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = lazy_client()  # Supabase or local SQLite, per STORAGE_BACKEND; connects on first query
 
 def render(session):
     st.title("🎯 Skill Session")
     st.markdown(f"**Week:** {session['week']}  \n **Day:** {session['day']}")
 
     # Fetch exercises for this session
-    exercises = supabase.table("plan_session_exercises")         .select("*")         .eq("session_id", session["session_id"])         .order("exercise_order")         .execute().data
+    exercises = SKILL_EXERCISES.query(supabase)         .eq("session_id", session["session_id"])         .order("exercise_order")         .execute().data
 
     if not exercises:
         st.warning("No exercises found for this skill session.")
@@ -111,16 +111,12 @@ def render(session):
     
     # Back to Dashboard button
     if st.button("⬅ Back to Dashboard"):
-        all_completed = all(st.session_state.exercise_completion.values())
+        # Ticks changed on this page plus the session flag (complete once every exercise is), in one batch
+        changes = {ex["id"]: st.session_state.exercise_completion[ex["id"]] for ex in exercises}
+        result = set_completion(supabase, session, exercises, changes)
 
-        # Update exercises completion in Supabase
-        for ex_id, completed in st.session_state.exercise_completion.items():
-            supabase.table("plan_session_exercises").update({"completed": completed}).eq("id", ex_id).execute()
-
-        # Update session completion if all exercises done
-        if all_completed:
-            supabase.table("plan_sessions").update({"completed": True}).eq("id", session["session_id"]).execute()
-
-        st.success("Progress saved. Returning to dashboard...")
+        st.success(
+            f"Progress saved ({result['sets_completed']}/{result['sets_total']} exercises). Returning to dashboard..."
+        )
         st.session_state.selected_session = None
         st.rerun()
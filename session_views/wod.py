@@ -1,14 +1,14 @@
 
 import streamlit as st
 import re
-from supabase import create_client
+from storage import lazy_client
+from utils.projections import WOD_SESSION
+from utils.results import session_result, submit_result
 from datetime import datetime
 from utils.timer import run_rest_timer
 import time
 
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = lazy_client()  # Supabase or local SQLite, per STORAGE_BACKEND; connects on first query
 
 
 def parse_rounds(text):
@@ -21,43 +21,115 @@ def parse_time(text):
     return sum(nums) / len(nums) if nums else 15
 
 
-def calculate_rating(wod_type, user_result, targets, level="Intermediate"):
+def calculate_rating(wod_type, user_result, targets, level="Intermediate", target_values=None):
+    """
+    targets: level -> target text (performance_targets)
+    target_values: level -> number, from the stored WOD spec; used instead of parsing the text
+    """
     expected = 0
     ratio = 0
+    target_values = target_values or {}
 
     # Pick the level target, fall back to Intermediate, then to a sensible default
-    def level_target(default_text):
-        return targets.get(level) or targets.get("Intermediate") or default_text
+    def level_target(default_text, parse):
+        for lvl in (level, "Intermediate"):
+            if target_values.get(lvl) is not None:
+                return target_values[lvl]
+        return parse(targets.get(level) or targets.get("Intermediate") or default_text)
 
     if wod_type == 'AMRAP':
-        expected = parse_rounds(level_target('5-6 rounds'))
+        expected = level_target('5-6 rounds', parse_rounds)
         ratio = (user_result.get('rounds', 0) + user_result.get('reps', 0) / 10) / expected if expected else 0
 
     elif wod_type in ['For Time', 'Chipper', 'Ladder']:
-        expected = parse_time(level_target('15-20 min'))
+        expected = level_target('15-20 min', parse_time)
         # Faster time ⇒ higher rating (expected / actual)
         tmin = user_result.get('time_min')
         ratio = (expected / tmin) if tmin and tmin > 0 else 0
 
     elif wod_type == 'Interval':
-        expected = parse_rounds(level_target('6 intervals'))
+        expected = level_target('6 intervals', parse_rounds)
         ratio = (user_result.get('rounds', 0) + user_result.get('reps', 0) / 10) / expected if expected else 0
 
     elif wod_type == 'Tabata':
-        expected = parse_rounds(level_target('10 reps'))
+        expected = level_target('10 reps', parse_rounds)
         ratio = user_result.get('avg_reps_per_round', 0) / expected if expected else 0
 
     elif wod_type in ['Death by', 'EMOM', 'Alternating EMOM']:
-        expected = parse_rounds(level_target('10 rounds'))
+        expected = level_target('10 rounds', parse_rounds)
         ratio = (user_result.get('rounds_completed', 0) + user_result.get('reps', 0) / 10) / expected if expected else 0
 
     else:
-        expected = parse_rounds(level_target('10 reps'))
+        expected = level_target('10 reps', parse_rounds)
         ratio = user_result.get('score', 0) / expected if expected else 0
 
     return min(int(ratio * 100), 100)
 
 
+# ---------- WOD spec ----------
+# "Alternating EMOM" before "EMOM" so the longer name wins the substring match
+WOD_TYPES = ["AMRAP", "Chipper", "Interval", "Tabata", "For Time", "Ladder", "Death by", "Alternating EMOM", "EMOM"]
+
+
+def spec_from_details(details):
+    """
+    Rebuild a WOD spec (see WODGenerator.wod_spec) from the free-text details.
+    Only used for sessions synced before plan_sessions.wod_spec existed.
+    """
+    lowered = details.lower()
+    wod_type = next((t for t in WOD_TYPES if t.lower() in lowered), "WOD")
+    movements = [
+        {"name": line.strip("- ").strip(), "exercise_id": None, "qty": None, "unit": None}
+        for line in details.split("\n") if line.strip().startswith("-")
+    ]
+
+    # 'N min' / 'N mins' / 'N minutes'
+    m_dur = re.search(r"(\d+)\s*(?:minutes?|mins?|min)\b", details, flags=re.I)
+    duration_minutes = int(m_dur.group(1)) if m_dur else 0
+    default_cap_min = 20 if wod_type in ["For Time", "AMRAP"] else 15
+    cap_seconds = int((duration_minutes or default_cap_min) * 60)
+
+    rounds = None
+    phases = []
+    if wod_type == "Tabata":
+        # 'X rounds of Ys work / Zs rest per movement' (defaults 8 / 20s / 10s)
+        m_rounds = re.search(r"(\d+)\s*rounds", details, flags=re.I)
+        m_work = re.search(r"(\d+)\s*s\s*work", details, flags=re.I)
+        m_rest = re.search(r"(\d+)\s*s\s*rest", details, flags=re.I)
+        rounds = int(m_rounds.group(1)) if m_rounds else 8
+        work_s = int(m_work.group(1)) if m_work else 20
+        rest_s = int(m_rest.group(1)) if m_rest else 10
+        phases = [{"phase": "work", "seconds": work_s}, {"phase": "rest", "seconds": rest_s}]
+        tabata_cap = rounds * (work_s + rest_s) * max(1, len(movements))
+        # with an explicit minutes cap keep the larger (more conservative) of the two
+        cap_seconds = max(cap_seconds, tabata_cap) if duration_minutes else tabata_cap
+    elif wod_type in ["EMOM", "Alternating EMOM"]:
+        phases = [{"phase": "work", "seconds": 60}]
+    elif wod_type == "Interval":
+        m_wr = re.search(r"work\s*(\d+)\s*min\s*/\s*rest\s*(\d+)\s*min", details, flags=re.I)
+        work_m, rest_m = (int(m_wr.group(1)), int(m_wr.group(2))) if m_wr else (2, 1)
+        phases = [{"phase": "work", "seconds": work_m * 60}, {"phase": "rest", "seconds": rest_m * 60}]
+
+    return {
+        "version": 0,
+        "type": wod_type,
+        "template": None,
+        "rounds": rounds,
+        "cap_seconds": cap_seconds,
+        "phases": phases,
+        "movements": movements,
+        "targets": {},
+    }
+
+
+def load_wod_spec(session_data):
+    """The stored spec when the session has one, else one parsed from its details."""
+    spec = session_data.get("wod_spec")
+    if isinstance(spec, dict) and spec.get("type"):
+        return spec
+    return spec_from_details(session_data.get("details") or "")
+
+
 def render(session):
 
     # --- Validate input early
@@ -69,8 +141,7 @@ def render(session):
     # --- Safer fetch: avoid .single() so 0 rows doesn't raise
     try:
         resp = (
-            supabase.table("plan_sessions")
-            .select("*")
+            WOD_SESSION.query(supabase)
             .eq("id", sid)
             .limit(1)          # fetch at most 1 row
             .execute()
@@ -88,19 +159,10 @@ def render(session):
     session_data = rows[0]
     details = session_data.get('details', 'No details provided')
 
-
-    # Detect WOD type from details
-    wod_type = None
-    for t in ["AMRAP", "Chipper", "Interval", "Tabata", "For Time", "Ladder", "Death by", "EMOM", "Alternating EMOM"]:
-        if t.lower() in details.lower():
-            wod_type = t
-            break
-    if not wod_type:
-        wod_type = "WOD"
-
-    # Extract movement lines (prefixed with "- ")
-    exercises = [line.strip("- ").strip() for line in details.split("\n") if line.strip().startswith("-")]
-    num_movements = len(exercises)
+    # Type, clock and movements come from the spec stored at sync time
+    spec = load_wod_spec(session_data)
+    wod_type = spec["type"]
+    exercises = [m["name"] for m in spec["movements"]]
 
     st.title(f"🔥 {wod_type} Session")
     st.markdown(f"**Week:** {session['week']}\n**Day:** {session['day']}")
@@ -111,54 +173,15 @@ def render(session):
         s = int(max(0, seconds))
         return f"{s//60:02d}:{s%60:02d}"
 
-    def parse_duration_minutes(text: str) -> int:
-        """
-        Matches '20 min', '20 mins', '20 minutes' (case-insensitive).
-        Returns int minutes or 0.
-        """
-        m_dur = re.search(r"(\d+)\s*(?:minutes?|mins?|min)\b", text, flags=re.I)
-        return int(m_dur.group(1)) if m_dur else 0
-
-    def derive_tabata_cap_seconds(text: str, movements: int) -> int:
-        """
-        Parse 'X rounds of Ys work / Zs rest per movement' and compute total cap:
-        cap = rounds * (work + rest) * movements
-        Defaults: rounds=8, work=20s, rest=10s
-        """
-        rounds = 8
-        work_s = 20
-        rest_s = 10
-
-        m_rounds = re.search(r"(\d+)\s*rounds", text, flags=re.I)
-        if m_rounds:
-            rounds = int(m_rounds.group(1))
-
-        m_work = re.search(r"(\d+)\s*s\s*work", text, flags=re.I)
-        if m_work:
-            work_s = int(m_work.group(1))
-
-        m_rest = re.search(r"(\d+)\s*s\s*rest", text, flags=re.I)
-        if m_rest:
-            rest_s = int(m_rest.group(1))
-
-        return rounds * (work_s + rest_s) * max(1, movements)
+    def format_phase(seconds):
+        return f"{seconds // 60} min" if seconds >= 60 and seconds % 60 == 0 else f"{seconds}s"
 
     # ---------- Duration & Cap ----------
-    # One robust parse for minutes (For Time/AMRAP/Interval/EMOM/Alternating EMOM)
-    duration_minutes = parse_duration_minutes(details)
-
     continuous_styles = ["For Time", "AMRAP", "Chipper", "Ladder"]
     interval_styles = ["Interval", "EMOM", "Alternating EMOM", "Tabata"]
 
     DEFAULT_CAP_MIN = 20 if wod_type in ["For Time", "AMRAP"] else 15
-    cap_seconds = int((duration_minutes or DEFAULT_CAP_MIN) * 60)
-
-    # For Tabata multi-movement, use rounds × (work+rest) × movements
-    if wod_type == "Tabata":
-        tabata_cap = derive_tabata_cap_seconds(details, num_movements)
-        # If details provided a minutes cap, choose the larger (more conservative) of the two; else use tabata_cap
-        cap_seconds = max(cap_seconds, tabata_cap) if duration_minutes else tabata_cap
-
+    cap_seconds = int(spec.get("cap_seconds") or 0)
     if cap_seconds <= 0:
         cap_seconds = DEFAULT_CAP_MIN * 60  # safety
 
@@ -281,25 +304,9 @@ def render(session):
                 st.info(f"Stopped at {format_mmss(final_elapsed)}")
 
     elif wod_type in interval_styles:
-        # Structured Work/Rest cycles using the same utility timer.
-        # Determine reasonable defaults if not explicitly provided in details.
+        # Structured Work/Rest cycles (one cycle per segment) using the same utility timer.
         # We'll still respect the overall cap_seconds for progress/termination.
-        wm = None
-        rm = None
-
-        if wod_type == "EMOM":
-            wm = wm or 1  # 1 minute work
-            rm = rm or 0  # explicit rest not modeled; rest is whatever is left in the minute
-        elif wod_type == "Alternating EMOM":
-            wm = wm or 1
-            rm = rm or 0
-        elif wod_type == "Tabata":
-            # Default Tabata: 20s work / 10s rest unless explicitly provided in seconds in details
-            wm = 0  # minutes placeholder; we use seconds below
-            rm = 0
-        else:  # "Interval"
-            wm = 2
-            rm = 1
+        phases = [p for p in spec.get("phases") or [] if p.get("seconds", 0) > 0] or [{"phase": "work", "seconds": 60}]
 
         if st.session_state.wod_clock_in_progress and not st.session_state.wod_clock_paused and st.session_state.wod_clock_remaining > 0:
             # Mark the segment start (for accurate elapsed)
@@ -308,34 +315,16 @@ def render(session):
             # Status line
             counter_ph.markdown(f"**Remaining Time:** {format_mmss(st.session_state.wod_clock_remaining)}")
 
-            if wod_type == "Tabata":
-                # Parse seconds from details if present; else default 20s work / 10s rest
-                m_work_s = re.search(r"(\d+)\s*s\s*work", details, flags=re.I)
-                m_rest_s = re.search(r"(\d+)\s*s\s*rest", details, flags=re.I)
-                work_s = int(m_work_s.group(1)) if m_work_s else 20
-                rest_s = int(m_rest_s.group(1)) if m_rest_s else 10
-
-                current_ph.subheader("Tabata Work: Go!")
-                next_ph.info(f"Next: Rest ({rest_s}s)")
-                run_rest_timer(work_s, label=f"Work ({work_s}s)", next_item=f"Rest ({rest_s}s)", skip_key=skip_key)
-
-                # Rest phase (if not interrupted)
-                if not st.session_state.get(skip_key):
-                    current_ph.subheader("Tabata Rest")
-                    next_ph.info(f"Next: Work ({work_s}s)")
-                    run_rest_timer(rest_s, label=f"Rest ({rest_s}s)", next_item=f"Work ({work_s}s)", skip_key=skip_key)
-
-            else:
-                # Work phase (minutes)
-                current_ph.subheader(f"Work Interval ({wm} min)")
-                next_ph.info("Next: Rest" if rm > 0 else "Next: Work/Continue")
-                run_rest_timer(int(wm * 60), label=f"Work ({wm} min)", next_item="Rest", skip_key=skip_key)
-
-                # Rest phase (minutes) if not interrupted and rest > 0
-                if rm > 0 and not st.session_state.get(skip_key):
-                    current_ph.subheader(f"Rest Interval ({rm} min)")
-                    next_ph.info("Next: Work")
-                    run_rest_timer(int(rm * 60), label=f"Rest ({rm} min)", next_item="Work", skip_key=skip_key)
+            for i, phase in enumerate(phases):
+                # Later phases only run if the previous one was not interrupted
+                if i and st.session_state.get(skip_key):
+                    break
+                nxt = phases[(i + 1) % len(phases)]
+                label = f"{phase['phase'].title()} ({format_phase(phase['seconds'])})"
+                next_label = f"{nxt['phase'].title()} ({format_phase(nxt['seconds'])})"
+                current_ph.subheader(f"{wod_type} {label}")
+                next_ph.info(f"Next: {next_label}")
+                run_rest_timer(phase["seconds"], label=label, next_item=next_label, skip_key=skip_key)
 
             # Segment accounting
             actual_run = int(time.time() - st.session_state.wod_clock_start_ts) if st.session_state.wod_clock_start_ts is not None else 0
@@ -394,17 +383,9 @@ def render(session):
 
     # ---- Result Recording Section ----
     st.subheader("Enter Your WOD Result")
-    previous_result = (
-        supabase.table('wod_results')
-        .select('result_details', 'rating', 'level')   # include level if stored top-level
-        .eq('session_id', session['session_id'])
-        .eq('user_id', st.session_state.get('user_id', 1))
-        .execute()
-        .data
-    )
+    prev = session_result(supabase, session['session_id'], st.session_state.get('user_id', 1))  # cached
 
-    if previous_result:
-        prev = previous_result[0]
+    if prev:
         prev_level = prev.get('level') or prev['result_details'].get('level')  # fallback if stored inside details earlier
         st.info(
             f"Previously submitted: {prev['result_details']} "
@@ -461,36 +442,17 @@ def render(session):
     notes = st.text_area("Notes (optional)")
 
     if st.button("Submit Result"):
-        rating = calculate_rating(wod_type, user_result, performance_targets, level=level)
-        existing_result = (
-            supabase.table('wod_results')
-            .select('id')
-            .eq('session_id', session['session_id'])
-            .eq('user_id', st.session_state.get('user_id', 1))
-            .execute()
-            .data
+        rating = calculate_rating(
+            wod_type, user_result, performance_targets, level=level, target_values=spec.get("targets")
         )
-
-        payload = {
-            'result_details': user_result,   # keep detailed inputs here
-            'level': level,                  # NEW: top-level column for easy querying
-            'notes': notes,
-            'rating': rating,
-            'timestamp': datetime.utcnow().isoformat(),
-        }
-
-        if existing_result:
-            supabase.table('wod_results').update(payload).eq('id', existing_result[0]['id']).execute()
-            st.success(f"Result updated! Your rating: {rating}/100")
-        else:
-            supabase.table('wod_results').insert({
-                'session_id': session['session_id'],
-                'user_id': st.session_state.get('user_id', 1),
-                **payload
-            }).execute()
-
-        # ✅ Fix: use the correct session id from `session`
-        supabase.table('plan_sessions').update({'completed': True}).eq('id', session['session_id']).execute()
+        # One upsert on (session_id, user_id) returns the stored row; the session is then
+        # marked completed (one RPC where complete_session_exercises is deployed)
+        stored = submit_result(
+            supabase, session, st.session_state.get('user_id', 1), user_result,
+            rating=rating, level=level, notes=notes,
+        )
+        if prev:
+            st.success(f"Result updated! Your rating: {stored.get('rating', rating)}/100")
 
         st.success("WOD completed!")
         st.session_state.wod_running = False
@@ -0,0 +1,79 @@
+# storage/__init__.py
+"""
+Storage backends for plan and catalog tables.
+
+Everything in the app talks to "a client" with the Supabase query-builder surface
+(table().select().eq()...execute()). Two implementations are available:
+  - "supabase": the hosted Supabase client (default)
+  - "sqlite":   storage.sqlite_backend.SQLiteClient, an embedded local database
+
+The backend is picked by STORAGE_BACKEND (st.secrets or environment), and the SQLite
+file location by SQLITE_PATH.
+
+The Postgres schema is versioned in migrations/ (storage.migrations applies it,
+storage.explain checks that the hot queries use its indexes).
+"""
+import os
+import threading
+
+from storage.sqlite_backend import SQLiteClient
+
+__all__ = ["SQLiteClient", "create_storage_client", "get_client", "lazy_client"]
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _setting(name: str, default=None):
+    """Read a setting from st.secrets when running under Streamlit, else the environment."""
+    try:
+        import streamlit as st
+        if name in st.secrets:
+            return st.secrets[name]
+    except Exception:
+        pass
+    return os.getenv(name, default)
+
+
+def create_storage_client(backend: str = None, **options):
+    """
+    Build a new client for the requested backend.
+      - backend: "supabase" | "sqlite" (defaults to STORAGE_BACKEND, then "supabase")
+      - options: url/key for Supabase, path for SQLite
+    """
+    backend = (backend or _setting("STORAGE_BACKEND", "supabase")).lower()
+    if backend == "sqlite":
+        return SQLiteClient(options.get("path") or _setting("SQLITE_PATH", "fullcrossfit.db"))
+    if backend == "supabase":
+        from supabase import create_client
+        return create_client(
+            options.get("url") or _setting("SUPABASE_URL"),
+            options.get("key") or _setting("SUPABASE_KEY"),
+        )
+    raise ValueError(f"Unknown storage backend '{backend}'. Choose from: supabase, sqlite.")
+
+
+def get_client():
+    """Return the process-wide client for the configured backend, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = create_storage_client()
+        return _client
+
+
+class _LazyClient:
+    """Stand-in that resolves get_client() on first attribute access (e.g. .table())."""
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+
+def lazy_client():
+    """
+    Module-level client handle for views: importing the view costs nothing, and the
+    backend (and its libraries) are only loaded when the first query is made.
+    """
+    return _LazyClient()
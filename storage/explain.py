@@ -0,0 +1,207 @@
+# storage/explain.py
+"""
+EXPLAIN harness for the app's hot query shapes: confirms each one is answered from an
+index rather than a sequential scan of its table.
+
+    python -m storage.explain                    # Postgres (DB_* settings), migrations applied
+    python -m storage.explain --sqlite app.db    # a SQLite store (storage.sqlite_backend)
+    python -m storage.explain -v                 # print every plan
+
+  - SHAPES are the SQL equivalents of real call sites (named in `source`); keep them in
+    step when a call site changes its filters or order.
+  - On Postgres each shape runs as EXPLAIN (FORMAT JSON) with enable_seqscan off, inside
+    a transaction that is rolled back: on a small or empty development database the
+    planner would otherwise prefer a seq scan even where an index exists, and the
+    question here is whether a usable index exists at all.
+  - On SQLite it is EXPLAIN QUERY PLAN; SEARCH ... USING INDEX / PRIMARY KEY passes,
+    SCAN <table> fails.
+  - Exits 1 if any shape scans its table.
+"""
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+_PARAM_RE = re.compile(r"%\((\w+)\)s")
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    name: str
+    source: str
+    table: str
+    sql: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+SHAPES = [
+    # ---------- plan reads ----------
+    QueryShape("plan weeks", "utils.plan_scope.scope_weeks / dashboard fetch_weeks", "plan_weeks",
+               "select id, number, start_date from plan_weeks where athlete_id = %(athlete_id)s order by number",
+               {"athlete_id": 1}),
+    QueryShape("plan exists", "CrossFitPlanGenerator.plan_exists", "plan_days",
+               "select date from plan_days where week_id in %(week_ids)s"
+               " and date >= %(start)s and date <= %(end)s limit 1",
+               {"week_ids": (1, 2, 3, 4, 5, 6), "start": "2026-01-05", "end": "2026-02-15"}),
+    QueryShape("days of week", "dashboard fetch_days / merge _get_or_create_day", "plan_days",
+               "select id from plan_days where week_id = %(week_id)s and day_number = %(day_number)s",
+               {"week_id": 1, "day_number": 3}),
+    QueryShape("sessions of days", "dashboard fetch_sessions / plan_scope.child_ids", "plan_sessions",
+               "select id, day_id, type, completed from plan_sessions where day_id in %(day_ids)s",
+               {"day_ids": (1, 2, 3, 4, 5, 6, 7)}),
+    QueryShape("session by type", "merge _upsert_session", "plan_sessions",
+               "select id from plan_sessions where day_id = %(day_id)s and type = %(type)s",
+               {"day_id": 1, "type": "Heavy"}),
+    QueryShape("session sets", "utils.session_blocks.load_session_sets", "plan_session_exercises",
+               "select id, exercise_name, set_number, reps from plan_session_exercises"
+               " where session_id = %(session_id)s order by exercise_order",
+               {"session_id": 1}),
+    QueryShape("session blocks", "utils.session_blocks.load_session_sets (blocks layout)", "plan_session_blocks",
+               "select id, exercise_name, sets from plan_session_blocks"
+               " where session_id = %(session_id)s order by exercise_order",
+               {"session_id": 1}),
+    QueryShape("open sets by lift", "utils.prescriptions.refresh_prescriptions", "plan_session_exercises",
+               "select id, exercise_name, intensity, expected_weight from plan_session_exercises"
+               " where session_id in %(session_ids)s and exercise_name in %(names)s and completed = false"
+               " order by id",
+               {"session_ids": (1, 2, 3), "names": ("Back Squat", "Deadlift")}),
+    QueryShape("day progress", "utils.day_progress.fetch_progress", "plan_day_progress",
+               "select day_id, sets_total, sets_completed from plan_day_progress where day_id in %(day_ids)s",
+               {"day_ids": (1, 2, 3)}),
+    # ---------- maxes / results ----------
+    QueryShape("latest 1RM", "session_views.heavy / olympic", "exercise_maxes",
+               "select manual_1rm, calculated_1rm from exercise_maxes"
+               " where exercise_name = %(name)s order by date desc limit 1",
+               {"name": "Back Squat"}),
+    QueryShape("session result", "session_views.wod (existing result)", "wod_results",
+               "select id, result_details, rating from wod_results"
+               " where session_id = %(session_id)s and user_id = %(user_id)s",
+               {"session_id": 1, "user_id": 1}),
+    QueryShape("benchmark history", "session_views.benchmark", "wod_results",
+               "select result_details, rating, timestamp from wod_results"
+               " where benchmark_id = %(benchmark_id)s and user_id = %(user_id)s order by timestamp desc",
+               {"benchmark_id": 1, "user_id": 1}),
+    QueryShape("benchmark leaderboard", "utils.leaderboard.ScoreIndex.build", "wod_results",
+               "select id, user_id, result_details from wod_results where benchmark_id = %(benchmark_id)s order by id",
+               {"benchmark_id": 1}),
+    # ---------- catalog reads ----------
+    QueryShape("skill plan week", "SkillSessionGenerator (no preloaded skill_plans)", "skill_plans",
+               "select id, skill_id, week, focus, session_plan from skill_plans "
+               "where skill_id = %(skill_id)s and week = %(week)s",
+               {"skill_id": 1, "week": 1}),
+]
+
+
+@dataclass
+class ExplainResult:
+    shape: QueryShape
+    indexes: List[str]
+    scans: List[str]  # tables read by a sequential scan
+    plan: str
+
+    @property
+    def ok(self) -> bool:
+        return self.shape.table not in self.scans
+
+
+# ---------- POSTGRES ----------
+def _pg_nodes(node: Dict[str, Any]):
+    yield node
+    for child in node.get("Plans") or []:
+        yield from _pg_nodes(child)
+
+
+def explain_postgres(conn, shape: QueryShape) -> ExplainResult:
+    try:
+        with conn.cursor() as cur:
+            cur.execute("set local enable_seqscan = off")
+            cur.execute("explain (format json) " + shape.sql, shape.params)
+            raw = cur.fetchone()[0]
+    finally:
+        conn.rollback()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    nodes = list(_pg_nodes(plan))
+    return ExplainResult(
+        shape,
+        indexes=[n["Index Name"] for n in nodes if n.get("Index Name")],
+        scans=[n.get("Relation Name") for n in nodes if n.get("Node Type") == "Seq Scan"],
+        plan=json.dumps(plan, indent=2),
+    )
+
+
+# ---------- SQLITE ----------
+def _sqlite_query(shape: QueryShape):
+    """%(name)s -> ? (tuples expand to ?, ?, ... inside parentheses)."""
+    args: List[Any] = []
+
+    def bind(match):
+        value = shape.params[match.group(1)]
+        if isinstance(value, (tuple, list)):
+            args.extend(value)
+            return "(" + ", ".join("?" for _ in value) + ")"
+        args.append(value)
+        return "?"
+
+    return _PARAM_RE.sub(bind, shape.sql), args
+
+
+def explain_sqlite(conn: sqlite3.Connection, shape: QueryShape) -> ExplainResult:
+    sql, args = _sqlite_query(shape)
+    details = [row[-1] for row in conn.execute("explain query plan " + sql, args).fetchall()]
+    indexes, scans = [], []
+    for detail in details:
+        words = detail.split()
+        if words[:1] == ["SCAN"] and len(words) > 1 and "INDEX" not in words:
+            scans.append(words[1])
+        match = re.search(r"USING (?:COVERING )?INDEX (\w+)|USING (INTEGER PRIMARY KEY)", detail)
+        if match:
+            indexes.append(match.group(1) or match.group(2))
+    return ExplainResult(shape, indexes, scans, "\n".join(details))
+
+
+def run(explain, conn, shapes: List[QueryShape] = None) -> List[ExplainResult]:
+    return [explain(conn, shape) for shape in (shapes or SHAPES)]
+
+
+def report(results: List[ExplainResult], verbose: bool = False) -> int:
+    """Print one line per shape (and its plan when verbose); returns the number of failures."""
+    failures = 0
+    for r in results:
+        status = "ok  " if r.ok else "SCAN"
+        via = ", ".join(dict.fromkeys(r.indexes)) or "-"
+        print(f"{status}  {r.shape.name:<22} {r.shape.table:<24} {via}")
+        if verbose or not r.ok:
+            print(f"      source: {r.shape.source}")
+            print("      " + r.plan.replace("\n", "\n      "))
+        failures += not r.ok
+    print(f"{len(results) - failures}/{len(results)} shapes use an index")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check that the app's hot queries are served by indexes.")
+    parser.add_argument("--sqlite", metavar="PATH", help="explain against a SQLite store instead of Postgres")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args(argv)
+
+    if args.sqlite:
+        from storage.sqlite_backend import SQLiteClient
+
+        client = SQLiteClient(args.sqlite)  # brings the file's schema up to date
+        try:
+            results = run(explain_sqlite, client.connection)
+        finally:
+            client.close()
+    else:
+        from plan_generators.postgres_sync import pooled_connection
+
+        with pooled_connection() as conn:
+            results = run(explain_postgres, conn)
+    return 1 if report(results, args.verbose) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
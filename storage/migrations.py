@@ -0,0 +1,132 @@
+# storage/migrations.py
+"""
+Versioned SQL migrations for the Postgres / Supabase schema (migrations/NNNN_name.sql).
+
+    python -m storage.migrations --status      # applied / pending versions
+    python -m storage.migrations               # apply everything pending
+    python -m storage.migrations --target 0002 --dry-run
+
+  - Files are applied in version order, each in its own transaction together with its
+    schema_migrations ledger row, so a failing file leaves nothing half-applied.
+  - Runs hold a transaction-level advisory lock, so two deploys cannot apply the same
+    file concurrently.
+  - Connection settings are the DB_* variables of plan_generators.postgres_sync.
+  - The SQLite backend keeps its schema in storage.sqlite_backend (TABLES / INDEXES) and
+    brings existing database files up to date when a client opens them.
+"""
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Set
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+LEDGER = "schema_migrations"
+LOCK_KEY = 7_462_019  # pg_advisory_xact_lock key shared by every runner
+
+_FILE_RE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    name: str
+    path: Path
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Migration files in version order; duplicate versions are an error."""
+    found = {}
+    for path in sorted(Path(directory).glob("*.sql")):
+        match = _FILE_RE.match(path.name)
+        if not match:
+            continue
+        version, name = match.groups()
+        if version in found:
+            raise ValueError(f"duplicate migration version {version}: {found[version].path.name}, {path.name}")
+        found[version] = Migration(version, name, path)
+    return [found[v] for v in sorted(found)]
+
+
+def _ensure_ledger(cur) -> None:
+    cur.execute(
+        f"create table if not exists {LEDGER} ("
+        " version text primary key, name text not null, applied_at timestamptz not null default now())"
+    )
+
+
+def applied_versions(conn) -> Set[str]:
+    with conn.cursor() as cur:
+        _ensure_ledger(cur)
+        cur.execute(f"select version from {LEDGER}")
+        versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def pending(conn, migrations: Optional[List[Migration]] = None, target: Optional[str] = None) -> List[Migration]:
+    done = applied_versions(conn)
+    return [
+        m for m in (migrations if migrations is not None else discover())
+        if m.version not in done and (target is None or m.version <= target)
+    ]
+
+
+def migrate(conn, *, target: Optional[str] = None, dry_run: bool = False, log=print) -> List[Migration]:
+    """Apply pending migrations up to target (inclusive); returns the ones applied (or due, with dry_run)."""
+    due = pending(conn, target=target)
+    if dry_run:
+        return due
+    applied = []
+    for migration in due:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("select pg_advisory_xact_lock(%s)", (LOCK_KEY,))
+                cur.execute(f"select 1 from {LEDGER} where version = %s", (migration.version,))
+                if cur.fetchone():  # applied by another runner while we waited for the lock
+                    conn.commit()
+                    continue
+                cur.execute(migration.sql)
+                cur.execute(f"insert into {LEDGER} (version, name) values (%s, %s)",
+                            (migration.version, migration.name))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            log(f"{migration.path.name}: failed, rolled back")
+            raise
+        log(f"{migration.path.name}: applied")
+        applied.append(migration)
+    return applied
+
+
+def main(argv=None) -> int:
+    from plan_generators.postgres_sync import pooled_connection
+
+    parser = argparse.ArgumentParser(description="Apply the SQL migrations in migrations/ to Postgres (DB_* settings).")
+    parser.add_argument("--status", action="store_true", help="list applied / pending versions and exit")
+    parser.add_argument("--target", help="apply up to and including this version (e.g. 0002)")
+    parser.add_argument("--dry-run", action="store_true", help="list what would be applied")
+    args = parser.parse_args(argv)
+
+    with pooled_connection() as conn:
+        if args.status:
+            done = applied_versions(conn)
+            for m in discover():
+                print(f"{m.version}  {'applied' if m.version in done else 'pending'}  {m.name}")
+            return 0
+        result = migrate(conn, target=args.target, dry_run=args.dry_run)
+    if args.dry_run:
+        for m in result:
+            print(f"would apply {m.path.name}")
+    if not result:
+        print("schema is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+# sqlite_backend.py
+"""
+Embedded SQLite implementation of the query-builder surface the app uses from the
+Supabase client:
+
+    client.table(name).select(...).eq/neq/gt/gte/lt/lte/in_/is_/contains(...).order(...).limit(...).range(...).execute()
+    client.table(name).insert(row | rows).execute()
+    client.table(name).upsert(row | rows, on_conflict="a,b").execute()
+    client.table(name).update(values).eq(...).execute()
+    client.table(name).delete().eq/gt(...).execute()
+    client.rpc(name, params).execute()      # the functions in RPCS; others fail like a missing function
+
+
+Generators, pages and session views take the client as a plain object, so a
+SQLiteClient can be passed anywhere a Supabase client is expected.
+"""
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+# ---------- SCHEMA ----------
+# (column, type) pairs; "JSON" and "BOOLEAN" columns are converted on read/write.
+TABLES: Dict[str, List[Tuple[str, str]]] = {
+    "md_exercises": [("id", "INTEGER PRIMARY KEY"), ("name", "TEXT"), ("equipment", "TEXT"), ("description", "TEXT")],
+    "md_muscle_groups": [("id", "INTEGER PRIMARY KEY"), ("name", "TEXT")],
+    "md_map_exercise_muscle_groups": [
+        ("id", "INTEGER PRIMARY KEY"), ("exercise_id", "INTEGER"), ("musclegroup_id", "INTEGER"),
+    ],
+    "md_categories": [("id", "INTEGER PRIMARY KEY"), ("name", "TEXT")],
+    "md_map_exercise_categories": [
+        ("id", "INTEGER PRIMARY KEY"), ("exercise_id", "INTEGER"), ("category_id", "INTEGER"),
+    ],
+    "exercise_pool": [
+        ("id", "INTEGER PRIMARY KEY"), ("musclegroup_id", "INTEGER"), ("exercise", "TEXT"), ("unit", "TEXT"),
+        ("range_min", "INTEGER"), ("range_max", "INTEGER"), ("rx_male_kg", "REAL"), ("rx_female_kg", "REAL"),
+        ("equipment", "JSON"), ("tags", "JSON"), ("skill_level", "INTEGER"), ("is_unilateral", "BOOLEAN"),
+        ("notes", "TEXT"),
+    ],
+    "skills": [("skill_id", "INTEGER PRIMARY KEY"), ("skill_name", "TEXT")],
+    "skill_plans": [
+        ("id", "INTEGER PRIMARY KEY"), ("skill_id", "INTEGER"), ("week", "INTEGER"), ("focus", "TEXT"),
+        ("session_plan", "JSON"),
+    ],
+    "benchmark_wods": [
+        ("id", "INTEGER PRIMARY KEY"), ("name", "TEXT"), ("description", "TEXT"), ("estimated_time", "TEXT"),
+        ("workout_type", "TEXT"), ("type", "TEXT"), ("beginner", "TEXT"), ("intermediate", "TEXT"),
+        ("advanced", "TEXT"), ("elite", "TEXT"), ("wodwell_url", "TEXT"),
+    ],
+    "plan_weeks": [
+        ("id", "INTEGER PRIMARY KEY"), ("number", "INTEGER"), ("notes", "TEXT"), ("start_date", "TEXT"),
+        ("athlete_id", "INTEGER"),
+    ],
+    "plan_days": [
+        ("id", "INTEGER PRIMARY KEY"), ("week_id", "INTEGER"), ("day_number", "INTEGER"),
+        ("is_rest_day", "BOOLEAN DEFAULT 0"), ("date", "TEXT"), ("total_time", "INTEGER"),
+    ],
+    "plan_day_progress": [
+        ("day_id", "INTEGER PRIMARY KEY"), ("sessions_total", "INTEGER DEFAULT 0"),
+        ("sessions_completed", "INTEGER DEFAULT 0"), ("sets_total", "INTEGER DEFAULT 0"),
+        ("sets_completed", "INTEGER DEFAULT 0"), ("updated_at", "TEXT"),
+    ],
+    "plan_sessions": [
+        ("id", "INTEGER PRIMARY KEY"), ("day_id", "INTEGER"), ("type", "TEXT"), ("target_muscle", "TEXT"),
+        ("duration", "INTEGER"), ("details", "TEXT"), ("focus_muscle", "TEXT"), ("performance_targets", "JSON"),
+        ("wod_spec", "JSON"), ("completed", "BOOLEAN DEFAULT 0"), ("catalog_refs", "JSON"),
+    ],
+    "plan_session_exercises": [
+        ("id", "INTEGER PRIMARY KEY"), ("session_id", "INTEGER"), ("exercise_name", "TEXT"),
+        ("exercise_id", "INTEGER"), ("set_number", "INTEGER"), ("reps", "TEXT"), ("intensity", "TEXT"),
+        ("rest", "INTEGER"), ("notes", "TEXT"), ("exercise_order", "INTEGER"), ("completed", "BOOLEAN DEFAULT 0"),
+        ("actual_reps", "TEXT"), ("actual_weight", "TEXT"), ("tempo", "TEXT"), ("expected_weight", "TEXT"),
+        ("equipment", "TEXT"),
+    ],
+    "plan_session_blocks": [
+        ("id", "INTEGER PRIMARY KEY"), ("session_id", "INTEGER"), ("exercise_name", "TEXT"),
+        ("exercise_id", "INTEGER"), ("exercise_order", "INTEGER"), ("tempo", "TEXT"), ("equipment", "TEXT"),
+        ("sets", "JSON"),
+    ],
+    "exercise_maxes": [
+        ("id", "INTEGER PRIMARY KEY"), ("exercise_name", "TEXT"), ("manual_1rm", "REAL"),
+        ("calculated_1rm", "REAL"), ("source_set_id", "INTEGER"), ("date", "TEXT"),
+    ],
+    "wod_results": [
+        ("id", "INTEGER PRIMARY KEY"), ("session_id", "INTEGER"), ("benchmark_id", "INTEGER"),
+        ("user_id", "INTEGER"), ("result_details", "JSON"), ("rating", "INTEGER"), ("level", "TEXT"),
+        ("notes", "TEXT"), ("timestamp", "TEXT DEFAULT CURRENT_TIMESTAMP"),
+    ],
+}
+
+INDEXES = [
+    # One week number per plan. SQLite treats NULLs as distinct, so the default plan
+    # (athlete_id NULL) is keyed on coalesce(); Postgres uses NULLS NOT DISTINCT (0003).
+    # Files created before this kept a plain unique index under the Postgres name.
+    "DROP INDEX IF EXISTS ux_plan_weeks_athlete_number",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_plan_weeks_plan_number ON plan_weeks (coalesce(athlete_id, -1), number)",
+    "CREATE INDEX IF NOT EXISTS ix_plan_weeks_athlete_number ON plan_weeks (athlete_id, number)",
+    "CREATE INDEX IF NOT EXISTS ix_plan_days_date ON plan_days (date)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_plan_days_week_day ON plan_days (week_id, day_number)",
+    "CREATE INDEX IF NOT EXISTS ix_plan_sessions_day_type ON plan_sessions (day_id, type)",
+    "CREATE INDEX IF NOT EXISTS ix_plan_session_exercises_session_order ON plan_session_exercises (session_id, exercise_order)",
+    "CREATE INDEX IF NOT EXISTS ix_plan_session_exercises_name ON plan_session_exercises (exercise_name)",
+    "CREATE INDEX IF NOT EXISTS ix_plan_session_blocks_session_order ON plan_session_blocks (session_id, exercise_order)",
+    "CREATE INDEX IF NOT EXISTS ix_plan_session_blocks_name ON plan_session_blocks (exercise_name)",
+    "CREATE INDEX IF NOT EXISTS ix_exercise_maxes_name_date ON exercise_maxes (exercise_name, date DESC)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_wod_results_session_user ON wod_results (session_id, user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_wod_results_benchmark_user_ts ON wod_results (benchmark_id, user_id, timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_map_muscle_exercise ON md_map_exercise_muscle_groups (exercise_id)",
+    "CREATE INDEX IF NOT EXISTS ix_map_muscle_group ON md_map_exercise_muscle_groups (musclegroup_id)",
+    "CREATE INDEX IF NOT EXISTS ix_map_category_exercise ON md_map_exercise_categories (exercise_id)",
+    "CREATE INDEX IF NOT EXISTS ix_map_category ON md_map_exercise_categories (category_id)",
+    "CREATE INDEX IF NOT EXISTS ix_skill_plans_skill_week ON skill_plans (skill_id, week)",
+]
+
+
+def _columns_of_type(table: str, kind: str) -> set:
+    return {col for col, typ in TABLES.get(table, []) if typ.split()[0] == kind}
+
+
+class SQLiteResponse:
+    """Mirrors the `.data` attribute of a PostgREST response."""
+
+    def __init__(self, data: Union[List[Dict[str, Any]], Dict[str, Any], None], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class SQLiteQuery:
+    def __init__(self, client: "SQLiteClient", table: str):
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+        self._single = False
+
+    # ----- operations -----
+    def select(self, *columns: str, **_kwargs) -> "SQLiteQuery":
+        cols = [c.strip() for part in columns for c in str(part).split(",") if c.strip()]
+        self._op = "select"
+        self._columns = "*" if not cols or "*" in cols else ", ".join(cols)
+        return self
+
+    def insert(self, payload: Union[Dict[str, Any], List[Dict[str, Any]]], **_kwargs) -> "SQLiteQuery":
+        self._op, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload: Union[Dict[str, Any], List[Dict[str, Any]]], on_conflict: str = "id", **_kwargs) -> "SQLiteQuery":
+        self._op, self._payload, self._on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def update(self, payload: Dict[str, Any], **_kwargs) -> "SQLiteQuery":
+        self._op, self._payload = "update", payload
+        return self
+
+    def delete(self, **_kwargs) -> "SQLiteQuery":
+        self._op = "delete"
+        return self
+
+    # ----- filters / modifiers -----
+    def _filter(self, column: str, op: str, value: Any) -> "SQLiteQuery":
+        self._filters.append((column, op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "=", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "!=", value)
+
+    def gt(self, column, value):
+        return self._filter(column, ">", value)
+
+    def gte(self, column, value):
+        return self._filter(column, ">=", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "<", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "<=", value)
+
+    def in_(self, column, values: Sequence[Any]):
+        return self._filter(column, "IN", list(values))
+
+    def is_(self, column, value):
+        return self._filter(column, "IS", value)
+
+    def contains(self, column, values: Sequence[Any]):
+        """JSON array column holds every one of values (PostgREST cs / jsonb @>)."""
+        return self._filter(column, "CONTAINS", list(values))
+
+    def order(self, column: str, desc: bool = False, **_kwargs) -> "SQLiteQuery":
+        self._order.append((column, bool(desc)))
+        return self
+
+    def limit(self, count: int, **_kwargs) -> "SQLiteQuery":
+        self._limit = int(count)
+        return self
+
+    def range(self, start: int, end: int, **_kwargs) -> "SQLiteQuery":
+        self._offset = int(start)
+        self._limit = int(end) - int(start) + 1
+        return self
+
+    def single(self) -> "SQLiteQuery":
+        self._single = True
+        return self
+
+    def maybe_single(self) -> "SQLiteQuery":
+        return self.single()
+
+    # ----- SQL building -----
+    def _encode(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        json_cols = _columns_of_type(self._table, "JSON")
+        out = {}
+        for k, v in row.items():
+            if k in json_cols or isinstance(v, (dict, list)):
+                out[k] = None if v is None else json.dumps(v)
+            else:
+                out[k] = v
+        return out
+
+    def _decode(self, row: sqlite3.Row) -> Dict[str, Any]:
+        json_cols = _columns_of_type(self._table, "JSON")
+        bool_cols = _columns_of_type(self._table, "BOOLEAN")
+        out = dict(row)
+        for k, v in out.items():
+            if k in json_cols and isinstance(v, str):
+                try:
+                    out[k] = json.loads(v)
+                except ValueError:
+                    pass
+            elif k in bool_cols and v is not None:
+                out[k] = bool(v)
+        return out
+
+    def _where(self) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for column, op, value in self._filters:
+            if op == "IN":
+                clauses.append(f'"{column}" IN ({", ".join("?" for _ in value)})')
+                params.extend(value)
+            elif op == "CONTAINS":
+                for value_ in value:
+                    clauses.append(f'EXISTS (SELECT 1 FROM json_each("{column}") WHERE value = ?)')
+                    params.append(value_)
+            elif op == "IS":
+                clauses.append(f'"{column}" IS ' + ("NULL" if value in (None, "null") else "?"))
+                if value not in (None, "null"):
+                    params.append(value)
+            else:
+                clauses.append(f'"{column}" {op} ?')
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _returning_rows(self, cur) -> List[Dict[str, Any]]:
+        return [self._decode(r) for r in cur.fetchall()]
+
+    def execute(self) -> SQLiteResponse:
+        with self._client._lock:
+            conn = self._client.connection
+            where, params = self._where()
+
+            if self._op == "select":
+                sql = f"SELECT {self._columns} FROM {self._table}{where}"
+                if self._order:
+                    sql += " ORDER BY " + ", ".join(f'"{c}" {"DESC" if d else "ASC"}' for c, d in self._order)
+                if self._limit is not None:
+                    sql += f" LIMIT {self._limit}"
+                    if self._offset:
+                        sql += f" OFFSET {self._offset}"
+                rows = [self._decode(r) for r in conn.execute(sql, params).fetchall()]
+                if self._single:
+                    return SQLiteResponse(rows[0] if rows else None)
+                return SQLiteResponse(rows)
+
+            if self._op in ("insert", "upsert"):
+                rows = self._payload if isinstance(self._payload, list) else [self._payload]
+                inserted: List[Dict[str, Any]] = []
+                with conn:
+                    for row in rows:
+                        row = self._encode(row)
+                        cols = list(row.keys())
+                        sql = (
+                            f"INSERT INTO {self._table} ({', '.join(chr(34) + c + chr(34) for c in cols)}) "
+                            f"VALUES ({', '.join('?' for _ in cols)})"
+                        )
+                        if self._op == "upsert":
+                            keys = [k.strip() for k in (self._on_conflict or "id").split(",")]
+                            updates = [c for c in cols if c not in keys]
+                            sql += f" ON CONFLICT ({', '.join(keys)}) DO " + (
+                                "UPDATE SET " + ", ".join(f'"{c}" = excluded."{c}"' for c in updates)
+                                if updates else "NOTHING"
+                            )
+                        sql += " RETURNING *"
+                        inserted.extend(self._returning_rows(conn.execute(sql, [row[c] for c in cols])))
+                return SQLiteResponse(inserted)
+
+            if self._op == "update":
+                row = self._encode(self._payload)
+                sets = ", ".join(f'"{c}" = ?' for c in row)
+                with conn:
+                    cur = conn.execute(
+                        f"UPDATE {self._table} SET {sets}{where} RETURNING *", list(row.values()) + params
+                    )
+                    return SQLiteResponse(self._returning_rows(cur))
+
+            if self._op == "delete":
+                with conn:
+                    cur = conn.execute(f"DELETE FROM {self._table}{where} RETURNING *", params)
+                    return SQLiteResponse(self._returning_rows(cur))
+
+        raise ValueError(f"Unsupported operation: {self._op}")
+
+
+# ---------- RPCS ----------
+class SQLiteRPCError(Exception):
+    """Raised like postgrest's APIError: args[0] is the error body, .code its code."""
+
+    def __init__(self, body: Dict[str, Any]):
+        super().__init__(body)
+        self.code = body.get("code")
+
+
+def _increment_day_progress(conn: sqlite3.Connection, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """migrations/0006_increment_day_progress.sql as one UPDATE (atomic across processes)."""
+    counters = ("sessions_total", "sessions_completed", "sets_total", "sets_completed")
+    deltas = {c: int(d) for c, d in (params.get("p_deltas") or {}).items() if c in counters and d}
+    sets = "".join(f'"{c}" = max(0, "{c}" + ?), ' for c in deltas)
+    with conn:
+        row = conn.execute(
+            f"UPDATE plan_day_progress SET {sets}updated_at = datetime('now') WHERE day_id = ? "
+            f"RETURNING day_id, {', '.join(counters)}",
+            [*deltas.values(), params.get("p_day_id")],
+        ).fetchone()
+    return dict(row) if row else None
+
+
+# Postgres functions (migrations/) that have a local implementation
+RPCS = {
+    "increment_day_progress": _increment_day_progress,
+}
+
+
+class SQLiteRPC:
+    def __init__(self, client: "SQLiteClient", name: str, params: Dict[str, Any]):
+        self._client = client
+        self._name = name
+        self._params = params
+
+    def execute(self) -> SQLiteResponse:
+        fn = RPCS.get(self._name)
+        if fn is None:  # same code PostgREST returns, so callers fall back the same way
+            raise SQLiteRPCError({"code": "PGRST202", "message": f"Could not find the function {self._name}"})
+        with self._client._lock:
+            return SQLiteResponse(fn(self._client.connection, self._params))
+
+
+class SQLiteClient:
+    """
+    Drop-in stand-in for the Supabase client backed by a local SQLite file.
+    Use path=":memory:" for a throwaway store (tests, benchmarks).
+    """
+
+    def __init__(self, path: str = "fullcrossfit.db", create_schema: bool = True):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.RLock()
+        if create_schema:
+            self.create_schema()
+
+    def create_schema(self) -> None:
+        with self._lock, self.connection:
+            for table, columns in TABLES.items():
+                cols = ", ".join(
+                    f'"{name}" {"TEXT" if typ.split()[0] == "JSON" else typ}' for name, typ in columns
+                )
+                self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols})")
+                self._add_missing_columns(table, columns)
+            for ddl in INDEXES:
+                self.connection.execute(ddl)
+
+    def _add_missing_columns(self, table: str, columns: List[Tuple[str, str]]) -> None:
+        """Bring a database file created by an older schema up to date (CREATE TABLE IF NOT EXISTS won't)."""
+        existing = {row["name"] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+        for name, typ in columns:
+            if name in existing or "PRIMARY KEY" in typ:
+                continue
+            typ = "TEXT" if typ.split()[0] == "JSON" else typ.replace("DEFAULT CURRENT_TIMESTAMP", "")
+            self.connection.execute(f'ALTER TABLE {table} ADD COLUMN "{name}" {typ}')
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+    # supabase-py exposes .from_() as an alias of .table()
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> SQLiteRPC:
+        return SQLiteRPC(self, name, params or {})
+
+    def close(self) -> None:
+        self.connection.close()
@@ -1,16 +1,15 @@
 import streamlit as st
-from supabase import create_client
-import pandas as pd
+from storage import get_client
 
 # Plan generators
 from plan_generators.crossfit_generator import CrossFitPlanGenerator
 from plan_generators.phat_generator import PHATPlanGenerator
 from plan_generators.run5k_generator import Run5KPlanGenerator
+from plan_generators.plan_export import EXPORT_FORMATS, iter_plan_rows, export_to_bytes
+from utils.plan_preview import summarize_plan, render_plan_preview
 
 # Connect to Supabase
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase = get_client()  # Supabase or local SQLite, per STORAGE_BACKEND
 
 # Sidebar for plan type selection
 st.sidebar.title("Plan Options")
@@ -34,73 +33,32 @@ sync_to_supabase = st.checkbox("Sync Plan to Supabase")
 
 if "full_plan" not in st.session_state:
     st.session_state.full_plan = None
+if "plan_summaries" not in st.session_state:
+    st.session_state.plan_summaries = None
 
 if st.button(f"Generate 6-Week {plan_type} Plan"):
     st.session_state.full_plan = None
     full_plan = plan_gen.generate_full_plan()
     st.session_state.full_plan = full_plan
+    st.session_state.plan_summaries = summarize_plan(full_plan)
 
     if sync_to_supabase and hasattr(plan_gen, "sync_plan_to_supabase"):
         plan_gen.sync_plan_to_supabase(full_plan)
         st.success("Plan synced to Supabase!")
 
-# Display plan if available
+# Display plan if available (one week at a time, sections on demand)
 if st.session_state.full_plan:
     full_plan = st.session_state.full_plan
-    week_tabs = st.tabs([f"Week {i}" for i in range(1, 7)])
+    render_plan_preview(full_plan, st.session_state.plan_summaries, debug_mode=debug_mode)
 
-    for idx, (week_label, week_data) in enumerate(full_plan.items()):
-        with week_tabs[idx]:
-            st.header(week_label)
-            for day_label, day_data in week_data.items():
-                st.subheader(day_label)
-                if day_data.get("Rest"):
-                    st.markdown("**Rest Day 💤**")
-                else:
-                    st.markdown(f"**Target Muscles:** {', '.join(day_data.get('muscles', []))}")
-                    st.markdown(f"**Stimulus:** `{day_data.get('stimulus', 'N/A')}`")
-                    st.markdown(f"**Estimated Time:** `{day_data.get('estimated_time', 'N/A')} min`")
-
-                    if "plan" in day_data:
-                        for section, content in day_data["plan"].items():
-                            if section != "Debug":
-                                if (day_label == "Tue" and section == "Light") or \
-                                   (day_label == "Thu" and section in ["Warmup", "Cooldown", "Light"]):
-                                    continue
-                                st.markdown(f"### {section}")
-                                if isinstance(content, dict):
-                                    if "details" in content:
-                                        st.markdown(f"**Details:** {content['details']}")
-                                    st.json(content)
-                                else:
-                                    st.json(content)
-
-                    if debug_mode and "Debug" in day_data.get("plan", {}):
-                        st.markdown("**Debug Info**")
-                        st.json(day_data["plan"]["Debug"])
-
-    if st.button("Export Plan to CSV"):
-        rows = []
-        for week_label, week_data in full_plan.items():
-            for day_label, day_data in week_data.items():
-                if day_data.get("Rest"):
-                    rows.append([week_label, day_label, "Rest", "", "", "", ""])
-                else:
-                    if "plan" in day_data:
-                        for section, content in day_data["plan"].items():
-                            if section != "Debug" and isinstance(content, dict):
-                                if (day_label == "Tue" and section == "Light") or \
-                                   (day_label == "Thu" and section in ["Warmup", "Cooldown", "Light"]):
-                                    continue
-                                rows.append([
-                                    week_label,
-                                    day_label,
-                                    section,
-                                    ", ".join(day_data.get("muscles", [])),
-                                    day_data.get("stimulus", ""),
-                                    content.get("details", ""),
-                                    content.get("time", "")
-                                ])
-        df = pd.DataFrame(rows, columns=["Week", "Day", "Type", "Target Muscles", "Stimulus", "Details", "Duration"])
-        csv = df.to_csv(index=False)
-        st.download_button("Download CSV", csv, "6_week_plan.csv", "text/csv")
+    # Export (set-level rows, written in chunks)
+    export_fmt = st.selectbox("Export format", list(EXPORT_FORMATS), key="export_fmt")
+    if st.button("Export Plan"):
+        try:
+            payload = export_to_bytes(iter_plan_rows(full_plan), export_fmt)
+        except ImportError as e:
+            st.error(str(e))
+        else:
+            st.download_button(
+                f"Download {export_fmt.upper()}", payload, f"6_week_plan.{export_fmt}", EXPORT_FORMATS[export_fmt]
+            )
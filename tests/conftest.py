@@ -0,0 +1,114 @@
+# tests/conftest.py
+"""
+Shared fixtures: a SQLite client (storage.sqlite_backend) seeded with a small catalog,
+enough for the generators to build a full six-week plan without Supabase.
+"""
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from plan_generators.crossfit_generator import CrossFitPlanGenerator  # noqa: E402
+from storage.sqlite_backend import SQLiteClient  # noqa: E402
+from utils import rpc  # noqa: E402
+
+MUSCLES = ["Back", "Chest", "Shoulders", "Quads", "Glutes/Hamstrings", "Core"]
+CATEGORIES = ["Heavy", "Olympic", "General Warmup", "Cooldown", "Muscular Endurance"]
+START_DATE = "2026-01-05"
+
+
+def seed_catalog(client: SQLiteClient) -> SQLiteClient:
+    client.table("md_muscle_groups").insert([{"id": i, "name": m} for i, m in enumerate(MUSCLES, 1)]).execute()
+    client.table("md_categories").insert([{"id": i, "name": c} for i, c in enumerate(CATEGORIES, 1)]).execute()
+    exercises, muscle_map, category_map, pool = [], [], [], []
+    for mi, muscle in enumerate(MUSCLES, 1):
+        for ci, category in enumerate(CATEGORIES, 1):
+            for k in range(3):
+                ex_id = len(exercises) + 1
+                exercises.append({"id": ex_id, "name": f"{muscle} {category} {k}", "equipment": "Barbell"})
+                muscle_map.append({"exercise_id": ex_id, "musclegroup_id": mi})
+                category_map.append({"exercise_id": ex_id, "category_id": ci})
+        pool.extend(
+            {"musclegroup_id": mi, "exercise": f"{muscle} move {k}", "unit": "reps", "range_min": 5, "range_max": 15,
+             "equipment": ["barbell"], "tags": [], "skill_level": 1, "rx_male_kg": 40, "rx_female_kg": 30}
+            for k in range(5)
+        )
+    pool.append({"musclegroup_id": 1, "exercise": "Row", "unit": "meters", "range_min": 200, "range_max": 500,
+                 "equipment": [], "tags": []})
+    client.table("md_exercises").insert(exercises).execute()
+    client.table("md_map_exercise_muscle_groups").insert(muscle_map).execute()
+    client.table("md_map_exercise_categories").insert(category_map).execute()
+    client.table("exercise_pool").insert(pool).execute()
+    client.table("skills").insert({"skill_id": 1, "skill_name": "Handstand Push-Up"}).execute()
+    client.table("skill_plans").insert(
+        [{"skill_id": 1, "week": w, "focus": "Strength", "session_plan": "Wall Walk, Pike Push-Up"} for w in range(1, 7)]
+    ).execute()
+    client.table("benchmark_wods").insert([
+        {"name": "Fran", "description": "21-15-9", "estimated_time": "5 min", "workout_type": "For Time",
+         "type": "For Time", "beginner": "10 min", "intermediate": "7 min", "advanced": "5 min", "elite": "3 min"},
+        {"name": "Cindy", "description": "AMRAP 20", "estimated_time": "20 min", "workout_type": "AMRAP",
+         "type": "AMRAP", "beginner": "10 rounds", "intermediate": "15 rounds", "advanced": "20 rounds",
+         "elite": "25 rounds"},
+    ]).execute()
+    return client
+
+
+class CappedClient:
+    """Wraps a client so every select response stops at cap rows, like PostgREST's max-rows."""
+
+    def __init__(self, client, cap):
+        self._client = client
+        self.cap = cap
+
+    def table(self, name):
+        return _CappedQuery(self._client.table(name), self.cap)
+
+    def rpc(self, name, params=None):
+        return self._client.rpc(name, params)
+
+
+class _CappedQuery:
+    def __init__(self, query, cap):
+        self._query = query
+        self._cap = cap
+
+    def __getattr__(self, attr):
+        method = getattr(self._query, attr)
+
+        def chained(*args, **kwargs):
+            result = method(*args, **kwargs)
+            return _CappedQuery(result, self._cap) if result is self._query else result
+        return chained
+
+    def execute(self):
+        response = self._query.execute()
+        if isinstance(response.data, list) and len(response.data) > self._cap:
+            response.data = response.data[:self._cap]
+        return response
+
+
+@pytest.fixture
+def client(tmp_path):
+    sqlite = seed_catalog(SQLiteClient(str(tmp_path / "plan.db")))
+    yield sqlite
+    sqlite.close()
+
+
+@pytest.fixture
+def generator(client):
+    random.seed(1)
+    return CrossFitPlanGenerator(client)
+
+
+@pytest.fixture
+def full_plan(generator):
+    return generator.generate_full_plan(START_DATE)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_rpc_state(monkeypatch):
+    """Missing-function latches are per process; every test starts without any."""
+    monkeypatch.setattr(rpc, "_missing", set())
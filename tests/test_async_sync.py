@@ -0,0 +1,49 @@
+# tests/test_async_sync.py
+import asyncio
+
+from plan_generators.async_sync import async_merge_plan_patch_to_supabase, async_sync_plan_to_supabase, load_data_async
+from plan_generators.plan_export import iter_stored_plan_rows
+from plan_generators.supabase_sync_function import merge_plan_patch_to_supabase, sync_plan_to_supabase
+from tests.conftest import START_DATE
+from utils.day_progress import fetch_progress
+from utils.plan_scope import plan_ids
+
+
+def _rows(client, athlete_id):
+    """Stored rows per section; sessions inserted concurrently get ids (and so export order) in any order."""
+    rows = iter_stored_plan_rows(client, athlete_id)
+    return sorted(rows, key=lambda r: (r["week"], r["date"], r["section"], r["exercise_order"], str(r["set_number"])))
+
+
+def _progress(client, athlete_id):
+    """Per-day summaries keyed by date; days are also inserted concurrently."""
+    days = client.table("plan_days").select("id, date").in_("id", plan_ids(client, athlete_id).days).execute().data
+    rows = fetch_progress(client, [d["id"] for d in days])
+    return {d["date"]: {k: v for k, v in rows[d["id"]].items() if k not in ("day_id", "updated_at")} for d in days}
+
+
+def test_catalog_load_matches_the_generator(client, generator):
+    assert asyncio.run(load_data_async(client, concurrency=4)) == generator.data
+
+
+def test_full_sync_writes_the_same_plan_as_the_blocking_sync(client, generator, full_plan):
+    summary = sync_plan_to_supabase(client, full_plan, generator.data, athlete_id=1)
+    async_summary = asyncio.run(async_sync_plan_to_supabase(client, full_plan, generator.data, concurrency=4, athlete_id=2))
+
+    assert async_summary == summary
+    assert _rows(client, 2) == _rows(client, 1)
+    assert _progress(client, 2) == _progress(client, 1)
+
+
+def test_merge_writes_the_same_rows_as_the_blocking_merge(client, generator, full_plan):
+    patch = {"Week 2": full_plan["Week 2"]}
+    for athlete_id in (1, 2):
+        sync_plan_to_supabase(client, full_plan, generator.data, athlete_id=athlete_id)
+
+    summary = merge_plan_patch_to_supabase(client, patch, generator.data, start_date=START_DATE, athlete_id=1)
+    async_summary = asyncio.run(async_merge_plan_patch_to_supabase(
+        client, patch, generator.data, start_date=START_DATE, concurrency=4, athlete_id=2))
+
+    assert async_summary == summary
+    assert _rows(client, 2) == _rows(client, 1)
+    assert _progress(client, 2) == _progress(client, 1)
@@ -0,0 +1,71 @@
+# tests/test_cache_bus.py
+from utils.cache_bus import bus_cached, publish, publish_plan_rewrite, subscribe
+
+ROWS = {1: {"id": 1, "weight": 60}, 2: {"id": 2, "weight": 80}}
+
+
+def _reader():
+    calls = []
+
+    @bus_cached(tables=["plan_session_exercises"], tags=lambda row, row_id: [("plan_session_exercises", row_id)])
+    def read(row_id):
+        calls.append(row_id)
+        return dict(ROWS[row_id])
+
+    read.clear()
+    return read, calls
+
+
+def test_row_events_evict_only_dependent_entries():
+    read, calls = _reader()
+    read(1), read(2)
+
+    publish("plan_session_exercises", 1)
+    read(1), read(2)
+    assert calls == [1, 2, 1]
+
+    publish("plan_sessions", 2)  # another table: nothing evicted
+    read(2)
+    assert calls == [1, 2, 1]
+
+
+def test_table_wide_events_clear_the_reader():
+    read, calls = _reader()
+    read(1), read(2)
+
+    publish_plan_rewrite()
+    read(1), read(2)
+    assert calls == [1, 2, 1, 2]
+
+
+def test_cached_results_are_copies():
+    read, _ = _reader()
+    read(1)["weight"] = 999
+    assert read(1)["weight"] == 60
+
+
+def test_read_racing_a_write_to_its_row_is_not_cached():
+    calls = []
+
+    @bus_cached(tables=["plan_session_exercises"], tags=lambda row, row_id: [("plan_session_exercises", row_id)])
+    def racing(row_id):
+        calls.append(row_id)
+        if len(calls) == 1:
+            publish("plan_session_exercises", row_id)   # a write lands while the first read is in flight
+            publish("plan_session_exercises", row_id + 1)
+        return dict(ROWS[row_id])
+
+    racing.clear()
+    racing(1), racing(1)
+    assert calls == [1, 1]  # the raced read was served but not kept
+    racing(1)
+    assert calls == [1, 1]
+
+
+def test_subscribers_see_every_event():
+    seen = []
+    unsubscribe = subscribe(lambda table, key: seen.append((table, key)))
+    publish("exercise_maxes", 7)
+    unsubscribe()
+    publish("exercise_maxes", 8)
+    assert seen == [("exercise_maxes", 7)]
@@ -0,0 +1,54 @@
+# tests/test_catalog_refresh.py
+from plan_generators.catalog_refresh import load_catalog, refresh_catalog
+from utils.catalog_deps import CHANGED, RETIRED, diff_fingerprints, fingerprints, parse_ref, sessions_using
+
+
+def test_diff_reports_renames_remaps_and_retirements(generator):
+    data = load_catalog(generator.supabase)
+    before = fingerprints(data)
+
+    renamed = dict(data["exercises"][0], name="Renamed Lift")
+    data["exercises"] = [renamed] + data["exercises"][2:]                      # row 2 retired
+    data["category_mappings"] = [
+        dict(m, category_id=5) if m["exercise_id"] == data["exercises"][1]["id"] else m
+        for m in data["category_mappings"]
+    ]
+    data["exercise_pool"] = data["exercise_pool"] + [dict(data["exercise_pool"][0], id=10_000)]  # new: no sessions yet
+
+    assert diff_fingerprints(before, fingerprints(data)) == {
+        f"md_exercises:{renamed['id']}": CHANGED,
+        "md_exercises:2": RETIRED,
+        f"md_exercises:{data['exercises'][1]['id']}": CHANGED,
+    }
+
+
+def _sets(client, session_ids):
+    return client.table("plan_session_exercises").select("id, session_id, exercise_name") \
+        .in_("session_id", sorted(session_ids)).order("id").execute().data
+
+
+def test_refresh_regenerates_only_sessions_built_from_changed_rows(client, generator, full_plan, tmp_path):
+    generator.sync_plan_to_supabase(full_plan)
+    snapshot = tmp_path / "catalog.json"
+    assert refresh_catalog(client, snapshot_path=snapshot)["baseline"]
+
+    sessions = client.table("plan_sessions").select("id, type, catalog_refs").eq("type", "Heavy").order("id").execute().data
+    target = next(r for s in sessions for r in s["catalog_refs"] if r.startswith("md_exercises:"))
+    old_name = client.table("md_exercises").select("name").eq("id", parse_ref(target)[1]).execute().data[0]["name"]
+    affected = sessions_using(client, [target])
+    completed, open_ids = affected[0]["id"], {s["id"] for s in affected[1:]}
+    client.table("plan_sessions").update({"completed": True}).eq("id", completed).execute()
+    others = {s["id"] for s in client.table("plan_sessions").select("id").execute().data} - open_ids - {completed}
+    before = _sets(client, others | {completed})
+    client.table("md_exercises").update({"name": old_name + " (renamed)"}).eq("id", parse_ref(target)[1]).execute()
+
+    dry = refresh_catalog(client, snapshot_path=snapshot, dry_run=True)
+    assert dry["changes"] == {target: CHANGED}
+    assert dry["skipped_completed"] == [completed]
+    assert "merged" not in dry
+
+    summary = refresh_catalog(client, snapshot_path=snapshot)
+    assert {m["section"] for m in summary["merged"]} == {s["type"] for s in affected[1:]}
+    assert _sets(client, others | {completed}) == before  # unaffected and completed sessions keep their rows
+    assert old_name not in {row["exercise_name"] for row in _sets(client, open_ids)}
+    assert refresh_catalog(client, snapshot_path=snapshot)["changes"] == {}  # the new version was recorded
@@ -0,0 +1,73 @@
+# tests/test_cli.py
+import csv
+import json
+
+import pytest
+
+from plan_generators.cli import main
+from storage.sqlite_backend import SQLiteClient
+from tests.conftest import START_DATE, seed_catalog
+from utils.plan_scope import plan_ids
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.delenv("PLAN_ATHLETE_ID", raising=False)
+    path = str(tmp_path / "cli.db")
+    seed_catalog(SQLiteClient(path)).close()
+    return path
+
+
+def _run(capsys, *argv):
+    code = main(list(argv))
+    return code, capsys.readouterr()
+
+
+def test_generate_sync_and_export_against_sqlite(db_path, tmp_path, capsys):
+    export = tmp_path / "plan.csv"
+    code, out = _run(capsys, "--start-date", START_DATE, "--seed", "1", "--storage", "sqlite", "--sqlite-path", db_path,
+                     "--sync", "rest", "--athlete-id", "8", "--export", str(export), "--json")
+
+    assert code == 0
+    summary = json.loads(out.out)
+    assert summary["athlete_id"] == 8
+    assert summary["sync"]["weeks"] == summary["plan"]["weeks"] == 6
+    with open(export, newline="", encoding="utf-8") as fp:
+        assert len(list(csv.DictReader(fp))) == summary["exported_rows"] > 0
+    assert {"connect", "catalog", "generate", "sync (rest)", "export"} <= set(summary["timings_ms"])
+
+    client = SQLiteClient(db_path)
+    try:
+        assert len(plan_ids(client, 8).weeks) == 6
+    finally:
+        client.close()
+
+
+def test_partial_plan_merges_into_the_stored_plan(db_path, capsys):
+    assert _run(capsys, "--start-date", START_DATE, "--sqlite-path", db_path, "--sync", "rest")[0] == 0
+    code, out = _run(capsys, "--start-date", START_DATE, "--sqlite-path", db_path, "--weeks", "2",
+                     "--sections", "WOD", "--sync", "merge", "--json")
+
+    assert code == 0
+    assert json.loads(out.out)["plan"]["weeks"] == 1
+
+
+@pytest.mark.parametrize("argv", [
+    ["--sync", "rest"],                                                  # no --start-date
+    ["--start-date", START_DATE, "--weeks", "2", "--sync", "rest"],      # partial plan, full-wipe sync
+    ["--start-date", START_DATE, "--sync", "merge"],                     # merge without a scope
+    ["--roster", "athletes.json", "--export", "out.csv"],                # roster export needs a sync
+    ["--start-date", "05/01/2026"],
+])
+def test_bad_arguments_exit_2(argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(argv)
+    assert exc.value.code == 2
+
+
+def test_failures_exit_1_with_the_phase_report(tmp_path, capsys):
+    code, out = _run(capsys, "--roster", str(tmp_path / "missing.json"), "--sqlite-path", str(tmp_path / "x.db"))
+
+    assert code == 1
+    assert "error: FileNotFoundError" in out.err
+    assert "profiles" in out.err
@@ -0,0 +1,119 @@
+# tests/test_completion.py
+import pytest
+
+from utils import rpc
+from utils.completion import RPC_NAME, complete_exercises, set_completion, tick_exercise
+from utils.day_progress import fetch_progress
+from utils.projections import TIMED_EXERCISES
+from utils.write_behind import WriteBehindQueue
+
+
+class RPCClient:
+    """Wraps the SQLite client; its complete_session_exercises RPC fails with the given errors, then succeeds."""
+
+    def __init__(self, client, errors):
+        self._client = client
+        self.errors = list(errors)
+        self.calls = 0
+
+    def table(self, name):
+        return self._client.table(name)
+
+    def rpc(self, name, params):
+        if name != RPC_NAME:
+            return self._client.rpc(name, params)
+        wrapper = self
+
+        class Call:
+            def execute(self):
+                wrapper.calls += 1
+                if wrapper.errors:
+                    raise wrapper.errors.pop(0)
+
+                class Response:
+                    data = {"changed": len(params["p_done_ids"]), "day": {"day_id": 0}}
+                return Response()
+        return Call()
+
+
+class APIError(Exception):
+    """Shaped like postgrest's APIError: the response body in args[0], its code in .code."""
+
+    def __init__(self, code):
+        super().__init__({"code": code, "message": "error"})
+        self.code = code
+
+
+def _session(client):
+    row = client.table("plan_sessions").select("id, day_id").eq("type", "Heavy").order("id").limit(1).execute().data[0]
+    sets = client.table("plan_session_exercises").select("id, completed").eq("session_id", row["id"]).order("id").execute().data
+    return {"session_id": row["id"], "day_id": row["day_id"], "completed": False}, sets
+
+
+def test_sqlite_falls_back_to_batched_writes(client, generator, full_plan):
+    generator.sync_plan_to_supabase(full_plan)
+    session, sets = _session(client)
+
+    result = set_completion(client, session, sets, {sets[0]["id"]: True, sets[1]["id"]: True})
+
+    assert result["changed"] == 2
+    assert result["day"]["sets_completed"] == 2
+    assert fetch_progress(client, [session["day_id"]])[session["day_id"]]["sets_completed"] == 2
+    assert RPC_NAME in rpc._missing
+
+
+def test_transient_rpc_error_is_raised_and_does_not_disable_the_rpc(client, generator, full_plan):
+    generator.sync_plan_to_supabase(full_plan)
+    session, sets = _session(client)
+    wrapped = RPCClient(client, [TimeoutError("timed out"), APIError("42501")])
+
+    with pytest.raises(TimeoutError):
+        set_completion(wrapped, dict(session), [dict(s) for s in sets], {sets[0]["id"]: True})
+    with pytest.raises(APIError):
+        set_completion(wrapped, dict(session), [dict(s) for s in sets], {sets[0]["id"]: True})
+    result = set_completion(wrapped, dict(session), [dict(s) for s in sets], {sets[0]["id"]: True})
+
+    assert wrapped.calls == 3
+    assert result["day"] == {"day_id": 0}  # served by the RPC
+    assert RPC_NAME not in rpc._missing
+
+
+@pytest.mark.parametrize("code", ["PGRST202", "42883"])
+def test_missing_function_falls_back_and_is_remembered(client, generator, full_plan, code):
+    generator.sync_plan_to_supabase(full_plan)
+    session, sets = _session(client)
+    wrapped = RPCClient(client, [APIError(code)])
+
+    set_completion(wrapped, dict(session), [dict(s) for s in sets], {sets[0]["id"]: True})
+    set_completion(wrapped, dict(session), [dict(s) for s in sets], {sets[1]["id"]: True})
+
+    assert wrapped.calls == 1
+    assert fetch_progress(client, [session["day_id"]])[session["day_id"]]["sets_completed"] == 2
+
+
+def test_guided_ticks_survive_a_restart_and_are_counted_once(client, generator, full_plan, tmp_path):
+    generator.sync_plan_to_supabase(full_plan)
+    row = client.table("plan_sessions").select("id, day_id").eq("type", "Warmup").order("id").limit(1).execute().data[0]
+    session = {"session_id": row["id"], "day_id": row["day_id"], "completed": False}
+    spill = tmp_path / "session_warmup.jsonl"
+    exercises = TIMED_EXERCISES.query(client).eq("session_id", row["id"]).order("exercise_order").execute().data
+
+    queue = WriteBehindQueue(client, spill, autostart=False)
+    assert tick_exercise(queue, session, exercises[0])
+    assert tick_exercise(queue, session, exercises[1])
+    assert not tick_exercise(queue, session, exercises[1])
+    # The process dies here: nothing was flushed, the ticks are only in the spill file
+
+    restarted = WriteBehindQueue(client, spill, autostart=False)
+    reloaded = TIMED_EXERCISES.query(client).eq("session_id", row["id"]).order("exercise_order").execute().data
+    restarted.overlay("plan_session_exercises", reloaded)
+    assert [ex["completed"] for ex in reloaded[:2]] == [True, True]
+
+    for ex in reloaded[2:]:
+        tick_exercise(restarted, session, ex)
+    restarted.flush()
+    complete_exercises(client, session, reloaded, complete_session=True)
+
+    progress = fetch_progress(client, [row["day_id"]])[row["day_id"]]
+    assert progress["sets_completed"] == len(reloaded)
+    assert progress["sessions_completed"] == 1
@@ -0,0 +1,51 @@
+# tests/test_day_progress.py
+from tests.conftest import CappedClient
+from utils import pagination
+from utils.day_progress import fetch_progress, mark_session, rebuild_day_progress
+from utils.plan_scope import plan_ids
+from utils.write_behind import WriteBehindQueue
+
+
+def _counts(rows):
+    return {day_id: {k: v for k, v in row.items() if k != "updated_at"} for day_id, row in rows.items()}
+
+
+def test_seeded_summary_matches_a_recount(client, generator, full_plan):
+    generator.sync_plan_to_supabase(full_plan)
+    days = plan_ids(client, None).days
+    seeded = _counts(fetch_progress(client, days))
+
+    rebuild_day_progress(client, days)
+    assert _counts(fetch_progress(client, days)) == seeded
+    assert sum(row["sets_total"] for row in seeded.values()) > 0
+
+
+def test_rebuild_reads_every_chunk_and_page(client, generator, full_plan, monkeypatch):
+    generator.sync_plan_to_supabase(full_plan)
+    days = plan_ids(client, None).days
+    expected = _counts(fetch_progress(client, days))
+    client.table("plan_day_progress").delete().in_("day_id", days).execute()
+
+    monkeypatch.setattr(pagination, "ID_CHUNK", 3)
+    monkeypatch.setattr(pagination, "SERVER_MAX_ROWS", 10)
+    monkeypatch.setitem(pagination.iter_pages.__kwdefaults__, "page_size", 10)
+    capped = CappedClient(client, 10)
+
+    rebuild_day_progress(capped, days)
+    assert _counts(fetch_progress(capped, days)) == expected
+
+
+def test_session_flag_is_counted_once(client, generator, full_plan, tmp_path):
+    generator.sync_plan_to_supabase(full_plan)
+    row = client.table("plan_sessions").select("id, day_id").order("id").limit(1).execute().data[0]
+    session = {"session_id": row["id"], "day_id": row["day_id"], "completed": False}
+    queue = WriteBehindQueue(client, tmp_path / "spill.jsonl", autostart=False)
+
+    assert mark_session(queue, session) is True
+    assert mark_session(queue, session) is False  # already complete: nothing queued
+    queue.flush()
+    assert fetch_progress(client, [row["day_id"]])[row["day_id"]]["sessions_completed"] == 1
+
+    mark_session(queue, session, completed=False)
+    queue.flush()
+    assert fetch_progress(client, [row["day_id"]])[row["day_id"]]["sessions_completed"] == 0
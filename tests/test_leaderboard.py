@@ -0,0 +1,57 @@
+# tests/test_leaderboard.py
+import pytest
+
+from utils import leaderboard as leaderboard_module
+from utils.leaderboard import ROUNDS, TIME, ScoreIndex, leaderboard
+from utils.results import record_result
+
+FRAN = 1
+
+
+@pytest.fixture(autouse=True)
+def _fresh_indexes(monkeypatch):
+    monkeypatch.setattr(leaderboard_module, "_indexes", {})
+
+
+def _log(client, session_id, user_id, minutes):
+    record_result(client, session_id, user_id, {"time_min": minutes}, benchmark_id=FRAN)
+
+
+def test_board_ranks_athletes_not_results(client):
+    # Athlete 1 logged three results, all better than athlete 2's only one
+    for session_id, minutes in ((1, 4.0), (2, 4.5), (3, 5.0)):
+        _log(client, session_id, 1, minutes)
+    _log(client, 4, 2, 6.0)
+    _log(client, 5, 3, 4.0)  # ties athlete 1's best
+
+    board = leaderboard(client, FRAN, "For Time")
+    assert [(row["user_id"], row["rank"]) for row in board.top()] == [(1, 1), (3, 1), (2, 3)]
+
+    best = board.athlete_best(2)
+    assert (best["rank"], best["of"], best["score"]) == (3, 3, 6.0)
+    assert best["percentile"] == 16.7  # last of three; its own entry counts as half a tie
+    assert board.athlete_best(4) is None
+
+
+def test_recorded_result_updates_the_board_incrementally(client):
+    _log(client, 1, 1, 4.0)
+    _log(client, 2, 2, 6.0)
+    board = leaderboard(client, FRAN, "For Time")
+    assert board.athlete_best(2)["rank"] == 2
+
+    _log(client, 3, 2, 3.5)  # published on the cache bus; the next lookup re-reads athlete 2 only
+    board = leaderboard(client, FRAN, "For Time")
+    assert [row["user_id"] for row in board.top()] == [2, 1]
+    assert board.athlete_best(1)["rank"] == 2
+    assert len(board) == 3  # rank() / percentile() still cover every logged result
+
+
+def test_rounds_sort_best_first(client):
+    for session_id, user_id, rounds in ((1, 1, 18), (2, 2, 22), (3, 2, 12)):
+        record_result(client, session_id, user_id, {"rounds": rounds}, benchmark_id=FRAN)
+
+    board = ScoreIndex(client, FRAN, ROUNDS).build()
+    assert [row["score"] for row in board.top()] == [22, 18]
+    assert board.rank({"rounds": 20}) == 2
+    assert board.percentile({"rounds": 30}) == 100.0
+    assert ScoreIndex(client, FRAN, TIME).build().top() == []
@@ -0,0 +1,79 @@
+# tests/test_migrations.py
+import importlib
+import re
+import sqlite3
+
+import pytest
+
+from storage import explain, migrations
+from storage.sqlite_backend import SQLiteClient
+
+_CREATE_TABLE = re.compile(r"create table if not exists (\w+)", re.I)
+_CREATE_INDEX = re.compile(r"create (?:unique )?index if not exists \w+\s+on (\w+)", re.I)
+
+
+def test_versions_are_contiguous():
+    versions = [m.version for m in migrations.discover()]
+    assert versions == [f"{n:04d}" for n in range(1, len(versions) + 1)]
+
+
+def test_every_indexed_table_is_created_by_an_earlier_migration():
+    created = set()
+    for migration in migrations.discover():
+        sql = migration.sql
+        created.update(name.lower() for name in _CREATE_TABLE.findall(sql))
+        for table in _CREATE_INDEX.findall(sql):
+            assert table.lower() in created, f"{migration.path.name} indexes {table} before any migration creates it"
+
+
+def test_explain_shapes_use_an_index_on_sqlite(client):
+    failures = [r.shape.name for r in explain.run(explain.explain_sqlite, client.connection) if not r.ok]
+    assert failures == []
+
+
+def _resolve(dotted):
+    parts = dotted.split(".")
+    for cut in range(len(parts), 0, -1):
+        try:
+            target = importlib.import_module(".".join(parts[:cut]))
+        except ModuleNotFoundError:
+            continue
+        for attr in parts[cut:]:
+            target = getattr(target, attr)
+        return target
+    raise ModuleNotFoundError(dotted)
+
+
+def test_explain_sources_name_real_call_sites():
+    for shape in explain.SHAPES:
+        dotted = shape.source.split()[0]
+        if dotted.startswith(("utils.", "storage.", "plan_generators.")):
+            assert _resolve(dotted) is not None, shape.source
+        elif dotted == "merge":  # plan_generators.supabase_sync_function helpers
+            sync = importlib.import_module("plan_generators.supabase_sync_function")
+            assert hasattr(sync, shape.source.split()[1]), shape.source
+
+
+def test_sqlite_default_plan_week_numbers_are_unique(client):
+    client.table("plan_weeks").insert({"number": 1}).execute()
+    client.table("plan_weeks").insert({"number": 1, "athlete_id": 7}).execute()
+    with pytest.raises(sqlite3.IntegrityError):
+        client.table("plan_weeks").insert({"number": 1}).execute()
+
+
+def test_sqlite_file_with_the_old_week_index_is_upgraded(tmp_path):
+    path = str(tmp_path / "old.db")
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE plan_weeks (id INTEGER PRIMARY KEY, number INTEGER, start_date TEXT, athlete_id INTEGER)")
+    old.execute("CREATE UNIQUE INDEX ux_plan_weeks_athlete_number ON plan_weeks (athlete_id, number)")
+    old.commit()
+    old.close()
+
+    client = SQLiteClient(path)
+    try:
+        indexes = {row["name"] for row in client.connection.execute(
+            "select name from sqlite_master where type = 'index' and tbl_name = 'plan_weeks'")}
+        assert "ux_plan_weeks_plan_number" in indexes
+        assert "ux_plan_weeks_athlete_number" not in indexes
+    finally:
+        client.close()
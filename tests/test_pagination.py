@@ -0,0 +1,55 @@
+# tests/test_pagination.py
+import pytest
+
+from plan_generators.crossfit_generator import CrossFitPlanGenerator
+from tests.conftest import CappedClient
+from utils import pagination
+from utils.pagination import TruncatedReadWarning, fetch_in, fetch_table, iter_pages, warn_if_capped
+
+CAP = 25
+
+
+@pytest.fixture
+def capped(client, monkeypatch):
+    monkeypatch.setattr(pagination, "SERVER_MAX_ROWS", CAP)
+    monkeypatch.setitem(pagination.iter_pages.__kwdefaults__, "page_size", CAP)
+    return CappedClient(client, CAP)
+
+
+def _ids(client, table):
+    return [row["id"] for row in client.table(table).select("id").order("id").execute().data]
+
+
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_table_reads_page_past_the_cap(client, capped, parallel):
+    expected = _ids(client, "md_exercises")
+    assert len(expected) > 3 * CAP
+
+    assert [row["id"] for row in fetch_table(capped, "md_exercises", "id", parallel=parallel)] == expected
+
+
+def test_page_size_above_the_cap_warns_and_pages_at_the_cap(client, capped):
+    with pytest.warns(TruncatedReadWarning, match="above the server row cap"):
+        pages = list(iter_pages(lambda: capped.table("md_exercises").select("id").order("id"), page_size=100))
+
+    assert {len(page) for page in pages[:-1]} == {CAP}
+    assert [row["id"] for page in pages for row in page] == _ids(client, "md_exercises")
+
+
+def test_in_filters_are_chunked_and_paged(client, capped, monkeypatch):
+    monkeypatch.setattr(pagination, "ID_CHUNK", 7)
+    rows = fetch_in(capped, "md_map_exercise_categories", "exercise_id, category_id", "category_id", [1, 2, 2],
+                    where=lambda q: q.gt("exercise_id", 3))
+
+    expected = [r for r in client.table("md_map_exercise_categories").select("exercise_id, category_id").order("id")
+                .execute().data if r["category_id"] in (1, 2) and r["exercise_id"] > 3]
+    assert rows == expected and len(rows) > CAP
+
+
+def test_unpaginated_reads_at_the_cap_warn():
+    with pytest.warns(TruncatedReadWarning):
+        warn_if_capped([{}] * 3, "md_exercises", cap=3)
+
+
+def test_catalog_load_is_complete_behind_the_cap(client, capped, generator):
+    assert CrossFitPlanGenerator(capped).data == generator.data
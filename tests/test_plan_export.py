@@ -0,0 +1,70 @@
+# tests/test_plan_export.py
+import csv
+import io
+import json
+
+from plan_generators.plan_export import (
+    EXPORT_COLUMNS, ROSTER_COLUMNS, export_rows, export_to_bytes, iter_plan_rows, iter_roster_plan_rows,
+    iter_stored_plan_rows,
+)
+from plan_generators.supabase_sync_function import sync_plan_to_supabase
+from tests.conftest import CappedClient
+from utils import pagination
+from utils.plan_preview import is_hidden_section
+from utils.plan_scope import plan_ids
+
+
+def _set_count(client, athlete_id):
+    sessions = plan_ids(client, athlete_id).sessions
+    return len(client.table("plan_session_exercises").select("id").in_("session_id", sessions).execute().data)
+
+
+def test_in_memory_export_is_set_level_and_skips_hidden_sections(full_plan):
+    rows = list(iter_plan_rows(full_plan))
+
+    assert all(not is_hidden_section(row["day"], row["section"]) for row in rows)
+    heavy = [row for row in rows if row["section"] == "Heavy"]
+    assert heavy and all(row["set_number"] != "" for row in heavy)
+    assert all(set(row) == set(EXPORT_COLUMNS) for row in rows)
+
+
+def test_csv_and_jsonl_writers_stream_every_row(full_plan):
+    rows = list(iter_plan_rows(full_plan))
+
+    text = export_to_bytes(iter(rows), "csv", chunk_size=7).decode("utf-8")
+    assert list(csv.DictReader(io.StringIO(text))) == [{k: str(v) for k, v in row.items()} for row in rows]
+    lines = export_to_bytes(iter(rows), "jsonl", chunk_size=7).decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == rows
+
+
+def test_stored_export_pages_past_the_server_cap(client, generator, full_plan, monkeypatch):
+    generator.sync_plan_to_supabase(full_plan)
+    monkeypatch.setattr(pagination, "SERVER_MAX_ROWS", 20)
+    monkeypatch.setitem(pagination.iter_pages.__kwdefaults__, "page_size", 20)
+    capped = CappedClient(client, 20)
+
+    rows = list(iter_stored_plan_rows(capped))
+
+    set_rows = [row for row in rows if row["exercise_name"]]
+    assert len(set_rows) == _set_count(client, None) > 20
+    for week_day_section in {(r["week"], r["day"], r["section"]) for r in set_rows}:
+        orders = [r["exercise_order"] for r in set_rows if (r["week"], r["day"], r["section"]) == week_day_section]
+        assert orders == sorted(orders)
+
+
+def test_roster_export_covers_every_athlete(client, generator, full_plan, tmp_path):
+    for athlete_id in (3, 5):
+        sync_plan_to_supabase(client, full_plan, generator.data, athlete_id=athlete_id)
+    generator.sync_plan_to_supabase(full_plan)  # the default plan is not part of the roster
+
+    path = tmp_path / "roster.csv"
+    written = export_rows(iter_roster_plan_rows(client), path, columns=ROSTER_COLUMNS)
+
+    with open(path, newline="", encoding="utf-8") as fp:
+        reader = csv.DictReader(fp)
+        assert reader.fieldnames == ROSTER_COLUMNS
+        stored = list(reader)
+    assert len(stored) == written
+    assert {row["athlete_id"] for row in stored} == {"3", "5"}
+    per_athlete = [sum(1 for row in stored if row["athlete_id"] == a and row["exercise_name"]) for a in ("3", "5")]
+    assert per_athlete == [_set_count(client, 3), _set_count(client, 5)]
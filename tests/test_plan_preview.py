@@ -0,0 +1,32 @@
+# tests/test_plan_preview.py
+from utils.plan_preview import HIDDEN_SECTIONS, _day_header, summarize_plan
+
+
+def test_summaries_cover_every_day_and_hide_the_preview_hidden_sections(full_plan):
+    summaries = summarize_plan(full_plan)
+
+    assert list(summaries) == list(full_plan)
+    for week_label, days in summaries.items():
+        assert [d["day"] for d in days] == list(full_plan[week_label])
+        for day in days:
+            names = {s["name"] for s in day["sections"]}
+            assert not names & HIDDEN_SECTIONS.get(day["day"], set())
+            assert not names & {"Debug", "Total Time"}
+
+
+def test_section_summaries_are_one_line_with_exercise_counts(full_plan):
+    week_label, week = next(iter(full_plan.items()))
+    day_label, day = next((label, d) for label, d in week.items() if "Heavy" in d.get("plan", {}))
+    summary = next(d for d in summarize_plan(full_plan)[week_label] if d["day"] == day_label)
+
+    heavy = next(s for s in summary["sections"] if s["name"] == "Heavy")
+    assert heavy["exercises"] == len(day["plan"]["Heavy"]["exercises"])
+    assert all("\n" not in s["details"] for s in summary["sections"])
+    assert f"{len(summary['sections'])} sections" in _day_header(summary)
+
+
+def test_rest_days_get_a_rest_header():
+    summaries = summarize_plan({"Week 1": {"Sun": {"date": "2026-01-11", "Rest": True}}})
+    day = summaries["Week 1"][0]
+    assert day["rest"] and day["sections"] == []
+    assert _day_header(day) == "💤 Sun (2026-01-11) – Rest Day"
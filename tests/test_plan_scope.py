@@ -0,0 +1,47 @@
+# tests/test_plan_scope.py
+from plan_generators.supabase_sync_function import sync_plan_to_supabase
+from utils import session_blocks
+from utils.plan_scope import delete_plan, plan_ids
+from utils.prescriptions import refresh_prescriptions
+
+
+def _open_sets(client, athlete_id):
+    session_ids = plan_ids(client, athlete_id).sessions
+    rows = client.table("plan_session_exercises").select("exercise_name, intensity, expected_weight") \
+        .in_("session_id", session_ids).execute().data
+    return [r for r in rows if r["intensity"].endswith("%")]
+
+
+def test_plans_are_replaced_and_deleted_independently(client, generator, full_plan):
+    sync_plan_to_supabase(client, full_plan, generator.data, athlete_id=1)
+    sync_plan_to_supabase(client, full_plan, generator.data, athlete_id=2)
+    other = plan_ids(client, 2)
+
+    sync_plan_to_supabase(client, full_plan, generator.data, athlete_id=1)  # resync replaces plan 1 only
+    assert plan_ids(client, 2) == other
+    assert len(plan_ids(client, 1).weeks) == len(other.weeks)
+
+    delete_plan(client, 1)
+    assert plan_ids(client, 1).weeks == []
+    assert plan_ids(client, 2) == other
+
+
+def test_refresh_prescriptions_only_touches_one_plan(client, generator, full_plan):
+    sync_plan_to_supabase(client, full_plan, generator.data, athlete_id=1)
+    sync_plan_to_supabase(client, full_plan, generator.data, athlete_id=2)
+    name = _open_sets(client, 1)[0]["exercise_name"]
+    before = _open_sets(client, 2)
+
+    assert refresh_prescriptions(client, {name: 100.0}, exercise_names=[name], athlete_id=1) > 0
+    assert all(r["expected_weight"] for r in _open_sets(client, 1) if r["exercise_name"] == name)
+    assert _open_sets(client, 2) == before
+
+
+def test_delete_plan_removes_blocks_after_layout_switch(client, generator, full_plan, monkeypatch):
+    monkeypatch.setattr(session_blocks, "LAYOUT", "blocks")  # PLAN_SET_LAYOUT, read at import
+    generator.sync_plan_to_supabase(full_plan)
+    assert client.table("plan_session_blocks").select("id").execute().data
+
+    monkeypatch.setattr(session_blocks, "LAYOUT", "rows")
+    delete_plan(client, None)
+    assert client.table("plan_session_blocks").select("id").execute().data == []
@@ -0,0 +1,63 @@
+# tests/test_postgres_sync.py
+"""
+Migrations and the COPY sync against a real Postgres, configured with the DB_* variables
+of plan_generators.postgres_sync. Skipped unless DB_HOST is set and reachable, e.g.
+
+    docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=postgres postgres:16
+    DB_HOST=localhost DB_PASSWORD=postgres python -m pytest tests/test_postgres_sync.py
+"""
+import os
+
+import pytest
+
+from plan_generators.postgres_sync import _dsn_from_env, _wipe, sync_plan_to_postgres
+from storage import migrations
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+ATHLETE_ID = 990_001  # a plan namespace no real athlete uses; wiped before and after
+
+
+@pytest.fixture
+def pg_conn():
+    if not os.getenv("DB_HOST"):
+        pytest.skip("DB_HOST not set")
+    try:
+        conn = psycopg2.connect(**_dsn_from_env())
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres unavailable: {e}")
+    yield conn
+    conn.rollback()
+    with conn, conn.cursor() as cur:
+        _wipe(cur, ATHLETE_ID)
+    conn.close()
+
+
+def _plan_counts(conn):
+    with conn.cursor() as cur:
+        cur.execute("select id from plan_weeks where athlete_id = %s", (ATHLETE_ID,))
+        weeks = [r[0] for r in cur.fetchall()]
+        cur.execute("select count(*) from plan_days where week_id = any(%s)", (weeks,))
+        days = cur.fetchone()[0]
+        cur.execute("select count(*) from plan_sessions s join plan_days d on d.id = s.day_id "
+                    "where d.week_id = any(%s)", (weeks,))
+        sessions = cur.fetchone()[0]
+        cur.execute("select count(*) from plan_session_exercises e join plan_sessions s on s.id = e.session_id "
+                    "join plan_days d on d.id = s.day_id where d.week_id = any(%s)", (weeks,))
+        exercises = cur.fetchone()[0]
+    conn.rollback()
+    return {"weeks": len(weeks), "days": days, "sessions": sessions, "exercises": exercises}
+
+
+def test_migrate_then_copy_sync(pg_conn, generator, full_plan):
+    migrations.migrate(pg_conn, log=lambda message: None)
+    assert migrations.pending(pg_conn) == []
+    assert migrations.migrate(pg_conn, log=lambda message: None) == []  # idempotent
+
+    first = sync_plan_to_postgres(full_plan, generator.data, conn=pg_conn, athlete_id=ATHLETE_ID)
+    stored = _plan_counts(pg_conn)
+    assert stored == {key: first[key] for key in stored}
+
+    # A second sync replaces the plan instead of adding to it
+    sync_plan_to_postgres(full_plan, generator.data, conn=pg_conn, athlete_id=ATHLETE_ID)
+    assert _plan_counts(pg_conn) == stored
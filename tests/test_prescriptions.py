@@ -0,0 +1,62 @@
+# tests/test_prescriptions.py
+import random
+
+from plan_generators.crossfit_generator import CrossFitPlanGenerator
+from tests.conftest import START_DATE
+from utils.prescriptions import expected_weight, load_maxes_snapshot, main, refresh_prescriptions
+
+
+def _heavy_sets(plan):
+    return [
+        ex for week in plan.values() for day in week.values()
+        for ex in ((day.get("plan") or {}).get("Heavy") or {}).get("exercises", [])
+    ]
+
+
+def test_snapshot_keeps_the_latest_max_per_lift(client):
+    client.table("exercise_maxes").insert([
+        {"exercise_name": "Back Squat", "calculated_1rm": 100, "date": "2026-01-01"},
+        {"exercise_name": "Back Squat", "calculated_1rm": 110, "manual_1rm": 120, "date": "2026-02-01"},
+        {"exercise_name": "Snatch", "calculated_1rm": 60, "date": "2026-01-15"},
+        {"exercise_name": "Clean", "date": "2026-01-15"},  # nothing to prescribe from
+    ]).execute()
+
+    assert load_maxes_snapshot(client) == {"Back Squat": 120.0, "Snatch": 60.0}
+
+
+def test_expected_weight_rounds_to_the_plate_increment():
+    assert expected_weight(103, "77%") == "80"
+    assert expected_weight(103, "77%", increment=1) == "79"
+    assert expected_weight(103, "<60% 1RM") == ""
+    assert expected_weight(None, "70%") == ""
+
+
+def test_generation_prescribes_from_the_snapshot(client):
+    name = "Quads Heavy 0"
+    client.table("exercise_maxes").insert({"exercise_name": name, "calculated_1rm": 140, "date": "2026-01-01"}).execute()
+    random.seed(1)
+    plan = CrossFitPlanGenerator(client).generate_full_plan(START_DATE)
+
+    sets = [ex for ex in _heavy_sets(plan) if ex.get("name", ex.get("exercise_name")) == name]
+    assert sets
+    for ex in sets:
+        assert ex["expected_weight"] == expected_weight(140, ex["intensity"])
+
+
+def test_refresh_cli_skips_completed_sets(client, generator, full_plan, tmp_path, capsys):
+    generator.sync_plan_to_supabase(full_plan)
+    rows = client.table("plan_session_exercises").select("id, exercise_name, intensity, expected_weight").execute().data
+    name = next(r["exercise_name"] for r in rows if r["intensity"].endswith("%"))
+    lift = [r for r in rows if r["exercise_name"] == name and r["intensity"].endswith("%")]
+    client.table("plan_session_exercises").update({"completed": True, "expected_weight": "done"}).eq("id", lift[0]["id"]).execute()
+    client.table("exercise_maxes").insert({"exercise_name": name, "manual_1rm": 200, "date": "2026-03-01"}).execute()
+
+    assert main(["--exercise", name, "--sqlite-path", str(tmp_path / "plan.db")]) == 0  # the client fixture's file
+    assert capsys.readouterr().out == f"updated {len(lift) - 1} prescriptions\n"
+    assert refresh_prescriptions(client, exercise_names=[name]) == 0  # already current
+
+    stored = {r["id"]: r for r in client.table("plan_session_exercises").select("id, intensity, expected_weight")
+              .in_("id", [r["id"] for r in lift]).execute().data}
+    assert stored[lift[0]["id"]]["expected_weight"] == "done"
+    for row in lift[1:]:
+        assert stored[row["id"]]["expected_weight"] == expected_weight(200, row["intensity"])
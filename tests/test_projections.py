@@ -0,0 +1,41 @@
+# tests/test_projections.py
+from pathlib import Path
+
+from utils.projections import CATALOG, SESSION_SETS, Projection, catalog_table, find_star_selects, main
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_checker_flags_star_selects_on_large_tables():
+    source = "\n".join([
+        'rows = supabase.table("plan_sessions").select("*").eq("id", 1).execute()',
+        'rows = supabase.table("plan_days").select().execute()',
+        'rows = fetch_table(client, "md_exercises")',
+        'rows = supabase.table("md_categories").select("*").execute()',    # small table
+        'rows = supabase.table("plan_sessions").select("id, type").execute()',
+        'rows = fetch_table(client, "exercise_pool", columns="id")',
+    ])
+    assert sorted(find_star_selects(source)) == [
+        (1, "plan_sessions", 'select("*")'),
+        (2, "plan_days", 'select("*")'),
+        (3, "md_exercises", "fetch_table() without columns"),
+    ]
+
+
+def test_repository_has_no_star_selects(capsys):
+    assert main(["--check", str(REPO_ROOT)]) == 0
+    assert "no star selects" in capsys.readouterr().out
+
+
+def test_projected_reads_return_only_declared_columns(client, generator, full_plan):
+    generator.sync_plan_to_supabase(full_plan)
+
+    row = SESSION_SETS.query(client).order("id").limit(1).execute().data[0]
+    assert set(row) == set(SESSION_SETS.columns)
+    assert set(catalog_table(client, "exercise_pool")[0]) == set(CATALOG["exercise_pool"].columns)
+    assert set(catalog_table(client, "plan_weeks")[0]) >= {"id", "number", "athlete_id"}  # undeclared: every column
+
+
+def test_extend_appends_new_columns_only():
+    base = Projection("plan_sessions", ("id", "type"))
+    assert base.extend("type", "completed").select_list == "id,type,completed"
@@ -0,0 +1,54 @@
+# tests/test_results.py
+from utils.results import record_result, result_history, session_result, submit_result
+from utils.spans import count_queries, record_spans
+
+FRAN = 1
+
+
+def test_resubmitting_a_session_replaces_its_result(client):
+    record_result(client, 10, 1, {"time_min": 6.0}, rating=60, notes="scaled", benchmark_id=FRAN)
+    row = record_result(client, 10, 1, {"time_min": 5.5}, rating=70)
+
+    stored = client.table("wod_results").select("session_id, result_details, rating, notes, benchmark_id").execute().data
+    assert stored == [{"session_id": 10, "result_details": {"time_min": 5.5}, "rating": 70, "notes": "scaled",
+                       "benchmark_id": FRAN}]
+    assert row["result_details"] == {"time_min": 5.5}
+
+
+def test_cached_reads_are_refreshed_by_a_new_result(client):
+    counted = count_queries(client)
+    record_result(counted, 10, 1, {"rounds": 12}, benchmark_id=FRAN)
+
+    with record_spans() as rec:
+        assert session_result(counted, 10, 1)["result_details"] == {"rounds": 12}
+        assert session_result(counted, 10, 1)["result_details"] == {"rounds": 12}
+    assert rec.queries == 1
+
+    record_result(counted, 10, 1, {"rounds": 14})
+    assert session_result(counted, 10, 1)["result_details"] == {"rounds": 14}
+    assert session_result(counted, 11, 1) is None
+
+
+def test_history_pages_newest_first(client):
+    for session_id in range(1, 6):
+        record_result(client, session_id, 2, {"rounds": session_id}, benchmark_id=FRAN)
+    record_result(client, 99, 3, {"rounds": 40}, benchmark_id=FRAN)  # another athlete
+
+    first = result_history(client, FRAN, 2, page=0, page_size=3)
+    second = result_history(client, FRAN, 2, page=1, page_size=3)
+    assert [r["session_id"] for r in first["rows"]] == [5, 4, 3] and first["has_more"]
+    assert [r["session_id"] for r in second["rows"]] == [2, 1] and not second["has_more"]
+
+    record_result(client, 6, 2, {"rounds": 6}, benchmark_id=FRAN)
+    assert result_history(client, FRAN, 2, page=0, page_size=3)["rows"][0]["session_id"] == 6
+
+
+def test_submit_completes_the_session(client, generator, full_plan):
+    generator.sync_plan_to_supabase(full_plan)
+    row = client.table("plan_sessions").select("id, day_id").eq("type", "WOD").order("id").limit(1).execute().data[0]
+
+    submit_result(client, {"session_id": row["id"], "day_id": row["day_id"], "completed": False}, 1, {"rounds": 9},
+                  rating=80)
+
+    assert client.table("plan_sessions").select("completed").eq("id", row["id"]).execute().data[0]["completed"] is True
+    assert session_result(client, row["id"], 1)["rating"] == 80
@@ -0,0 +1,51 @@
+# tests/test_roster.py
+import json
+
+from plan_generators.roster import (
+    AthleteProfile, load_profiles, load_shared_catalog, rest_roster_sync, run_roster, summarize,
+)
+from tests.conftest import START_DATE
+from utils.plan_scope import plan_ids
+
+
+def test_profiles_load_from_csv_and_json(tmp_path):
+    csv_path = tmp_path / "roster.csv"
+    csv_path.write_text("athlete_id,start_date,equipment,seed,run_5k_minutes,name\n"
+                        "3,2026-01-05,barbell; rower,7,22.5,Ana\n"
+                        "4,2026-01-05,,,,\n")
+    json_path = tmp_path / "roster.json"
+    json_path.write_text(json.dumps([{"athlete_id": 5, "start_date": START_DATE, "maxes": {"Back Squat": 120}}]))
+
+    first, second = load_profiles(csv_path)
+    assert (first.athlete_id, first.equipment, first.seed, first.run_5k_minutes) == (3, ["barbell", "rower"], 7, 22.5)
+    assert (second.equipment, second.seed, second.name, second.skill) == (None, None, "", "Handstand Push-Up")
+    assert load_profiles(json_path) == [AthleteProfile(5, START_DATE, maxes={"Back Squat": 120})]
+
+
+def test_roster_syncs_one_plan_per_athlete(client):
+    data = load_shared_catalog(client)
+    profiles = [AthleteProfile(athlete_id, START_DATE, seed=athlete_id) for athlete_id in (11, 12, 13)]
+
+    results = run_roster(profiles, data, workers=2, sync=rest_roster_sync(client, data), keep_plans=True)
+
+    assert [r.athlete_id for r in results] == [11, 12, 13]
+    assert summarize(results)["ok"] == 3
+    for result in results:
+        assert result.sync["weeks"] == len(result.plan) == len(plan_ids(client, result.athlete_id).weeks)
+
+
+def test_sync_failures_are_reported_per_athlete(client):
+    data = load_shared_catalog(client)
+
+    def sync(profile, plan):
+        if profile.athlete_id == 2:
+            raise ConnectionError("pool exhausted")
+        return {"weeks": len(plan)}
+
+    results = run_roster([AthleteProfile(1, START_DATE, seed=1), AthleteProfile(2, START_DATE, seed=2)],
+                         data, workers=1, sync=sync)
+
+    summary = summarize(results)
+    assert (summary["ok"], summary["failed"]) == (1, 1)
+    assert summary["errors"] == {2: "sync failed: ConnectionError: pool exhausted"}
+    assert results[0].plan is None  # plans are dropped unless keep_plans
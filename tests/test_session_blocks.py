@@ -0,0 +1,63 @@
+# tests/test_session_blocks.py
+import pytest
+
+from utils import session_blocks
+from utils.day_progress import rebuild_day_progress
+from utils.prescriptions import refresh_prescriptions
+from utils.session_blocks import compact_rows, expand_blocks, fetch_block_sets, load_session_sets
+
+
+@pytest.fixture
+def synced_as_blocks(client, generator, full_plan, monkeypatch):
+    monkeypatch.setattr(session_blocks, "LAYOUT", "blocks")  # PLAN_SET_LAYOUT, read at import
+    generator.sync_plan_to_supabase(full_plan)
+    monkeypatch.setattr(session_blocks, "LAYOUT", "rows")  # switched back after the sync
+    return client.table("plan_sessions").select("id, day_id, type").eq("type", "Heavy").order("id").limit(1).execute().data[0]
+
+
+def test_compact_rows_round_trip():
+    rows = [
+        {"session_id": 1, "exercise_name": "Back Squat", "exercise_id": 7, "tempo": "20X0", "equipment": "Barbell",
+         "exercise_order": 1, "set_number": n, "reps": "5", "intensity": "70%", "completed": False}
+        for n in (1, 2, 3)
+    ]
+    blocks = compact_rows(rows)
+    assert len(blocks) == 1 and len(blocks[0]["sets"]) == 3
+
+    blocks[0]["id"] = 10
+    expanded = expand_blocks(blocks)
+    assert [r["id"] for r in expanded] == ["10:0", "10:1", "10:2"]
+    assert [r["set_number"] for r in expanded] == [1, 2, 3]
+    assert all(r["exercise_name"] == "Back Squat" for r in expanded)
+
+
+def test_block_sessions_stay_readable_after_layout_switch(client, synced_as_blocks):
+    session = synced_as_blocks
+    sets = load_session_sets(client, {"session_id": session["id"], "type": "Heavy"})
+
+    assert sets.compact and len(sets) > 0
+    assert len(fetch_block_sets(client, [session["id"]])) == len(sets)
+    progress = {row["day_id"]: row for row in rebuild_day_progress(client, [session["day_id"]])}
+    assert progress[session["day_id"]]["sets_total"] >= len(sets)
+
+
+def test_prescription_refresh_updates_blocks_after_layout_switch(client, synced_as_blocks):
+    sets = load_session_sets(client, {"session_id": synced_as_blocks["id"], "type": "Heavy"})
+    name = sets.rows[0]["exercise_name"]
+
+    assert refresh_prescriptions(client, {name: 100.0}, exercise_names=[name]) > 0
+    reloaded = load_session_sets(client, {"session_id": synced_as_blocks["id"], "type": "Heavy"})
+    assert reloaded.rows[0]["expected_weight"] == "40"  # 40% of 100 kg
+
+
+def test_rows_appended_to_a_block_session_are_read_with_it(client, synced_as_blocks):
+    session_id = synced_as_blocks["id"]
+    before = len(load_session_sets(client, {"session_id": session_id, "type": "Heavy"}))
+    client.table("plan_session_exercises").insert({
+        "session_id": session_id, "exercise_name": "Added Lift", "exercise_order": 99, "set_number": 1,
+        "reps": "3", "intensity": "80%", "completed": False,
+    }).execute()
+
+    sets = load_session_sets(client, {"session_id": session_id, "type": "Heavy"})
+    assert len(sets) == before + 1
+    assert sets.rows[-1]["exercise_name"] == "Added Lift"
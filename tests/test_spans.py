@@ -0,0 +1,64 @@
+# tests/test_spans.py
+from tests.conftest import START_DATE
+from utils.spans import annotate, count_queries, profile_call, record_spans, span, traced
+
+
+def test_nested_spans_are_reported_by_path():
+    @traced("pick")
+    def pick(pool):
+        annotate(pool=pool)
+
+    with record_spans() as rec:
+        with span("day"):
+            pick(3)
+            pick(8)
+        pick(1)
+
+    rows = {row["span"]: row for row in rec.rows()}
+    assert set(rows) == {"day", "day / pick", "pick"}
+    assert (rows["day / pick"]["calls"], rows["day / pick"]["pool"]) == (2, 8)  # largest value seen
+    assert rows["pick"]["pool"] == 1
+
+
+def test_queries_are_counted_against_open_spans(client):
+    counted = count_queries(client)
+    assert count_queries(counted) is counted
+
+    with record_spans() as rec:
+        with span("outer"):
+            counted.table("md_categories").select("id").eq("id", 1).execute()
+            with span("inner"):
+                counted.table("md_categories").select("id").execute()
+        counted.table("md_categories").select("id").execute()
+
+    rows = {row["span"]: row["queries"] for row in rec.rows()}
+    assert rows == {"outer": 2, "outer / inner": 1}
+    assert rec.queries == 3
+
+
+def test_spans_are_free_without_a_recorder():
+    with span("ignored"):
+        annotate(pool=5)
+    with record_spans() as rec:
+        pass
+    assert rec.rows() == []
+
+
+def test_generation_spans_attribute_queries_to_sections(generator):
+    with record_spans() as rec:
+        generator.generate_full_plan(START_DATE)
+
+    rows = {row["span"]: row for row in rec.rows()}
+    assert rows["generate_full_plan"]["calls"] == 1
+    assert rows["generate_full_plan / day / Warmup"]["pool"] > 0
+    # the catalog is preloaded; only the skill lookups reach the database
+    queried = {path for path, row in rows.items() if row["queries"] and path.count(" / ") == 2}
+    assert queried == {"generate_full_plan / day / Skill"}
+    assert rows["generate_full_plan"]["queries"] == rows["generate_full_plan / day / Skill"]["queries"]
+
+
+def test_profile_call_returns_result_and_report(tmp_path):
+    result, report = profile_call(sorted, [3, 1, 2], dump_path=str(tmp_path / "stats.prof"))
+    assert result == [1, 2, 3]
+    assert "function calls" in report
+    assert (tmp_path / "stats.prof").exists()
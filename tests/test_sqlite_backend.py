@@ -0,0 +1,74 @@
+# tests/test_sqlite_backend.py
+import pytest
+
+from storage import create_storage_client
+from storage.sqlite_backend import SQLiteClient, SQLiteRPCError
+
+
+@pytest.fixture
+def store(tmp_path):
+    client = SQLiteClient(str(tmp_path / "store.db"))
+    yield client
+    client.close()
+
+
+def test_json_and_boolean_columns_round_trip(store):
+    row = store.table("exercise_pool").insert({
+        "exercise": "Row", "equipment": ["rower"], "tags": {"zone": 2}, "is_unilateral": True,
+    }).execute().data[0]
+
+    stored = store.table("exercise_pool").select("exercise, equipment, tags, is_unilateral").eq("id", row["id"]).execute().data
+    assert stored == [{"exercise": "Row", "equipment": ["rower"], "tags": {"zone": 2}, "is_unilateral": True}]
+
+
+def test_filters_order_and_range(store):
+    store.table("plan_weeks").insert([
+        {"number": n, "athlete_id": (None if n <= 2 else 7)} for n in range(1, 7)
+    ]).execute()
+    weeks = store.table("plan_weeks")
+
+    assert [w["number"] for w in weeks.select("number").is_("athlete_id", "null").order("number").execute().data] == [1, 2]
+    assert [w["number"] for w in store.table("plan_weeks").select("number").in_("number", [2, 5]).order("number").execute().data] == [2, 5]
+    assert [w["number"] for w in store.table("plan_weeks").select("number").gt("number", 4).order("number", desc=True).execute().data] == [6, 5]
+    page = store.table("plan_weeks").select("number").order("number").range(2, 3).execute().data
+    assert [w["number"] for w in page] == [3, 4]
+    assert len(store.table("plan_weeks").select("id").limit(4).execute().data) == 4
+
+
+def test_upsert_update_and_delete(store):
+    store.table("plan_day_progress").upsert({"day_id": 1, "sets_total": 3}, on_conflict="day_id").execute()
+    store.table("plan_day_progress").upsert({"day_id": 1, "sets_total": 5}, on_conflict="day_id").execute()
+    assert store.table("plan_day_progress").select("day_id, sets_total").execute().data == [{"day_id": 1, "sets_total": 5}]
+
+    store.table("plan_day_progress").update({"sets_completed": 2}).eq("day_id", 1).execute()
+    assert store.table("plan_day_progress").select("sets_completed").eq("day_id", 1).execute().data[0]["sets_completed"] == 2
+
+    store.table("plan_day_progress").delete().eq("day_id", 1).execute()
+    assert store.table("plan_day_progress").select("day_id").execute().data == []
+
+
+def test_unknown_rpc_fails_like_a_missing_function(store):
+    with pytest.raises(SQLiteRPCError) as error:
+        store.rpc("no_such_function", {}).execute()
+    assert error.value.code == "PGRST202"
+
+
+def test_data_persists_across_clients(tmp_path):
+    path = str(tmp_path / "app.db")
+    first = create_storage_client("sqlite", path=path)
+    first.table("md_muscle_groups").insert({"name": "Back"}).execute()
+    first.close()
+
+    second = create_storage_client("sqlite", path=path)
+    try:
+        assert second.table("md_muscle_groups").select("name").execute().data == [{"name": "Back"}]
+    finally:
+        second.close()
+
+
+def test_generated_plan_syncs_into_sqlite(client, generator, full_plan):
+    generator.sync_plan_to_supabase(full_plan)
+
+    weeks = client.table("plan_weeks").select("id, number").order("number").execute().data
+    assert [w["number"] for w in weeks] == list(range(1, len(full_plan) + 1))
+    assert generator.plan_exists(next(iter(full_plan["Week 1"].values()))["date"])
@@ -0,0 +1,57 @@
+# tests/test_startup.py
+import sys
+
+import pytest
+
+import session_views
+import storage
+from utils import startup_profiler
+from utils.startup_profiler import measure_cold_imports, timed_import, top_records
+
+
+def test_importing_session_views_loads_no_view():
+    imported = {r["module"] for r in measure_cold_imports(["session_views"])}
+
+    assert "session_views" in imported
+    assert not imported & set(session_views.VIEW_MODULES.values())
+    assert "streamlit" not in imported and "pandas" not in imported
+
+
+def test_cold_import_failures_are_reported():
+    with pytest.raises(RuntimeError, match="no_such_module"):
+        measure_cold_imports(["no_such_module"])
+
+
+def test_timed_import_records_the_first_load_only(tmp_path, monkeypatch):
+    (tmp_path / "slow_view.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(startup_profiler, "IMPORT_TIMES", {})
+    monkeypatch.delitem(sys.modules, "slow_view", raising=False)
+
+    module = timed_import("slow_view")
+    assert module.VALUE == 1 and set(startup_profiler.IMPORT_TIMES) == {"slow_view"}
+
+    startup_profiler.IMPORT_TIMES.clear()
+    assert timed_import("slow_view") is module
+    assert startup_profiler.IMPORT_TIMES == {}
+
+
+def test_unknown_session_type_has_no_view():
+    with pytest.raises(KeyError):
+        session_views.load_view("Yoga")
+
+
+def test_lazy_client_resolves_on_first_query(client, monkeypatch):
+    handle = storage.lazy_client()
+    monkeypatch.setattr(storage, "_client", None)
+    monkeypatch.setattr(storage, "create_storage_client", lambda: client)
+
+    assert storage._client is None  # creating the handle builds nothing
+    assert handle.table("md_categories").select("name").eq("id", 1).execute().data == [{"name": "Heavy"}]
+    assert storage._client is client
+
+
+def test_top_records_sorts_by_the_chosen_column():
+    records = [{"module": "a", "self_ms": 1.0, "cumulative_ms": 9.0}, {"module": "b", "self_ms": 5.0, "cumulative_ms": 6.0}]
+    assert [r["module"] for r in top_records(records, 1)] == ["b"]
+    assert [r["module"] for r in top_records(records, 2, "cumulative_ms")] == ["a", "b"]
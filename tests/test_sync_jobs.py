@@ -0,0 +1,71 @@
+# tests/test_sync_jobs.py
+import threading
+
+import pytest
+
+from plan_generators import sync_jobs
+from plan_generators.sync_jobs import SyncJobConflict, active_job, get_job, plan_totals, submit, submit_sync
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry(monkeypatch):
+    monkeypatch.setattr(sync_jobs, "_jobs", {})
+    monkeypatch.setattr(sync_jobs, "_active", {})
+
+
+def _blocked(release: threading.Event, started: threading.Event = None):
+    def run(job):
+        if started:
+            started.set()
+        release.wait(5)
+        job.advance("plan_weeks", 1)  # raises SyncCancelled once cancel() was called
+        return {"weeks": 1}
+    return run
+
+
+def test_background_sync_reports_every_level(client, generator, full_plan):
+    job = submit_sync(generator, "rest", full_plan)
+    assert job.wait(30)
+
+    snapshot = get_job(job.job_id).snapshot()
+    assert snapshot["state"] == "done" and snapshot["fraction"] == 1.0
+    levels = {level["table"]: level for level in snapshot["levels"]}
+    assert {t: level["written"] for t, level in levels.items()} == {t: n for t, n in plan_totals(full_plan, generator.data).items() if n}
+    assert snapshot["result"]["weeks"] == len(full_plan)
+    assert active_job() is None
+
+
+def test_one_active_job_per_plan():
+    release = threading.Event()
+    first = submit("rest", _blocked(release), plan_key="athlete:1")
+    try:
+        with pytest.raises(SyncJobConflict) as conflict:
+            submit("rest", _blocked(release), plan_key="athlete:1")
+        assert conflict.value.job is first
+        other = submit("rest", _blocked(release), plan_key="athlete:2")
+    finally:
+        release.set()
+    assert first.wait(5) and other.wait(5)
+    assert submit("rest", lambda job: None, plan_key="athlete:1").wait(5)  # free again once finished
+
+
+def test_cancel_stops_before_the_next_write():
+    release, started = threading.Event(), threading.Event()
+    job = submit("resumable", _blocked(release, started))
+    started.wait(5)
+
+    job.cancel()
+    assert job.snapshot()["state"] == "cancelling"
+    release.set()
+    assert job.wait(5)
+    assert job.snapshot()["state"] == "cancelled"
+    assert job.result is None and job.error is None
+
+
+def test_failures_are_kept_on_the_job():
+    def run(job):
+        raise ValueError("bad plan")
+
+    job = submit("rest", run)
+    assert job.wait(5)
+    assert (job.state, job.error) == ("failed", "ValueError: bad plan")
@@ -0,0 +1,114 @@
+# tests/test_sync_journal.py
+import json
+
+import pytest
+
+from plan_generators import sync_journal
+from utils import session_blocks
+
+PLAN_TABLES = ("plan_weeks", "plan_days", "plan_sessions", "plan_session_exercises", "plan_session_blocks")
+
+
+def _counts(client):
+    return {table: len(client.table(table).select("id").execute().data) for table in PLAN_TABLES}
+
+
+class FlakyInserts:
+    """
+    Client wrapper for inserts. Call numbers in `lose` commit but lose their response;
+    from call `fail_from` on, inserts fail before reaching the database.
+    """
+
+    def __init__(self, client, lose=(), fail_from=None):
+        self._client = client
+        self._lose = set(lose)
+        self._fail_from = fail_from
+        self.inserts = 0
+
+    def table(self, name):
+        wrapper, query = self, self._client.table(name)
+
+        class Query:
+            def insert(self, rows):
+                inner = query.insert(rows)
+
+                class Insert:
+                    def execute(self):
+                        wrapper.inserts += 1
+                        if wrapper._fail_from is not None and wrapper.inserts >= wrapper._fail_from:
+                            raise ConnectionError("connection refused")
+                        response = inner.execute()
+                        if wrapper.inserts in wrapper._lose:
+                            raise ConnectionError("response lost")
+                        return response
+                return Insert()
+
+            def __getattr__(self, attr):
+                return getattr(query, attr)
+        return Query()
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    monkeypatch.setattr(sync_journal.time, "sleep", lambda seconds: None)
+
+
+def _sync(client, plan, data, path, **options):
+    return sync_journal.resumable_sync_plan_to_supabase(client, plan, data, journal_path=path, chunk_size=100, **options)
+
+
+def test_resumable_retry_after_lost_response_does_not_duplicate(client, generator, full_plan, tmp_path):
+    _sync(client, full_plan, generator.data, tmp_path / "a.json")
+    expected = _counts(client)
+
+    lossy = FlakyInserts(client, lose={3, 9})
+    _sync(lossy, full_plan, generator.data, tmp_path / "b.json")
+
+    assert lossy.inserts > 9
+    assert _counts(client) == expected
+
+
+def test_interrupted_sync_resumes_from_its_checkpoint(client, generator, full_plan, tmp_path):
+    _sync(client, full_plan, generator.data, tmp_path / "fresh.json")
+    expected = _counts(client)
+    path = tmp_path / "plan.json"
+
+    with pytest.raises(ConnectionError):
+        _sync(FlakyInserts(client, fail_from=5), full_plan, generator.data, path, retries=0)
+    assert sync_journal.has_pending_sync(path)
+
+    summary = sync_journal.resume_sync(client, generator.data, journal_path=path, chunk_size=100)
+    assert summary["resumed"] is True
+    assert _counts(client) == expected
+    assert not sync_journal.has_pending_sync(path)
+
+
+def test_checkpoint_from_the_other_layout_starts_over(client, generator, full_plan, tmp_path, monkeypatch):
+    path = tmp_path / "plan.json"
+    monkeypatch.setattr(session_blocks, "LAYOUT", "blocks")  # PLAN_SET_LAYOUT, read at import
+    with pytest.raises(ConnectionError):
+        _sync(FlakyInserts(client, fail_from=8), full_plan, generator.data, path, retries=0)
+    assert json.loads(path.read_text())["layout"] == "blocks"
+
+    monkeypatch.setattr(session_blocks, "LAYOUT", "rows")
+    summary = _sync(client, full_plan, generator.data, path)
+
+    assert summary["resumed"] is False
+    counts = _counts(client)
+    assert counts["plan_session_blocks"] == 0
+    assert counts["plan_session_exercises"] == summary["exercises"]
+    assert counts["plan_weeks"] == summary["weeks"]
+
+
+def test_resume_sync_restarts_a_checkpoint_from_the_other_layout(client, generator, full_plan, tmp_path, monkeypatch):
+    path = tmp_path / "plan.json"
+    with pytest.raises(ConnectionError):
+        _sync(FlakyInserts(client, fail_from=8), full_plan, generator.data, path, retries=0)
+
+    monkeypatch.setattr(session_blocks, "LAYOUT", "blocks")
+    summary = sync_journal.resume_sync(client, generator.data, journal_path=path, chunk_size=100)
+
+    assert summary["resumed"] is False
+    counts = _counts(client)
+    assert counts["plan_session_blocks"] == summary["blocks"] > 0
+    assert counts["plan_session_exercises"] == summary["exercises"]
@@ -0,0 +1,53 @@
+# tests/test_wod_spec.py
+import copy
+
+from plan_generators.crossfit_generator import UpdateScope
+from tests.conftest import START_DATE
+
+
+def _wod_days(plan):
+    return [day for week in plan.values() for day in week.values() if "WOD" in (day.get("plan") or {})]
+
+
+def test_spec_describes_the_clock_and_targets(generator):
+    wods = generator.wod_gen
+    movements = [{"name": "Burpee", "exercise_id": 4, "reps": 10}, {"name": "Row", "exercise_id": 9, "reps": 250, "unit": "meters"}]
+
+    tabata = wods.wod_spec("Tabata", 4, movements)
+    assert (tabata["rounds"], tabata["cap_seconds"]) == (8, 8 * 30 * 2)
+    assert [p["seconds"] for p in tabata["phases"]] == [20, 10]
+    assert tabata["movements"][1] == {"name": "Row", "exercise_id": 9, "qty": 250, "unit": "meters"}
+
+    interval = wods.wod_spec("Interval", 15, movements, work_min=3, rest_min=2)
+    assert [p["seconds"] for p in interval["phases"]] == [180, 120]
+    assert wods.wod_spec("For Time", 12, movements)["phases"] == []
+    assert wods._target_value("5-6 rounds") == 5.5 and wods._target_value("Finish") is None
+
+
+def test_sync_stores_the_generated_spec(client, generator, full_plan):
+    generator.sync_plan_to_supabase(full_plan)
+
+    for day in _wod_days(full_plan):
+        stored_day = client.table("plan_days").select("id").eq("date", day["date"]).execute().data[0]
+        session = client.table("plan_sessions").select("wod_spec").eq("day_id", stored_day["id"]).eq("type", "WOD") \
+            .execute().data[0]
+        assert session["wod_spec"] == day["plan"]["WOD"]["spec"]
+        assert session["wod_spec"]["movements"]
+
+
+def test_merge_rewrites_wod_spec(client, generator):
+    patch = generator.generate_partial_plan(START_DATE, UpdateScope(weeks={1}, sections={"WOD"}))
+    generator.sync_partial_plan_to_supabase(patch, START_DATE)
+
+    day = _wod_days(patch)[0]
+    changed = copy.deepcopy(patch)
+    wod = next(d for d in changed["Week 1"].values() if d["date"] == day["date"])["plan"]["WOD"]
+    wod["details"] = "20 Min AMRAP"
+    wod["spec"] = {**(wod.get("spec") or {}), "type": "AMRAP"}
+    generator.sync_partial_plan_to_supabase(changed, START_DATE)
+
+    stored = client.table("plan_days").select("id").eq("date", day["date"]).execute().data[0]
+    session = client.table("plan_sessions").select("details, wod_spec").eq("day_id", stored["id"]).eq("type", "WOD").execute().data
+    assert len(session) == 1
+    assert session[0]["details"] == "20 Min AMRAP"
+    assert session[0]["wod_spec"]["type"] == "AMRAP"
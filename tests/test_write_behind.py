@@ -0,0 +1,104 @@
+# tests/test_write_behind.py
+from utils.day_progress import fetch_progress, increment_progress, mark_session, mark_sets
+from utils.write_behind import WriteBehindQueue
+
+
+def _heavy_session(client):
+    session = client.table("plan_sessions").select("id, day_id").eq("type", "Heavy").order("id").limit(1).execute().data[0]
+    sets = client.table("plan_session_exercises").select("id").eq("session_id", session["id"]).order("id").execute().data
+    return session, sets
+
+
+def _counts(row):
+    return {col: value for col, value in row.items() if col != "updated_at"}
+
+
+def test_spill_recovery_after_crash_mid_flush_does_not_double_count(client, generator, full_plan, tmp_path):
+    generator.sync_plan_to_supabase(full_plan)
+    session, sets = _heavy_session(client)
+    spill = tmp_path / "session_1.jsonl"
+
+    queue = WriteBehindQueue(client, spill, autostart=False)
+    for row in sets[:3]:
+        queue.update("plan_session_exercises", row["id"], {"completed": True})
+    mark_sets(queue, session["day_id"], 3)
+    mark_session(queue, {"session_id": session["id"], "day_id": session["day_id"], "completed": False})
+    queue._rewrite_spill = lambda: None  # the process dies after applying, before rewriting the spill
+    queue.flush()
+    after_crash = _counts(fetch_progress(client, [session["day_id"]])[session["day_id"]])
+
+    recovered = WriteBehindQueue(client, spill, autostart=False)
+    recovered.flush()
+
+    progress = _counts(fetch_progress(client, [session["day_id"]])[session["day_id"]])
+    assert progress == after_crash
+    assert progress["sets_completed"] == 3
+    assert progress["sessions_completed"] == 1
+    assert not spill.exists()
+
+
+def test_spill_recovery_applies_unflushed_edits(client, generator, full_plan, tmp_path):
+    generator.sync_plan_to_supabase(full_plan)
+    session, sets = _heavy_session(client)
+    spill = tmp_path / "session_1.jsonl"
+
+    queue = WriteBehindQueue(client, spill, autostart=False)
+    queue.update("plan_session_exercises", sets[0]["id"], {"completed": True})
+    mark_sets(queue, session["day_id"], 1)  # never flushed: the process dies here
+
+    WriteBehindQueue(client, spill, autostart=False).flush()
+    assert fetch_progress(client, [session["day_id"]])[session["day_id"]]["sets_completed"] == 1
+
+
+def test_increment_progress_is_floored_at_zero(client, generator, full_plan):
+    generator.sync_plan_to_supabase(full_plan)
+    day_id = client.table("plan_days").select("id").order("id").limit(1).execute().data[0]["id"]
+
+    row = increment_progress(client, day_id, {"sets_completed": 2})
+    assert row["sets_completed"] == 2
+    assert increment_progress(client, day_id, {"sets_completed": -5})["sets_completed"] == 0
+    assert increment_progress(client, 10 ** 9, {"sets_completed": 1}) is None
+
+
+class _CountingClient:
+    """Counts update() calls per table so coalescing and batching are observable."""
+
+    def __init__(self, client):
+        self._client = client
+        self.updates = []
+
+    def table(self, name):
+        query = self._client.table(name)
+        update = query.update
+
+        def counted(values):
+            self.updates.append((name, dict(values)))
+            return update(values)
+
+        query.update = counted
+        return query
+
+    def rpc(self, name, params=None):
+        return self._client.rpc(name, params)
+
+
+def test_repeated_edits_are_coalesced_and_batched(client, generator, full_plan, tmp_path):
+    generator.sync_plan_to_supabase(full_plan)
+    session, sets = _heavy_session(client)
+    counting = _CountingClient(client)
+
+    queue = WriteBehindQueue(counting, tmp_path / "session_1.jsonl", autostart=False)
+    queue.update("plan_session_exercises", sets[0]["id"], {"actual_weight": "60"})
+    queue.update("plan_session_exercises", sets[0]["id"], {"actual_weight": "65", "completed": True})
+    queue.update("plan_session_exercises", sets[1]["id"], {"actual_weight": "65", "completed": True})
+    assert len(queue) == 2
+
+    reread = client.table("plan_session_exercises").select("id, completed").in_("id", [sets[0]["id"]]).execute().data
+    assert queue.overlay("plan_session_exercises", reread)[0]["completed"] is True
+
+    assert queue.flush() == 2
+    assert counting.updates == [("plan_session_exercises", {"actual_weight": "65", "completed": True})]
+    stored = client.table("plan_session_exercises").select("actual_weight, completed") \
+        .in_("id", [sets[0]["id"], sets[1]["id"]]).execute().data
+    assert stored == [{"actual_weight": "65", "completed": True}] * 2
+    assert len(queue) == 0
@@ -0,0 +1,201 @@
+# utils/cache_bus.py
+"""
+In-process cache invalidation bus.
+
+Writers publish (table, key) events after a write lands; cached readers declare
+which (table, key) pairs each cached entry depends on, and only those entries are
+evicted. That keeps long TTLs safe: the TTL is just a backstop for writes made by
+other processes.
+
+    @bus_cached(ttl=3600, tables=["plan_session_exercises"],
+                tags=lambda rows, session_id: [("plan_session_exercises", r["id"]) for r in rows])
+    def fetch_exercises(session_id): ...
+
+    publish("plan_session_exercises", 42)   # evicts entries tagged with row 42
+    publish("plan_session_exercises")       # key=None: evicts every entry of readers of the table
+
+A reader tag with key None depends on the whole table and is evicted by any event
+on it. A read that overlaps an event is only left uncached when the event touches
+that read's own tags (or is table-wide on its tables); frequent unrelated writes,
+such as write-behind flushes, leave other readers cached. Streamlit's st.cache_data can only be cleared per function, hence the
+small cache here; like st.cache_data it is shared by all sessions in the process
+and hands out copies.
+"""
+import copy
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+Tag = Tuple[str, Optional[Hashable]]
+
+PLAN_TABLES = (
+    "plan_weeks", "plan_days", "plan_sessions", "plan_session_exercises", "plan_session_blocks", "plan_day_progress",
+)
+
+_lock = threading.RLock()
+_caches: Dict[Tuple[str, str, str], "BusCache"] = {}
+_subscribers: List[Callable[[str, Optional[Hashable]], None]] = []
+
+
+def publish(table: str, key: Optional[Hashable] = None) -> None:
+    """Announce that rows of table (or the row identified by key) changed."""
+    with _lock:
+        caches = list(_caches.values())
+        subscribers = list(_subscribers)
+    for cache in caches:
+        cache.invalidate(table, key)
+    for callback in subscribers:
+        callback(table, key)
+
+
+def publish_many(table: str, keys: Iterable[Hashable]) -> None:
+    for key in keys:
+        publish(table, key)
+
+
+def publish_plan_rewrite() -> None:
+    """A sync rewrote plan rows: drop everything cached from the plan tables."""
+    for table in PLAN_TABLES:
+        publish(table)
+
+
+def subscribe(callback: Callable[[str, Optional[Hashable]], None]) -> Callable[[], None]:
+    """Call callback(table, key) on every event. Returns an unsubscribe function."""
+    with _lock:
+        _subscribers.append(callback)
+
+    def unsubscribe():
+        with _lock:
+            if callback in _subscribers:
+                _subscribers.remove(callback)
+
+    return unsubscribe
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class BusCache:
+    """TTL cache for one function whose entries are evicted by bus events."""
+
+    def __init__(self, func: Callable, ttl: float, tables: Iterable[str],
+                 tags: Optional[Callable[..., Iterable[Tag]]], max_entries: int):
+        self.func = func
+        self.ttl = ttl
+        self.tables = set(tables)
+        self.tags = tags
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any, Set[Tag]]] = {}
+        self._by_tag: Dict[Tag, Set[Hashable]] = {}
+        self._by_table: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.RLock()
+        # Events seen while reads are in flight, so a read racing a write to *its* rows is not
+        # cached; events on anything else leave it cacheable
+        self._seq = 0
+        self._inflight = 0
+        self._events: List[Tuple[int, str, Optional[Hashable]]] = []
+        self.hits = self.misses = self.evictions = 0
+        functools.update_wrapper(self, func)
+
+    def __call__(self, *args, **kwargs):
+        key = (_freeze(args), _freeze(kwargs))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+            started = self._seq
+            self._inflight += 1
+
+        try:
+            result = self.func(*args, **kwargs)
+            entry_tags = set(self.tags(result, *args, **kwargs)) if self.tags else set()
+        finally:
+            with self._lock:
+                self._inflight -= 1
+        with self._lock:
+            stale = self._raced(started, entry_tags)
+            if not self._inflight:
+                self._events.clear()
+            if stale:
+                return copy.deepcopy(result)
+            self._drop(key)
+            if len(self._entries) >= self.max_entries:
+                self._drop(min(self._entries, key=lambda k: self._entries[k][0]))
+            self._entries[key] = (now + self.ttl, result, entry_tags)
+            for tag in entry_tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+                self._by_table.setdefault(tag[0], set()).add(key)
+        return copy.deepcopy(result)
+
+    def _affects(self, table: str, key: Optional[Hashable], entry_tags: Set[Tag]) -> bool:
+        if key is None:
+            return table in self.tables or any(tag[0] == table for tag in entry_tags)
+        return (table, key) in entry_tags or (table, None) in entry_tags
+
+    def _raced(self, started: int, entry_tags: Set[Tag]) -> bool:
+        """True if an event after `started` touched what the entry depends on."""
+        return any(seq > started and self._affects(table, key, entry_tags) for seq, table, key in self._events)
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if not entry:
+            return
+        for tag in entry[2]:
+            self._by_tag.get(tag, set()).discard(key)
+            self._by_table.get(tag[0], set()).discard(key)
+
+    def invalidate(self, table: str, key: Optional[Hashable] = None) -> int:
+        """Evict entries affected by an event; returns how many were dropped."""
+        with self._lock:
+            self._seq += 1
+            if self._inflight:
+                self._events.append((self._seq, table, key))
+            if key is None:
+                victims = set(self._entries) if table in self.tables else set(self._by_table.get(table, ()))
+            else:
+                victims = self._by_tag.get((table, key), set()) | self._by_tag.get((table, None), set())
+            for cache_key in list(victims):
+                self._drop(cache_key)
+            self.evictions += len(victims)
+            return len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+            self._by_table.clear()
+
+
+def bus_cached(ttl: float = 3600, tables: Iterable[str] = (), tags: Optional[Callable[..., Iterable[Tag]]] = None,
+               max_entries: int = 512):
+    """
+    Cache a reader until its TTL expires or a bus event touches one of its tags.
+      - tables: tables the reader queries; a table-wide event on any of them clears the cache
+      - tags(result, *args, **kwargs) -> iterable of (table, key) the entry depends on
+      - arguments may be lists/dicts; they are frozen into the cache key
+      - the returned object exposes clear() and hit/miss/eviction counters
+    """
+    def decorator(func):
+        # Streamlit re-executes page scripts on every rerun; reuse the cache created
+        # for the same function on earlier runs instead of starting an empty one.
+        ident = (func.__module__, func.__qualname__, func.__code__.co_filename)
+        with _lock:
+            cache = _caches.get(ident)
+            if cache is None:
+                cache = _caches[ident] = BusCache(func, ttl, tables, tags, max_entries)
+            else:
+                cache.func, cache.ttl, cache.tags, cache.max_entries = func, ttl, tags, max_entries
+                cache.tables = set(tables)
+        return cache
+    return decorator
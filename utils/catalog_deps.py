@@ -0,0 +1,151 @@
+# utils/catalog_deps.py
+"""
+Catalog dependencies of stored sessions, so a catalog change only touches the sessions
+built from the rows that changed.
+
+    refs = session_refs(session, data)           # ["exercise_pool:40", "md_exercises:12"]
+    prints = fingerprints(data)                  # ref -> hash of what generation reads from the row
+    changes = diff_fingerprints(old, prints)     # ref -> "changed" | "retired"
+    sessions = sessions_using(client, changes)   # plan_sessions rows that depend on them
+
+  - Generation records, per session, the catalog rows its exercises came from
+    (plan_sessions.catalog_refs, written by every sync backend through _session_row).
+    Refs are "<table>:<id>" for md_exercises and exercise_pool, matched by exercise name.
+  - Only CATALOG_SECTIONS are tracked: the sections whose exercises the generators pick
+    from those tables (Run, Benchmark and Skill content comes from elsewhere).
+  - An md_exercises fingerprint covers its name, equipment and its muscle-group / category
+    mappings, so renames, retirements and remaps all show up as a change of that row;
+    rows that only appear in the new catalog affect no stored session.
+  - sessions_using() is one lookup per changed ref against the GIN index on catalog_refs
+    (migrations/0005_catalog_refs.sql): the cost follows the change, not the stored plans.
+
+Postgres / Supabase (migrations/0005_catalog_refs.sql):
+    alter table plan_sessions add column if not exists catalog_refs jsonb not null default '[]'::jsonb;
+    create index ix_plan_sessions_catalog_refs on plan_sessions using gin (catalog_refs jsonb_path_ops);
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.pagination import fetch_all
+from utils.projections import CATALOG
+
+CATALOG_SECTIONS = ("Warmup", "Heavy", "Olympic", "WOD", "Light", "Cooldown")
+
+CHANGED, RETIRED = "changed", "retired"
+
+_index_cache: Dict[int, Tuple[Dict[str, Any], Dict[str, List[str]]]] = {}
+
+
+def ref(table: str, row_id: Any) -> str:
+    return f"{table}:{row_id}"
+
+
+def parse_ref(value: str) -> Tuple[str, int]:
+    table, _, row_id = value.partition(":")
+    return table, int(row_id)
+
+
+# ---------- GENERATION SIDE ----------
+def _refs_by_name(data: Dict[str, Any]) -> Dict[str, List[str]]:
+    """exercise name (lowercase) -> refs of the catalog rows with that name (built once per catalog)."""
+    cached = _index_cache.get(id(data))
+    if cached is not None and cached[0] is data:
+        return cached[1]
+    index: Dict[str, List[str]] = {}
+    for row in data.get("exercises") or []:
+        if row.get("name"):
+            index.setdefault(row["name"].strip().lower(), []).append(ref("md_exercises", row["id"]))
+    for row in data.get("exercise_pool") or []:
+        if row.get("exercise"):
+            index.setdefault(row["exercise"].strip().lower(), []).append(ref("exercise_pool", row["id"]))
+    _index_cache.clear()  # one catalog at a time is the common case; keep the cache from growing
+    _index_cache[id(data)] = (data, index)
+    return index
+
+
+def session_refs(session: Dict[str, Any], data: Dict[str, Any]) -> List[str]:
+    """Sorted refs of the catalog rows behind a generated session's exercises."""
+    index = _refs_by_name(data)
+    refs = set()
+    for ex in session.get("exercises") or []:
+        if not isinstance(ex, dict):
+            continue
+        name = ex.get("name") or ex.get("exercise_name") or ex.get("exercise")
+        if name:
+            refs.update(index.get(str(name).strip().lower(), ()))
+    return sorted(refs)
+
+
+def tag_plan(daily_plan: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Record catalog_refs on the tracked sections of one generated day (in place)."""
+    for section, session in daily_plan.items():
+        if section in CATALOG_SECTIONS and isinstance(session, dict):
+            session["catalog_refs"] = session_refs(session, data)
+    return daily_plan
+
+
+# ---------- CHANGE DETECTION ----------
+def _digest(value: Any) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def fingerprints(data: Dict[str, Any]) -> Dict[str, str]:
+    """ref -> hash of the columns (and, for md_exercises, the mappings) generation reads."""
+    muscles: Dict[Any, List[Any]] = {}
+    for m in data.get("mappings") or []:
+        muscles.setdefault(m.get("exercise_id"), []).append(m.get("musclegroup_id"))
+    categories: Dict[Any, List[Any]] = {}
+    for m in data.get("category_mappings") or []:
+        categories.setdefault(m.get("exercise_id"), []).append(m.get("category_id"))
+
+    prints = {}
+    for row in data.get("exercises") or []:
+        prints[ref("md_exercises", row["id"])] = _digest({
+            **{c: row.get(c) for c in CATALOG["md_exercises"].columns if c != "id"},
+            "muscle_groups": sorted(muscles.get(row["id"], []), key=str),
+            "categories": sorted(categories.get(row["id"], []), key=str),
+        })
+    for row in data.get("exercise_pool") or []:
+        prints[ref("exercise_pool", row["id"])] = _digest(
+            {c: row.get(c) for c in CATALOG["exercise_pool"].columns if c != "id"}
+        )
+    return prints
+
+
+def diff_fingerprints(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, str]:
+    """Refs whose row changed or disappeared between two catalog versions."""
+    changes = {r: RETIRED for r in old if r not in new}
+    changes.update({r: CHANGED for r, digest in new.items() if r in old and old[r] != digest})
+    return changes
+
+
+def sessions_using(client, refs: Iterable[str], columns: str = "id, day_id, type, completed") -> List[Dict[str, Any]]:
+    """plan_sessions rows (any plan) whose catalog_refs include one of refs; one indexed lookup per ref."""
+    found: Dict[Any, Dict[str, Any]] = {}
+    for value in sorted(set(refs)):
+        rows = fetch_all(
+            lambda: client.table("plan_sessions").select(columns).contains("catalog_refs", [value]).order("id"),
+            source="plan_sessions",
+        )
+        for row in rows:
+            found.setdefault(row["id"], row)
+    return [found[k] for k in sorted(found)]
+
+
+def load_fingerprints(path) -> Optional[Dict[str, str]]:
+    """The catalog version recorded by the last refresh (None before the first one)."""
+    try:
+        with open(path, encoding="utf-8") as fp:
+            return json.load(fp).get("fingerprints")
+    except FileNotFoundError:
+        return None
+
+
+def save_fingerprints(path, prints: Dict[str, str]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"fingerprints": prints}, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
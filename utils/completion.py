@@ -0,0 +1,115 @@
+# utils/completion.py
+"""
+Bulk completion for a plan session: tick / untick any set of its exercise rows and
+set the session's completed flag in one call, getting the new counts back.
+
+    result = set_completion(client, session, exercises, {12: True, 13: True}, complete_session=None)
+    result["sets_completed"], result["sets_total"], result["session_completed"], result["day"]
+
+  - With complete_session_exercises deployed (migrations/0004_complete_session_exercises.sql),
+    the whole change is one RPC.
+  - Otherwise (SQLite, or the function not deployed yet) it is at most one update per
+    distinct value on plan_session_exercises, one on plan_sessions and one atomic
+    increment on plan_day_progress (utils.day_progress.increment_progress). Only a
+    missing function falls back (utils.rpc); other RPC errors are raised.
+  - `exercises` are the session's rows as the view loaded them; they are updated in
+    place, so the view can redraw without refetching.
+  - Guided sessions (warmup / cooldown) tick rows one at a time with tick_exercise(),
+    which goes through the session's write-behind queue (utils.write_behind) so every
+    tick is spilled to disk as it happens; set_completion is left to set the final
+    session flag.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.cache_bus import publish, publish_many
+from utils.day_progress import TABLE as DAY_PROGRESS_TABLE, increment_progress, mark_sets
+from utils.rpc import NOT_DEPLOYED, call_rpc
+
+RPC_NAME = "complete_session_exercises"
+
+
+def _call_rpc(client, session_id: int, done: List[int], undone: List[int],
+              session_completed: Optional[bool]) -> Optional[Dict[str, Any]]:
+    """The RPC's result, or None when the function is not deployed (other errors are raised)."""
+    result = call_rpc(client, RPC_NAME, {
+        "p_session_id": session_id,
+        "p_done_ids": done,
+        "p_undone_ids": undone,
+        "p_session_completed": session_completed,
+    })
+    if result is NOT_DEPLOYED:
+        return None
+    return result[0] if isinstance(result, list) else result
+
+
+def set_completion(client, session: Dict[str, Any], exercises: List[Dict[str, Any]],
+                   changes: Dict[int, bool], complete_session: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Apply completion changes for one session.
+      - session: the routed session (st.session_state.selected_session: session_id, day_id, completed)
+      - exercises: the session's plan_session_exercises rows (updated in place)
+      - changes: exercise row id -> completed; rows already in that state are skipped
+      - complete_session: new session flag; None = complete once every row is completed
+    Returns {"changed", "sets_completed", "sets_total", "session_completed", "day"}.
+    """
+    by_id = {ex["id"]: ex for ex in exercises}
+    done = [i for i, flag in changes.items() if flag and i in by_id and not by_id[i].get("completed")]
+    undone = [i for i, flag in changes.items() if not flag and i in by_id and by_id[i].get("completed")]
+    for i in done:
+        by_id[i]["completed"] = True
+    for i in undone:
+        by_id[i]["completed"] = False
+
+    sets_completed = sum(1 for ex in exercises if ex.get("completed"))
+    if complete_session is None:
+        complete_session = bool(exercises) and sets_completed == len(exercises)
+    session_changed = bool(session.get("completed")) != complete_session
+
+    result = {
+        "changed": len(done) + len(undone),
+        "sets_completed": sets_completed,
+        "sets_total": len(exercises),
+        "session_completed": complete_session,
+        "day": None,
+    }
+    if not done and not undone and not session_changed:
+        return result
+
+    rpc = _call_rpc(client, session["session_id"], done, undone, complete_session)
+    if rpc is not None:
+        result["day"] = rpc.get("day")
+    else:
+        for flag, ids in ((True, done), (False, undone)):
+            if ids:
+                client.table("plan_session_exercises").update({"completed": flag}).in_("id", ids).execute()
+        if session_changed:
+            client.table("plan_sessions").update({"completed": complete_session}).eq("id", session["session_id"]).execute()
+        result["day"] = increment_progress(client, session.get("day_id"), {
+            "sets_completed": len(done) - len(undone),
+            "sessions_completed": (1 if complete_session else -1) if session_changed else 0,
+        })
+
+    session["completed"] = complete_session
+    publish_many("plan_session_exercises", done + undone)
+    if session_changed:
+        publish("plan_sessions", session["session_id"])
+    if session.get("day_id") is not None:
+        publish(DAY_PROGRESS_TABLE, session["day_id"])
+    return result
+
+
+def complete_exercises(client, session: Dict[str, Any], exercises: List[Dict[str, Any]],
+                       ids: Optional[Iterable[int]] = None, complete_session: Optional[bool] = None) -> Dict[str, Any]:
+    """Mark the given rows (default: all of them) completed; see set_completion."""
+    ids = [ex["id"] for ex in exercises] if ids is None else list(ids)
+    return set_completion(client, session, exercises, {i: True for i in ids}, complete_session=complete_session)
+
+
+def tick_exercise(queue, session: Dict[str, Any], exercise: Dict[str, Any]) -> bool:
+    """Queue one row becoming completed and count it on the day summary; False if it already was."""
+    if exercise.get("completed"):
+        return False
+    exercise["completed"] = True
+    queue.update("plan_session_exercises", exercise["id"], {"completed": True})
+    mark_sets(queue, session.get("day_id"), 1)
+    return True
@@ -0,0 +1,135 @@
+# utils/day_progress.py
+"""
+Materialized per-day completion summary (plan_day_progress).
+
+One row per plan day:
+    day_id, sessions_total, sessions_completed, sets_total, sets_completed
+
+  - Seeded by every sync path when the plan is written (see day_progress_row).
+  - Adjusted incrementally by the session views through their write-behind queue
+    (mark_sets / mark_session), so no view has to recount anything. Every adjustment is
+    one atomic increment (increment_progress: the increment_day_progress function from
+    migrations/0006, or one UPDATE on SQLite), so concurrent writers never lose counts.
+  - rebuild_day_progress() recounts from plan_sessions / plan_session_exercises (and
+    plan_session_blocks, whatever PLAN_SET_LAYOUT is now); the merge sync uses it for the
+    days it touched, and the dashboard uses it to backfill days that have no summary row yet.
+
+Postgres / Supabase table (applied by migrations/0001_plan_schema.sql):
+    create table plan_day_progress (
+        day_id bigint primary key references plan_days (id) on delete cascade,
+        sessions_total int not null default 0,
+        sessions_completed int not null default 0,
+        sets_total int not null default 0,
+        sets_completed int not null default 0,
+        updated_at timestamptz default now()
+    );
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.cache_bus import publish_many
+from utils.pagination import fetch_in, fetch_table
+from utils.rpc import NOT_DEPLOYED, call_rpc
+from utils.session_blocks import fetch_block_sets
+
+TABLE = "plan_day_progress"
+COUNT_COLUMNS = ["sessions_total", "sessions_completed", "sets_total", "sets_completed"]
+INCREMENT_RPC = "increment_day_progress"
+
+
+def day_progress_row(day_id: Optional[int], day_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary row for a freshly written (nothing completed) plan day."""
+    sessions = [
+        content for section, content in (day_data.get("plan") or {}).items()
+        if section not in ("Debug", "Total Time") and isinstance(content, dict)
+    ]
+    if day_data.get("Rest"):
+        sessions = []
+    return {
+        "day_id": day_id,
+        "sessions_total": len(sessions),
+        "sessions_completed": 0,
+        "sets_total": sum(len(s["exercises"]) for s in sessions if isinstance(s.get("exercises"), list)),
+        "sets_completed": 0,
+    }
+
+
+def rebuild_day_progress(client, day_ids: Iterable[int]) -> List[Dict[str, Any]]:
+    """Recount the summary for the given days from the plan tables and upsert it."""
+    day_ids = list(dict.fromkeys(day_ids))
+    if not day_ids:
+        return []
+    # Chunked, paginated reads: a whole plan's days / sessions / sets fit no single request
+    sessions = fetch_in(client, "plan_sessions", "id, day_id, completed", "day_id", day_ids)
+    day_of_session = {s["id"]: s["day_id"] for s in sessions}
+    sets = fetch_in(client, "plan_session_exercises", "id, session_id, completed", "session_id", list(day_of_session))
+    sets += fetch_block_sets(client, list(day_of_session), "id, session_id, sets")
+
+    rows = {day_id: {"day_id": day_id, **{col: 0 for col in COUNT_COLUMNS}} for day_id in day_ids}
+    for s in sessions:
+        rows[s["day_id"]]["sessions_total"] += 1
+        rows[s["day_id"]]["sessions_completed"] += 1 if s.get("completed") else 0
+    for ex in sets:
+        row = rows[day_of_session[ex["session_id"]]]
+        row["sets_total"] += 1
+        row["sets_completed"] += 1 if ex.get("completed") else 0
+
+    now = datetime.now().isoformat(timespec="seconds")
+    payload = [{**row, "updated_at": now} for row in rows.values()]
+    client.table(TABLE).upsert(payload, on_conflict="day_id").execute()
+    publish_many(TABLE, day_ids)
+    return payload
+
+
+def fetch_progress(client, day_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+    """Summary rows keyed by day_id, for the given days or the whole table (chunked, paginated reads)."""
+    columns = "day_id, " + ", ".join(COUNT_COLUMNS)
+    if day_ids is None:
+        rows = fetch_table(client, TABLE, columns)
+    else:
+        rows = fetch_in(client, TABLE, columns, "day_id", day_ids)
+    return {row["day_id"]: row for row in rows}
+
+
+def increment_progress(client, day_id: Optional[int], deltas: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    """Add deltas to the day's counters (floored at 0); returns the row after the change, None if it has none."""
+    deltas = {col: int(d) for col, d in deltas.items() if col in COUNT_COLUMNS and d}
+    if day_id is None:
+        return None
+    if deltas:
+        result = call_rpc(client, INCREMENT_RPC, {"p_day_id": day_id, "p_deltas": deltas})
+        if result is not NOT_DEPLOYED:
+            return (result[0] if isinstance(result, list) and result else result) or None
+
+    # Function not deployed yet: read-modify-write
+    rows = client.table(TABLE).select("day_id, " + ", ".join(COUNT_COLUMNS)).eq("day_id", day_id).limit(1).execute().data
+    if not rows:
+        return None  # rebuilt by the dashboard when missing
+    row = dict(rows[0])
+    values = {col: max(0, int(row.get(col) or 0) + d) for col, d in deltas.items()}
+    if values:
+        client.table(TABLE).update(values).eq("day_id", day_id).execute()
+        row.update(values)
+    return row
+
+
+# ---------- incremental updates (via utils.write_behind.WriteBehindQueue) ----------
+def mark_sets(queue, day_id: Optional[int], delta: int) -> None:
+    """Record `delta` sets becoming completed (negative when un-ticked)."""
+    if day_id is not None and delta:
+        queue.increment(TABLE, "day_id", day_id, {"sets_completed": delta})
+
+
+def mark_session(queue, session: Dict[str, Any], completed: bool = True) -> bool:
+    """
+    Flag the routed session (st.session_state.selected_session) complete or not.
+    Queues the plan_sessions update and adjusts the day summary only when the flag
+    actually changes. Returns True if it changed.
+    """
+    if bool(session.get("completed")) == completed:
+        return False
+    queue.update("plan_sessions", session["session_id"], {"completed": completed})
+    if session.get("day_id") is not None:
+        queue.increment(TABLE, "day_id", session["day_id"], {"sessions_completed": 1 if completed else -1})
+    session["completed"] = completed
+    return True
@@ -0,0 +1,255 @@
+# utils/leaderboard.py
+"""
+Benchmark leaderboards: every logged result for a benchmark_wods entry, ranked across
+athletes.
+
+    board = leaderboard(client, benchmark_id, workout_type)
+    board.percentile({"time_min": 7.5})    # share of logged results this one beats (0-100)
+    board.rank({"time_min": 7.5})          # 1-based, ties share a rank
+    board.top(10)                          # best result per athlete, best first
+    board.athlete_best(user_id)            # that athlete's best entry, rank and percentile among athletes
+
+  - One ScoreIndex per (benchmark, scoring direction): a sorted list of
+    (sort key, result id, user id). "time" scores sort ascending, "rounds" scores are
+    negated, so the list is always best first and rank / percentile are bisect lookups,
+    O(log n) however many results are logged.
+  - A second sorted list holds each athlete's best entry: the board (top, athlete_best)
+    ranks athletes, so a rival's older, slower results never push anyone down.
+  - An index is built once per process from that benchmark's results (one paginated
+    read over ix_wod_results_benchmark_user_ts) and then kept current incrementally:
+    utils.results publishes ("wod_results", ("benchmark", id, user)) on the cache bus
+    for every recorded result, and the next lookup re-reads only that athlete's results
+    for the benchmark and swaps their entries.
+  - LEADERBOARD_TTL (default 600 s) rebuilds an index as a backstop for results written
+    by other processes.
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from utils.cache_bus import subscribe
+from utils.pagination import fetch_all
+from utils.projections import LEADERBOARD_RESULTS
+
+TABLE = "wod_results"
+INDEX_TTL = float(os.getenv("LEADERBOARD_TTL", "600"))
+
+# Scoring directions: "time" = less is better, "rounds" = more is better
+TIME, ROUNDS = "time", "rounds"
+
+Entry = Tuple[float, int, int]  # (sort key, result id, user id)
+
+
+def direction_of(workout_type: Optional[str]) -> str:
+    return TIME if workout_type == "For Time" else ROUNDS
+
+
+def score_of(direction: str, result_details: Optional[Dict[str, Any]]) -> Optional[float]:
+    """The comparable score of a result (None if it has none for this direction)."""
+    details = result_details or {}
+    try:
+        if direction == TIME:
+            value = float(details.get("time_min") or 0)
+            return value if value > 0 else None
+        value = details.get("rounds", details.get("score"))
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _sort_key(direction: str, score: float) -> float:
+    return score if direction == TIME else -score
+
+
+class ScoreIndex:
+    """Sorted, best-first scores of one benchmark in one direction."""
+
+    def __init__(self, client, benchmark_id: int, direction: str):
+        self.client = client
+        self.benchmark_id = benchmark_id
+        self.direction = direction
+        self._entries: List[Entry] = []
+        self._by_result: Dict[int, Entry] = {}
+        self._by_user: Dict[int, Set[int]] = {}
+        self._bests: List[Entry] = []        # one entry per athlete (their best), best first
+        self._best_of: Dict[int, Entry] = {}
+        self._dirty: Set[int] = set()  # athletes whose results changed since the last read
+        self._lock = threading.RLock()
+        self.built_at = time.monotonic()
+
+    # ---------- maintenance ----------
+    def _read(self, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        def query():
+            q = LEADERBOARD_RESULTS.query(self.client).eq("benchmark_id", self.benchmark_id)
+            if user_id is not None:
+                q = q.eq("user_id", user_id)
+            return q.order("id")
+        return fetch_all(query, source=TABLE)
+
+    def _entry(self, row: Dict[str, Any]) -> Optional[Entry]:
+        score = score_of(self.direction, row.get("result_details"))
+        if score is None or row.get("id") is None:
+            return None
+        return (_sort_key(self.direction, score), row["id"], row.get("user_id"))
+
+    def build(self) -> "ScoreIndex":
+        with self._lock:
+            entries = sorted(e for e in map(self._entry, self._read()) if e is not None)
+            self._entries = entries
+            self._by_result = {e[1]: e for e in entries}
+            self._by_user = {}
+            for e in entries:
+                self._by_user.setdefault(e[2], set()).add(e[1])
+            self._best_of = {}
+            for e in entries:  # best first, so the first entry seen per athlete is their best
+                self._best_of.setdefault(e[2], e)
+            self._bests = sorted(self._best_of.values())
+        return self
+
+    def _remove(self, result_id: int) -> None:
+        entry = self._by_result.pop(result_id, None)
+        if entry is None:
+            return
+        i = bisect.bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+        self._by_user.get(entry[2], set()).discard(result_id)
+
+    def _insert(self, entry: Entry) -> None:
+        self._remove(entry[1])
+        bisect.insort(self._entries, entry)
+        self._by_result[entry[1]] = entry
+        self._by_user.setdefault(entry[2], set()).add(entry[1])
+
+    def _update_best(self, user_id: int) -> None:
+        old = self._best_of.pop(user_id, None)
+        if old is not None:
+            i = bisect.bisect_left(self._bests, old)
+            if i < len(self._bests) and self._bests[i] == old:
+                del self._bests[i]
+        results = self._by_user.get(user_id)
+        if results:
+            best = min(self._by_result[r] for r in results)
+            self._best_of[user_id] = best
+            bisect.insort(self._bests, best)
+
+    def mark_dirty(self, user_id: int) -> None:
+        with self._lock:
+            self._dirty.add(user_id)
+
+    def refresh(self) -> None:
+        """Re-read the results of athletes marked dirty and swap their entries."""
+        with self._lock:
+            users, self._dirty = self._dirty, set()
+        for user_id in users:
+            entries = [e for e in map(self._entry, self._read(user_id)) if e is not None]
+            with self._lock:
+                for result_id in list(self._by_user.get(user_id, ())):
+                    self._remove(result_id)
+                for entry in entries:
+                    self._insert(entry)
+                self._update_best(user_id)
+
+    # ---------- lookups ----------
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _bounds(self, score: float, entries: Optional[List[Entry]] = None) -> Tuple[int, int]:
+        key = _sort_key(self.direction, score)
+        with self._lock:
+            entries = self._entries if entries is None else entries
+            return (bisect.bisect_left(entries, (key,)),
+                    bisect.bisect_right(entries, (key, float("inf"))))
+
+    def rank(self, result_details: Dict[str, Any]) -> Optional[int]:
+        """1-based rank this result would have among the logged results (ties share a rank)."""
+        score = score_of(self.direction, result_details)
+        return None if score is None else self._bounds(score)[0] + 1
+
+    def percentile(self, result_details: Dict[str, Any]) -> Optional[float]:
+        """Share of logged results this one beats, ties counting half (None if nothing is logged)."""
+        score = score_of(self.direction, result_details)
+        return None if score is None else self._percentile(score)
+
+    def _percentile(self, score: float, entries: Optional[List[Entry]] = None) -> Optional[float]:
+        entries = self._entries if entries is None else entries
+        total = len(entries)
+        if not total:
+            return None
+        better, not_worse = self._bounds(score, entries)
+        worse = total - not_worse
+        return round(100.0 * (worse + 0.5 * (not_worse - better)) / total, 1)
+
+    def _score(self, entry: Entry) -> float:
+        return entry[0] if self.direction == TIME else -entry[0]
+
+    def top(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Best result per athlete, best first: [{"rank", "user_id", "result_id", "score"}].
+        rank counts athletes ahead (ties share a rank), not results.
+        """
+        with self._lock:
+            return [
+                {
+                    "rank": bisect.bisect_left(self._bests, (entry[0],)) + 1,
+                    "user_id": entry[2],
+                    "result_id": entry[1],
+                    "score": self._score(entry),
+                }
+                for entry in self._bests[:limit]
+            ]
+
+    def athlete_best(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """That athlete's best result with its rank / percentile among athletes ("of" = athletes on the board)."""
+        with self._lock:
+            best = self._best_of.get(user_id)
+            if best is None:
+                return None
+            bests = list(self._bests)
+        score = self._score(best)
+        return {
+            "rank": self._bounds(score, bests)[0] + 1,
+            "of": len(bests),
+            "result_id": best[1],
+            "score": score,
+            "percentile": self._percentile(score, bests),
+        }
+
+
+# ---------- REGISTRY ----------
+_indexes: Dict[Tuple[int, str], ScoreIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def leaderboard(client, benchmark_id: int, workout_type: Optional[str]) -> ScoreIndex:
+    """The process-wide index for a benchmark, built on first use and refreshed incrementally."""
+    key = (benchmark_id, direction_of(workout_type))
+    with _registry_lock:
+        index = _indexes.get(key)
+    if index is None or time.monotonic() - index.built_at > INDEX_TTL:
+        # Built before it is registered, so no caller sees a half-built index
+        fresh = ScoreIndex(client, *key).build()
+        with _registry_lock:
+            index = _indexes[key] = fresh
+    index.refresh()
+    return index
+
+
+def _on_event(table: str, key) -> None:
+    if table != TABLE:
+        return
+    with _registry_lock:
+        if key is None:  # table-wide change: rebuild on next use
+            _indexes.clear()
+            return
+        indexes = list(_indexes.values())
+    if isinstance(key, tuple) and len(key) == 3 and key[0] == "benchmark":
+        _, benchmark_id, user_id = key
+        for index in indexes:
+            if index.benchmark_id == benchmark_id:
+                index.mark_dirty(user_id)
+
+
+subscribe(_on_event)
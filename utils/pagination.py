@@ -0,0 +1,134 @@
+# utils/pagination.py
+"""
+Paginated reads past the PostgREST row cap.
+
+PostgREST (Supabase) silently truncates any response at the server's max-rows setting
+(1000 by default), so a bare select("*") on a table that outgrows it returns a prefix of
+the table and nothing says so. These helpers read in range() chunks instead:
+
+    rows = fetch_table(client, "md_exercises")                       # ordered by id
+    rows = fetch_in(client, "plan_sessions", "id, day_id", "day_id", day_ids)   # any number of ids
+    rows = fetch_all(lambda: client.table("exercise_maxes").select("*").order("date", desc=True).order("id"))
+    for page in iter_pages(lambda: client.table("md_map_exercise_categories").select("*").order("id")):
+        ...
+
+  - make_query is called once per page and must return a fresh, unexecuted query with a
+    total order (range pagination over an unstable order can skip or repeat rows).
+  - parallel > 1 fetches that many pages at a time on a thread pool once the first page
+    shows there is more than one.
+  - A page shorter than requested but exactly SERVER_MAX_ROWS long means the server cap is
+    below the page size: a warning is issued and paging continues at the cap.
+  - warn_if_capped() flags single, unpaginated responses that hit the cap.
+  - fetch_in() splits an in_() filter into ID_CHUNK ids per request (keeps request URLs
+    short) and paginates each chunk.
+
+PAGE_SIZE, PAGE_PARALLEL, POSTGREST_MAX_ROWS and PLAN_ID_CHUNK come from the environment
+(1000 / 1 / 1000 / 200).
+"""
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "1000"))
+PAGE_PARALLEL = int(os.getenv("PAGE_PARALLEL", "1"))
+SERVER_MAX_ROWS = int(os.getenv("POSTGREST_MAX_ROWS", "1000"))
+ID_CHUNK = int(os.getenv("PLAN_ID_CHUNK", "200"))  # ids per in_() filter (keeps request URLs short)
+
+# Tables whose primary key is not "id"
+ORDER_KEYS = {"skills": "skill_id", "plan_day_progress": "day_id"}
+
+QueryFactory = Callable[[], Any]
+
+
+class TruncatedReadWarning(RuntimeWarning):
+    """A response came back exactly at the server row cap and may be missing rows."""
+
+
+def warn_if_capped(rows: List[Dict[str, Any]], source: str, cap: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Warn when an unpaginated response is exactly cap (default SERVER_MAX_ROWS) rows long; returns rows unchanged."""
+    cap = SERVER_MAX_ROWS if cap is None else cap
+    if cap and rows is not None and len(rows) == cap:
+        warnings.warn(f"{source}: response has exactly {cap} rows (server row cap); results may be truncated",
+                      TruncatedReadWarning, stacklevel=2)
+    return rows
+
+
+def _page(make_query: QueryFactory, start: int, size: int) -> List[Dict[str, Any]]:
+    return make_query().range(start, start + size - 1).execute().data or []
+
+
+def iter_pages(make_query: QueryFactory, *, page_size: int = PAGE_SIZE, parallel: int = PAGE_PARALLEL,
+               source: str = "query") -> Iterator[List[Dict[str, Any]]]:
+    """Yield non-empty pages in order until a short page ends the result."""
+    first = _page(make_query, 0, page_size)
+    if len(first) < page_size and SERVER_MAX_ROWS and len(first) == SERVER_MAX_ROWS:
+        warnings.warn(f"{source}: page size {page_size} is above the server row cap {SERVER_MAX_ROWS}; "
+                      f"paging at {SERVER_MAX_ROWS}", TruncatedReadWarning, stacklevel=2)
+        page_size = SERVER_MAX_ROWS
+    if first:
+        yield first
+    if len(first) < page_size:
+        return
+    offset = len(first)
+
+    if parallel <= 1:
+        while True:
+            page = _page(make_query, offset, page_size)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        while True:
+            starts = [offset + i * page_size for i in range(parallel)]
+            for page in pool.map(lambda start: _page(make_query, start, page_size), starts):
+                if page:
+                    yield page
+                if len(page) < page_size:
+                    return
+            offset = starts[-1] + page_size
+
+
+def iter_rows(make_query: QueryFactory, **options) -> Iterator[Dict[str, Any]]:
+    for page in iter_pages(make_query, **options):
+        yield from page
+
+
+def fetch_all(make_query: QueryFactory, **options) -> List[Dict[str, Any]]:
+    """Every row of the query, however many pages it takes."""
+    return list(iter_rows(make_query, **options))
+
+
+def fetch_table(client, table: str, columns: str = "*", *, order: str = None, **options) -> List[Dict[str, Any]]:
+    """Whole table, paginated over its primary key (ORDER_KEYS, default "id")."""
+    order = order or ORDER_KEYS.get(table, "id")
+    return fetch_all(lambda: client.table(table).select(columns).order(order), source=table, **options)
+
+
+def fetch_in(client, table: str, columns: str, column: str, values: Iterable[Any], *,
+             order: Union[str, Sequence[str]] = None, where: Optional[Callable[[Any], Any]] = None,
+             **options) -> List[Dict[str, Any]]:
+    """
+    Rows whose column is one of values: ID_CHUNK values per request, each chunk paginated.
+      - order: a column or several (the last should be unique, e.g. ("exercise_order", "id"))
+      - where(query) adds further filters (e.g. lambda q: q.eq("completed", False))
+    """
+    values = list(dict.fromkeys(values))
+    order = order or ORDER_KEYS.get(table, "id")
+    orders = [order] if isinstance(order, str) else list(order)
+    rows: List[Dict[str, Any]] = []
+    for start in range(0, len(values), ID_CHUNK):
+        chunk = values[start:start + ID_CHUNK]
+
+        def make_query():
+            query = client.table(table).select(columns).in_(column, chunk)
+            query = where(query) if where else query
+            for col in orders:
+                query = query.order(col)
+            return query
+
+        rows.extend(fetch_all(make_query, source=table, **options))
+    return rows
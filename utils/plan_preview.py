@@ -0,0 +1,123 @@
+# Sections the preview has always hidden (Tue has no Light, Thu is a run day)
+HIDDEN_SECTIONS = {
+    "Tue": {"Light"},
+    "Thu": {"Warmup", "Cooldown", "Light"},
+}
+
+SKIPPED_KEYS = ("Debug", "Total Time")
+
+
+def is_hidden_section(day_label, section):
+    return section in HIDDEN_SECTIONS.get(day_label, set())
+
+
+def _section_summary(section, content):
+    """One-line description of a section for the collapsed day view."""
+    if not isinstance(content, dict):
+        return {"name": section, "details": str(content), "exercises": 0, "time": ""}
+
+    details = content.get("details", "")
+    if section == "WOD":
+        details = f"{content.get('WOD Name', '')} – {content.get('Type', '')}".strip(" –")
+    elif section == "Benchmark":
+        details = content.get("name") or details
+    first_line = str(details).split("\n", 1)[0]
+
+    exercises = content.get("exercises") or []
+    return {
+        "name": section,
+        "details": first_line,
+        "exercises": len(exercises) if isinstance(exercises, list) else 0,
+        "time": content.get("time") or content.get("Estimated Time") or "",
+    }
+
+
+def summarize_plan(full_plan):
+    """
+    Precompute the per-day summaries shown by the preview.
+    Build this once per generated plan and keep it next to the plan in session state:
+      {week_label: [{"day", "date", "rest", "muscles", "stimulus", "estimated_time",
+                     "sections": [{"name", "details", "exercises", "time"}], "has_debug"}]}
+    """
+    summaries = {}
+    for week_label, week_data in (full_plan or {}).items():
+        days = []
+        for day_label, day_data in week_data.items():
+            plan = day_data.get("plan", {}) if isinstance(day_data, dict) else {}
+            sections = [
+                _section_summary(section, content)
+                for section, content in plan.items()
+                if section not in SKIPPED_KEYS and not is_hidden_section(day_label, section)
+            ]
+            days.append({
+                "day": day_label,
+                "date": day_data.get("date", ""),
+                "rest": bool(day_data.get("Rest")),
+                "muscles": day_data.get("muscles", []),
+                "stimulus": day_data.get("stimulus"),
+                "estimated_time": day_data.get("estimated_time"),
+                "sections": sections,
+                "has_debug": "Debug" in plan,
+                "message": day_data.get("message", ""),
+            })
+        summaries[week_label] = days
+    return summaries
+
+
+def _day_header(day):
+    if day["rest"]:
+        return f"💤 {day['day']} ({day['date']}) – Rest Day"
+    parts = [f"{day['day']} ({day['date']})" if day["date"] else day["day"]]
+    if day["stimulus"]:
+        parts.append(day["stimulus"])
+    if day["estimated_time"] not in (None, ""):
+        parts.append(f"{day['estimated_time']} min")
+    parts.append(f"{len(day['sections'])} sections")
+    return " · ".join(parts)
+
+
+def render_plan_preview(full_plan, summaries=None, debug_mode=False, key_prefix="preview"):
+    """
+    Render one week of a plan at a time.
+      - Only the selected week is rendered on each rerun.
+      - Days are collapsed summaries; section JSON is only materialized when asked for.
+    """
+    import streamlit as st  # imported here so headless code (plan_export) can use is_hidden_section
+
+    if not full_plan:
+        return
+    if summaries is None:
+        summaries = summarize_plan(full_plan)
+
+    week_labels = list(full_plan.keys())
+    active_week = st.radio(
+        "Week", week_labels, horizontal=True, key=f"{key_prefix}_active_week"
+    )
+    week_data = full_plan[active_week]
+
+    for day in summaries.get(active_week, []):
+        with st.expander(_day_header(day), expanded=False):
+            if day["rest"]:
+                st.markdown("**Rest Day 💤**")
+                continue
+            if day["message"]:
+                st.markdown(day["message"])
+            if day["muscles"]:
+                st.markdown(f"**Target Muscles:** {', '.join(day['muscles'])}")
+
+            plan = week_data.get(day["day"], {}).get("plan", {})
+            for section in day["sections"]:
+                line = f"**{section['name']}**"
+                if section["details"]:
+                    line += f" – {section['details']}"
+                if section["exercises"]:
+                    line += f" ({section['exercises']} rows)"
+                st.markdown(line)
+
+                json_key = f"{key_prefix}_json_{active_week}_{day['day']}_{section['name']}"
+                if st.checkbox("Show JSON", key=json_key):
+                    st.json(plan.get(section["name"], {}))
+
+            if debug_mode and day["has_debug"]:
+                if st.checkbox("Show debug info", key=f"{key_prefix}_debug_{active_week}_{day['day']}"):
+                    st.json(plan["Debug"])
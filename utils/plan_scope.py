@@ -0,0 +1,95 @@
+# utils/plan_scope.py
+"""
+Plan namespaces: one plan per athlete, keyed by plan_weeks.athlete_id.
+
+Days, sessions, set rows and day summaries reach their plan through their parents
+(plan_days.week_id -> plan_sessions.day_id -> plan_session_exercises / plan_session_blocks
+.session_id, plan_day_progress.day_id), so replacing one plan walks those keys with
+indexed lookups and deletes only that plan's rows, children first:
+
+    ids = plan_ids(client, athlete_id)      # week / day / session ids (3 indexed reads)
+    delete_plan(client, athlete_id)         # deletes by id / parent id, never table-wide
+
+  - athlete_id None is the default single-user plan (weeks with athlete_id IS NULL).
+  - PLAN_ATHLETE_ID (environment) selects the plan the app pages read and write.
+  - Deletes filter on primary or parent keys in chunks of ID_CHUNK ids, so the cost of a
+    sync follows the size of that plan, not of the tables.
+
+Postgres / Supabase (migrations/0001 and 0003; every lookup is covered by an index):
+    alter table plan_weeks add column if not exists athlete_id bigint;
+    create unique index ux_plan_weeks_athlete_number on plan_weeks (athlete_id, number) nulls not distinct;
+    -- plan_days (week_id, day_number), plan_sessions (day_id, type),
+    -- plan_session_exercises / plan_session_blocks (session_id, exercise_order)
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from utils.day_progress import TABLE as DAY_PROGRESS_TABLE
+from utils.pagination import ID_CHUNK, fetch_all, fetch_in
+from utils.session_blocks import TABLE as BLOCK_TABLE
+
+
+def current_athlete_id() -> Optional[int]:
+    """The plan the app works on (PLAN_ATHLETE_ID); None = the default plan."""
+    value = os.getenv("PLAN_ATHLETE_ID", "").strip()
+    return int(value) if value else None
+
+
+def plan_key(athlete_id: Optional[int]) -> str:
+    return "default" if athlete_id is None else f"athlete:{athlete_id}"
+
+
+def scope_weeks(query, athlete_id: Optional[int]):
+    """Restrict a plan_weeks query to one plan."""
+    return query.is_("athlete_id", "null") if athlete_id is None else query.eq("athlete_id", athlete_id)
+
+
+def week_row(row: Dict, athlete_id: Optional[int]) -> Dict:
+    """Tag a plan_weeks insert payload with its plan (the default plan leaves athlete_id null)."""
+    if athlete_id is not None:
+        row["athlete_id"] = athlete_id
+    return row
+
+
+def _chunks(ids: Sequence[int]) -> Iterator[List[int]]:
+    for start in range(0, len(ids), ID_CHUNK):
+        yield list(ids[start:start + ID_CHUNK])
+
+
+def child_ids(client, table: str, parent_col: str, parent_ids: Sequence[int]) -> List[int]:
+    """Ids of table rows whose parent_col is one of parent_ids."""
+    return [r["id"] for r in fetch_in(client, table, "id", parent_col, parent_ids)]
+
+
+@dataclass
+class PlanIds:
+    weeks: List[int] = field(default_factory=list)
+    days: List[int] = field(default_factory=list)
+    sessions: List[int] = field(default_factory=list)
+
+
+def plan_ids(client, athlete_id: Optional[int]) -> PlanIds:
+    weeks = [r["id"] for r in fetch_all(
+        lambda: scope_weeks(client.table("plan_weeks").select("id"), athlete_id).order("id"), source="plan_weeks",
+    )]
+    days = child_ids(client, "plan_days", "week_id", weeks)
+    return PlanIds(weeks, days, child_ids(client, "plan_sessions", "day_id", days))
+
+
+def delete_in(client, table: str, column: str, ids: Sequence[int]) -> None:
+    for chunk in _chunks(ids):
+        client.table(table).delete().in_(column, chunk).execute()
+
+
+def delete_plan(client, athlete_id: Optional[int]) -> Dict[str, int]:
+    """Delete one plan's rows, children first; returns the week / day / session counts removed."""
+    ids = plan_ids(client, athlete_id)
+    delete_in(client, DAY_PROGRESS_TABLE, "day_id", ids.days)
+    delete_in(client, "plan_session_exercises", "session_id", ids.sessions)
+    # Whatever the current layout: blocks written under the other one must not outlive their sessions
+    delete_in(client, BLOCK_TABLE, "session_id", ids.sessions)
+    delete_in(client, "plan_sessions", "id", ids.sessions)
+    delete_in(client, "plan_days", "id", ids.days)
+    delete_in(client, "plan_weeks", "id", ids.weeks)
+    return {"weeks": len(ids.weeks), "days": len(ids.days), "sessions": len(ids.sessions)}
@@ -0,0 +1,168 @@
+# utils/prescriptions.py
+"""
+Expected-weight prescriptions for %RM sets (Heavy / Olympic).
+
+  - load_maxes_snapshot(): current 1RM per exercise from exercise_maxes in one query
+    (latest row per exercise; manual_1rm wins over calculated_1rm, as in the views).
+  - expected_weight(): 1RM x %RM rounded to the plate increment, as stored in
+    plan_session_exercises.expected_weight.
+  - refresh_prescriptions(): recompute expected_weight for every not-yet-completed %RM
+    set of one athlete's plan (optionally only some exercises) after maxes change, one
+    update per distinct value (per changed block for the compact layout, see
+    utils.session_blocks). Other plans (utils.plan_scope) are never touched.
+
+The plate increment defaults to PLATE_INCREMENT_KG (environment) or 2.5.
+
+CLI (e.g. nightly, or after importing maxes):
+    python -m utils.prescriptions [--exercise "Back Squat" ...] [--athlete-id 7] [--sqlite-path fullcrossfit.db]
+"""
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.cache_bus import publish_many
+from utils.pagination import fetch_all, fetch_in
+from utils.plan_scope import current_athlete_id, plan_ids
+from utils.projections import MAX_HISTORY
+from utils.session_blocks import TABLE as BLOCK_TABLE
+
+DEFAULT_PLATE_INCREMENT = float(os.getenv("PLATE_INCREMENT_KG", "2.5"))
+
+_PERCENT = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*%\s*$")
+
+
+def load_maxes_snapshot(client) -> Dict[str, float]:
+    """exercise_name -> current 1RM, from a single exercise_maxes query."""
+    rows = fetch_all(
+        lambda: MAX_HISTORY.query(client)
+        .order("date", desc=True)
+        .order("id", desc=True),
+        source="exercise_maxes",
+    )
+    maxes: Dict[str, float] = {}
+    for row in rows:
+        name = row.get("exercise_name")
+        if name in maxes:
+            continue  # older entry
+        value = row.get("manual_1rm") or row.get("calculated_1rm")
+        if value:
+            maxes[name] = float(value)
+    return maxes
+
+
+def percent_of(intensity: Any) -> Optional[float]:
+    """'77%' -> 77.0; anything else ('<60% 1RM', 'High', '') -> None."""
+    match = _PERCENT.match(str(intensity or ""))
+    return float(match.group(1)) if match else None
+
+
+def round_to_increment(weight: float, increment: float = DEFAULT_PLATE_INCREMENT) -> float:
+    if not increment or increment <= 0:
+        return round(weight, 2)
+    return round(round(weight / increment) * increment, 2)
+
+
+def expected_weight(one_rm: Optional[float], intensity: Any,
+                    increment: float = DEFAULT_PLATE_INCREMENT) -> str:
+    """Prescribed load for a set as stored in expected_weight ('' when it can't be derived)."""
+    pct = percent_of(intensity)
+    if not one_rm or pct is None:
+        return ""
+    weight = round_to_increment(one_rm * pct / 100, increment)
+    return f"{weight:g}"
+
+
+def refresh_prescriptions(client, maxes: Optional[Dict[str, float]] = None,
+                          exercise_names: Optional[Iterable[str]] = None,
+                          increment: float = DEFAULT_PLATE_INCREMENT,
+                          athlete_id: Optional[int] = None) -> int:
+    """
+    Recompute expected_weight for open (not completed) %RM sets of one plan.
+      - maxes: snapshot to use (loaded when omitted)
+      - exercise_names: limit to these exercises (e.g. the one whose max just changed)
+      - athlete_id: the plan whose sets are refreshed (None = the default plan)
+    Returns the number of rows whose prescription changed.
+    """
+    if maxes is None:
+        maxes = load_maxes_snapshot(client)
+    names: List[str] = list(exercise_names) if exercise_names is not None else list(maxes)
+    if not names:
+        return 0
+    session_ids = plan_ids(client, athlete_id).sessions
+    if not session_ids:
+        return 0
+
+    rows = fetch_in(
+        client, "plan_session_exercises", "id, exercise_name, intensity, expected_weight", "session_id", session_ids,
+        where=lambda q: q.in_("exercise_name", names).eq("completed", False),
+    )
+    by_value: Dict[str, List[int]] = {}
+    for row in rows:
+        if percent_of(row.get("intensity")) is None:
+            continue
+        value = expected_weight(maxes.get(row["exercise_name"]), row["intensity"], increment)
+        if value != (row.get("expected_weight") or ""):
+            by_value.setdefault(value, []).append(row["id"])
+
+    changed = 0
+    for value, ids in by_value.items():
+        client.table("plan_session_exercises").update({"expected_weight": value}).in_("id", ids).execute()
+        publish_many("plan_session_exercises", ids)
+        changed += len(ids)
+    # Blocks are refreshed whatever PLAN_SET_LAYOUT is now: sessions synced as blocks keep that layout
+    return changed + _refresh_blocks(client, maxes, names, increment, session_ids)
+
+
+def _refresh_blocks(client, maxes: Dict[str, float], names: List[str], increment: float,
+                    session_ids: List[int]) -> int:
+    """Same recalculation for the plan's plan_session_blocks (one update per block that changed)."""
+    blocks = fetch_in(client, BLOCK_TABLE, "id, exercise_name, sets", "session_id", session_ids,
+                      where=lambda q: q.in_("exercise_name", names))
+    changed, touched = 0, []
+    for block in blocks:
+        sets = block.get("sets") or []
+        block_changed = 0
+        for s in sets:
+            if s.get("completed") or percent_of(s.get("intensity")) is None:
+                continue
+            value = expected_weight(maxes.get(block["exercise_name"]), s["intensity"], increment)
+            if value != (s.get("expected_weight") or ""):
+                s["expected_weight"] = value
+                block_changed += 1
+        if block_changed:
+            client.table(BLOCK_TABLE).update({"sets": sets}).eq("id", block["id"]).execute()
+            touched.append(block["id"])
+            changed += block_changed
+    publish_many(BLOCK_TABLE, touched)
+    return changed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    from storage import create_storage_client
+
+    parser = argparse.ArgumentParser(description="Refresh expected weights of open %RM sets from current 1RMs.")
+    parser.add_argument("--exercise", action="append", help="only this exercise (repeatable)")
+    parser.add_argument("--plate-increment", type=float, default=DEFAULT_PLATE_INCREMENT)
+    parser.add_argument("--athlete-id", type=int, help="plan to refresh (default PLAN_ATHLETE_ID, else the default plan)")
+    parser.add_argument("--storage", choices=["supabase", "sqlite"])
+    parser.add_argument("--sqlite-path")
+    args = parser.parse_args(argv)
+
+    options = {"path": args.sqlite_path} if args.sqlite_path else {}
+    try:
+        client = create_storage_client(args.storage or ("sqlite" if args.sqlite_path else None), **options)
+        athlete_id = args.athlete_id if args.athlete_id is not None else current_athlete_id()
+        changed = refresh_prescriptions(client, exercise_names=args.exercise, increment=args.plate_increment,
+                                        athlete_id=athlete_id)
+    except Exception as e:
+        print(f"error: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    print(f"updated {changed} prescriptions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
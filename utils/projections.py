@@ -0,0 +1,203 @@
+# utils/projections.py
+"""
+Declared column lists for every read, instead of select("*").
+
+Each call site names the projection it needs, so a response only carries the columns the
+caller actually uses (smaller payloads, less JSON to decode, and the Postgres planner can
+use covering indexes):
+
+    rows = SESSION_SETS.query(client).eq("session_id", sid).order("exercise_order").execute().data
+    pool = CATALOG["exercise_pool"].fetch_all(client)     # paged, utils.pagination.fetch_table
+
+  - Projections are per use, not per table: the WOD view and the dashboard read different
+    plan_sessions columns. Add a column to the projection when a caller starts reading it
+    (a missing column is a KeyError / None, not a silent extra round trip).
+  - Write paths that need a row back by id keep "id" in their projection.
+  - `python -m utils.projections --check [paths...]` flags any select("*") (and any
+    fetch_table() without columns) against LARGE_TABLES; exits 1 when it finds some.
+"""
+import argparse
+import ast
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from utils.pagination import fetch_table
+
+
+@dataclass(frozen=True)
+class Projection:
+    table: str
+    columns: Tuple[str, ...]
+
+    @property
+    def select_list(self) -> str:
+        return ",".join(self.columns)
+
+    def query(self, client):
+        """Unexecuted select of just these columns; add filters / order / limit and execute()."""
+        return client.table(self.table).select(self.select_list)
+
+    def fetch_all(self, client, **options) -> List[Dict[str, Any]]:
+        """Whole table, these columns, paginated over its primary key."""
+        return fetch_table(client, self.table, self.select_list, **options)
+
+    def extend(self, *columns: str) -> "Projection":
+        return Projection(self.table, self.columns + tuple(c for c in columns if c not in self.columns))
+
+
+# ---------- CATALOG (plan generation) ----------
+CATALOG: Dict[str, Projection] = {
+    p.table: p for p in (
+        Projection("md_exercises", ("id", "name", "equipment")),
+        Projection("md_muscle_groups", ("id", "name")),
+        Projection("md_map_exercise_muscle_groups", ("id", "exercise_id", "musclegroup_id")),
+        Projection("md_categories", ("id", "name")),
+        Projection("md_map_exercise_categories", ("id", "exercise_id", "category_id")),
+        Projection("exercise_pool", (
+            "id", "musclegroup_id", "exercise", "unit", "range_min", "range_max", "rx_male_kg",
+            "rx_female_kg", "equipment", "tags", "skill_level", "is_unilateral", "notes",
+        )),
+        Projection("skills", ("skill_id", "skill_name")),
+        Projection("skill_plans", ("id", "skill_id", "week", "focus", "session_plan")),
+        Projection("benchmark_wods", (
+            "id", "name", "description", "estimated_time", "workout_type", "type",
+            "beginner", "intermediate", "advanced", "elite", "wodwell_url",
+        )),
+    )
+}
+
+
+def catalog_table(client, table: str, **options) -> List[Dict[str, Any]]:
+    """A catalog table with its declared columns (every column for tables not in CATALOG)."""
+    projection = CATALOG.get(table)
+    if projection is None:
+        return fetch_table(client, table, **options)
+    return projection.fetch_all(client, **options)
+
+
+# ---------- DASHBOARD ----------
+PLAN_WEEKS = Projection("plan_weeks", ("id", "number", "start_date"))
+PLAN_DAYS = Projection("plan_days", ("id", "week_id", "day_number", "date", "is_rest_day"))
+DAY_SESSIONS = Projection("plan_sessions", ("id", "day_id", "type", "focus_muscle", "completed"))
+
+# ---------- SESSION VIEWS ----------
+# Row-per-set reads (Light / Heavy / Olympic, and the fallback of utils.session_blocks)
+SESSION_SETS = Projection("plan_session_exercises", (
+    "id", "session_id", "exercise_name", "exercise_order", "set_number", "reps", "intensity",
+    "rest", "notes", "expected_weight", "completed", "actual_reps", "actual_weight",
+))
+SESSION_BLOCKS = Projection("plan_session_blocks", (
+    "id", "session_id", "exercise_name", "exercise_id", "exercise_order", "tempo", "equipment", "sets",
+))
+# Warmup / Cooldown checklists and the Skill view
+TIMED_EXERCISES = Projection("plan_session_exercises", ("id", "exercise_name", "exercise_order", "rest", "completed"))
+SKILL_EXERCISES = Projection("plan_session_exercises", (
+    "id", "exercise_name", "exercise_order", "reps", "rest", "notes", "completed",
+))
+BEST_SET = Projection("plan_session_exercises", ("actual_weight", "actual_reps"))
+
+WOD_SESSION = Projection("plan_sessions", ("id", "type", "details", "performance_targets", "wod_spec"))
+SESSION_DETAILS = Projection("plan_sessions", ("id", "details", "completed"))
+
+LATEST_MAX = Projection("exercise_maxes", ("manual_1rm", "calculated_1rm"))
+MAX_HISTORY = Projection("exercise_maxes", ("id", "exercise_name", "manual_1rm", "calculated_1rm", "date"))
+
+# ---------- RESULTS (utils.results) ----------
+SESSION_RESULT = Projection("wod_results", (
+    "id", "session_id", "benchmark_id", "user_id", "result_details", "rating", "level", "notes", "timestamp",
+))
+RESULT_HISTORY = Projection("wod_results", ("id", "session_id", "result_details", "rating", "level", "timestamp"))
+LEADERBOARD_RESULTS = Projection("wod_results", ("id", "user_id", "result_details"))  # utils.leaderboard
+
+
+# ---------- CHECK ----------
+# Tables that grow with plans / athletes or are read whole; select("*") on these is flagged
+LARGE_TABLES = frozenset({
+    "plan_weeks", "plan_days", "plan_sessions", "plan_session_exercises", "plan_session_blocks",
+    "plan_day_progress", "exercise_maxes", "wod_results", "exercise_pool", "md_exercises",
+    "md_map_exercise_muscle_groups", "md_map_exercise_categories", "skill_plans", "benchmark_wods",
+})
+
+SKIP_DIRS = {".git", "__pycache__", ".venv", "venv", "node_modules"}
+
+
+def _str_arg(call: ast.Call, index: int, keyword: str = None):
+    if len(call.args) > index and isinstance(call.args[index], ast.Constant):
+        return call.args[index].value
+    for kw in call.keywords:
+        if kw.arg == keyword and isinstance(kw.value, ast.Constant):
+            return kw.value.value
+    return None
+
+
+def _table_of(node: ast.AST):
+    """Walk a query chain (x.table("t").select(...).eq(...)) back to its .table() name."""
+    while isinstance(node, (ast.Call, ast.Attribute)):
+        if isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Attribute) and func.attr == "table":
+                return _str_arg(node, 0)
+            node = func
+        else:
+            node = node.value
+    return None
+
+
+def find_star_selects(source: str, filename: str = "<string>") -> Iterator[Tuple[int, str, str]]:
+    """(line, table, call) for every star select / column-less fetch_table() on a large table."""
+    for node in ast.walk(ast.parse(source, filename)):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr == "select":
+            table = _table_of(func.value)
+            if (not node.args or _str_arg(node, 0) == "*") and table in LARGE_TABLES:
+                yield node.lineno, table, 'select("*")'
+        elif getattr(func, "id", getattr(func, "attr", None)) == "fetch_table":
+            table = _str_arg(node, 1)
+            if table in LARGE_TABLES and _str_arg(node, 2, "columns") in (None, "*"):
+                yield node.lineno, table, "fetch_table() without columns"
+
+
+def _python_files(paths: List[str]) -> Iterator[Path]:
+    for path in map(Path, paths):
+        if path.is_file():
+            yield path
+            continue
+        for file in sorted(path.rglob("*.py")):
+            if not SKIP_DIRS.intersection(file.parts):
+                yield file
+
+
+def check(paths: List[str]) -> int:
+    """Print every finding; returns how many there were."""
+    found = 0
+    for file in _python_files(paths):
+        try:
+            findings = list(find_star_selects(file.read_text(encoding="utf-8"), str(file)))
+        except SyntaxError as e:
+            print(f"{file}: skipped (does not parse: {e.msg}, line {e.lineno})", file=sys.stderr)
+            continue
+        for line, table, call in findings:
+            print(f"{file}:{line}: {call} on {table}")
+            found += 1
+    return found
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Flag select(\"*\") reads against large tables.")
+    parser.add_argument("--check", action="store_true", help="scan the given paths (default: current directory)")
+    parser.add_argument("paths", nargs="*", default=["."])
+    args = parser.parse_args(argv)
+    if not args.check:
+        parser.print_help()
+        return 2
+    found = check(args.paths)
+    print(f"{found} star select(s) on large tables" if found else "no star selects on large tables")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
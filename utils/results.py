@@ -0,0 +1,110 @@
+# utils/results.py
+"""
+Recording and reading WOD / benchmark results (wod_results).
+
+    row = record_result(client, session_id, user_id, {"rounds": 12}, rating=74, benchmark_id=3)
+    prev = session_result(client, session_id, user_id)                    # cached
+    page = result_history(client, benchmark_id, user_id, page=0)          # cached, newest first
+    page["rows"], page["has_more"]
+
+  - record_result() is one upsert on (session_id, user_id) (ux_wod_results_session_user,
+    migrations/0003_upsert_keys.sql) that returns the stored row: resubmitting a session
+    replaces its result instead of adding a row or needing a lookup first.
+  - submit_result() also completes the session through utils.completion (one RPC when
+    complete_session_exercises is deployed), so a submit is two round trips.
+  - Readers are bus-cached (utils.cache_bus) and tagged per (session, user) and per
+    (benchmark, user); record_result() publishes exactly those keys, so renders between
+    submissions cost no queries.
+  - History is read one page of HISTORY_PAGE rows at a time (RESULT_HISTORY_PAGE,
+    default 10), so rendering stays bounded however many results an athlete logs.
+"""
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from utils.cache_bus import bus_cached, publish
+from utils.completion import set_completion
+from utils.projections import RESULT_HISTORY, SESSION_RESULT
+
+TABLE = "wod_results"
+CONFLICT_KEY = "session_id,user_id"
+
+HISTORY_PAGE = int(os.getenv("RESULT_HISTORY_PAGE", "10"))
+CACHE_TTL = 3600  # backstop for results written by other processes
+
+
+def session_key(session_id: int, user_id: int):
+    return ("session", session_id, user_id)
+
+
+def benchmark_key(benchmark_id: int, user_id: int):
+    return ("benchmark", benchmark_id, user_id)
+
+
+# ---------- WRITE ----------
+def record_result(client, session_id: int, user_id: int, result_details: Dict[str, Any], *,
+                  rating: Optional[int] = None, level: Optional[str] = None, notes: Optional[str] = None,
+                  benchmark_id: Optional[int] = None) -> Dict[str, Any]:
+    """Insert or replace the athlete's result for a session; returns the stored row."""
+    payload = {
+        "session_id": session_id,
+        "user_id": user_id,
+        "result_details": result_details,
+        "rating": rating,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    # Optional columns are only sent when given, so a resubmit does not blank them
+    for column, value in (("level", level), ("notes", notes), ("benchmark_id", benchmark_id)):
+        if value is not None:
+            payload[column] = value
+
+    rows = client.table(TABLE).upsert(payload, on_conflict=CONFLICT_KEY).execute().data or []
+    row = rows[0] if rows else payload
+
+    publish(TABLE, session_key(session_id, user_id))
+    stored_benchmark = row.get("benchmark_id", benchmark_id)
+    if stored_benchmark is not None:
+        publish(TABLE, benchmark_key(stored_benchmark, user_id))
+    return row
+
+
+def submit_result(client, session: Dict[str, Any], user_id: int, result_details: Dict[str, Any],
+                  **fields) -> Dict[str, Any]:
+    """
+    record_result() for the routed session (st.session_state.selected_session), then mark
+    the session completed. fields: rating, level, notes, benchmark_id.
+    """
+    row = record_result(client, session["session_id"], user_id, result_details, **fields)
+    set_completion(client, session, [], {}, complete_session=True)
+    return row
+
+
+# ---------- READ ----------
+@bus_cached(ttl=CACHE_TTL, tables=[TABLE],
+            tags=lambda row, client, session_id, user_id, *_: [(TABLE, session_key(session_id, user_id))])
+def session_result(client, session_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """The athlete's stored result for a session, or None."""
+    rows = SESSION_RESULT.query(client).eq("session_id", session_id).eq("user_id", user_id).limit(1).execute().data
+    return rows[0] if rows else None
+
+
+@bus_cached(ttl=CACHE_TTL, tables=[TABLE],
+            tags=lambda result, client, benchmark_id, user_id, *_, **__: [(TABLE, benchmark_key(benchmark_id, user_id))])
+def result_history(client, benchmark_id: int, user_id: int, page: int = 0,
+                   page_size: int = HISTORY_PAGE) -> Dict[str, Any]:
+    """
+    One page of the athlete's results for a benchmark, newest first:
+    {"rows": [...], "page": page, "has_more": bool}.
+    """
+    start = page * page_size
+    rows = (
+        RESULT_HISTORY.query(client)
+        .eq("benchmark_id", benchmark_id)
+        .eq("user_id", user_id)
+        .order("timestamp", desc=True)
+        .order("id", desc=True)
+        .range(start, start + page_size)  # one extra row tells whether another page exists
+        .execute()
+        .data
+    ) or []
+    return {"rows": rows[:page_size], "page": page, "has_more": len(rows) > page_size}
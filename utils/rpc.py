@@ -0,0 +1,46 @@
+# utils/rpc.py
+"""
+Optional Postgres functions (RPCs) with a fallback when they are not deployed.
+
+    data = call_rpc(client, "complete_session_exercises", params)
+    if data is NOT_DEPLOYED:
+        ...  # batched table calls instead
+
+  - NOT_DEPLOYED is returned when the client has no .rpc (older clients), or when
+    PostgREST reports the function missing (PGRST202, or Postgres 42883
+    undefined_function). Only that error marks the function unavailable for the rest of
+    the process.
+  - Every other error (timeouts, 5xx, RLS / permission errors) is raised to the caller;
+    one transient failure never switches the RPC path off.
+"""
+from typing import Any, Dict, Set
+
+MISSING_FUNCTION_CODES = {"PGRST202", "42883"}
+
+NOT_DEPLOYED = object()
+
+_missing: Set[str] = set()
+
+
+def _error_code(error: Exception) -> str:
+    code = getattr(error, "code", None)
+    if code is None and error.args and isinstance(error.args[0], dict):
+        code = error.args[0].get("code")  # postgrest APIError built from the response body
+    return str(code or "")
+
+
+def is_missing_function(error: Exception) -> bool:
+    return _error_code(error) in MISSING_FUNCTION_CODES
+
+
+def call_rpc(client, name: str, params: Dict[str, Any]) -> Any:
+    """The RPC's response data, or NOT_DEPLOYED when the function does not exist."""
+    if name in _missing or not hasattr(client, "rpc"):
+        return NOT_DEPLOYED
+    try:
+        return client.rpc(name, params).execute().data
+    except Exception as e:
+        if not is_missing_function(e):
+            raise
+        _missing.add(name)
+        return NOT_DEPLOYED
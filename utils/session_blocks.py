@@ -0,0 +1,181 @@
+# utils/session_blocks.py
+"""
+Compact set storage: one plan_session_blocks row per (session, exercise) holding the
+set prescriptions and results as a JSON array, instead of one plan_session_exercises
+row per set repeating the exercise name, id, tempo and equipment.
+
+  - Opt-in with PLAN_SET_LAYOUT=blocks (default "rows"); only COMPACT_SESSION_TYPES
+    (Heavy / Olympic, 8-9 sets of one lift) are compacted, other sessions keep rows.
+    The setting only picks the layout new syncs write: readers always look for blocks
+    and fall back to rows, so switching it back never hides sessions already stored.
+  - compact_rows() turns plan_session_exercises-shaped rows into block rows; every sync
+    backend builds rows as before and compacts them just before writing.
+  - load_session_sets() is the compatibility reader for the session views: it returns
+    row-per-set dicts (same keys as plan_session_exercises) from both layouts, already
+    grouped by exercise, and routes edits back to the right table through the session's
+    write-behind queue.
+
+Postgres / Supabase table (applied by migrations/0001_plan_schema.sql):
+    create table plan_session_blocks (
+        id bigserial primary key,
+        session_id bigint not null,
+        exercise_name text,
+        exercise_id bigint,
+        exercise_order int,
+        tempo text,
+        equipment text,
+        sets jsonb not null default '[]'::jsonb
+    );
+    create index ix_plan_session_blocks_session_order on plan_session_blocks (session_id, exercise_order);
+    create index ix_plan_session_blocks_name on plan_session_blocks (exercise_name);
+"""
+import copy
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.pagination import fetch_in
+from utils.projections import SESSION_BLOCKS, SESSION_SETS
+
+TABLE = "plan_session_blocks"
+ROW_TABLE = "plan_session_exercises"
+
+LAYOUT = os.getenv("PLAN_SET_LAYOUT", "rows").strip().lower()
+COMPACT_SESSION_TYPES = ("Heavy", "Olympic")
+
+# Shared by every set of a block / kept per set
+BLOCK_FIELDS = ("exercise_name", "exercise_id", "tempo", "equipment")
+SET_FIELDS = (
+    "exercise_order", "set_number", "reps", "intensity", "rest", "notes",
+    "expected_weight", "completed", "actual_reps", "actual_weight",
+)
+
+
+def compact_enabled(layout: Optional[str] = None) -> bool:
+    """True if the layout (default: PLAN_SET_LAYOUT) writes blocks."""
+    return (layout or LAYOUT) == "blocks"
+
+
+def compacts(session_type: Optional[str], layout: Optional[str] = None) -> bool:
+    """True if sessions of this type are written as blocks (write side only; readers check both tables)."""
+    return compact_enabled(layout) and session_type in COMPACT_SESSION_TYPES
+
+
+# ---------- WRITE SIDE ----------
+def compact_rows(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    plan_session_exercises rows (any number of sessions) -> plan_session_blocks rows,
+    one per (session_id, exercise_name) in order of first appearance.
+    """
+    blocks: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        key = (row.get("session_id"), row.get("exercise_name"))
+        block = blocks.get(key)
+        if block is None:
+            block = blocks[key] = {
+                "session_id": row.get("session_id"),
+                **{f: row.get(f) for f in BLOCK_FIELDS},
+                "exercise_order": row.get("exercise_order"),
+                "sets": [],
+            }
+        block["sets"].append({f: row.get(f) for f in SET_FIELDS})
+    return list(blocks.values())
+
+
+def set_count(blocks: Iterable[Dict[str, Any]]) -> int:
+    return sum(len(b.get("sets") or []) for b in blocks)
+
+
+# ---------- READ SIDE ----------
+def set_row_id(block_id: Any, index: int) -> str:
+    """Id of an expanded set row ('<block id>:<set index>'); plain rows keep their integer id."""
+    return f"{block_id}:{index}"
+
+
+def expand_block(block: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One plan_session_exercises-shaped dict per set (plus block_id / set_index)."""
+    shared = {"session_id": block.get("session_id"), **{f: block.get(f) for f in BLOCK_FIELDS}}
+    return [
+        {
+            "id": set_row_id(block.get("id"), i),
+            "block_id": block.get("id"),
+            "set_index": i,
+            **shared,
+            **s,
+        }
+        for i, s in enumerate(block.get("sets") or [])
+    ]
+
+
+def expand_blocks(blocks: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    rows = [row for block in blocks for row in expand_block(block)]
+    rows.sort(key=lambda r: (r.get("session_id") or 0, r.get("exercise_order") or 0))
+    return rows
+
+
+class SessionSets:
+    """
+    The set rows of one session, whichever layout stores them.
+      - rows: plan_session_exercises-shaped dicts in exercise_order
+      - grouped(): exercise_name -> its sets in set_number order
+      - update(row_id, values): queue an edit to one set on the session's write-behind queue
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], blocks: Optional[List[Dict[str, Any]]] = None, queue=None):
+        self.rows = rows
+        self.blocks = {b["id"]: b for b in blocks} if blocks else {}
+        self.queue = queue
+        self._by_id = {r["id"]: r for r in rows}
+
+    @property
+    def compact(self) -> bool:
+        return bool(self.blocks)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def grouped(self) -> Dict[str, List[Dict[str, Any]]]:
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self.rows:
+            groups.setdefault(row["exercise_name"], []).append(row)
+        for sets in groups.values():
+            sets.sort(key=lambda r: r.get("set_number") or 1)
+        return groups
+
+    def update(self, row_id: Any, values: Dict[str, Any]) -> None:
+        row = self._by_id.get(row_id)
+        if row is not None:
+            row.update(values)
+        if row is None or row.get("block_id") is None:
+            self.queue.update(ROW_TABLE, row_id, values)
+            return
+        block = self.blocks[row["block_id"]]
+        block["sets"][row["set_index"]].update(values)
+        # The whole array is the unit of write; later edits coalesce into one pending update
+        self.queue.update(TABLE, block["id"], {"sets": copy.deepcopy(block["sets"])})
+
+
+def load_session_sets(client, session: Dict[str, Any], queue=None) -> SessionSets:
+    """
+    Compatibility reader for one routed session (st.session_state.selected_session).
+    Reads both layouts whatever PLAN_SET_LAYOUT is now: a session synced as blocks keeps
+    its blocks after the setting goes back to rows, and a merge sync may have appended
+    rows to it since. Pending queue edits are applied to whatever was read.
+    """
+    session_id = session["session_id"]
+    blocks = SESSION_BLOCKS.query(client).eq("session_id", session_id).order("exercise_order").execute().data or []
+    rows = SESSION_SETS.query(client).eq("session_id", session_id).order("exercise_order").execute().data or []
+    if queue is not None:
+        queue.overlay(TABLE, blocks)
+        queue.overlay(ROW_TABLE, rows)
+    if not blocks:
+        return SessionSets(rows, queue=queue)
+    merged = expand_blocks(blocks) + rows
+    merged.sort(key=lambda r: r.get("exercise_order") or 0)
+    return SessionSets(merged, blocks, queue)
+
+
+def fetch_block_sets(client, session_ids: List[int], columns: str = SESSION_BLOCKS.select_list) -> List[Dict[str, Any]]:
+    """Expanded set rows for many sessions (whichever of them are stored as blocks)."""
+    if not session_ids:
+        return []
+    return expand_blocks(fetch_in(client, TABLE, columns, "session_id", session_ids))
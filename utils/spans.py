@@ -0,0 +1,177 @@
+# utils/spans.py
+"""
+Lightweight timing spans for plan generation.
+
+    with record_spans() as rec:
+        plan = gen.generate_full_plan(start_date, skill=skill)
+    rec.rows()   # [{"span": "generate_full_plan / day / WOD", "calls": 36, "total_ms": ..., "queries": 0, "pool": 41}, ...]
+
+  - span(name) / @traced(name) time a block; nested spans are reported by path.
+  - annotate(**values) attaches numbers (e.g. candidate pool sizes) to the innermost
+    open span; rows report the largest value seen.
+  - count_queries(client) wraps a client so every execute() is counted against the
+    spans open at the time.
+  - profile_call(fn, ...) runs fn under cProfile and returns a pstats report.
+
+With no recorder active, span/annotate/count are a context-variable lookup and return.
+"""
+import cProfile
+import functools
+import io
+import pstats
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class SpanRecorder:
+    """Aggregates span timings by path (calls, total / max ms, queries, annotations)."""
+
+    def __init__(self):
+        self.queries = 0
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, path: str, ms: float, queries: int, notes: Dict[str, Any]) -> None:
+        stat = self.stats.setdefault(path, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "queries": 0, "notes": {}})
+        stat["calls"] += 1
+        stat["total_ms"] += ms
+        stat["max_ms"] = max(stat["max_ms"], ms)
+        stat["queries"] += queries
+        for key, value in notes.items():
+            previous = stat["notes"].get(key)
+            stat["notes"][key] = value if previous is None else max(previous, value)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """One row per span path, slowest (total) first."""
+        rows = []
+        for path, stat in self.stats.items():
+            rows.append({
+                "span": path,
+                "calls": stat["calls"],
+                "total_ms": round(stat["total_ms"], 2),
+                "avg_ms": round(stat["total_ms"] / stat["calls"], 3),
+                "max_ms": round(stat["max_ms"], 3),
+                "queries": stat["queries"],
+                **stat["notes"],
+            })
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+
+_recorder: ContextVar[Optional[SpanRecorder]] = ContextVar("span_recorder", default=None)
+_stack: ContextVar[Tuple[Tuple[str, Dict[str, Any]], ...]] = ContextVar("span_stack", default=())
+
+
+@contextmanager
+def record_spans(recorder: Optional[SpanRecorder] = None):
+    """Collect spans opened inside the block (in this thread / task) into a recorder."""
+    recorder = recorder or SpanRecorder()
+    rec_token, stack_token = _recorder.set(recorder), _stack.set(())
+    try:
+        yield recorder
+    finally:
+        _stack.reset(stack_token)
+        _recorder.reset(rec_token)
+
+
+@contextmanager
+def span(name: str):
+    recorder = _recorder.get()
+    if recorder is None:
+        yield
+        return
+    parent = _stack.get()
+    notes: Dict[str, Any] = {}
+    token = _stack.set(parent + ((name, notes),))
+    queries, started = recorder.queries, time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - started) * 1000
+        _stack.reset(token)
+        path = " / ".join([n for n, _ in parent] + [name])
+        recorder.add(path, ms, recorder.queries - queries, notes)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span(name)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recorder.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def annotate(**values: Any) -> None:
+    """Attach values to the innermost open span (no-op when nothing is recording)."""
+    stack = _stack.get()
+    if stack and _recorder.get() is not None:
+        stack[-1][1].update(values)
+
+
+def count_query() -> None:
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.queries += 1
+
+
+# ---------- QUERY COUNTING ----------
+class _CountingQuery:
+    """Wraps a query builder; chained builders stay wrapped, execute() is counted."""
+    __slots__ = ("_query",)
+
+    def __init__(self, query):
+        self._query = query
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name == "execute":
+            def execute(*args, **kwargs):
+                count_query()
+                return attr(*args, **kwargs)
+            return execute
+        if callable(attr):
+            def chain(*args, **kwargs):
+                result = attr(*args, **kwargs)
+                return _CountingQuery(result) if hasattr(result, "execute") else result
+            return chain
+        return _CountingQuery(attr) if hasattr(attr, "execute") else attr
+
+
+class CountingClient:
+    """Client proxy that counts executed queries into the active span recorder."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name: str):
+        return _CountingQuery(self._client.table(name))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def count_queries(client):
+    if client is None or isinstance(client, CountingClient):
+        return client
+    return CountingClient(client)
+
+
+# ---------- PROFILER ----------
+def profile_call(fn: Callable, *args, sort: str = "cumulative", limit: int = 40,
+                 dump_path: Optional[str] = None, **kwargs) -> Tuple[Any, str]:
+    """
+    Run fn(*args, **kwargs) under cProfile. Returns (result, pstats report text).
+    dump_path: also write the raw stats (for snakeviz / pstats.Stats(path)).
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(fn, *args, **kwargs)
+    if dump_path:
+        profiler.dump_stats(dump_path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return result, out.getvalue()
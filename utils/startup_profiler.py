@@ -0,0 +1,106 @@
+# utils/startup_profiler.py
+"""
+Import-time profiling for cold start / first paint.
+
+Two views of the same question ("what does loading this cost?"):
+  - timed_import(name): in-process import that records wall time in IMPORT_TIMES.
+    Used by the session view registry so the dashboard can show what it loaded.
+  - measure_cold_imports(modules): runs a fresh interpreter with -X importtime and
+    returns per-module self / cumulative times, i.e. true cold-start cost.
+
+CLI:
+    python -m utils.startup_profiler session_views.heavy storage --top 20
+"""
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# module name -> milliseconds spent in its first in-process import
+IMPORT_TIMES: Dict[str, float] = {}
+
+
+def enabled() -> bool:
+    """Profiling output is shown when STARTUP_PROFILE is set to a truthy value."""
+    return os.getenv("STARTUP_PROFILE", "").lower() in ("1", "true", "yes", "on")
+
+
+def timed_import(name: str):
+    """Import a module, recording how long the first (uncached) import took."""
+    if name in sys.modules:
+        return sys.modules[name]
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = round((time.perf_counter() - started) * 1000, 1)
+    return module
+
+
+def measure_cold_imports(modules: List[str], python: Optional[str] = None) -> List[Dict[str, float]]:
+    """
+    Import modules in a fresh interpreter (-X importtime) and parse its report.
+    Returns one record per imported module: {"module", "self_ms", "cumulative_ms", "depth"},
+    in import order. Raises RuntimeError if the import fails.
+    """
+    import subprocess
+
+    code = "; ".join(f"import {m}" for m in modules) or "pass"
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    records = []
+    for line in proc.stderr.splitlines():
+        # "import time:       123 |        456 |   package.module"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            records.append({
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            })
+        except ValueError:
+            continue
+    return records
+
+
+def top_records(records: List[Dict[str, float]], top: int = 20, key: str = "self_ms") -> List[Dict[str, float]]:
+    return sorted(records, key=lambda r: r[key], reverse=True)[:top]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report per-module import time for a cold start.")
+    parser.add_argument("modules", nargs="*", default=["session_views", "storage", "utils.write_behind"])
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--sort", choices=["self_ms", "cumulative_ms"], default="cumulative_ms")
+    args = parser.parse_args(argv)
+
+    try:
+        records = measure_cold_imports(args.modules)
+    except RuntimeError as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+
+    total = sum(r["cumulative_ms"] for r in records if r["depth"] == 0)
+    print(f"{'self ms':>10} {'cumul ms':>10}  module")
+    for r in top_records(records, args.top, args.sort):
+        print(f"{r['self_ms']:>10.1f} {r['cumulative_ms']:>10.1f}  {r['module']}")
+    print(f"\ntotal: {total:.1f} ms across {len(records)} modules")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+from utils.cache_bus import publish, publish_many
+from utils.day_progress import TABLE as DAY_PROGRESS_TABLE, increment_progress, rebuild_day_progress
+
+FLUSH_INTERVAL_SECONDS = 2.0
+SPILL_DIR = os.getenv("WRITE_BEHIND_DIR", ".write_behind")
+
+# Counter tables increment() supports: table -> (apply(client, key, deltas), recount(client, keys))
+COUNTERS = {
+    DAY_PROGRESS_TABLE: (increment_progress, rebuild_day_progress),
+}
+
+
+class WriteBehindQueue:
+    """
+    Local buffer for session-logging updates (completion flags, weights, reps).
+
+      - update() records the edit locally and returns immediately.
+      - Repeated edits to the same (table, row id) are coalesced into one pending write.
+      - A background thread flushes every flush_interval seconds; flush() can be called
+        directly (e.g. on "Back to Dashboard").
+      - Pending rows sharing identical values are written with a single
+        update(...).in_("id", ids) call.
+      - increment() buffers additive counter changes (the tables in COUNTERS); deltas for
+        the same row are summed and applied as one atomic increment per flush.
+      - Each successful write publishes (table, id) on utils.cache_bus, so cached
+        readers of those rows are evicted.
+      - Every edit is appended to a JSONL spill file first, so pending writes survive a
+        process restart and are replayed the next time the queue is opened.
+      - Increments are not idempotent, so spilled ones are never replayed: a counter row
+        with a spilled increment is recounted from its source rows instead (after the
+        replayed row edits are written). A crash between applying deltas and rewriting
+        the spill therefore cannot count anything twice.
+    """
+
+    def __init__(self, client, spill_path, flush_interval: float = FLUSH_INTERVAL_SECONDS, autostart: bool = True):
+        self.client = client
+        self.spill_path = Path(spill_path)
+        self.flush_interval = flush_interval
+        self._pending = {}   # (table, row_id) -> {"values": {...}, "version": int}
+        self._counters = {}  # (table, key_column, key) -> {column: delta}
+        self._recount = {}   # table -> keys to recount (from a previous process's spill)
+        self._version = 0
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_error = None
+
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        self._replay_spill()
+        if autostart:
+            self.start()
+
+    # ---------- recording ----------
+    def update(self, table, row_id, values):
+        """Queue `UPDATE table SET values WHERE id = row_id`."""
+        with self._lock:
+            self._version += 1
+            entry = self._pending.setdefault((table, row_id), {"values": {}, "version": 0})
+            entry["values"].update(values)
+            entry["version"] = self._version
+            with open(self.spill_path, "a", encoding="utf-8") as fp:
+                fp.write(json.dumps({"table": table, "id": row_id, "values": values}, default=str) + "\n")
+
+    def increment(self, table, key_column, key, deltas):
+        """Queue `UPDATE table SET col = col + delta WHERE key_column = key` for each delta."""
+        if table not in COUNTERS:
+            raise ValueError(f"no counter support for table {table!r}")
+        deltas = {col: d for col, d in deltas.items() if d}
+        if not deltas:
+            return
+        with self._lock:
+            self._add_deltas((table, key_column, key), deltas)
+            with open(self.spill_path, "a", encoding="utf-8") as fp:
+                fp.write(json.dumps({"op": "inc", "table": table, "key_column": key_column, "key": key, "deltas": deltas}, default=str) + "\n")
+
+    def _add_deltas(self, counter_key, deltas):
+        counter = self._counters.setdefault(counter_key, {})
+        for col, d in deltas.items():
+            counter[col] = counter.get(col, 0) + d
+            if not counter[col]:
+                del counter[col]
+        if not counter:
+            del self._counters[counter_key]
+
+    def pending_values(self, table, row_id):
+        with self._lock:
+            entry = self._pending.get((table, row_id))
+            return dict(entry["values"]) if entry else {}
+
+    def overlay(self, table, rows):
+        """Apply not-yet-flushed edits to rows freshly read from the database."""
+        with self._lock:
+            if not self._pending:
+                return rows
+            for row in rows:
+                entry = self._pending.get((table, row.get("id")))
+                if entry:
+                    row.update(entry["values"])
+        return rows
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending) + len(self._counters) + sum(len(keys) for keys in self._recount.values())
+
+    # ---------- flushing ----------
+    def flush(self) -> int:
+        """Write all pending edits. Returns the number of rows written; failures stay queued."""
+        with self._flush_lock:
+            with self._lock:
+                snapshot = {key: (dict(e["values"]), e["version"]) for key, e in self._pending.items()}
+                counters, self._counters = self._counters, {}
+                recount, self._recount = self._recount, {}
+            if not snapshot and not counters and not recount:
+                return 0
+
+            batches = {}
+            for (table, row_id), (values, _version) in snapshot.items():
+                batch_key = (table, json.dumps(values, sort_keys=True, default=str))
+                batches.setdefault(batch_key, (values, []))[1].append(row_id)
+
+            written, rows_failed = [], False
+            for (table, _), (values, ids) in batches.items():
+                try:
+                    self.client.table(table).update(values).in_("id", ids).execute()
+                except Exception as e:  # keep the rows queued and retry on the next flush
+                    self.last_error = e
+                    rows_failed = True
+                    continue
+                written.extend((table, row_id) for row_id in ids)
+                publish_many(table, ids)
+
+            applied, failed_counters = 0, {}
+            for counter_key, deltas in counters.items():
+                try:
+                    self._apply_deltas(*counter_key, deltas)
+                except Exception as e:  # re-queue the deltas for the next flush
+                    self.last_error = e
+                    failed_counters[counter_key] = deltas
+                    continue
+                applied += 1
+                publish(counter_key[0], counter_key[2])
+
+            # Recounts read the source rows, so they wait until every row edit is written
+            failed_recount = dict(recount) if rows_failed else {}
+            for table, keys in recount.items():
+                if rows_failed:
+                    break
+                try:
+                    COUNTERS[table][1](self.client, sorted(keys))
+                except Exception as e:
+                    self.last_error = e
+                    failed_recount[table] = keys
+                    continue
+                applied += len(keys)
+
+            with self._lock:
+                for key in written:
+                    entry = self._pending.get(key)
+                    # Only drop entries that were not edited again while we were writing
+                    if entry and entry["version"] == snapshot[key][1]:
+                        del self._pending[key]
+                for counter_key, deltas in failed_counters.items():
+                    self._add_deltas(counter_key, deltas)
+                for table, keys in failed_recount.items():
+                    self._recount.setdefault(table, set()).update(keys)
+                self._rewrite_spill()
+            return len(written) + applied
+
+    def _apply_deltas(self, table, key_column, key, deltas):
+        COUNTERS[table][0](self.client, key, deltas)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"write-behind:{self.spill_path.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self, flush: bool = True):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval * 2)
+        if flush:
+            self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    # ---------- spill file ----------
+    def _replay_spill(self):
+        if not self.spill_path.exists():
+            return
+        with open(self.spill_path, encoding="utf-8") as fp:
+            for line in fp:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash mid-write
+                if rec.get("op") in ("inc", "recount"):
+                    # The increment may already have been applied before the crash: recount instead
+                    if rec["table"] in COUNTERS:
+                        self._recount.setdefault(rec["table"], set()).add(rec["key"])
+                    continue
+                self._version += 1
+                entry = self._pending.setdefault((rec["table"], rec["id"]), {"values": {}, "version": 0})
+                entry["values"].update(rec["values"])
+                entry["version"] = self._version
+
+    def _rewrite_spill(self):
+        if not self._pending and not self._counters and not self._recount:
+            self.spill_path.unlink(missing_ok=True)
+            return
+        tmp = self.spill_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fp:
+            for (table, row_id), entry in self._pending.items():
+                fp.write(json.dumps({"table": table, "id": row_id, "values": entry["values"]}, default=str) + "\n")
+            for (table, key_column, key), deltas in self._counters.items():
+                fp.write(json.dumps({"op": "inc", "table": table, "key_column": key_column, "key": key, "deltas": deltas}, default=str) + "\n")
+            for table, keys in self._recount.items():
+                for key in sorted(keys):
+                    fp.write(json.dumps({"op": "recount", "table": table, "key": key}, default=str) + "\n")
+        os.replace(tmp, self.spill_path)
+
+
+# ---------- per-session registry ----------
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_session_queue(session_id, client, spill_dir: str = SPILL_DIR) -> WriteBehindQueue:
+    """Return the write-behind queue for a plan session, creating (and replaying) it on first use."""
+    with _queues_lock:
+        queue = _queues.get(session_id)
+        if queue is None:
+            queue = WriteBehindQueue(client, Path(spill_dir) / f"session_{session_id}.jsonl")
+            _queues[session_id] = queue
+        return queue
+
+
+def recover_spilled(client, spill_dir: str = SPILL_DIR) -> int:
+    """Flush every spill file left behind by a previous process. Returns rows written."""
+    written = 0
+    spill_root = Path(spill_dir)
+    if not spill_root.exists():
+        return 0
+    for path in spill_root.glob("session_*.jsonl"):
+        session_id = path.stem[len("session_"):]
+        try:
+            session_id = int(session_id)
+        except ValueError:
+            pass
+        written += get_session_queue(session_id, client, spill_dir).flush()
+    return written